@@ -0,0 +1,18 @@
+import logging
+
+from app_logging import setup_logging
+from db.bootstrap import criar_tabelas
+from services.apc_preview_worker import apc_preview_worker_loop
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logger.info("Inicializando worker de previews APC")
+    criar_tabelas()
+    apc_preview_worker_loop()
+
+
+if __name__ == "__main__":
+    main()
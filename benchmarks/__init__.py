@@ -0,0 +1 @@
+"""Benchmarks executaveis com `python -m benchmarks.<modulo>`."""
@@ -0,0 +1,73 @@
+"""Mede o custo de importacao (tempo e memoria) dos pontos de entrada.
+
+Cada rodada sobe um interpretador novo e importa ``main`` (API) ou um dos
+workers, registrando o tempo do import, o pico de RSS e quais bibliotecas
+pesadas (FastAPI, pypdf, Pillow, ReportLab) ficaram carregadas. PDF e imagem
+so devem aparecer quando uma rota ou job realmente os usa.
+
+Uso: ``python -m benchmarks.app_import --rodadas 5``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+PONTOS_DE_ENTRADA = ("main", "worker_main", "notification_worker_main", "apc_preview_worker_main")
+BIBLIOTECAS_PESADAS = ("fastapi", "pypdf", "PIL", "reportlab", "yt_dlp")
+
+_SCRIPT_IMPORT = """
+import importlib, json, resource, sys, time
+inicio = time.perf_counter()
+importlib.import_module(sys.argv[1])
+fim = time.perf_counter()
+print(json.dumps({
+    "import_ms": (fim - inicio) * 1000,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modulos": len(sys.modules),
+    "pesadas": [nome for nome in sys.argv[2:] if nome in sys.modules],
+}))
+"""
+
+
+def _importar(modulo: str, db_path: Path) -> dict:
+    ambiente = {**os.environ, "DB_PATH": str(db_path)}
+    saida = subprocess.run(
+        [sys.executable, "-c", _SCRIPT_IMPORT, modulo, *BIBLIOTECAS_PESADAS],
+        cwd=BASE_DIR,
+        env=ambiente,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("modulos", nargs="*", default=list(PONTOS_DE_ENTRADA))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "impressao.db"
+        for modulo in args.modulos:
+            rodadas = [_importar(modulo, db_path) for _ in range(args.rodadas)]
+            tempo = statistics.median(item["import_ms"] for item in rodadas)
+            memoria = statistics.median(item["rss_mb"] for item in rodadas)
+            print(
+                f"{modulo:>25}: import {tempo:7.1f} ms | RSS {memoria:6.1f} MB"
+                f" | {rodadas[-1]['modulos']:5d} modulos | pesadas: {', '.join(rodadas[-1]['pesadas']) or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
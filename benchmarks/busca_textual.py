@@ -0,0 +1,142 @@
+"""Latencia da busca textual: ``LIKE '%termo%'`` contra os indices FTS5.
+
+Popula um banco temporario com estudantes, professores, ocorrencias e eventos
+de auditoria em volume de alguns anos letivos e mede, para termos tipicos de
+autocompletar, a consulta antiga (varredura com LIKE) e a nova (``MATCH`` em
+``db.busca_textual``). Tambem mede o custo dos gatilhos na escrita.
+
+Uso: ``python -m benchmarks.busca_textual --estudantes 20000 --eventos 200000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_NOMES = ("João", "Maria", "Ana", "José", "Antônio", "Francisca", "Márcia", "Conceição", "Luís", "Sebastião")
+_SOBRENOMES = ("Silva", "Souza", "Gonçalves", "Araújo", "Conceição", "Pereira", "Lima", "Simões", "Brandão")
+_PALAVRAS = ("agressão", "celular", "atraso", "indisciplina", "conversa", "material", "tarefa", "uniforme")
+
+# (rotulo, indice, termo, sql LIKE equivalente ao codigo anterior)
+_CONSULTAS = (
+    ("estudante", "estudantes", "joao sil",
+     "SELECT id FROM estudantes WHERE LOWER(nome) LIKE ? LIMIT 20", "%joao sil%"),
+    ("estudante", "estudantes", "conceicao",
+     "SELECT id FROM estudantes WHERE LOWER(nome) LIKE ? LIMIT 20", "%conceicao%"),
+    ("professor", "usuarios", "marc",
+     "SELECT id FROM usuarios WHERE LOWER(nome) LIKE ? OR LOWER(email) LIKE ? LIMIT 20", "%marc%"),
+    ("ocorrencia", "ocorrencias", "agressao",
+     "SELECT id FROM ocorrencias WHERE LOWER(descricao) LIKE ? LIMIT 50", "%agressao%"),
+    ("auditoria", "auditoria", "goncalves",
+     "SELECT COUNT(*) FROM audit_events WHERE description LIKE ? OR actor_name LIKE ?", "%goncalves%"),
+)
+
+
+def _nome(aleatorio: random.Random) -> str:
+    return f"{aleatorio.choice(_NOMES)} {aleatorio.choice(_NOMES)} {aleatorio.choice(_SOBRENOMES)}"
+
+
+def _popular(db_path: Path, args) -> dict[str, float]:
+    aleatorio = random.Random(5)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("INSERT INTO turmas (nome, turno, criado_em) VALUES ('7A', 'MATUTINO', datetime('now'))")
+    turma_id = conn.execute("SELECT id FROM turmas").fetchone()[0]
+    tempos = {}
+
+    inicio = time.perf_counter()
+    conn.executemany(
+        "INSERT INTO estudantes (nome, turma_id) VALUES (?, ?)",
+        [(_nome(aleatorio), turma_id) for _ in range(args.estudantes)],
+    )
+    conn.executemany(
+        "INSERT INTO usuarios (nome, email, senha_hash, perfil, cargo) VALUES (?, ?, 'x', 'professor', 'PROFESSOR')",
+        [(_nome(aleatorio), f"prof{i}@escola") for i in range(args.professores)],
+    )
+    conn.executemany(
+        """
+        INSERT INTO ocorrencias (
+            nome_estudante, turma_id, professor_requerente, disciplina, data_ocorrencia,
+            aula, horario_ocorrencia, descricao, acao_aplicada
+        )
+        VALUES (?, ?, 'Professor', 'Historia', '2026-03-10', '1', '07:30', ?, 'advertencia')
+        """,
+        [
+            (_nome(aleatorio), turma_id, " ".join(aleatorio.choices(_PALAVRAS, k=12)))
+            for _ in range(args.ocorrencias)
+        ],
+    )
+    conn.executemany(
+        """
+        INSERT INTO audit_events (category, action, outcome, actor_name, actor_email, description)
+        VALUES ('users', 'user.update', 'success', ?, 'coord@escola', ?)
+        """,
+        [(_nome(aleatorio), f"Cadastro de {_nome(aleatorio)} atualizado.") for _ in range(args.eventos)],
+    )
+    conn.commit()
+    tempos["carga_com_gatilhos_ms"] = (time.perf_counter() - inicio) * 1000
+    conn.close()
+    return tempos
+
+
+def _medir(conn: sqlite3.Connection, sql: str, params: list, rodadas: int) -> float:
+    tempos = []
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", type=int, default=20000)
+    parser.add_argument("--professores", type=int, default=400)
+    parser.add_argument("--ocorrencias", type=int, default=50000)
+    parser.add_argument("--eventos", type=int, default=200000)
+    parser.add_argument("--rodadas", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "impressao.db"
+        os.environ["DB_PATH"] = str(db_path)
+        sys.modules.pop("database", None)
+        database = importlib.import_module("database")
+        busca = importlib.import_module("db.busca_textual")
+        database.criar_tabelas()
+        tempos = _popular(db_path, args)
+        print(
+            f"banco: {db_path.stat().st_size / 1024 / 1024:6.1f} MB | carga com gatilhos FTS"
+            f" {tempos['carga_com_gatilhos_ms']:8.1f} ms"
+        )
+
+        conn = sqlite3.connect(str(db_path))
+        for rotulo, indice, termo, sql_like, padrao in _CONSULTAS:
+            tempo_like = _medir(conn, sql_like, [padrao] * sql_like.count("?"), args.rodadas)
+            filtro, params = busca.filtro_busca(indice, termo, coluna_id="id")
+            tabela = busca.INDICES_BUSCA[indice].tabela
+            tempo_fts = _medir(conn, f"SELECT id FROM {tabela} WHERE {filtro} LIMIT 50", params, args.rodadas)
+            juncao, params_juncao = busca.juncao_busca(indice, termo, coluna_id=f"{tabela}.id")
+            tempo_ranqueado = _medir(
+                conn,
+                f"SELECT {tabela}.id FROM {tabela} {juncao} WHERE busca.id IS NOT NULL"
+                " ORDER BY busca.relevancia LIMIT 20",
+                params_juncao,
+                args.rodadas,
+            )
+            print(
+                f"{rotulo:>10} {termo!r:>12}: LIKE {tempo_like:7.2f} ms | FTS {tempo_fts:7.2f} ms"
+                f" | FTS ranqueado {tempo_ranqueado:7.2f} ms"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Custo do pacote ``/ocorrencias/opcoes``: montagem completa, cache e 304.
+
+Popula um banco temporario com turmas, professores, disciplinas e uma base
+legal do tamanho de um regimento real e mede a rota de opcoes em tres
+situacoes: montando o pacote a cada chamada (como antes do cache), servindo o
+pacote pronto da memoria e respondendo 304 para quem ja tem o ETag.
+
+Uso: ``python -m benchmarks.catalogo_opcoes --professores 150 --artigos 120``
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def _popular(db_path: Path, args) -> None:
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO turmas (nome, turno, quantidade_estudantes, ativo, criado_em) VALUES (?, 'MATUTINO', 30, 1, datetime('now'))",
+        [(f"Turma {i}",) for i in range(args.turmas)],
+    )
+    conn.executemany(
+        "INSERT INTO disciplinas (nome, aulas_semanais, ativo, criado_em) VALUES (?, 4, 1, datetime('now'))",
+        [(f"Disciplina {i}",) for i in range(args.disciplinas)],
+    )
+    conn.executemany(
+        "INSERT INTO usuarios (nome, email, senha_hash, perfil, cargo) VALUES (?, ?, 'x', 'professor', 'PROFESSOR')",
+        [(f"Professor {i}", f"prof{i}@escola") for i in range(args.professores)],
+    )
+    for lei in range(3):
+        lei_id = conn.execute("INSERT INTO leis (nome) VALUES (?)", (f"Lei {lei}",)).lastrowid
+        for artigo in range(args.artigos // 3):
+            artigo_id = conn.execute(
+                "INSERT INTO artigos (lei_id, numero, descricao) VALUES (?, ?, ?)",
+                (lei_id, str(artigo + 1), f"Descricao do artigo {artigo + 1} " * 4),
+            ).lastrowid
+            for inciso in range(4):
+                inciso_id = conn.execute(
+                    "INSERT INTO incisos (artigo_id, numero, descricao) VALUES (?, ?, ?)",
+                    (artigo_id, f"{inciso + 1}", f"Descricao do inciso {inciso + 1} " * 3),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO alineas (inciso_id, identificador, descricao) VALUES (?, ?, ?)",
+                    [(inciso_id, letra, f"Alinea {letra}") for letra in "ab"],
+                )
+    conn.commit()
+    conn.close()
+
+
+def _medir(funcao, rodadas: int) -> tuple[float, object]:
+    tempos = []
+    resultado = None
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def _requisicao(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turmas", type=int, default=45)
+    parser.add_argument("--disciplinas", type=int, default=30)
+    parser.add_argument("--professores", type=int, default=150)
+    parser.add_argument("--artigos", type=int, default=120)
+    parser.add_argument("--rodadas", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "impressao.db"
+        os.environ["DB_PATH"] = str(db_path)
+        for nome_modulo in ("database", "ocorrencias_router"):
+            sys.modules.pop(nome_modulo, None)
+        database = importlib.import_module("database")
+        ocorrencias_router = importlib.import_module("ocorrencias_router")
+        database.criar_tabelas()
+        _popular(db_path, args)
+        usuario = {"cargo": "ADMIN"}
+
+        # Antes do cache a rota devolvia o dict e o FastAPI o serializava a cada chamada.
+        tempo_montagem, _ = _medir(
+            lambda: JSONResponse(jsonable_encoder(ocorrencias_router._montar_opcoes_ocorrencias())),
+            args.rodadas,
+        )
+        tempo_cache, resposta = _medir(
+            lambda: ocorrencias_router.listar_opcoes_ocorrencias(request=_requisicao(), usuario=usuario),
+            args.rodadas,
+        )
+        etag = resposta.headers["etag"]
+        tempo_304, nao_modificada = _medir(
+            lambda: ocorrencias_router.listar_opcoes_ocorrencias(request=_requisicao(etag), usuario=usuario),
+            args.rodadas,
+        )
+        print(f"pacote: {len(resposta.body) / 1024:7.1f} KB")
+        print(f"montagem a cada chamada: {tempo_montagem:7.2f} ms")
+        print(f"pacote em cache (200):   {tempo_cache:7.2f} ms")
+        print(f"If-None-Match ({nao_modificada.status_code}):    {tempo_304:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Mede o dashboard de relatorios lendo os agregados diarios contra a varredura bruta.
+
+Uso: ``python -m benchmarks.dashboard_rollups --anos 3 --jobs-dia 120 --reservas-dia 40``
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+TAGS = ["Atividade", "Prova", "Trabalho avaliativo", "Recuperacao", "Projeto"]
+
+
+def _popular(db_path: Path, *, anos: int, jobs_dia: int, reservas_dia: int, professores: int) -> None:
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO usuarios (nome, email, senha_hash, perfil) VALUES (?, ?, 'x', 'professor')",
+        [(f"Professor {i}", f"prof{i}@escola") for i in range(professores)],
+    )
+    conn.executemany(
+        "INSERT INTO recursos (nome, tipo, ativo) VALUES (?, 'equipamento', 1)",
+        [(f"Recurso {i}",) for i in range(8)],
+    )
+    usuarios = [row[0] for row in conn.execute("SELECT id FROM usuarios")]
+    recursos = [row[0] for row in conn.execute("SELECT id FROM recursos")]
+    aleatorio = random.Random(7)
+    inicio = date.today() - timedelta(days=365 * anos)
+
+    for deslocamento in range(365 * anos):
+        dia = (inicio + timedelta(days=deslocamento)).isoformat()
+        conn.executemany(
+            """
+            INSERT INTO jobs (
+                usuario_id, arquivo, copias, paginas_totais, tags_json, printer_name,
+                status, prioridade, criado_em
+            )
+            VALUES (?, 'a.pdf', 1, ?, ?, ?, 'CONCLUIDO', 0, ?)
+            """,
+            [
+                (
+                    aleatorio.choice(usuarios),
+                    aleatorio.randint(1, 40),
+                    json.dumps(aleatorio.sample(TAGS, aleatorio.randint(1, 2))),
+                    aleatorio.choice(["sala-1", "sala-2", ""]),
+                    f"{dia} 10:00:00",
+                )
+                for _ in range(jobs_dia)
+            ],
+        )
+        conn.executemany(
+            """
+            INSERT INTO agendamentos (recurso_id, usuario_id, data, aula, status, criado_em)
+            VALUES (?, ?, ?, '1', 'ATIVO', datetime('now'))
+            """,
+            [
+                (aleatorio.choice(recursos), aleatorio.choice(usuarios), dia)
+                for _ in range(reservas_dia)
+            ],
+        )
+    conn.commit()
+    conn.close()
+
+
+def _varredura_bruta(db_path: Path, data_inicio: str, data_fim: str) -> None:
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        """
+        SELECT u.id, COUNT(j.id), COALESCE(SUM(j.paginas_totais), 0)
+        FROM usuarios u
+        LEFT JOIN jobs j ON j.usuario_id = u.id AND j.status IN ('CONCLUIDO', 'FINALIZADO')
+        WHERE date(j.criado_em) >= ? AND date(j.criado_em) <= ?
+        GROUP BY u.id
+        """,
+        (data_inicio, data_fim),
+    ).fetchall()
+    agregados: dict[str, int] = {}
+    for (tags_json,) in conn.execute(
+        """
+        SELECT tags_json FROM jobs
+        WHERE status IN ('CONCLUIDO', 'FINALIZADO')
+          AND date(criado_em) >= ? AND date(criado_em) <= ?
+        """,
+        (data_inicio, data_fim),
+    ):
+        for tag in json.loads(tags_json or "[]"):
+            agregados[tag.casefold()] = agregados.get(tag.casefold(), 0) + 1
+    conn.execute(
+        """
+        SELECT a.data, COUNT(a.id) FROM agendamentos a
+        WHERE a.status = 'ATIVO' AND a.data >= ? AND a.data <= ?
+        GROUP BY a.data
+        """,
+        (data_inicio, data_fim),
+    ).fetchall()
+    conn.close()
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--anos", type=int, default=3)
+    parser.add_argument("--jobs-dia", type=int, default=120)
+    parser.add_argument("--reservas-dia", type=int, default=40)
+    parser.add_argument("--professores", type=int, default=150)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "relatorios.db"
+        os.environ["DB_PATH"] = str(db_path)
+        sys.modules.pop("database", None)
+        database = importlib.import_module("database")
+        database.criar_tabelas()
+
+        inicio = time.perf_counter()
+        _popular(
+            db_path,
+            anos=args.anos,
+            jobs_dia=args.jobs_dia,
+            reservas_dia=args.reservas_dia,
+            professores=args.professores,
+        )
+        print(f"carga com gatilhos: {time.perf_counter() - inicio:6.1f} s")
+
+        hoje = date.today()
+        periodos = {
+            "mes atual": (hoje.replace(day=1).isoformat(), hoje.isoformat()),
+            f"{args.anos} ano(s)": ((hoje - timedelta(days=365 * args.anos)).isoformat(), hoje.isoformat()),
+        }
+        for rotulo, (data_inicio, data_fim) in periodos.items():
+            bruto = _medir(lambda: _varredura_bruta(db_path, data_inicio, data_fim), args.repeticoes)
+            agregado = _medir(
+                lambda: database.gerar_dashboard_relatorios(data_inicio, data_fim),
+                args.repeticoes,
+            )
+            print(f"{rotulo:>10}: varredura {bruto:8.1f} ms | dashboard agregado {agregado:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Compara o padrao abrir/fechar por chamada com o pool de conexoes SQLite.
+
+Uso: ``python -m benchmarks.db_connections --threads 8 --operacoes 2000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from db.connection_pool import ConnectionPool
+
+
+def _conexao_legada(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _preparar_banco(db_path: Path, usuarios: int) -> None:
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(
+        """
+        CREATE TABLE usuarios (id INTEGER PRIMARY KEY, nome TEXT NOT NULL);
+        CREATE TABLE tokens (
+            token TEXT PRIMARY KEY,
+            usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+            expira_em TEXT NOT NULL
+        );
+        CREATE TABLE eventos (id INTEGER PRIMARY KEY, usuario_id INTEGER, criado_em TEXT);
+        """
+    )
+    conn.executemany(
+        "INSERT INTO usuarios (id, nome) VALUES (?, ?)",
+        [(i, f"Usuario {i}") for i in range(1, usuarios + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO tokens (token, usuario_id, expira_em) VALUES (?, ?, datetime('now', '+7 days'))",
+        [(f"token-{i}", i) for i in range(1, usuarios + 1)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _operacao(abrir, indice: int, usuarios: int, percentual_escrita: int) -> None:
+    conn = abrir()
+    try:
+        if indice % 100 < percentual_escrita:
+            conn.execute(
+                "INSERT INTO eventos (usuario_id, criado_em) VALUES (?, datetime('now'))",
+                (indice % usuarios + 1,),
+            )
+            conn.commit()
+        else:
+            conn.execute(
+                """
+                SELECT u.id, u.nome
+                FROM usuarios u
+                JOIN tokens t ON t.usuario_id = u.id
+                WHERE t.token = ? AND t.expira_em > datetime('now')
+                """,
+                (f"token-{indice % usuarios + 1}",),
+            ).fetchone()
+    finally:
+        conn.close()
+
+
+def _executar(abrir, *, threads: int, operacoes: int, usuarios: int, escrita: int) -> float:
+    erros: list[BaseException] = []
+
+    def trabalhador(deslocamento: int) -> None:
+        try:
+            for indice in range(operacoes):
+                _operacao(abrir, deslocamento + indice, usuarios, escrita)
+        except BaseException as exc:  # noqa: BLE001 - reportado ao final
+            erros.append(exc)
+
+    inicio = time.perf_counter()
+    workers = [
+        threading.Thread(target=trabalhador, args=(numero * operacoes,))
+        for numero in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    duracao = time.perf_counter() - inicio
+    if erros:
+        raise RuntimeError(f"{len(erros)} thread(s) falharam: {erros[0]!r}")
+    return (threads * operacoes) / duracao
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operacoes", type=int, default=2000, help="Operacoes por thread.")
+    parser.add_argument("--usuarios", type=int, default=500)
+    parser.add_argument("--escrita", type=int, default=5, help="Percentual de escritas.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        resultados = {}
+        for nome in ("abrir/fechar", "pool"):
+            db_path = Path(tmp_dir) / f"{nome.replace('/', '_')}.db"
+            _preparar_banco(db_path, args.usuarios)
+            if nome == "pool":
+                pool = ConnectionPool()
+                abrir = lambda: pool.acquire(db_path)  # noqa: E731
+            else:
+                abrir = lambda: _conexao_legada(db_path)  # noqa: E731
+            resultados[nome] = _executar(
+                abrir,
+                threads=args.threads,
+                operacoes=args.operacoes,
+                usuarios=args.usuarios,
+                escrita=args.escrita,
+            )
+
+    base = resultados["abrir/fechar"]
+    for nome, ops in resultados.items():
+        print(f"{nome:>14}: {ops:10.0f} ops/s  ({ops / base:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
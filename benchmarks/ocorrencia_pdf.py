@@ -0,0 +1,95 @@
+"""PDF de ocorrencia: renderizacao vetorial x raster de 300 DPI.
+
+Uso: ``python -m benchmarks.ocorrencia_pdf --repeticoes 5``
+
+Mede tempo mediano e tamanho do arquivo para um registro curto, um registro
+com base legal e assinatura conjunta, e um registro longo de varias paginas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import time
+
+from pypdf import PdfReader
+
+from services.ocorrencia_pdf_service import MODOS_RENDERIZACAO, gerar_pdf_ocorrencia_registro
+
+FRASE = "O estudante interrompeu a aula repetidas vezes e nao atendeu as orientacoes da professora."
+
+
+def _ocorrencia(descricao: str, **extras) -> dict:
+    ocorrencia = {
+        "id": 12,
+        "nome_estudante": "Geovanna Correia Galeano",
+        "turma_id": 7,
+        "turma_nome": "8 B",
+        "professor_requerente": "Iara Cristini da Silva Cavalcante",
+        "disciplina": "Leitura e Producao Textual",
+        "data_ocorrencia": "2026-03-10",
+        "aula": "2",
+        "horario_ocorrencia": "14:10",
+        "descricao": descricao,
+        "regimento_itens": [],
+        "acao_aplicada": "advertencia",
+        "status": "registrado",
+        "criado_em": "2026-03-10 14:30:00",
+    }
+    ocorrencia.update(extras)
+    return ocorrencia
+
+
+CENARIOS = {
+    "curto": _ocorrencia(FRASE),
+    "base legal + ambos": _ocorrencia(
+        " ".join([FRASE] * 12),
+        quem_assina="ambos",
+        regimento_itens=[
+            {
+                "regimento_item_id": 2,
+                "artigo": "Art. 76 - VII",
+                "descricao": "Integrar-se ao processo pedagogico desenvolvido pela unidade escolar.",
+                "ordem": 1,
+            },
+            {
+                "regimento_item_id": 3,
+                "artigo": "Art. 76 - X",
+                "descricao": "Atender convocacao da Direcao Escolar e Coordenacao Pedagogica.",
+                "ordem": 2,
+            },
+        ],
+    ),
+    "longo": _ocorrencia(" ".join([FRASE] * 250)),
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # A primeira chamada carrega fontes e registra os TTF no reportlab.
+    for modo in MODOS_RENDERIZACAO:
+        gerar_pdf_ocorrencia_registro(CENARIOS["curto"], modo_renderizacao=modo)
+
+    for nome, ocorrencia in CENARIOS.items():
+        for modo in MODOS_RENDERIZACAO:
+            duracoes = []
+            for _ in range(args.repeticoes):
+                inicio = time.perf_counter()
+                pdf_bytes = gerar_pdf_ocorrencia_registro(
+                    ocorrencia, turma={"turno": "MATUTINO"}, modo_renderizacao=modo
+                )
+                duracoes.append(time.perf_counter() - inicio)
+            paginas = len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+            print(
+                f"{nome:<20} {modo:<9} {statistics.median(duracoes) * 1000:8.0f} ms | "
+                f"{len(pdf_bytes) / 1024:8.0f} KB | {paginas} pagina(s)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
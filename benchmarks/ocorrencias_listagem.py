@@ -0,0 +1,153 @@
+"""Compara a listagem completa de ocorrencias com a paginacao por keyset.
+
+Popula um banco temporario com ``--ocorrencias`` registros sinteticos (com
+estudantes vinculados e itens do regimento) e mede, para alguns filtros
+tipicos da coordenacao, ``listar_ocorrencias`` (tudo hidratado) contra a
+primeira pagina e uma pagina profunda de ``listar_ocorrencias_pagina``.
+
+Uso: ``python -m benchmarks.ocorrencias_listagem --ocorrencias 50000``
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+_FILTROS = {
+    "sem filtro": {},
+    "status": {"status": "em_acompanhamento"},
+    "turma + periodo": {"turma_id": 3, "data_inicial": "2025-03-01", "data_final": "2025-06-30"},
+    "nome do estudante": {"nome_estudante": "silva"},
+}
+
+
+def _popular(db_path: Path, *, ocorrencias: int, turmas: int) -> None:
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO turmas (nome, turno, quantidade_estudantes, ativo, criado_em) VALUES (?, 'Matutino', 30, 1, datetime('now'))",
+        [(f"Turma {i}",) for i in range(1, turmas + 1)],
+    )
+    turma_ids = [row[0] for row in conn.execute("SELECT id FROM turmas")]
+    sobrenomes = ("Silva", "Souza", "Oliveira", "Pereira", "Costa", "Almeida", "Lima")
+    conn.executemany(
+        "INSERT INTO estudantes (nome, turma_id, ativo) VALUES (?, ?, 1)",
+        [
+            (f"Estudante {i} {sobrenomes[i % len(sobrenomes)]}", turma_ids[i % len(turma_ids)])
+            for i in range(turmas * 30)
+        ],
+    )
+    estudantes = conn.execute("SELECT id, nome, turma_id FROM estudantes").fetchall()
+
+    aleatorio = random.Random(11)
+    inicio = date(2023, 2, 1)
+    status = ("registrado", "em_acompanhamento", "aguardando_responsavel", "resolvido")
+    lote = []
+    for indice in range(ocorrencias):
+        estudante_id, nome, turma_id = aleatorio.choice(estudantes)
+        dia = inicio + timedelta(days=aleatorio.randrange(365 * 3))
+        lote.append(
+            (
+                nome,
+                estudante_id,
+                turma_id,
+                dia.isoformat(),
+                aleatorio.choice(status),
+                f"{dia.isoformat()} {indice % 24:02d}:{indice % 60:02d}:00",
+            )
+        )
+    conn.executemany(
+        """
+        INSERT INTO ocorrencias (
+            nome_estudante, estudante_id, turma_id, professor_requerente, disciplina,
+            data_ocorrencia, aula, horario_ocorrencia, descricao, acao_aplicada, status, criado_em
+        )
+        VALUES (?, ?, ?, 'Professor', 'Matematica', ?, '1', '07:30', 'Descricao ' || hex(randomblob(80)),
+                'orientacao_verbal', ?, ?)
+        """,
+        lote,
+    )
+    conn.execute(
+        """
+        INSERT INTO ocorrencia_estudantes (ocorrencia_id, estudante_id, nome_estudante, turma_id, ordem)
+        SELECT id, estudante_id, nome_estudante, turma_id, 0 FROM ocorrencias
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO ocorrencia_regimento_itens (ocorrencia_id, artigo, descricao)
+        SELECT id, 'Art. 10', 'Item do regimento escolar' FROM ocorrencias
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+def _medir(funcao, rodadas: int) -> tuple[float, object]:
+    tempos = []
+    resultado = None
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ocorrencias", type=int, default=50000)
+    parser.add_argument("--turmas", type=int, default=40)
+    parser.add_argument("--limite", type=int, default=50)
+    parser.add_argument("--paginas", type=int, default=20, help="profundidade da pagina medida")
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "impressao.db"
+        os.environ["DB_PATH"] = str(db_path)
+        sys.modules.pop("database", None)
+        database = importlib.import_module("database")
+        database.criar_tabelas()
+        _popular(db_path, ocorrencias=args.ocorrencias, turmas=args.turmas)
+        print(f"banco: {db_path.stat().st_size / 1024 / 1024:6.1f} MB, {args.ocorrencias} ocorrencias")
+
+        for rotulo, filtros in _FILTROS.items():
+            tempo_completo, completo = _medir(lambda: database.listar_ocorrencias(**filtros), max(1, args.rodadas // 2))
+            tempo_primeira, primeira = _medir(
+                lambda: database.listar_ocorrencias_pagina(**filtros, limite=args.limite), args.rodadas
+            )
+
+            cursor_profundo = primeira["proximo_cursor"]
+            for _ in range(args.paginas - 2):
+                if not cursor_profundo:
+                    break
+                cursor_profundo = database.listar_ocorrencias_pagina(
+                    **filtros, limite=args.limite, cursor_pagina=cursor_profundo
+                )["proximo_cursor"]
+            tempo_profunda = 0.0
+            if cursor_profundo:
+                tempo_profunda, _ = _medir(
+                    lambda: database.listar_ocorrencias_pagina(
+                        **filtros, limite=args.limite, cursor_pagina=cursor_profundo
+                    ),
+                    args.rodadas,
+                )
+
+            total = f"{primeira['total']}{'' if primeira['total_exato'] else '+'}"
+            print(
+                f"{rotulo:>18}: completa {tempo_completo:8.1f} ms ({len(completo):6d} linhas)"
+                f" | 1a pagina {tempo_primeira:6.1f} ms (total {total})"
+                f" | pagina {args.paginas} {tempo_profunda:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
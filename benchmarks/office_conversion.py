@@ -0,0 +1,119 @@
+"""Latencia de conversoes DOCX -> PDF repetidas: soffice a frio x pool quente.
+
+Uso: ``python -m benchmarks.office_conversion --repeticoes 10 [--arquivo atividade.docx]``
+
+Sem ``--arquivo`` gera um DOCX minimo. O pool quente exige LibreOffice e o
+modulo ``uno`` (``python3-uno``) no mesmo interpretador.
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from services import file_service
+from services.office_converter import InstanciaLibreOffice, PoolConversaoOffice
+
+DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Override PartName="/word/document.xml"
+    ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+DOCX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1"
+    Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+    Target="word/document.xml"/>
+</Relationships>"""
+
+
+def _gerar_docx(caminho: Path, paragrafos: int = 200) -> None:
+    corpo = "".join(
+        f"<w:p><w:r><w:t>Questao {indice}: resolva a atividade proposta.</w:t></w:r></w:p>"
+        for indice in range(1, paragrafos + 1)
+    )
+    documento = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{corpo}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as pacote:
+        pacote.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        pacote.writestr("_rels/.rels", DOCX_RELS)
+        pacote.writestr("word/document.xml", documento)
+
+
+def _medir(converter, origem: Path, diretorio: Path, repeticoes: int) -> list[float]:
+    duracoes = []
+    for indice in range(repeticoes):
+        copia = diretorio / f"upload-{indice}{origem.suffix}"
+        shutil.copyfile(origem, copia)
+        inicio = time.perf_counter()
+        converter(copia, copia.with_suffix(".pdf"))
+        duracoes.append(time.perf_counter() - inicio)
+    return duracoes
+
+
+def _resumo(nome: str, duracoes: list[float]) -> str:
+    ordenadas = sorted(duracoes)
+    p95 = ordenadas[min(int(round(0.95 * (len(ordenadas) - 1))), len(ordenadas) - 1)]
+    return (
+        f"{nome:<12} primeira {duracoes[0] * 1000:8.0f} ms | mediana "
+        f"{statistics.median(duracoes) * 1000:8.0f} ms | p95 {p95 * 1000:8.0f} ms"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--arquivo", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    comando = file_service._descobrir_comando_soffice()
+    if not comando:
+        print("LibreOffice nao encontrado; configure LIBREOFFICE_COMMAND.", file=sys.stderr)
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix="bench-office-") as tmp:
+        diretorio = Path(tmp)
+        origem = args.arquivo or diretorio / "atividade.docx"
+        if args.arquivo is None:
+            _gerar_docx(origem)
+
+        def a_frio(caminho_origem: Path, caminho_destino: Path):
+            file_service._converter_office_para_pdf_subprocesso(
+                comando, caminho_origem, caminho_destino
+            )
+
+        print(_resumo("a frio", _medir(a_frio, origem, diretorio, args.repeticoes)))
+
+        pool = PoolConversaoOffice(1, criar_instancia=lambda nome: InstanciaLibreOffice(comando, nome))
+        try:
+            duracoes = _medir(
+                lambda caminho_origem, caminho_destino: pool.converter(
+                    caminho_origem, caminho_destino, timeout=file_service.SOFFICE_TIMEOUT_SECONDS
+                ),
+                origem,
+                diretorio,
+                args.repeticoes,
+            )
+        except RuntimeError as exc:
+            print(f"Pool quente indisponivel: {exc}", file=sys.stderr)
+            return 1
+        finally:
+            pool.encerrar()
+        print(_resumo("pool quente", duracoes))
+        print("A primeira conversao do pool inclui a subida do LibreOffice.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,174 @@
+"""Contagem de paginas e layout N-up: implementacao atual x merge pagina a pagina.
+
+Uso: ``python -m benchmarks.pdf_imposition --paginas 120 [--repeticoes 3]``
+
+Gera tres PDFs representativos (digitalizado, texto e rotacao mista) e mede,
+para 2 e 4 paginas por folha, o tempo e o pico de memoria Python (tracemalloc)
+de ``gerar_pdf_n_por_folha`` contra a referencia com ``merge_transformed_page``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter, Transformation
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from services import pdf_service
+
+
+def _gerar_pdf_texto(caminho: Path, paginas: int, rotacao_mista: bool = False) -> None:
+    documento = canvas.Canvas(str(caminho), pagesize=A4)
+    for numero in range(1, paginas + 1):
+        tamanho = landscape(A4) if rotacao_mista and numero % 3 == 0 else A4
+        documento.setPageSize(tamanho)
+        documento.setFont("Helvetica-Bold", 16)
+        documento.drawString(56, tamanho[1] - 72, f"Atividade - pagina {numero}")
+        documento.setFont("Helvetica", 10)
+        for linha in range(1, 55):
+            documento.drawString(
+                56, tamanho[1] - 100 - linha * 12, f"{linha}. Resolva a questao proposta com calculos."
+            )
+        documento.showPage()
+    documento.save()
+
+    if rotacao_mista:
+        reader = PdfReader(str(caminho))
+        writer = PdfWriter()
+        for indice, pagina in enumerate(reader.pages):
+            if indice % 4 == 1:
+                pagina.rotate(90)
+            elif indice % 4 == 3:
+                pagina.rotate(270)
+            writer.add_page(pagina)
+        with caminho.open("wb") as destino:
+            writer.write(destino)
+
+
+def _gerar_pdf_digitalizado(caminho: Path, paginas: int) -> None:
+    imagem = Image.effect_noise((1240, 1754), 48).convert("L")
+    buffer = io.BytesIO()
+    imagem.save(buffer, format="JPEG", quality=70)
+    pagina_jpeg = ImageReader(io.BytesIO(buffer.getvalue()))
+
+    documento = canvas.Canvas(str(caminho), pagesize=A4)
+    for _ in range(paginas):
+        documento.drawImage(pagina_jpeg, 0, 0, width=A4[0], height=A4[1])
+        documento.showPage()
+    documento.save()
+
+
+def _nup_por_merge(caminho_origem: Path, paginas_por_folha: int, orientacao: str) -> Path:
+    """Referencia: mesclagem de content streams com ``merge_transformed_page``."""
+    reader = PdfReader(str(caminho_origem))
+    orientacao_norm = pdf_service._normalizar_orientacao(orientacao)
+    largura_folha, altura_folha = pdf_service._obter_tamanho_folha(orientacao_norm)
+    colunas, linhas = pdf_service._obter_layout_nup(paginas_por_folha, orientacao_norm)
+    largura_celula = largura_folha / colunas
+    altura_celula = altura_folha / linhas
+
+    writer = PdfWriter()
+    paginas = list(range(len(reader.pages)))
+    for inicio in range(0, len(paginas), paginas_por_folha):
+        folha = writer.add_blank_page(width=largura_folha, height=altura_folha)
+        for indice_slot, indice_pagina in enumerate(paginas[inicio : inicio + paginas_por_folha]):
+            pagina = reader.pages[indice_pagina]
+            pagina.transfer_rotation_to_content()
+            largura = float(pagina.cropbox.width)
+            altura = float(pagina.cropbox.height)
+            escala = min(largura_celula / largura, altura_celula / altura)
+            coluna = indice_slot % colunas
+            linha = indice_slot // colunas
+            deslocamento_x = coluna * largura_celula + (largura_celula - largura * escala) / 2.0
+            deslocamento_y = (
+                altura_folha - (linha + 1) * altura_celula + (altura_celula - altura * escala) / 2.0
+            )
+            folha.merge_transformed_page(
+                pagina,
+                Transformation().scale(escala, escala).translate(deslocamento_x, deslocamento_y),
+                expand=False,
+            )
+
+    destino = caminho_origem.with_name(f"{caminho_origem.stem}_merge_{paginas_por_folha}up.pdf")
+    with destino.open("wb") as arquivo:
+        writer.write(arquivo)
+    return destino
+
+
+def _medir(funcao, repeticoes: int) -> tuple[float, float]:
+    duracoes = []
+    pico = 0
+    for _ in range(repeticoes):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        saida = funcao()
+        duracoes.append(time.perf_counter() - inicio)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if isinstance(saida, Path):
+            saida.unlink(missing_ok=True)
+    return statistics.median(duracoes), pico / (1024 * 1024)
+
+
+def _linha(rotulo: str, atual: tuple[float, float], referencia: tuple[float, float]) -> str:
+    return (
+        f"{rotulo:<26} atual {atual[0] * 1000:8.1f} ms {atual[1]:7.1f} MB | "
+        f"referencia {referencia[0] * 1000:8.1f} ms {referencia[1]:7.1f} MB | "
+        f"{referencia[0] / atual[0] if atual[0] else 0:5.1f}x"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=120)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench-nup-") as tmp:
+        diretorio = Path(tmp)
+        documentos = {
+            "digitalizado": diretorio / "digitalizado.pdf",
+            "texto": diretorio / "texto.pdf",
+            "rotacao mista": diretorio / "rotacao_mista.pdf",
+        }
+        _gerar_pdf_digitalizado(documentos["digitalizado"], args.paginas)
+        _gerar_pdf_texto(documentos["texto"], args.paginas)
+        _gerar_pdf_texto(documentos["rotacao mista"], args.paginas, rotacao_mista=True)
+
+        for nome, caminho in documentos.items():
+            print(f"{nome}: {args.paginas} paginas, {caminho.stat().st_size / 1024:.0f} KB")
+            print(
+                _linha(
+                    "  contagem de paginas",
+                    _medir(lambda: pdf_service._contar_paginas_pdf_sem_cache(str(caminho)), args.repeticoes),
+                    _medir(lambda: len(PdfReader(str(caminho)).pages), args.repeticoes),
+                )
+            )
+            for paginas_por_folha in (2, 4):
+                print(
+                    _linha(
+                        f"  {paginas_por_folha} por folha",
+                        _medir(
+                            lambda: pdf_service.gerar_pdf_n_por_folha(caminho, paginas_por_folha),
+                            args.repeticoes,
+                        ),
+                        _medir(
+                            lambda: _nup_por_merge(caminho, paginas_por_folha, "retrato"),
+                            args.repeticoes,
+                        ),
+                    )
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
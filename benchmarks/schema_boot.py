@@ -0,0 +1,130 @@
+"""Mede a partida a frio (processo novo) com e sem o carimbo de schema.
+
+Cada rodada sobe um interpretador novo, importa ``database`` e chama
+``criar_tabelas`` contra um banco com volume de producao; ``forcar=True``
+reproduz o comportamento anterior ao carimbo (backstop legado a cada boot).
+
+Uso: ``python -m benchmarks.schema_boot --anos 3 --jobs-dia 150 --rodadas 5``
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+_SCRIPT_BOOT = """
+import json, sys, time
+inicio = time.perf_counter()
+import database
+importado = time.perf_counter()
+resultado = database.criar_tabelas(forcar=sys.argv[1] == "1")
+fim = time.perf_counter()
+print(json.dumps({
+    "import_ms": (importado - inicio) * 1000,
+    "criar_tabelas_ms": (fim - importado) * 1000,
+    "caminho": resultado["caminho"],
+    "tempos_ms": resultado["tempos_ms"],
+}))
+"""
+
+
+def _popular(db_path: Path, *, anos: int, jobs_dia: int, professores: int) -> None:
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO usuarios (nome, email, senha_hash, perfil) VALUES (?, ?, 'x', 'professor')",
+        [(f"Professor {i}", f"prof{i}@escola") for i in range(professores)],
+    )
+    conn.executemany(
+        "INSERT INTO recursos (nome, tipo, ativo) VALUES (?, 'equipamento', 1)",
+        [(f"Recurso {i}",) for i in range(8)],
+    )
+    usuarios = [row[0] for row in conn.execute("SELECT id FROM usuarios")]
+    recursos = [row[0] for row in conn.execute("SELECT id FROM recursos")]
+    aleatorio = random.Random(7)
+    inicio = date.today() - timedelta(days=365 * anos)
+    for deslocamento in range(365 * anos):
+        dia = (inicio + timedelta(days=deslocamento)).isoformat()
+        conn.executemany(
+            """
+            INSERT INTO jobs (
+                usuario_id, arquivo, copias, paginas_totais, tags_json, printer_name,
+                status, prioridade, criado_em
+            )
+            VALUES (?, 'a.pdf', 1, ?, '[]', 'sala-1', 'CONCLUIDO', 0, ?)
+            """,
+            [
+                (aleatorio.choice(usuarios), aleatorio.randint(1, 40), f"{dia} 10:00:00")
+                for _ in range(jobs_dia)
+            ],
+        )
+        conn.executemany(
+            """
+            INSERT INTO agendamentos (recurso_id, usuario_id, data, aula, status, criado_em)
+            VALUES (?, ?, ?, '1', 'ATIVO', datetime('now'))
+            """,
+            [(aleatorio.choice(recursos), aleatorio.choice(usuarios), dia) for _ in range(jobs_dia // 4)],
+        )
+    conn.commit()
+    conn.close()
+
+
+def _boot(db_path: Path, *, forcar: bool) -> dict:
+    ambiente = {**os.environ, "DB_PATH": str(db_path)}
+    inicio = time.perf_counter()
+    saida = subprocess.run(
+        [sys.executable, "-c", _SCRIPT_BOOT, "1" if forcar else "0"],
+        cwd=BASE_DIR,
+        env=ambiente,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+    resultado["processo_ms"] = (time.perf_counter() - inicio) * 1000
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--anos", type=int, default=3)
+    parser.add_argument("--jobs-dia", type=int, default=150)
+    parser.add_argument("--professores", type=int, default=150)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "impressao.db"
+        os.environ["DB_PATH"] = str(db_path)
+        sys.modules.pop("database", None)
+        database = importlib.import_module("database")
+        database.criar_tabelas()
+        _popular(db_path, anos=args.anos, jobs_dia=args.jobs_dia, professores=args.professores)
+        print(f"banco: {db_path.stat().st_size / 1024 / 1024:6.1f} MB")
+
+        for rotulo, forcar in (("backstop completo", True), ("carimbo atual", False)):
+            rodadas = [_boot(db_path, forcar=forcar) for _ in range(args.rodadas)]
+            mediana = statistics.median(item["criar_tabelas_ms"] for item in rodadas)
+            processo = statistics.median(item["processo_ms"] for item in rodadas)
+            importacao = statistics.median(item["import_ms"] for item in rodadas)
+            print(
+                f"{rotulo:>17}: criar_tabelas {mediana:8.1f} ms | import database {importacao:7.1f} ms"
+                f" | processo {processo:8.1f} ms"
+            )
+            print(f"{'':>17}  etapas (ultima rodada): {rodadas[-1]['tempos_ms']}")
+
+
+if __name__ == "__main__":
+    main()
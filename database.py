@@ -1,14 +1,22 @@
+import base64
 import sqlite3
 import uuid
 import hashlib
 import json
+import logging
 import os
 import shutil
+import threading
+import time
 import unicodedata
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from db.schema_migrations import apply_pending_migrations
+from db.busca_textual import filtro_busca, garantir_indices_busca, juncao_busca
+from db.catalogo_versao import garantir_versao_catalogo
+from db.connection_pool import acquire_connection
+from db.schema_migrations import apply_pending_migrations, list_migration_paths
 from security.nt_hash import generate_nt_hash
+from security.token_cache import token_cache
 from services.ocorrencia_disciplina_service import ACAO_OCORRENCIA_VALIDAS
 from services.preconselho_service import (
     STATUS_PERIODO_PRE_CONSELHO_ABERTO,
@@ -153,6 +161,26 @@ else:
     DB_PATH = DB_PATH_PADRAO
 
 _BANCO_PREPARADO = False
+logger = logging.getLogger(__name__)
+
+# Arquivos cujo conteudo define o schema e os seeds aplicados por criar_tabelas;
+# as migrations versionadas entram no fingerprint pela listagem do diretorio.
+_ARQUIVOS_FINGERPRINT_SCHEMA = (
+    BASE_DIR / "database.py",
+    BASE_DIR / "db" / "schema_migrations.py",
+    BASE_DIR / "db" / "busca_textual.py",
+    BASE_DIR / "db" / "catalogo_versao.py",
+    BASE_DIR / "services" / "preconselho_service.py",
+    BASE_DIR / "services" / "ocorrencia_disciplina_service.py",
+)
+# ponytail: fingerprint do codigo de schema, calculado uma vez por processo.
+_FINGERPRINT_SCHEMA: str | None = None
+# ponytail: serializa a materializacao dos limites de cota dentro do processo.
+_LOCK_LIMITES_COTA = threading.Lock()
+# ponytail: snapshot da distribuicao de cota por (banco, versao) neste processo.
+_LOCK_DISTRIBUICAO_COTA = threading.Lock()
+_CACHE_DISTRIBUICAO_COTA: dict = {"chave": None, "calculos": []}
+_ESTATISTICAS_PESOS_COTA = {"reaproveitados": 0, "recalculados": 0}
 
 
 def _resolver_ttl_token_dias() -> int:
@@ -193,10 +221,13 @@ def _garantir_banco_preparado():
 
 def get_connection():
     _garantir_banco_preparado()
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+    return acquire_connection(DB_PATH)
+
+
+def get_read_connection():
+    """Conexao do pool somente leitura (``PRAGMA query_only``) para consultas quentes."""
+    _garantir_banco_preparado()
+    return acquire_connection(DB_PATH, read_only=True)
 
 
 def criar_job(
@@ -363,7 +394,7 @@ def normalizar_jobs_impressao_pendentes(
 
 
 def listar_jobs_por_usuario(usuario_id):
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -381,10 +412,110 @@ def listar_jobs_por_usuario(usuario_id):
     return [dict(r) for r in rows]
 
 
-def criar_tabelas():
+def criar_tabelas(*, forcar: bool = False) -> dict:
+    """Prepara o schema e devolve quanto cada etapa levou, em milissegundos.
+
+    Se o carimbo gravado na ultima execucao completa ainda confere (mesmo
+    fingerprint do codigo de schema e mesmo ``PRAGMA schema_version``), so le o
+    carimbo por uma conexao somente leitura e retorna, sem pegar o lock de
+    escrita. ``forcar=True`` roda o caminho completo mesmo assim.
+    """
+    inicio = time.perf_counter()
+    tempos: dict = {}
+
+    def marcar(etapa: str, desde: float) -> float:
+        agora = time.perf_counter()
+        tempos[etapa] = round((agora - desde) * 1000, 2)
+        return agora
+
+    fingerprint = _fingerprint_schema()
+    etapa = marcar("fingerprint", inicio)
+    if not forcar and _carimbo_schema_confere(fingerprint):
+        marcar("verificacao_carimbo", etapa)
+        marcar("total", inicio)
+        logger.info("Schema atual pelo carimbo; inicializacao em %.1f ms (%s)", tempos["total"], tempos)
+        return {"caminho": "rapido", "tempos_ms": tempos}
+
     conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        cursor = conn.cursor()
+        _criar_tabelas_base(cursor)
+        etapa = marcar("tabelas_base", etapa)
+        _aplicar_migracoes_versionadas(conn)
+        etapa = marcar("migracoes_versionadas", etapa)
+        _aplicar_compatibilidade_schema_legada(cursor)
+        etapa = marcar("compatibilidade_legada", etapa)
+        _criar_indices_schema(cursor)
+        etapa = marcar("indices", etapa)
+        _aplicar_seeds_iniciais(cursor)
+        # Seeds e migracoes legadas podem ter mudado turmas, disciplinas e cargas.
+        invalidar_limites_cota(cursor)
+        etapa = marcar("seeds", etapa)
+        _gravar_carimbo_schema(cursor, fingerprint)
+        conn.commit()
+        marcar("carimbo_commit", etapa)
+    finally:
+        conn.close()
+    marcar("total", inicio)
+    logger.info("Schema preparado pelo caminho completo em %.1f ms (%s)", tempos["total"], tempos)
+    return {"caminho": "completo", "tempos_ms": tempos}
+
+
+def _fingerprint_schema() -> str:
+    global _FINGERPRINT_SCHEMA
+    if _FINGERPRINT_SCHEMA is None:
+        digest = hashlib.sha256()
+        for caminho in (*_ARQUIVOS_FINGERPRINT_SCHEMA, *list_migration_paths()):
+            digest.update(caminho.name.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(caminho.read_bytes())
+            digest.update(b"\0")
+        _FINGERPRINT_SCHEMA = digest.hexdigest()
+    return _FINGERPRINT_SCHEMA
+
+
+def _carimbo_schema_confere(fingerprint: str) -> bool:
+    if not DB_PATH.exists():
+        return False
+    conn = get_read_connection()
+    try:
+        linha = conn.execute(
+            "SELECT fingerprint, schema_version FROM schema_carimbo WHERE id = 1"
+        ).fetchone()
+        versao_atual = conn.execute("PRAGMA schema_version").fetchone()[0]
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+    return bool(linha) and linha[0] == fingerprint and int(linha[1]) == int(versao_atual)
+
+
+def _gravar_carimbo_schema(cursor, fingerprint: str) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_carimbo (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            fingerprint TEXT NOT NULL,
+            schema_version INTEGER NOT NULL,
+            gravado_em TEXT NOT NULL
+        )
+    """)
+    # Lido depois de todo DDL da inicializacao: qualquer DDL posterior (outra
+    # versao do codigo, downgrade manual) muda o schema_version e invalida.
+    versao = cursor.execute("PRAGMA schema_version").fetchone()[0]
+    cursor.execute(
+        """
+        INSERT INTO schema_carimbo (id, fingerprint, schema_version, gravado_em)
+        VALUES (1, ?, ?, datetime('now'))
+        ON CONFLICT(id) DO UPDATE SET
+            fingerprint = excluded.fingerprint,
+            schema_version = excluded.schema_version,
+            gravado_em = excluded.gravado_em
+        """,
+        (fingerprint, int(versao)),
+    )
 
+
+def _criar_tabelas_base(cursor):
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS usuarios (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1098,14 +1229,6 @@ def criar_tabelas():
         )
     """)
 
-    _aplicar_migracoes_versionadas(conn)
-    _aplicar_compatibilidade_schema_legada(cursor)
-    _criar_indices_schema(cursor)
-    _aplicar_seeds_iniciais(cursor)
-
-    conn.commit()
-    conn.close()
-
 
 def _aplicar_migracoes_versionadas(conn):
     apply_pending_migrations(conn)
@@ -1289,8 +1412,8 @@ def _criar_indices_schema(cursor):
     """)
 
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_ocorrencias_status
-        ON ocorrencias(status)
+        CREATE INDEX IF NOT EXISTS idx_ocorrencias_status_listagem
+        ON ocorrencias(status, data_ocorrencia DESC, criado_em DESC, id DESC)
     """)
 
     cursor.execute("""
@@ -1299,8 +1422,8 @@ def _criar_indices_schema(cursor):
     """)
 
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_ocorrencias_turma_id
-        ON ocorrencias(turma_id)
+        CREATE INDEX IF NOT EXISTS idx_ocorrencias_turma_listagem
+        ON ocorrencias(turma_id, data_ocorrencia DESC, criado_em DESC, id DESC)
     """)
 
     cursor.execute("""
@@ -1324,8 +1447,8 @@ def _criar_indices_schema(cursor):
     """)
 
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_ocorrencias_data_criado
-        ON ocorrencias(data_ocorrencia DESC, criado_em DESC)
+        CREATE INDEX IF NOT EXISTS idx_ocorrencias_listagem
+        ON ocorrencias(data_ocorrencia DESC, criado_em DESC, id DESC)
     """)
 
     cursor.execute("""
@@ -1408,6 +1531,9 @@ def _criar_indices_schema(cursor):
         ON estudantes(ativo)
     """)
 
+    garantir_indices_busca(cursor)
+    garantir_versao_catalogo(cursor)
+
 
 def _aplicar_seeds_iniciais(cursor):
     _seed_catalogos_academicos(cursor)
@@ -3778,11 +3904,17 @@ def revogar_tokens_usuario(usuario_id: int) -> int:
     removidos = cursor.rowcount
     conn.commit()
     conn.close()
+    token_cache.invalidate_user(usuario_id)
     return removidos
 
 
 def buscar_usuario_por_token(token: str):
-    conn = get_connection()
+    chave_cache = (str(DB_PATH), token)
+    usuario = token_cache.get(chave_cache)
+    if usuario is not None:
+        return usuario
+
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -3800,7 +3932,11 @@ def buscar_usuario_por_token(token: str):
     row = cursor.fetchone()
     conn.close()
 
-    return dict(row) if row else None
+    if not row:
+        return None
+    usuario = dict(row)
+    token_cache.put(chave_cache, usuario)
+    return usuario
 
 
 # hash para senhas
@@ -3833,6 +3969,7 @@ def criar_usuario(nome, email, senha, perfil, cargo: str = ""):
         (nome, email, hash_senha(senha), nt_hash, perfil, cargo_norm),
     )
 
+    invalidar_limites_cota(cursor, ())
     conn.commit()
     conn.close()
 
@@ -3901,6 +4038,7 @@ def criar_usuario_se_nao_existir(
         (nome, email, senha_hash, nt_hash_final, perfil, cargo_norm),
     )
 
+    invalidar_limites_cota(cursor, ())
     conn.commit()
     conn.close()
 
@@ -4030,6 +4168,7 @@ def criar_professor(
         (usuario_id, aulas_semanais, turmas_quantidade, turmas_json, disciplinas_json),
     )
 
+    invalidar_limites_cota(cursor, [usuario_id])
     conn.commit()
     conn.close()
     return usuario_id
@@ -4102,8 +4241,10 @@ def atualizar_professor(
         ),
     )
 
+    invalidar_limites_cota(cursor, [usuario_id])
     conn.commit()
     conn.close()
+    token_cache.invalidate_user(usuario_id)
     return True
 
 
@@ -4160,10 +4301,13 @@ def promover_professor_para_coordenador(usuario_id: int) -> bool:
     """,
         (CARGO_COORDENADOR, usuario_id),
     )
+    alterado = cursor.rowcount > 0
 
+    invalidar_limites_cota(cursor, [usuario_id])
     conn.commit()
     conn.close()
-    return cursor.rowcount > 0
+    token_cache.invalidate_user(usuario_id)
+    return alterado
 
 
 def listar_coordenadores_admin():
@@ -4240,6 +4384,7 @@ def atualizar_senha_usuario(usuario_id: int, senha_em_texto: str):
     alterado = cursor.rowcount > 0
     conn.commit()
     conn.close()
+    token_cache.invalidate_user(usuario_id)
     return alterado
 
 
@@ -4268,8 +4413,10 @@ def desativar_professor(usuario_id: int) -> bool:
             (usuario_id,),
         )
 
+    invalidar_limites_cota(cursor, [usuario_id])
     conn.commit()
     conn.close()
+    token_cache.invalidate_user(usuario_id)
     return alterado
 
 
@@ -4289,6 +4436,7 @@ def salvar_carga_professor(usuario_id: int, aulas_semanais: int, turmas_quantida
         (usuario_id, aulas_semanais, turmas_quantidade),
     )
 
+    invalidar_limites_cota(cursor, [usuario_id])
     conn.commit()
     conn.close()
 
@@ -4592,6 +4740,7 @@ def _consultar_atribuicoes_docentes(
 
 
 def _sincronizar_resumo_carga_professor(cursor, usuario_id: int):
+    invalidar_limites_cota(cursor, [usuario_id])
     cursor.execute(
         """
         SELECT COALESCE(aulas_semanais, 0) AS aulas_semanais
@@ -4891,6 +5040,7 @@ def excluir_turma_disciplina(turma_disciplina_id: int) -> bool:
         for professor_id in sorted(professores_afetados):
             _sincronizar_resumo_carga_professor(cursor, professor_id)
 
+    invalidar_limites_cota(cursor, professores_afetados)
     conn.commit()
     conn.close()
     return alterado
@@ -5110,7 +5260,7 @@ def obter_regras_cota():
 
 
 def obter_status_impressao():
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -5190,6 +5340,7 @@ def atualizar_regras_cota(
         (base_paginas, paginas_por_aula, paginas_por_turma, cota_mensal_escola),
     )
 
+    invalidar_limites_cota(cursor, ())
     conn.commit()
     conn.close()
 
@@ -5261,28 +5412,15 @@ def _calcular_peso_professor(
     return max(peso_total, 0.0)
 
 
-def calcular_cotas_mensais_professores():
-    regras = obter_regras_cota()
-    cota_distribuivel = _calcular_total_distribuivel(regras["cota_mensal_escola"])
+def _versao_limites_cota(cursor) -> int:
+    row = cursor.execute("SELECT versao FROM cota_limites_estado WHERE id = 1").fetchone()
+    return int(row["versao"]) if row else 0
+
 
+def _calcular_pesos_professores(professores: list[dict]) -> dict[int, float]:
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute(f"""
-        SELECT
-            u.id,
-            u.nome,
-            COALESCE(pc.aulas_semanais, 0) AS aulas_semanais,
-            COALESCE(pc.turmas, '[]') AS turmas,
-            COALESCE(pc.disciplinas, '[]') AS disciplinas
-        FROM usuarios u
-        LEFT JOIN professores_carga pc ON pc.usuario_id = u.id
-        WHERE u.perfil = 'professor'
-          AND {_clausula_usuario_ativo("u")}
-        ORDER BY u.nome COLLATE NOCASE ASC, u.id ASC
-    """)
-    professores_rows = cursor.fetchall()
-
     cursor.execute("""
         SELECT nome, quantidade_estudantes
         FROM turmas
@@ -5299,11 +5437,8 @@ def calcular_cotas_mensais_professores():
 
     conn.close()
 
-    if not professores_rows:
-        return []
-
     atribuicoes_por_usuario = listar_atribuicoes_docentes_por_usuario_ids(
-        [int(row["id"]) for row in professores_rows],
+        [int(professor["id"]) for professor in professores],
         incluir_inativos=False,
     )
 
@@ -5317,17 +5452,91 @@ def calcular_cotas_mensais_professores():
         chave_disciplina = _normalizar_texto_chave(disciplina["nome"])
         aulas_por_disciplina[chave_disciplina] = max(int(disciplina["aulas_semanais"] or 0), 0)
 
-    calculos = []
-    total_pesos = 0.0
-
-    for row in professores_rows:
-        professor = dict(row)
-        peso_total_individual = _calcular_peso_professor(
+    return {
+        int(professor["id"]): _calcular_peso_professor(
             professor=professor,
             alunos_por_turma=alunos_por_turma,
             aulas_por_disciplina=aulas_por_disciplina,
             atribuicoes_docentes=atribuicoes_por_usuario.get(int(professor["id"]), []),
         )
+        for professor in professores
+    }
+
+
+def _obter_pesos_professores(professores: list[dict], versao: int) -> dict[int, float]:
+    """Le os pesos em cache e recalcula apenas os professores invalidados."""
+    conn = get_connection()
+    try:
+        pesos = {
+            int(row["usuario_id"]): float(row["peso"])
+            for row in conn.execute("SELECT usuario_id, peso FROM cota_pesos_professores")
+        }
+    finally:
+        conn.close()
+
+    pendentes = [professor for professor in professores if int(professor["id"]) not in pesos]
+    _ESTATISTICAS_PESOS_COTA["reaproveitados"] += len(professores) - len(pendentes)
+    if not pendentes:
+        return pesos
+
+    recalculados = _calcular_pesos_professores(pendentes)
+    _ESTATISTICAS_PESOS_COTA["recalculados"] += len(recalculados)
+    pesos.update(recalculados)
+
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # Uma invalidacao durante o calculo pode ter tornado estes pesos
+        # obsoletos; nesse caso eles valem so para esta resposta.
+        if _versao_limites_cota(conn) == versao:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO cota_pesos_professores (usuario_id, peso, calculado_em)
+                VALUES (?, ?, datetime('now'))
+                """,
+                [(usuario_id, max(peso, 0.0)) for usuario_id, peso in recalculados.items()],
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    return pesos
+
+
+def _calcular_distribuicao_cota_professores(versao: int) -> list[dict]:
+    regras = obter_regras_cota()
+    cota_distribuivel = _calcular_total_distribuivel(regras["cota_mensal_escola"])
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(f"""
+        SELECT
+            u.id,
+            u.nome,
+            COALESCE(pc.aulas_semanais, 0) AS aulas_semanais,
+            COALESCE(pc.turmas, '[]') AS turmas,
+            COALESCE(pc.disciplinas, '[]') AS disciplinas
+        FROM usuarios u
+        LEFT JOIN professores_carga pc ON pc.usuario_id = u.id
+        WHERE u.perfil = 'professor'
+          AND {_clausula_usuario_ativo("u")}
+        ORDER BY u.nome COLLATE NOCASE ASC, u.id ASC
+    """)
+    professores_rows = cursor.fetchall()
+
+    conn.close()
+
+    if not professores_rows:
+        return []
+
+    professores = [dict(row) for row in professores_rows]
+    pesos = _obter_pesos_professores(professores, versao)
+
+    calculos = []
+    total_pesos = 0.0
+
+    for professor in professores:
+        peso_total_individual = pesos.get(int(professor["id"]), 0.0)
 
         calculos.append(
             {
@@ -5373,6 +5582,40 @@ def calcular_cotas_mensais_professores():
     return calculos
 
 
+def obter_distribuicao_cota_professores() -> dict:
+    """Distribuicao da cota escolar entre professores, com a versao usada.
+
+    Enquanto ``cota_limites_estado.versao`` nao muda, o painel admin e as
+    consultas de limite leem o mesmo snapshot sem recalcular nada.
+    """
+    conn = get_connection()
+    try:
+        versao = _versao_limites_cota(conn)
+    finally:
+        conn.close()
+
+    chave = (str(DB_PATH), versao)
+    with _LOCK_DISTRIBUICAO_COTA:
+        if _CACHE_DISTRIBUICAO_COTA.get("chave") != chave:
+            _CACHE_DISTRIBUICAO_COTA["calculos"] = _calcular_distribuicao_cota_professores(versao)
+            _CACHE_DISTRIBUICAO_COTA["chave"] = chave
+        calculos = _CACHE_DISTRIBUICAO_COTA["calculos"]
+
+    return {"versao": versao, "calculos": [dict(calculo) for calculo in calculos]}
+
+
+def calcular_cotas_mensais_professores():
+    return obter_distribuicao_cota_professores()["calculos"]
+
+
+def estatisticas_cache_cota() -> dict:
+    return {
+        "versao_snapshot": (_CACHE_DISTRIBUICAO_COTA.get("chave") or (None, None))[1],
+        "pesos_reaproveitados": _ESTATISTICAS_PESOS_COTA["reaproveitados"],
+        "pesos_recalculados": _ESTATISTICAS_PESOS_COTA["recalculados"],
+    }
+
+
 def calcular_limites_cota_professores():
     calculos = calcular_cotas_mensais_professores()
     return {
@@ -5380,7 +5623,84 @@ def calcular_limites_cota_professores():
     }
 
 
-def calcular_limite_cota_usuario(usuario_id: int):
+def invalidar_limites_cota(cursor, usuario_ids=None) -> None:
+    """Marca a distribuicao da cota e os limites materializados como desatualizados.
+
+    Chamado na mesma transacao das escritas que mudam a distribuicao
+    (professores, atribuicoes, turmas, disciplinas e ``cota_regras``); o
+    recalculo acontece uma unica vez, na proxima consulta. ``usuario_ids``
+    restringe quais pesos em cache sao descartados: ``None`` descarta todos
+    (turmas e disciplinas afetam qualquer professor) e uma colecao vazia
+    mantem os pesos, como em mudancas de regra ou usuarios novos.
+    """
+    cursor.execute(
+        """
+        UPDATE cota_limites_estado
+        SET versao = versao + 1, atualizado_em = datetime('now')
+        WHERE id = 1
+        """
+    )
+    if usuario_ids is None:
+        cursor.execute("DELETE FROM cota_pesos_professores")
+        return
+    ids = sorted({int(usuario_id) for usuario_id in usuario_ids})
+    if ids:
+        placeholders = ",".join("?" for _ in ids)
+        cursor.execute(
+            f"DELETE FROM cota_pesos_professores WHERE usuario_id IN ({placeholders})",
+            ids,
+        )
+
+
+def _buscar_limite_materializado(usuario_id: int, mes: str) -> int | None:
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            """
+            SELECT l.limite_paginas
+            FROM cota_limites_mensais l
+            JOIN cota_limites_estado e ON e.id = 1 AND e.versao = l.versao
+            WHERE l.usuario_id = ? AND l.mes = ?
+            """,
+            (int(usuario_id), mes),
+        ).fetchone()
+    finally:
+        conn.close()
+    return int(row["limite_paginas"]) if row else None
+
+
+def materializar_limites_cota_mes(mes: str) -> dict[int, int]:
+    """Calcula a distribuicao do mes uma vez e grava o limite de cada professor."""
+    distribuicao = obter_distribuicao_cota_professores()
+    versao = distribuicao["versao"]
+    limites = {
+        int(calculo["usuario_id"]): int(calculo["cota_mensal_calculada"])
+        for calculo in distribuicao["calculos"]
+    }
+
+    # Se alguma escrita invalidar durante o calculo, a versao gravada ja nasce
+    # desatualizada e a proxima consulta recalcula.
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM cota_limites_mensais WHERE mes = ?", (mes,))
+        conn.executemany(
+            """
+            INSERT INTO cota_limites_mensais (usuario_id, mes, limite_paginas, versao)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (usuario_id, mes, max(int(limite), 0), versao)
+                for usuario_id, limite in limites.items()
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return limites
+
+
+def calcular_limite_cota_usuario(usuario_id: int, mes: str | None = None):
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -5393,19 +5713,25 @@ def calcular_limite_cota_usuario(usuario_id: int):
         (usuario_id,),
     )
     row_usuario = cursor.fetchone()
+    conn.close()
 
     if not row_usuario:
-        conn.close()
         return 0
 
-    regras = obter_regras_cota()
-    perfil = row_usuario["perfil"]
+    if row_usuario["perfil"] != "professor":
+        return int(obter_regras_cota()["base_paginas"])
 
-    if perfil != "professor":
-        conn.close()
-        return int(regras["base_paginas"])
-    conn.close()
-    limites = calcular_limites_cota_professores()
+    mes_referencia = mes or datetime.now().strftime("%Y-%m")
+    limite = _buscar_limite_materializado(usuario_id, mes_referencia)
+    if limite is not None:
+        return max(limite, 0)
+
+    with _LOCK_LIMITES_COTA:
+        # Outra thread pode ter materializado o mes enquanto esperavamos.
+        limite = _buscar_limite_materializado(usuario_id, mes_referencia)
+        if limite is not None:
+            return max(limite, 0)
+        limites = materializar_limites_cota_mes(mes_referencia)
     return max(int(limites.get(int(usuario_id), 0)), 0)
 
 
@@ -5558,13 +5884,14 @@ def buscar_professores_ocorrencia(termo: str = "", limite: int = 20):
     conn = get_connection()
     cursor = conn.cursor()
 
-    termo_limpo = _normalizar_nome_catalogo(termo).lower()
     limite_final = max(int(limite or 20), 1)
+    juncao_sql, params = juncao_busca("usuarios", termo, coluna_id="usuarios.id")
 
     query = f"""
-        SELECT id, nome, email
+        SELECT usuarios.id, usuarios.nome, usuarios.email
         FROM usuarios
-        WHERE {_clausula_usuario_ativo()}
+        {juncao_sql}
+        WHERE {_clausula_usuario_ativo("usuarios")}
           AND (
               UPPER(COALESCE(cargo, '')) = ?
               OR (
@@ -5573,20 +5900,14 @@ def buscar_professores_ocorrencia(termo: str = "", limite: int = 20):
               )
           )
     """
-    params = [CARGO_PROFESSOR]
-
-    if termo_limpo:
-        query += """
-            AND (
-                LOWER(COALESCE(nome, '')) LIKE ?
-                OR LOWER(COALESCE(email, '')) LIKE ?
-            )
-        """
-        like = f"%{termo_limpo}%"
-        params.extend([like, like])
-
-    query += """
-        ORDER BY nome COLLATE NOCASE ASC, id ASC
+    params.append(CARGO_PROFESSOR)
+    ordem = "usuarios.nome COLLATE NOCASE ASC, usuarios.id ASC"
+    if juncao_sql:
+        query += " AND busca.id IS NOT NULL"
+        ordem = f"busca.relevancia ASC, {ordem}"
+
+    query += f"""
+        ORDER BY {ordem}
         LIMIT ?
     """
     params.append(limite_final)
@@ -5602,11 +5923,13 @@ def listar_estudantes(
     nome: str = None,
     turma_id: int = None,
     limite: int = None,
+    por_relevancia: bool = False,
 ):
     conn = get_connection()
     cursor = conn.cursor()
 
-    query = """
+    juncao_sql, params = juncao_busca("estudantes", nome, coluna_id="e.id")
+    query = f"""
         SELECT
             e.id,
             e.nome,
@@ -5621,17 +5944,15 @@ def listar_estudantes(
             e.atualizado_em
         FROM estudantes e
         LEFT JOIN turmas t ON t.id = e.turma_id
+        {juncao_sql}
         WHERE 1 = 1
     """
-    params = []
 
     if not incluir_inativos:
         query += " AND e.ativo = 1"
 
-    nome_limpo = _normalizar_nome_catalogo(nome).lower()
-    if nome_limpo:
-        query += " AND LOWER(COALESCE(e.nome, '')) LIKE ?"
-        params.append(f"%{nome_limpo}%")
+    if juncao_sql:
+        query += " AND busca.id IS NOT NULL"
 
     if turma_id is not None:
         turma_id_valor = int(turma_id)
@@ -5639,7 +5960,10 @@ def listar_estudantes(
             query += " AND e.turma_id = ?"
             params.append(turma_id_valor)
 
-    query += " ORDER BY e.nome COLLATE NOCASE ASC, e.id ASC"
+    ordem = "e.nome COLLATE NOCASE ASC, e.id ASC"
+    if juncao_sql and por_relevancia:
+        ordem = f"busca.relevancia ASC, {ordem}"
+    query += f" ORDER BY {ordem}"
 
     if limite is not None:
         limite_valor = max(int(limite or 0), 1)
@@ -6103,6 +6427,7 @@ def buscar_estudantes_ocorrencia(termo: str = "", turma_id: int = None, limite:
         nome=termo,
         turma_id=turma_id,
         limite=limite,
+        por_relevancia=True,
     )
 
 
@@ -7042,47 +7367,69 @@ def agendar_apc_preview_job(
     return buscar_apc_preview_job_por_envio(envio_id)
 
 
-def buscar_proximo_apc_preview_job():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT *
-        FROM apc_preview_jobs
-        WHERE status IN ('PENDENTE', 'ERRO')
-          AND tentativas < 3
-        ORDER BY
-            CASE status WHEN 'PENDENTE' THEN 0 ELSE 1 END,
-            atualizado_em ASC,
-            id ASC
-        LIMIT 1
-        """
-    )
-    job = _mapear_apc_preview_job(cursor.fetchone())
-    conn.close()
-    return job
+def reivindicar_proximo_apc_preview_job(minutos_travado: int = 10):
+    """Marca como PROCESSANDO o proximo preview APC elegivel e o devolve.
 
+    Selecao e marcacao rodam na mesma transacao ``BEGIN IMMEDIATE``, entao
+    varios consumidores (threads, processos do pool ou workers distintos) nunca
+    convertem o mesmo envio. Jobs PROCESSANDO ha mais de ``minutos_travado``
+    (consumidor encerrado no meio da conversao) voltam para ERRO e seguem o
+    limite normal de tentativas.
+    """
+    try:
+        minutos = max(int(minutos_travado), 1)
+    except (TypeError, ValueError):
+        minutos = 10
 
-def marcar_apc_preview_job_processando(job_id: int):
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        UPDATE apc_preview_jobs
-        SET status = 'PROCESSANDO',
-            tentativas = tentativas + 1,
-            erro_mensagem = '',
-            atualizado_em = datetime('now')
-        WHERE id = ?
-          AND status IN ('PENDENTE', 'ERRO')
-          AND tentativas < 3
-        """,
-        (int(job_id),),
-    )
-    alterado = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    return alterado
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            """
+            UPDATE apc_preview_jobs
+            SET status = 'ERRO',
+                erro_mensagem = 'Conversao interrompida antes de concluir.',
+                atualizado_em = datetime('now')
+            WHERE status = 'PROCESSANDO'
+              AND atualizado_em < datetime('now', ?)
+            """,
+            (f"-{minutos} minutes",),
+        )
+        row = conn.execute(
+            """
+            SELECT *
+            FROM apc_preview_jobs
+            WHERE status IN ('PENDENTE', 'ERRO')
+              AND tentativas < 3
+            ORDER BY
+                CASE status WHEN 'PENDENTE' THEN 0 ELSE 1 END,
+                atualizado_em ASC,
+                id ASC
+            LIMIT 1
+            """
+        ).fetchone()
+        if not row:
+            conn.commit()
+            return None
+
+        conn.execute(
+            """
+            UPDATE apc_preview_jobs
+            SET status = 'PROCESSANDO',
+                tentativas = tentativas + 1,
+                erro_mensagem = '',
+                atualizado_em = datetime('now')
+            WHERE id = ?
+            """,
+            (int(row["id"]),),
+        )
+        conn.commit()
+        job = _mapear_apc_preview_job(row)
+        job["status"] = "PROCESSANDO"
+        job["tentativas"] = int(job.get("tentativas") or 0) + 1
+        return job
+    finally:
+        conn.close()
 
 
 def concluir_apc_preview_job(job_id: int, preview_pdf_path: str):
@@ -7126,6 +7473,14 @@ def falhar_apc_preview_job(job_id: int, erro_mensagem: str):
     return alterado
 
 
+def obter_versao_catalogo() -> tuple[str, int]:
+    """``(geracao, versao)`` atual do catalogo; muda a cada escrita em ``TABELAS_CATALOGO``."""
+    conn = get_read_connection()
+    row = conn.execute("SELECT geracao, versao FROM catalogo_versao WHERE id = 1").fetchone()
+    conn.close()
+    return str(row[0]), int(row[1])
+
+
 def listar_turmas(incluir_inativas: bool = False):
     from modules.admin.classes.repository import listar_turmas as listar
 
@@ -7359,6 +7714,7 @@ def criar_disciplina(
     )
 
     disciplina_id = cursor.lastrowid
+    invalidar_limites_cota(cursor)
     conn.commit()
     conn.close()
     return disciplina_id
@@ -7397,6 +7753,7 @@ def atualizar_disciplina_dados(
     )
 
     alterado = cursor.rowcount > 0
+    invalidar_limites_cota(cursor)
     conn.commit()
     conn.close()
     return alterado
@@ -7416,6 +7773,7 @@ def atualizar_status_disciplina(disciplina_id: int, ativo: bool):
     )
 
     alterado = cursor.rowcount > 0
+    invalidar_limites_cota(cursor)
     conn.commit()
     conn.close()
     return alterado
@@ -7426,7 +7784,7 @@ def gerar_token():
 
 
 def listar_fila():
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -7441,7 +7799,7 @@ def listar_fila():
 
 
 def buscar_job(job_id):
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
@@ -7494,13 +7852,31 @@ def cancelar_job(job_id, estornar_cota: bool = True):
         if paginas > 0 and usuario_id is not None and len(mes_referencia) == 7:
             cursor.execute(
                 """
-                UPDATE cotas
-                SET usadas_paginas = MAX(usadas_paginas - ?, 0)
+                SELECT id, usadas_paginas
+                FROM cotas
                 WHERE usuario_id = ? AND mes = ?
             """,
-                (paginas, usuario_id, mes_referencia),
+                (usuario_id, mes_referencia),
             )
-            paginas_estornadas = paginas
+            cota = cursor.fetchone()
+            if cota:
+                paginas_estornadas = min(paginas, int(cota["usadas_paginas"]))
+                cursor.execute(
+                    """
+                    UPDATE cotas
+                    SET usadas_paginas = usadas_paginas - ?
+                    WHERE id = ?
+                """,
+                    (paginas_estornadas, cota["id"]),
+                )
+                if paginas_estornadas > 0:
+                    cursor.execute(
+                        """
+                        INSERT INTO cotas_movimentos (cota_id, usuario_id, mes, paginas, tipo, job_id)
+                        VALUES (?, ?, ?, ?, 'estorno', ?)
+                    """,
+                        (cota["id"], usuario_id, mes_referencia, -paginas_estornadas, job_id),
+                    )
 
     conn.commit()
     conn.close()
@@ -7565,6 +7941,103 @@ def buscar_proximo_job(atraso_minimo_segundos: int = 0):
     return dict(row) if row else None
 
 
+def _filtro_impressoras_ocupadas(
+    impressoras_ocupadas=(), impressora_padrao: str = ""
+) -> tuple[str, list]:
+    """Clausula SQL que ignora jobs das impressoras (raias) ja ocupadas."""
+    ocupadas = sorted({str(nome or "").strip().lower() for nome in impressoras_ocupadas or ()})
+    if not ocupadas:
+        return "", []
+    marcadores = ", ".join("?" for _ in ocupadas)
+    return (
+        f" AND LOWER(COALESCE(NULLIF(TRIM(printer_name), ''), ?)) NOT IN ({marcadores})",
+        [str(impressora_padrao or "").strip(), *ocupadas],
+    )
+
+
+def segundos_ate_proximo_job(
+    atraso_minimo_segundos: int = 0,
+    impressoras_ocupadas=(),
+    impressora_padrao: str = "",
+) -> float | None:
+    """Segundos ate o job PENDENTE mais antigo sair da janela de cancelamento."""
+    try:
+        atraso_minimo = max(int(atraso_minimo_segundos), 0)
+    except (TypeError, ValueError):
+        atraso_minimo = 0
+
+    filtro, parametros = _filtro_impressoras_ocupadas(impressoras_ocupadas, impressora_padrao)
+    conn = get_read_connection()
+    row = conn.execute(
+        f"""
+        SELECT (julianday(MIN(datetime(criado_em))) - julianday(datetime('now'))) * 86400.0
+            AS segundos
+        FROM jobs
+        WHERE status = 'PENDENTE'{filtro}
+    """,
+        parametros,
+    ).fetchone()
+    conn.close()
+
+    if not row or row["segundos"] is None:
+        return None
+    return max(float(row["segundos"]) + atraso_minimo, 0.0)
+
+
+def reivindicar_proximo_job(
+    atraso_minimo_segundos: int = 0,
+    impressoras_ocupadas=(),
+    impressora_padrao: str = "",
+):
+    """Marca como IMPRIMINDO o proximo job elegivel e o devolve.
+
+    A selecao e a troca de status acontecem na mesma transacao ``BEGIN
+    IMMEDIATE``; dois despachantes (raias ou processos) nunca recebem o mesmo
+    job. Jobs de impressoras em ``impressoras_ocupadas`` sao ignorados para que
+    uma impressora lenta nao segure a fila das demais; jobs sem
+    ``printer_name`` pertencem a ``impressora_padrao``.
+    """
+    try:
+        atraso_minimo = max(int(atraso_minimo_segundos), 0)
+    except (TypeError, ValueError):
+        atraso_minimo = 0
+
+    filtro, parametros = _filtro_impressoras_ocupadas(impressoras_ocupadas, impressora_padrao)
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            f"""
+            SELECT * FROM jobs
+            WHERE status = 'PENDENTE'
+              AND datetime(criado_em) <= datetime('now', ?){filtro}
+            ORDER BY prioridade DESC, criado_em ASC, id ASC
+            LIMIT 1
+        """,
+            [f"-{atraso_minimo} seconds", *parametros],
+        ).fetchone()
+        if not row:
+            conn.commit()
+            return None
+
+        cursor = conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'IMPRIMINDO'
+            WHERE id = ? AND status = 'PENDENTE'
+        """,
+            (int(row["id"]),),
+        )
+        conn.commit()
+        if cursor.rowcount != 1:
+            return None
+        job = dict(row)
+        job["status"] = "IMPRIMINDO"
+        return job
+    finally:
+        conn.close()
+
+
 def atualizar_status(job_id, status):
     conn = get_connection()
     cursor = conn.cursor()
@@ -7687,6 +8160,89 @@ def consumir_cota(cota_id: int, paginas: int):
     conn.close()
 
 
+def garantir_cota_mes(usuario_id: int, mes: str, resolver_limite) -> dict:
+    """Retorna a cota do mes, criando-a sem corrida com outras requisicoes.
+
+    ``resolver_limite`` so e chamado quando a linha nao existe e roda fora de
+    qualquer transacao de escrita, ja que o calculo do limite pode ser caro.
+    """
+    cota = buscar_cota(usuario_id, mes)
+    if cota:
+        return cota
+
+    limite = max(int(resolver_limite()), 0)
+    conn = get_connection()
+    try:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO cotas (usuario_id, mes, limite_paginas, usadas_paginas)
+            VALUES (?, ?, ?, 0)
+            """,
+            (usuario_id, mes, limite),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return buscar_cota(usuario_id, mes)
+
+
+def reservar_paginas_cota(usuario_id: int, mes: str, paginas: int, *, resolver_limite) -> dict:
+    """Reserva paginas da cota do mes em uma unica transacao.
+
+    Leitura do saldo, debito condicional e registro em ``cotas_movimentos``
+    acontecem sob ``BEGIN IMMEDIATE``: duas requisicoes simultaneas nunca
+    ultrapassam o limite, e o livro-razao sempre soma ``usadas_paginas``.
+    """
+    paginas = max(int(paginas), 0)
+    garantir_cota_mes(usuario_id, mes, resolver_limite)
+
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cota = conn.execute(
+            """
+            SELECT id, limite_paginas, usadas_paginas
+            FROM cotas
+            WHERE usuario_id = ? AND mes = ?
+            """,
+            (usuario_id, mes),
+        ).fetchone()
+        if not cota:
+            conn.rollback()
+            raise RuntimeError("Cota do mes nao encontrada")
+
+        restante = int(cota["limite_paginas"]) - int(cota["usadas_paginas"])
+        cursor = conn.execute(
+            """
+            UPDATE cotas
+            SET usadas_paginas = usadas_paginas + ?
+            WHERE id = ? AND limite_paginas - usadas_paginas >= ?
+            """,
+            (paginas, cota["id"], paginas),
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return {"autorizado": False, "restante": restante, "movimento_id": None}
+
+        cursor = conn.execute(
+            """
+            INSERT INTO cotas_movimentos (cota_id, usuario_id, mes, paginas, tipo)
+            VALUES (?, ?, ?, ?, 'reserva')
+            """,
+            (cota["id"], usuario_id, mes, paginas),
+        )
+        movimento_id = cursor.lastrowid
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        "autorizado": True,
+        "restante": restante - paginas,
+        "movimento_id": movimento_id,
+    }
+
+
 def buscar_cota_do_usuario(usuario_id: int, mes: str):
     conn = get_connection()
     cursor = conn.cursor()
@@ -7779,37 +8335,47 @@ def gerar_relatorio_consumo():
     return [dict(row) for row in rows]
 
 
+def _filtro_periodo_relatorio(data_inicio: str | None, data_fim: str | None, coluna: str = "data"):
+    clausulas = []
+    params = []
+    if data_inicio:
+        clausulas.append(f"{coluna} >= ?")
+        params.append(str(data_inicio))
+    if data_fim:
+        clausulas.append(f"{coluna} <= ?")
+        params.append(str(data_fim))
+    return (" AND ".join(clausulas) or "1 = 1"), params
+
+
+# Os relatorios leem os agregados diarios mantidos por gatilhos no banco
+# (migrations/20261018_create_report_rollups.py), sem varrer jobs/agendamentos.
 def gerar_relatorio_impressao(data_inicio: str = None, data_fim: str = None):
     conn = get_connection()
     cursor = conn.cursor()
 
-    query = """
+    filtro, params = _filtro_periodo_relatorio(data_inicio, data_fim)
+    # Sem periodo, todos os usuarios aparecem (inclusive com zero); com
+    # periodo, apenas quem imprimiu nele.
+    juncao = "JOIN" if params else "LEFT JOIN"
+
+    query = f"""
         SELECT
             u.id AS usuario_id,
             u.nome,
             u.email,
             u.perfil,
             u.cargo,
-            COUNT(j.id) AS total_jobs,
-            COALESCE(SUM(j.paginas_totais), 0) AS total_paginas
+            COALESCE(r.total_jobs, 0) AS total_jobs,
+            COALESCE(r.total_paginas, 0) AS total_paginas
         FROM usuarios u
-        LEFT JOIN jobs j
-            ON j.usuario_id = u.id
-           AND j.status IN (?, ?)
+        {juncao} (
+            SELECT usuario_id, SUM(total_jobs) AS total_jobs, SUM(total_paginas) AS total_paginas
+            FROM relatorio_impressao_diario
+            WHERE {filtro}
+            GROUP BY usuario_id
+            HAVING SUM(total_jobs) > 0
+        ) r ON r.usuario_id = u.id
         WHERE LOWER(COALESCE(u.perfil, '')) IN ('professor', 'admin', 'coordenador')
-    """
-    params = [STATUS_CONCLUIDO, STATUS_FINALIZADO_LEGADO]
-
-    if data_inicio:
-        query += " AND date(j.criado_em) >= ?"
-        params.append(data_inicio)
-
-    if data_fim:
-        query += " AND date(j.criado_em) <= ?"
-        params.append(data_fim)
-
-    query += """
-        GROUP BY u.id, u.nome, u.email, u.perfil, u.cargo
         ORDER BY total_paginas DESC, total_jobs DESC, u.nome ASC
     """
 
@@ -7819,70 +8385,60 @@ def gerar_relatorio_impressao(data_inicio: str = None, data_fim: str = None):
     return [dict(row) for row in rows]
 
 
-def _normalizar_tags_job(tags_json: str | None) -> list[str]:
-    try:
-        tags_brutas = json.loads(str(tags_json or "[]"))
-    except (TypeError, ValueError, json.JSONDecodeError):
-        return []
-
-    if not isinstance(tags_brutas, list):
-        return []
+def gerar_relatorio_impressoras(data_inicio: str = None, data_fim: str = None):
+    conn = get_connection()
+    cursor = conn.cursor()
 
-    tags_normalizadas = []
-    vistos = set()
-    for item in tags_brutas:
-        tag = str(item or "").strip()
-        if not tag:
-            continue
-        chave = tag.casefold()
-        if chave in vistos:
-            continue
-        vistos.add(chave)
-        tags_normalizadas.append(tag)
-    return tags_normalizadas
+    filtro, params = _filtro_periodo_relatorio(data_inicio, data_fim)
+    cursor.execute(
+        f"""
+        SELECT
+            impressora,
+            SUM(total_jobs) AS total_jobs,
+            SUM(total_paginas) AS total_paginas
+        FROM relatorio_impressao_diario
+        WHERE {filtro}
+        GROUP BY impressora
+        HAVING SUM(total_jobs) > 0
+        ORDER BY total_paginas DESC, total_jobs DESC, impressora ASC
+    """,
+        params,
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
 
 
 def gerar_relatorio_tags_impressao(data_inicio: str = None, data_fim: str = None):
     conn = get_connection()
     cursor = conn.cursor()
 
-    query = """
+    filtro, params = _filtro_periodo_relatorio(data_inicio, data_fim)
+    cursor.execute(
+        f"""
         SELECT
-            j.tags_json,
-            j.paginas_totais
-        FROM jobs j
-        WHERE j.status IN (?, ?)
-    """
-    params = [STATUS_CONCLUIDO, STATUS_FINALIZADO_LEGADO]
-
-    if data_inicio:
-        query += " AND date(j.criado_em) >= ?"
-        params.append(data_inicio)
-
-    if data_fim:
-        query += " AND date(j.criado_em) <= ?"
-        params.append(data_fim)
-
-    cursor.execute(query, params)
+            MIN(tag) AS tag,
+            SUM(total_jobs) AS total_jobs,
+            SUM(total_paginas) AS total_paginas
+        FROM relatorio_tags_diario
+        WHERE {filtro}
+        GROUP BY tag_chave
+        HAVING SUM(total_jobs) > 0
+    """,
+        params,
+    )
     rows = cursor.fetchall()
     conn.close()
 
-    agregados = {}
-    for row in rows:
-        paginas_totais = max(int(row["paginas_totais"] or 0), 0)
-        for tag in _normalizar_tags_job(row["tags_json"]):
-            chave = tag.casefold()
-            if chave not in agregados:
-                agregados[chave] = {
-                    "tag": tag,
-                    "total_jobs": 0,
-                    "total_paginas": 0,
-                }
-            agregados[chave]["total_jobs"] += 1
-            agregados[chave]["total_paginas"] += paginas_totais
-
     return sorted(
-        agregados.values(),
+        (
+            {
+                "tag": str(row["tag"] or ""),
+                "total_jobs": int(row["total_jobs"] or 0),
+                "total_paginas": int(row["total_paginas"] or 0),
+            }
+            for row in rows
+        ),
         key=lambda item: (
             -int(item.get("total_jobs") or 0),
             -int(item.get("total_paginas") or 0),
@@ -8417,12 +8973,14 @@ def gerar_dashboard_relatorios(data_inicio: str | None = None, data_fim: str | N
 
     ranking_impressao = gerar_relatorio_impressao(inicio_periodo, fim_periodo)
     ranking_tags_impressao = gerar_relatorio_tags_impressao(inicio_periodo, fim_periodo)
+    ranking_impressoras = gerar_relatorio_impressoras(inicio_periodo, fim_periodo)
     if not any(
         int(item.get("total_jobs") or 0) > 0 or int(item.get("total_paginas") or 0) > 0
         for item in ranking_impressao
     ):
         ranking_impressao = gerar_relatorio_impressao()
         ranking_tags_impressao = gerar_relatorio_tags_impressao()
+        ranking_impressoras = gerar_relatorio_impressoras()
     ranking_recursos = gerar_relatorio_uso_recursos(inicio_periodo, fim_periodo)
     ranking_recursos_professor = gerar_relatorio_uso_recursos_por_professor(
         inicio_periodo, fim_periodo
@@ -8530,33 +9088,31 @@ def gerar_dashboard_relatorios(data_inicio: str | None = None, data_fim: str | N
     cursor.execute(
         """
         SELECT
-            date(j.criado_em) AS data,
-            COUNT(j.id) AS total_jobs,
-            COALESCE(SUM(j.paginas_totais), 0) AS total_paginas
-        FROM jobs j
-        WHERE j.status IN (?, ?)
-          AND date(j.criado_em) >= ?
-          AND date(j.criado_em) <= ?
-        GROUP BY date(j.criado_em)
-        ORDER BY date(j.criado_em) ASC
+            data,
+            SUM(total_jobs) AS total_jobs,
+            SUM(total_paginas) AS total_paginas
+        FROM relatorio_impressao_diario
+        WHERE data >= ?
+          AND data <= ?
+        GROUP BY data
+        ORDER BY data ASC
     """,
-        (STATUS_CONCLUIDO, STATUS_FINALIZADO_LEGADO, inicio_periodo, fim_periodo),
+        (inicio_periodo, fim_periodo),
     )
     serie_impressoes_rows = [dict(row) for row in cursor.fetchall()]
 
     cursor.execute(
         """
         SELECT
-            a.data,
-            COUNT(a.id) AS total_reservas
-        FROM agendamentos a
-        WHERE a.status = ?
-          AND a.data >= ?
-          AND a.data <= ?
-        GROUP BY a.data
-        ORDER BY a.data ASC
+            data,
+            SUM(total_reservas) AS total_reservas
+        FROM relatorio_reservas_diario
+        WHERE data >= ?
+          AND data <= ?
+        GROUP BY data
+        ORDER BY data ASC
     """,
-        (STATUS_AGENDAMENTO_ATIVO, inicio_periodo, fim_periodo),
+        (inicio_periodo, fim_periodo),
     )
     serie_recursos_rows = [dict(row) for row in cursor.fetchall()]
     conn.close()
@@ -8692,6 +9248,14 @@ def gerar_dashboard_relatorios(data_inicio: str | None = None, data_fim: str | N
             },
             "ranking_professores": ranking_impressao_ativo,
             "ranking_tags": ranking_tags_impressao,
+            "ranking_impressoras": [
+                {
+                    "impressora": str(item.get("impressora") or ""),
+                    "total_jobs": int(item.get("total_jobs") or 0),
+                    "total_paginas": int(item.get("total_paginas") or 0),
+                }
+                for item in ranking_impressoras
+            ],
             "serie_diaria": {
                 "labels": labels_periodo,
                 "paginas": serie_paginas,
@@ -8735,30 +9299,25 @@ def gerar_relatorio_uso_recursos(data_inicio: str = None, data_fim: str = None):
     conn = get_connection()
     cursor = conn.cursor()
 
-    query = """
+    filtro, params = _filtro_periodo_relatorio(data_inicio, data_fim)
+    query = f"""
         SELECT
             r.id AS recurso_id,
             r.nome AS recurso_nome,
             r.tipo AS recurso_tipo,
-            COUNT(a.id) AS total_reservas,
-            COUNT(DISTINCT a.usuario_id) AS professores_distintos
+            COALESCE(a.total_reservas, 0) AS total_reservas,
+            COALESCE(a.professores_distintos, 0) AS professores_distintos
         FROM recursos r
-        LEFT JOIN agendamentos a
-            ON a.recurso_id = r.id
-           AND a.status = ?
-    """
-    params = [STATUS_AGENDAMENTO_ATIVO]
-
-    if data_inicio:
-        query += " AND a.data >= ?"
-        params.append(data_inicio)
-
-    if data_fim:
-        query += " AND a.data <= ?"
-        params.append(data_fim)
-
-    query += """
-        GROUP BY r.id, r.nome, r.tipo
+        LEFT JOIN (
+            SELECT
+                recurso_id,
+                SUM(total_reservas) AS total_reservas,
+                COUNT(DISTINCT CASE WHEN total_reservas > 0 THEN usuario_id END)
+                    AS professores_distintos
+            FROM relatorio_reservas_diario
+            WHERE {filtro}
+            GROUP BY recurso_id
+        ) a ON a.recurso_id = r.id
         ORDER BY total_reservas DESC, r.nome ASC
     """
 
@@ -8772,29 +9331,22 @@ def gerar_relatorio_uso_recursos_por_professor(data_inicio: str = None, data_fim
     conn = get_connection()
     cursor = conn.cursor()
 
-    query = """
+    filtro, params = _filtro_periodo_relatorio(data_inicio, data_fim)
+    juncao = "JOIN" if params else "LEFT JOIN"
+    query = f"""
         SELECT
             u.id AS usuario_id,
             u.nome,
-            COUNT(a.id) AS total_reservas
+            COALESCE(a.total_reservas, 0) AS total_reservas
         FROM usuarios u
-        LEFT JOIN agendamentos a
-            ON a.usuario_id = u.id
-           AND a.status = ?
+        {juncao} (
+            SELECT usuario_id, SUM(total_reservas) AS total_reservas
+            FROM relatorio_reservas_diario
+            WHERE {filtro}
+            GROUP BY usuario_id
+            HAVING SUM(total_reservas) > 0
+        ) a ON a.usuario_id = u.id
         WHERE u.perfil = 'professor'
-    """
-    params = [STATUS_AGENDAMENTO_ATIVO]
-
-    if data_inicio:
-        query += " AND a.data >= ?"
-        params.append(data_inicio)
-
-    if data_fim:
-        query += " AND a.data <= ?"
-        params.append(data_fim)
-
-    query += """
-        GROUP BY u.id, u.nome
         ORDER BY total_reservas DESC, u.nome ASC
     """
 
@@ -10342,6 +10894,53 @@ def criar_ocorrencia(
     return ocorrencia_id
 
 
+def _filtros_listagem_ocorrencias(
+    tipo_registro: str = None,
+    status: str = None,
+    turma_id: int = None,
+    nome_estudante: str = None,
+    data_inicial: str = None,
+    data_final: str = None,
+    texto: str = None,
+) -> tuple[str, list]:
+    condicoes = []
+    params = []
+
+    tipo_registro_limpo = _normalizar_nome_catalogo(tipo_registro)
+    if tipo_registro_limpo:
+        condicoes.append("o.tipo_registro = ?")
+        params.append(tipo_registro_limpo)
+
+    status_limpo = _normalizar_nome_catalogo(status)
+    if status_limpo:
+        condicoes.append("o.status = ?")
+        params.append(status_limpo)
+
+    if turma_id is not None:
+        turma_id_valor = int(turma_id)
+        if turma_id_valor > 0:
+            condicoes.append("o.turma_id = ?")
+            params.append(turma_id_valor)
+
+    for termo, colunas in ((nome_estudante, ("nome_estudante",)), (texto, None)):
+        condicao, params_busca = filtro_busca("ocorrencias", termo, coluna_id="o.id", colunas=colunas)
+        if condicao:
+            condicoes.append(condicao)
+            params.extend(params_busca)
+
+    data_inicial_limpa = _normalizar_nome_catalogo(data_inicial)
+    if data_inicial_limpa:
+        condicoes.append("o.data_ocorrencia >= ?")
+        params.append(data_inicial_limpa)
+
+    data_final_limpa = _normalizar_nome_catalogo(data_final)
+    if data_final_limpa:
+        condicoes.append("o.data_ocorrencia <= ?")
+        params.append(data_final_limpa)
+
+    return "".join(f" AND {condicao}" for condicao in condicoes), params
+
+
 def listar_ocorrencias(
     tipo_registro: str = None,
     status: str = None,
@@ -10349,11 +10948,16 @@ def listar_ocorrencias(
     nome_estudante: str = None,
     data_inicial: str = None,
     data_final: str = None,
+    texto: str = None,
 ):
     conn = get_connection()
     cursor = conn.cursor()
 
-    query = """
+    filtros_sql, params = _filtros_listagem_ocorrencias(
+        tipo_registro, status, turma_id, nome_estudante, data_inicial, data_final, texto
+    )
+    cursor.execute(
+        f"""
         SELECT
             o.id,
             o.tipo_registro,
@@ -10375,48 +10979,13 @@ def listar_ocorrencias(
             o.atualizado_em
         FROM ocorrencias o
         LEFT JOIN turmas t ON t.id = o.turma_id
-        WHERE 1 = 1
-    """
-    params = []
-
-    tipo_registro_limpo = _normalizar_nome_catalogo(tipo_registro)
-    if tipo_registro_limpo:
-        query += " AND o.tipo_registro = ?"
-        params.append(tipo_registro_limpo)
-
-    status_limpo = _normalizar_nome_catalogo(status)
-    if status_limpo:
-        query += " AND o.status = ?"
-        params.append(status_limpo)
-
-    if turma_id is not None:
-        turma_id_valor = int(turma_id)
-        if turma_id_valor > 0:
-            query += " AND o.turma_id = ?"
-            params.append(turma_id_valor)
-
-    nome_estudante_limpo = _normalizar_nome_catalogo(nome_estudante)
-    if nome_estudante_limpo:
-        query += " AND LOWER(o.nome_estudante) LIKE ?"
-        params.append(f"%{nome_estudante_limpo.lower()}%")
-
-    data_inicial_limpa = _normalizar_nome_catalogo(data_inicial)
-    if data_inicial_limpa:
-        query += " AND o.data_ocorrencia >= ?"
-        params.append(data_inicial_limpa)
-
-    data_final_limpa = _normalizar_nome_catalogo(data_final)
-    if data_final_limpa:
-        query += " AND o.data_ocorrencia <= ?"
-        params.append(data_final_limpa)
-
-    query += """
+        WHERE 1 = 1{filtros_sql}
         ORDER BY
             o.data_ocorrencia DESC,
             o.criado_em DESC
-    """
-
-    cursor.execute(query, params)
+        """,
+        params,
+    )
     rows = cursor.fetchall()
     ocorrencias = [dict(row) for row in rows]
     _anexar_regimento_itens_ocorrencias(cursor, ocorrencias)
@@ -10425,6 +10994,120 @@ def listar_ocorrencias(
     return ocorrencias
 
 
+LIMITE_PAGINA_OCORRENCIAS = 100
+# Acima disso a contagem para e o total vira estimativa ("mais de N").
+LIMITE_CONTAGEM_OCORRENCIAS = 5000
+_TAMANHO_RESUMO_DESCRICAO_OCORRENCIA = 160
+
+
+def _codificar_cursor_ocorrencias(ocorrencia: dict) -> str:
+    chave = [ocorrencia["data_ocorrencia"], ocorrencia["criado_em"], int(ocorrencia["id"])]
+    bruto = json.dumps(chave, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor_ocorrencias(cursor_pagina: str) -> tuple[str, str, int]:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor_pagina + "=" * (-len(cursor_pagina) % 4))
+        data_ocorrencia, criado_em, ocorrencia_id = json.loads(bruto.decode("utf-8"))
+        if not isinstance(data_ocorrencia, str) or not isinstance(criado_em, str):
+            raise TypeError
+        return data_ocorrencia, criado_em, int(ocorrencia_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Cursor de paginacao invalido.") from exc
+
+
+def listar_ocorrencias_pagina(
+    tipo_registro: str = None,
+    status: str = None,
+    turma_id: int = None,
+    nome_estudante: str = None,
+    data_inicial: str = None,
+    data_final: str = None,
+    texto: str = None,
+    *,
+    limite: int = 50,
+    cursor_pagina: str | None = None,
+) -> dict:
+    """Pagina de ocorrencias em projecao resumida, por keyset.
+
+    A ordem (``data_ocorrencia``, ``criado_em``, ``id``) decrescente percorre
+    ``idx_ocorrencias_listagem`` (ou o indice de status/turma com a mesma
+    ordem), entao cada pagina le so as linhas que devolve, sem ordenar. Sem
+    vinculos nem base legal: a hidratacao completa fica para
+    ``buscar_ocorrencia_por_id``. O total so e contado na primeira pagina, ate
+    ``LIMITE_CONTAGEM_OCORRENCIAS``.
+    """
+    limite_valor = min(max(int(limite), 1), LIMITE_PAGINA_OCORRENCIAS)
+    filtros_sql, params = _filtros_listagem_ocorrencias(
+        tipo_registro, status, turma_id, nome_estudante, data_inicial, data_final, texto
+    )
+    filtros_pagina_sql = filtros_sql
+    params_pagina = list(params)
+    if cursor_pagina:
+        filtros_pagina_sql += " AND (o.data_ocorrencia, o.criado_em, o.id) < (?, ?, ?)"
+        params_pagina.extend(_decodificar_cursor_ocorrencias(cursor_pagina))
+
+    conn = get_read_connection()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT
+                o.id,
+                o.tipo_registro,
+                o.nome_estudante,
+                o.estudante_id,
+                o.turma_id,
+                COALESCE(t.nome, '') AS turma_nome,
+                o.professor_requerente,
+                o.professor_requerente_id,
+                o.disciplina,
+                o.data_ocorrencia,
+                o.aula,
+                SUBSTR(o.descricao, 1, {_TAMANHO_RESUMO_DESCRICAO_OCORRENCIA}) AS descricao_resumo,
+                LENGTH(o.descricao) > {_TAMANHO_RESUMO_DESCRICAO_OCORRENCIA} AS descricao_truncada,
+                o.acao_aplicada,
+                o.status,
+                o.criado_em,
+                o.atualizado_em
+            FROM ocorrencias o
+            LEFT JOIN turmas t ON t.id = o.turma_id
+            WHERE 1 = 1{filtros_pagina_sql}
+            ORDER BY o.data_ocorrencia DESC, o.criado_em DESC, o.id DESC
+            LIMIT ?
+            """,
+            [*params_pagina, limite_valor + 1],
+        ).fetchall()
+
+        total = None
+        total_exato = None
+        if not cursor_pagina:
+            total = conn.execute(
+                f"""
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM ocorrencias o
+                    WHERE 1 = 1{filtros_sql}
+                    LIMIT ?
+                )
+                """,
+                [*params, LIMITE_CONTAGEM_OCORRENCIAS + 1],
+            ).fetchone()[0]
+            total_exato = total <= LIMITE_CONTAGEM_OCORRENCIAS
+            total = min(total, LIMITE_CONTAGEM_OCORRENCIAS)
+    finally:
+        conn.close()
+
+    itens = [dict(row) for row in rows[:limite_valor]]
+    for item in itens:
+        item["descricao_truncada"] = bool(item["descricao_truncada"])
+    return {
+        "itens": itens,
+        "proximo_cursor": _codificar_cursor_ocorrencias(itens[-1]) if len(rows) > limite_valor else None,
+        "total": total,
+        "total_exato": total_exato,
+    }
+
+
 def buscar_ocorrencia_por_id(ocorrencia_id: int):
     conn = get_connection()
     cursor = conn.cursor()
@@ -12149,10 +12832,10 @@ def listar_estudantes_pre_conselho_painel(
         int(turma_id),
     ]
 
-    nome_limpo = _normalizar_nome_catalogo(busca_nome).lower()
-    if nome_limpo:
-        query += " AND LOWER(COALESCE(e.nome, '')) LIKE ?"
-        params.append(f"%{nome_limpo}%")
+    filtro_nome_sql, filtro_nome_params = filtro_busca("estudantes", busca_nome, coluna_id="e.id")
+    if filtro_nome_sql:
+        query += f" AND {filtro_nome_sql}"
+        params.extend(filtro_nome_params)
 
     status_limpo = _normalizar_nome_catalogo(status).lower()
     if status_limpo == "sinalizados":
@@ -12497,3 +13180,443 @@ def excluir_registro_pre_conselho(registro_id: int, *, professor_usuario_id: int
     conn.commit()
     conn.close()
     return alterado
+
+
+_SELECT_YOUTUBE_DOWNLOAD_JOB = """
+    SELECT
+        j.*,
+        a.arquivo_path,
+        a.arquivo_nome,
+        a.media_type
+    FROM youtube_download_jobs j
+    LEFT JOIN youtube_download_artefatos a
+      ON a.chave = j.artefato_chave
+     AND a.status = 'CONCLUIDO'
+"""
+
+
+def _mapear_youtube_download_job(row):
+    if not row:
+        return None
+    return {
+        "id": str(row["id"]),
+        "usuario_id": int(row["usuario_id"]),
+        "url": str(row["url"] or ""),
+        "formato": str(row["formato"] or ""),
+        "qualidade": row["qualidade"] or None,
+        "artefato_chave": str(row["artefato_chave"] or ""),
+        "status": str(row["status"] or "").strip().upper(),
+        "erro_mensagem": row["erro_mensagem"] or None,
+        "arquivo_path": row["arquivo_path"] or None,
+        "arquivo_nome": row["arquivo_nome"] or None,
+        "media_type": row["media_type"] or None,
+        "criado_em": str(row["criado_em"] or ""),
+        "atualizado_em": str(row["atualizado_em"] or ""),
+    }
+
+
+def _buscar_youtube_download_job_conn(conn, job_id: str):
+    row = conn.execute(f"{_SELECT_YOUTUBE_DOWNLOAD_JOB} WHERE j.id = ?", (str(job_id),)).fetchone()
+    return _mapear_youtube_download_job(row)
+
+
+def _descartar_youtube_artefato_conn(conn, chave: str, erro_mensagem: str):
+    conn.execute("DELETE FROM youtube_download_artefatos WHERE chave = ?", (chave,))
+    conn.execute(
+        """
+        UPDATE youtube_download_jobs
+        SET status = 'ERRO',
+            erro_mensagem = ?,
+            atualizado_em = datetime('now')
+        WHERE artefato_chave = ?
+          AND status = 'CONCLUIDO'
+        """,
+        (erro_mensagem, chave),
+    )
+
+
+def registrar_youtube_download_job(
+    *,
+    job_id: str,
+    usuario_id: int,
+    url: str,
+    formato: str,
+    qualidade: str | None,
+    video_id: str,
+    chave: str,
+    dono: str,
+    minutos_travado: int = 120,
+):
+    """Cria (ou reaproveita) o job do usuario e decide quem baixa o artefato.
+
+    Devolve ``(job, iniciar_download)``. A decisao roda numa transacao
+    ``BEGIN IMMEDIATE``: pedidos iguais de qualquer usuario, thread ou processo
+    se penduram no mesmo artefato, e so quem cria ou reassume o artefato recebe
+    ``iniciar_download=True``. Artefato PENDENTE/PROCESSANDO parado ha mais de
+    ``minutos_travado`` (processo encerrado no meio do download) e reassumido.
+    """
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        artefato = conn.execute(
+            """
+            SELECT *,
+                   atualizado_em >= datetime('now', ?) AS dentro_do_prazo
+            FROM youtube_download_artefatos
+            WHERE chave = ?
+            """,
+            (f"-{max(int(minutos_travado), 1)} minutes", chave),
+        ).fetchone()
+        disponivel = bool(
+            artefato
+            and artefato["status"] == "CONCLUIDO"
+            and artefato["arquivo_path"]
+            and Path(artefato["arquivo_path"]).exists()
+        )
+        em_andamento = bool(
+            artefato
+            and artefato["status"] in ("PENDENTE", "PROCESSANDO")
+            and artefato["dentro_do_prazo"]
+        )
+
+        existente = conn.execute(
+            """
+            SELECT id, status
+            FROM youtube_download_jobs
+            WHERE usuario_id = ?
+              AND artefato_chave = ?
+              AND status IN ('PENDENTE', 'PROCESSANDO', 'CONCLUIDO')
+            ORDER BY criado_em DESC
+            LIMIT 1
+            """,
+            (int(usuario_id), chave),
+        ).fetchone()
+        reaproveitar = existente is not None and (
+            (existente["status"] == "CONCLUIDO" and disponivel)
+            or (existente["status"] != "CONCLUIDO" and em_andamento)
+        )
+
+        iniciar_download = False
+        if disponivel:
+            conn.execute(
+                """
+                UPDATE youtube_download_artefatos
+                SET ultimo_acesso_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+                WHERE chave = ?
+                """,
+                (chave,),
+            )
+            status_job = "CONCLUIDO"
+        elif em_andamento:
+            status_job = str(artefato["status"])
+        else:
+            conn.execute(
+                """
+                INSERT INTO youtube_download_artefatos (
+                    chave, video_id, formato, qualidade, url, status, dono,
+                    criado_em, atualizado_em, ultimo_acesso_em
+                )
+                VALUES (?, ?, ?, ?, ?, 'PENDENTE', ?, datetime('now'), datetime('now'),
+                        strftime('%Y-%m-%d %H:%M:%f', 'now'))
+                ON CONFLICT(chave) DO UPDATE SET
+                    url = excluded.url,
+                    status = 'PENDENTE',
+                    dono = excluded.dono,
+                    arquivo_path = NULL,
+                    arquivo_nome = NULL,
+                    media_type = NULL,
+                    tamanho_bytes = 0,
+                    erro_mensagem = NULL,
+                    atualizado_em = excluded.atualizado_em,
+                    ultimo_acesso_em = excluded.ultimo_acesso_em
+                """,
+                (chave, video_id, formato, qualidade or "", url, dono),
+            )
+            # Jobs que apontavam para um arquivo que sumiu voltam a esperar o novo download.
+            conn.execute(
+                """
+                UPDATE youtube_download_jobs
+                SET status = 'PENDENTE',
+                    erro_mensagem = NULL,
+                    atualizado_em = datetime('now')
+                WHERE artefato_chave = ?
+                  AND status IN ('PROCESSANDO', 'CONCLUIDO')
+                """,
+                (chave,),
+            )
+            status_job = "PENDENTE"
+            iniciar_download = True
+
+        if reaproveitar:
+            job_id = str(existente["id"])
+        else:
+            conn.execute(
+                """
+                INSERT INTO youtube_download_jobs (
+                    id, usuario_id, url, formato, qualidade, artefato_chave, status,
+                    criado_em, atualizado_em
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+                """,
+                (str(job_id), int(usuario_id), url, formato, qualidade, chave, status_job),
+            )
+        conn.commit()
+        return _buscar_youtube_download_job_conn(conn, job_id), iniciar_download
+    finally:
+        conn.close()
+
+
+def marcar_youtube_artefato_processando(chave: str, dono: str) -> bool:
+    conn = get_connection()
+    try:
+        cursor = conn.execute(
+            """
+            UPDATE youtube_download_artefatos
+            SET status = 'PROCESSANDO',
+                atualizado_em = datetime('now')
+            WHERE chave = ?
+              AND dono = ?
+              AND status = 'PENDENTE'
+            """,
+            (chave, dono),
+        )
+        assumido = cursor.rowcount > 0
+        if assumido:
+            conn.execute(
+                """
+                UPDATE youtube_download_jobs
+                SET status = 'PROCESSANDO',
+                    atualizado_em = datetime('now')
+                WHERE artefato_chave = ?
+                  AND status = 'PENDENTE'
+                """,
+                (chave,),
+            )
+        conn.commit()
+        return assumido
+    finally:
+        conn.close()
+
+
+def concluir_youtube_artefato(
+    chave: str,
+    dono: str,
+    *,
+    arquivo_path: str,
+    arquivo_nome: str,
+    media_type: str,
+    tamanho_bytes: int,
+) -> bool:
+    """Publica o arquivo baixado para todos os jobs do artefato.
+
+    Devolve ``False`` quando outro processo reassumiu o artefato; nesse caso o
+    arquivo recem-baixado nao foi registrado e deve ser removido por quem chamou.
+    """
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(
+            """
+            UPDATE youtube_download_artefatos
+            SET status = 'CONCLUIDO',
+                arquivo_path = ?,
+                arquivo_nome = ?,
+                media_type = ?,
+                tamanho_bytes = ?,
+                erro_mensagem = NULL,
+                atualizado_em = datetime('now'),
+                ultimo_acesso_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE chave = ?
+              AND dono = ?
+              AND status = 'PROCESSANDO'
+            """,
+            (arquivo_path, arquivo_nome, media_type, max(int(tamanho_bytes), 0), chave, dono),
+        )
+        publicado = cursor.rowcount > 0
+        if publicado:
+            conn.execute(
+                """
+                UPDATE youtube_download_jobs
+                SET status = 'CONCLUIDO',
+                    erro_mensagem = NULL,
+                    atualizado_em = datetime('now')
+                WHERE artefato_chave = ?
+                  AND status IN ('PENDENTE', 'PROCESSANDO')
+                """,
+                (chave,),
+            )
+        conn.commit()
+        return publicado
+    finally:
+        conn.close()
+
+
+def falhar_youtube_artefato(chave: str, dono: str, erro_mensagem: str) -> bool:
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(
+            """
+            UPDATE youtube_download_artefatos
+            SET status = 'ERRO',
+                erro_mensagem = ?,
+                atualizado_em = datetime('now')
+            WHERE chave = ?
+              AND dono = ?
+              AND status IN ('PENDENTE', 'PROCESSANDO')
+            """,
+            (erro_mensagem, chave, dono),
+        )
+        registrado = cursor.rowcount > 0
+        if registrado:
+            conn.execute(
+                """
+                UPDATE youtube_download_jobs
+                SET status = 'ERRO',
+                    erro_mensagem = ?,
+                    atualizado_em = datetime('now')
+                WHERE artefato_chave = ?
+                  AND status IN ('PENDENTE', 'PROCESSANDO')
+                """,
+                (erro_mensagem, chave),
+            )
+        conn.commit()
+        return registrado
+    finally:
+        conn.close()
+
+
+def descartar_youtube_artefato(chave: str, erro_mensagem: str):
+    conn = get_connection()
+    try:
+        _descartar_youtube_artefato_conn(conn, chave, erro_mensagem)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def remover_youtube_artefatos_excedentes(
+    max_bytes: int,
+    erro_mensagem: str,
+    *,
+    preservar_chave: str | None = None,
+) -> list[str]:
+    """Tira do cache os artefatos menos acessados ate o total caber em ``max_bytes``.
+
+    Devolve os caminhos dos arquivos removidos do indice; apagar do disco fica
+    com quem chamou, fora da transacao.
+    """
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            """
+            SELECT chave, arquivo_path, tamanho_bytes
+            FROM youtube_download_artefatos
+            WHERE status = 'CONCLUIDO'
+            ORDER BY ultimo_acesso_em ASC, chave ASC
+            """
+        ).fetchall()
+        total = sum(int(row["tamanho_bytes"] or 0) for row in rows)
+        removidos = []
+        for row in rows:
+            if total <= max_bytes:
+                break
+            if row["chave"] == preservar_chave:
+                continue
+            _descartar_youtube_artefato_conn(conn, row["chave"], erro_mensagem)
+            total -= int(row["tamanho_bytes"] or 0)
+            if row["arquivo_path"]:
+                removidos.append(str(row["arquivo_path"]))
+        conn.commit()
+        return removidos
+    finally:
+        conn.close()
+
+
+def tocar_youtube_artefato(chave: str):
+    conn = get_connection()
+    try:
+        conn.execute(
+            """
+            UPDATE youtube_download_artefatos
+            SET ultimo_acesso_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE chave = ?
+            """,
+            (chave,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def buscar_youtube_download_job(job_id: str):
+    conn = get_connection()
+    try:
+        return _buscar_youtube_download_job_conn(conn, job_id)
+    finally:
+        conn.close()
+
+
+def limpar_youtube_downloads_expirados(ttl_segundos: int):
+    """Remove jobs finalizados, tickets vencidos e falhas antigas; arquivos ficam com o cache."""
+    limite = f"-{max(int(ttl_segundos), 0)} seconds"
+    conn = get_connection()
+    try:
+        conn.execute("DELETE FROM youtube_download_tickets WHERE expira_em <= datetime('now')")
+        conn.execute(
+            """
+            DELETE FROM youtube_download_jobs
+            WHERE status IN ('CONCLUIDO', 'ERRO')
+              AND atualizado_em < datetime('now', ?)
+            """,
+            (limite,),
+        )
+        conn.execute(
+            """
+            DELETE FROM youtube_download_artefatos
+            WHERE status = 'ERRO'
+              AND atualizado_em < datetime('now', ?)
+            """,
+            (limite,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def criar_youtube_download_ticket(ticket: str, job_id: str, usuario_id: int, ttl_segundos: int) -> str:
+    conn = get_connection()
+    try:
+        conn.execute(
+            """
+            INSERT INTO youtube_download_tickets (ticket, job_id, usuario_id, expira_em)
+            VALUES (?, ?, ?, datetime('now', ?))
+            """,
+            (ticket, str(job_id), int(usuario_id), f"+{max(int(ttl_segundos), 1)} seconds"),
+        )
+        expira_em = conn.execute(
+            "SELECT expira_em FROM youtube_download_tickets WHERE ticket = ?",
+            (ticket,),
+        ).fetchone()["expira_em"]
+        conn.commit()
+        return str(expira_em)
+    finally:
+        conn.close()
+
+
+def buscar_youtube_download_ticket(ticket: str):
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            """
+            SELECT ticket, job_id, usuario_id, expira_em
+            FROM youtube_download_tickets
+            WHERE ticket = ?
+              AND expira_em > datetime('now')
+            """,
+            (str(ticket),),
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
@@ -6,7 +6,6 @@ buscar_apc_envio_por_chave = proxy("buscar_apc_envio_por_chave")
 buscar_apc_destinatario_por_chave = proxy("buscar_apc_destinatario_por_chave")
 buscar_apc_periodo_por_id = proxy("buscar_apc_periodo_por_id")
 buscar_apc_preview_job_por_envio = proxy("buscar_apc_preview_job_por_envio")
-buscar_proximo_apc_preview_job = proxy("buscar_proximo_apc_preview_job")
 agendar_apc_preview_job = proxy("agendar_apc_preview_job")
 concluir_apc_preview_job = proxy("concluir_apc_preview_job")
 criar_apc_envio = proxy("criar_apc_envio")
@@ -19,7 +18,7 @@ listar_apc_destinatarios = proxy("listar_apc_destinatarios")
 listar_apc_envio_historico = proxy("listar_apc_envio_historico")
 listar_apc_envios = proxy("listar_apc_envios")
 listar_apc_periodos = proxy("listar_apc_periodos")
-marcar_apc_preview_job_processando = proxy("marcar_apc_preview_job_processando")
+reivindicar_proximo_apc_preview_job = proxy("reivindicar_proximo_apc_preview_job")
 substituir_apc_destinatarios = proxy("substituir_apc_destinatarios")
 atualizar_apc_envio = proxy("atualizar_apc_envio")
 atualizar_apc_periodo = proxy("atualizar_apc_periodo")
@@ -31,7 +30,6 @@ __all__ = [
     "buscar_apc_destinatario_por_chave",
     "buscar_apc_periodo_por_id",
     "buscar_apc_preview_job_por_envio",
-    "buscar_proximo_apc_preview_job",
     "agendar_apc_preview_job",
     "concluir_apc_preview_job",
     "criar_apc_envio",
@@ -44,7 +42,7 @@ __all__ = [
     "listar_apc_envio_historico",
     "listar_apc_envios",
     "listar_apc_periodos",
-    "marcar_apc_preview_job_processando",
+    "reivindicar_proximo_apc_preview_job",
     "substituir_apc_destinatarios",
     "atualizar_apc_envio",
     "atualizar_apc_periodo",
@@ -0,0 +1,162 @@
+"""Busca textual sem acento e por prefixo sobre indices FTS5.
+
+Cada ``IndiceBusca`` e uma tabela FTS5 de conteudo externo (le as colunas da
+propria tabela de origem, sem duplicar o texto) com o tokenizador
+``unicode61 remove_diacritics 2``: "joao" encontra "João" e "sil" encontra
+"Silva". Gatilhos na tabela de origem mantem o indice em dia a cada
+INSERT/UPDATE/DELETE, seja qual for o caminho de escrita.
+
+Consultas montam a expressao com ``expressao_busca`` e entram no SQL por
+``filtro_busca`` (listagens com ordem propria) ou ``juncao_busca``
+(autocompletar, ordenado por relevancia bm25).
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class IndiceBusca:
+    nome: str
+    tabela: str
+    colunas: tuple[str, ...]
+
+
+INDICES_BUSCA = {
+    "estudantes": IndiceBusca("busca_estudantes", "estudantes", ("nome",)),
+    "usuarios": IndiceBusca("busca_usuarios", "usuarios", ("nome", "email")),
+    "ocorrencias": IndiceBusca("busca_ocorrencias", "ocorrencias", ("nome_estudante", "descricao")),
+    "auditoria": IndiceBusca(
+        "busca_auditoria", "audit_events", ("description", "actor_name", "actor_email", "action")
+    ),
+}
+
+# Termos com mais palavras que isso sao cortados; autocompletar nao precisa.
+_MAXIMO_TOKENS = 8
+_TOKEN = re.compile(r"\w+")
+
+
+def _gatilhos(indice: IndiceBusca) -> dict[str, str]:
+    colunas = ", ".join(indice.colunas)
+    novos = ", ".join(f"new.{coluna}" for coluna in indice.colunas)
+    antigos = ", ".join(f"old.{coluna}" for coluna in indice.colunas)
+    remover = f"INSERT INTO {indice.nome} ({indice.nome}, rowid, {colunas}) VALUES ('delete', old.id, {antigos});"
+    inserir = f"INSERT INTO {indice.nome} (rowid, {colunas}) VALUES (new.id, {novos});"
+    return {
+        f"{indice.nome}_ai": f"AFTER INSERT ON {indice.tabela} BEGIN {inserir} END",
+        f"{indice.nome}_ad": f"AFTER DELETE ON {indice.tabela} BEGIN {remover} END",
+        f"{indice.nome}_au": (
+            f"AFTER UPDATE OF {colunas} ON {indice.tabela} BEGIN {remover} {inserir} END"
+        ),
+    }
+
+
+def garantir_indices_busca(cursor) -> None:
+    """Cria os indices e gatilhos que faltarem e reconstroi o que ficou para tras.
+
+    Roda no caminho completo de ``criar_tabelas``. Recriar a tabela de origem
+    (compatibilidade legada) apaga os gatilhos junto; nesse caso, e na primeira
+    criacao, o indice e reconstruido a partir do conteudo atual.
+    """
+    existentes = {
+        row[0]
+        for row in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE 'busca\\_%' ESCAPE '\\'"
+        )
+    }
+    for indice in INDICES_BUSCA.values():
+        gatilhos = _gatilhos(indice)
+        if indice.nome in existentes and existentes.issuperset(gatilhos):
+            continue
+        cursor.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {indice.nome} USING fts5(
+                {", ".join(indice.colunas)},
+                content='{indice.tabela}',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2'
+            )
+            """
+        )
+        for nome_gatilho, corpo in gatilhos.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nome_gatilho}")
+            cursor.execute(f"CREATE TRIGGER {nome_gatilho} {corpo}")
+        cursor.execute(f"INSERT INTO {indice.nome} ({indice.nome}) VALUES ('rebuild')")
+
+
+def normalizar_texto_busca(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", str(texto or ""))
+    return "".join(char for char in decomposto if not unicodedata.combining(char)).casefold()
+
+
+def expressao_busca(termo: str, colunas: tuple[str, ...] | None = None) -> str | None:
+    """Expressao MATCH em que cada palavra do termo vira um prefixo obrigatorio.
+
+    Devolve ``None`` se o termo nao tem nenhuma palavra pesquisavel.
+    """
+    tokens = _TOKEN.findall(normalizar_texto_busca(termo))[:_MAXIMO_TOKENS]
+    if not tokens:
+        return None
+    expressao = " ".join(f'"{token}"*' for token in tokens)
+    if colunas:
+        return f"{{{' '.join(colunas)}}} : ({expressao})"
+    return expressao
+
+
+def _indice(nome: str, colunas: tuple[str, ...] | None) -> IndiceBusca:
+    indice = INDICES_BUSCA[nome]
+    if colunas and not set(colunas).issubset(indice.colunas):
+        raise ValueError(f"Colunas fora do indice {nome}: {colunas}")
+    return indice
+
+
+def filtro_busca(
+    nome_indice: str,
+    termo: str,
+    *,
+    coluna_id: str,
+    colunas: tuple[str, ...] | None = None,
+) -> tuple[str, list]:
+    """Condicao SQL ``coluna_id IN (...)`` para o termo; ``("", [])`` sem termo."""
+    if not str(termo or "").strip():
+        return "", []
+    indice = _indice(nome_indice, colunas)
+    expressao = expressao_busca(termo, colunas)
+    if expressao is None:
+        return "0 = 1", []
+    return f"{coluna_id} IN (SELECT rowid FROM {indice.nome} WHERE {indice.nome} MATCH ?)", [expressao]
+
+
+def juncao_busca(
+    nome_indice: str,
+    termo: str,
+    *,
+    coluna_id: str,
+    alias: str = "busca",
+    colunas: tuple[str, ...] | None = None,
+) -> tuple[str, list]:
+    """``LEFT JOIN`` que expoe ``alias.id`` e ``alias.relevancia`` (bm25, menor e melhor).
+
+    Linhas sem correspondencia ficam com ``alias.id`` nulo; quem chama decide se
+    as descarta ou combina com outro criterio. Sem termo devolve ``("", [])``.
+    """
+    if not str(termo or "").strip():
+        return "", []
+    indice = _indice(nome_indice, colunas)
+    expressao = expressao_busca(termo, colunas)
+    if expressao is None:
+        return f"LEFT JOIN (SELECT NULL AS id, NULL AS relevancia) {alias} ON 0", []
+    return (
+        f"""
+        LEFT JOIN (
+            SELECT rowid AS id, bm25({indice.nome}) AS relevancia
+            FROM {indice.nome}
+            WHERE {indice.nome} MATCH ?
+        ) {alias} ON {alias}.id = {coluna_id}
+        """,
+        [expressao],
+    )
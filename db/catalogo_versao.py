@@ -0,0 +1,81 @@
+"""Contador de versao do catalogo que alimenta os pacotes de opcoes.
+
+Os pacotes de opcoes (``services.catalogo_cache``) juntam turmas, professores,
+disciplinas, base legal, grade de aulas e anos letivos. Gatilhos nessas
+tabelas incrementam ``catalogo_versao.versao`` a cada escrita, seja qual for o
+caminho (rotas, importacao CSV, migrations, edicao manual), e o pacote em
+memoria vale enquanto a versao lida for a mesma em que ele foi montado.
+
+``geracao`` e sorteada quando a linha e criada: um banco recriado volta a
+contar do zero, mas com outra geracao, e nao herda pacotes do banco anterior.
+"""
+
+from __future__ import annotations
+
+# Tabela -> colunas cuja alteracao muda algum pacote (None = qualquer coluna).
+# Em ``usuarios`` ficam de fora senha e hashes; nas tabelas com muitas linhas
+# por ano so o proprio ano letivo interessa (a lista de anos dos contextos).
+TABELAS_CATALOGO: dict[str, tuple[str, ...] | None] = {
+    "turmas": None,
+    "disciplinas": None,
+    "usuarios": ("nome", "email", "perfil", "cargo", "ativo"),
+    "leis": None,
+    "artigos": None,
+    "incisos": None,
+    "alineas": None,
+    "configuracao_aulas": None,
+    "horarios_escolares": ("ano_letivo",),
+    "apc_periodos": ("ano_letivo",),
+}
+
+_INCREMENTAR = "UPDATE catalogo_versao SET versao = versao + 1 WHERE id = 1;"
+
+
+def _gatilhos(tabela: str, colunas: tuple[str, ...] | None) -> dict[str, str]:
+    atualizacao = f"AFTER UPDATE OF {', '.join(colunas)}" if colunas else "AFTER UPDATE"
+    return {
+        f"catalogo_versao_{tabela}_ai": f"AFTER INSERT ON {tabela} BEGIN {_INCREMENTAR} END",
+        f"catalogo_versao_{tabela}_ad": f"AFTER DELETE ON {tabela} BEGIN {_INCREMENTAR} END",
+        f"catalogo_versao_{tabela}_au": f"{atualizacao} ON {tabela} BEGIN {_INCREMENTAR} END",
+    }
+
+
+def garantir_versao_catalogo(cursor) -> None:
+    """Cria a tabela de versao e os gatilhos que faltarem.
+
+    Roda no caminho completo de ``criar_tabelas``. Gatilhos ausentes (tabela
+    de origem reconstruida pela compatibilidade legada) ou com definicao
+    diferente da atual sao recriados, e nesse caso a versao e incrementada:
+    escritas feitas sem eles podem nao ter sido contadas.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalogo_versao (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            geracao TEXT NOT NULL,
+            versao INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    cursor.execute(
+        "INSERT OR IGNORE INTO catalogo_versao (id, geracao, versao) VALUES (1, lower(hex(randomblob(8))), 0)"
+    )
+    existentes = {
+        row[0]: row[1]
+        for row in cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')"
+        )
+    }
+    recriados = False
+    for tabela, colunas in TABELAS_CATALOGO.items():
+        if tabela not in existentes:
+            continue
+        for nome_gatilho, corpo in _gatilhos(tabela, colunas).items():
+            sql = f"CREATE TRIGGER {nome_gatilho} {corpo}"
+            if existentes.get(nome_gatilho) == sql:
+                continue
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nome_gatilho}")
+            cursor.execute(sql)
+            recriados = True
+    if recriados:
+        cursor.execute(_INCREMENTAR)
@@ -24,6 +24,7 @@ buscar_disciplina_por_nome = proxy("buscar_disciplina_por_nome")
 criar_disciplina = proxy("criar_disciplina")
 listar_disciplinas = proxy("listar_disciplinas")
 listar_disciplinas_ativas = proxy("listar_disciplinas_ativas")
+obter_versao_catalogo = proxy("obter_versao_catalogo")
 
 __all__ = [
     "atualizar_disciplina_dados",
@@ -46,4 +47,5 @@ __all__ = [
     "listar_recursos_ativos",
     "listar_turmas",
     "listar_turmas_ativas",
+    "obter_versao_catalogo",
 ]
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+JOURNAL_MODES_VALIDOS = ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY")
+SYNCHRONOUS_VALIDOS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def _env_int(nome: str, padrao: int, *, minimo: int = 0) -> int:
+    valor = os.getenv(nome, "").strip()
+    if not valor:
+        return padrao
+    try:
+        return max(int(valor), minimo)
+    except ValueError:
+        return padrao
+
+
+def _env_opcao(nome: str, padrao: str, opcoes: tuple[str, ...]) -> str:
+    valor = os.getenv(nome, "").strip().upper()
+    return valor if valor in opcoes else padrao
+
+
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 4)
+DB_JOURNAL_MODE = _env_opcao("DB_JOURNAL_MODE", "WAL", JOURNAL_MODES_VALIDOS)
+DB_SYNCHRONOUS = _env_opcao("DB_SYNCHRONOUS", "NORMAL", SYNCHRONOUS_VALIDOS)
+DB_BUSY_TIMEOUT_MS = _env_int("DB_BUSY_TIMEOUT_MS", 5000)
+DB_MMAP_SIZE_BYTES = _env_int("DB_MMAP_SIZE_BYTES", 128 * 1024 * 1024)
+DB_CACHE_SIZE_KIB = _env_int("DB_CACHE_SIZE_KIB", 16 * 1024)
+
+
+class PooledConnection(sqlite3.Connection):
+    """Conexao cujo ``close()`` devolve a conexao ao pool da thread atual."""
+
+    _pool: ConnectionPool | None = None
+    _db_path: str = ""
+    _read_only: bool = False
+
+    def close(self) -> None:
+        pool = self._pool
+        if pool is not None and pool.release(self):
+            return
+        self._pool = None
+        super().close()
+
+
+def configurar_conexao(conn: sqlite3.Connection, *, read_only: bool = False) -> None:
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+    if not read_only:
+        try:
+            conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+        except sqlite3.OperationalError:
+            # Outra conexao segura o lock; o modo e persistente no arquivo e sera
+            # aplicado na proxima conexao de escrita.
+            pass
+    conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE_BYTES)}")
+    conn.execute(f"PRAGMA cache_size = -{int(DB_CACHE_SIZE_KIB)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA foreign_keys = ON")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+
+
+def abrir_conexao(db_path: str | Path, *, read_only: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        str(db_path),
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        factory=PooledConnection,
+    )
+    conn._db_path = str(db_path)
+    conn._read_only = read_only
+    configurar_conexao(conn, read_only=read_only)
+    return conn
+
+
+class ConnectionPool:
+    """Pool de conexoes SQLite por thread, com filas separadas para leitura e escrita.
+
+    Conexoes sqlite3 nao podem trocar de thread, entao cada thread guarda as
+    suas conexoes ociosas. Trocar o ``DB_PATH`` (como fazem os testes) descarta
+    as conexoes ociosas da thread que apontam para o caminho anterior.
+    """
+
+    def __init__(self, tamanho: int = DB_POOL_SIZE):
+        self.tamanho = max(int(tamanho), 0)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {
+            "abertas": 0,
+            "reutilizadas": 0,
+            "devolvidas": 0,
+            "descartadas": 0,
+        }
+
+    def _contar(self, chave: str) -> None:
+        with self._lock:
+            self._stats[chave] += 1
+
+    def _ociosas_da_thread(self, db_path: str) -> dict[bool, list[PooledConnection]]:
+        local = self._local
+        if getattr(local, "db_path", None) != db_path:
+            self._fechar_ociosas_da_thread()
+            local.db_path = db_path
+            local.ociosas = {False: [], True: []}
+        return local.ociosas
+
+    def _fechar_ociosas_da_thread(self) -> None:
+        ociosas = getattr(self._local, "ociosas", None) or {}
+        for conexoes in ociosas.values():
+            while conexoes:
+                conn = conexoes.pop()
+                conn._pool = None
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+                self._contar("descartadas")
+
+    def acquire(self, db_path: str | Path, *, read_only: bool = False) -> sqlite3.Connection:
+        caminho = str(db_path)
+        if self.tamanho <= 0:
+            self._contar("abertas")
+            return abrir_conexao(caminho, read_only=read_only)
+
+        ociosas = self._ociosas_da_thread(caminho)[read_only]
+        if ociosas:
+            conn = ociosas.pop()
+            conn.row_factory = sqlite3.Row
+            self._contar("reutilizadas")
+        else:
+            conn = abrir_conexao(caminho, read_only=read_only)
+            self._contar("abertas")
+        conn._pool = self
+        return conn
+
+    def release(self, conn: PooledConnection) -> bool:
+        """Devolve ``conn`` ao pool; retorna ``False`` quando ela deve ser fechada."""
+        local = self._local
+        ociosas = getattr(local, "ociosas", None)
+        if ociosas is None or getattr(local, "db_path", None) != conn._db_path:
+            return False
+        fila = ociosas[conn._read_only]
+        if any(item is conn for item in fila):
+            return True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if not conn._read_only:
+                conn.execute("PRAGMA foreign_keys = ON")
+        except sqlite3.Error:
+            self._contar("descartadas")
+            return False
+
+        if len(fila) >= self.tamanho:
+            self._contar("descartadas")
+            return False
+        conn.row_factory = sqlite3.Row
+        fila.append(conn)
+        self._contar("devolvidas")
+        return True
+
+    def close_idle(self) -> None:
+        self._fechar_ociosas_da_thread()
+        self._local.db_path = None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            dados = dict(self._stats)
+        dados["tamanho"] = self.tamanho
+        return dados
+
+
+_POOL = ConnectionPool()
+
+
+def get_pool() -> ConnectionPool:
+    return _POOL
+
+
+def acquire_connection(db_path: str | Path, *, read_only: bool = False) -> sqlite3.Connection:
+    return _POOL.acquire(db_path, read_only=read_only)
+
+
+def close_idle_connections() -> None:
+    _POOL.close_idle()
+
+
+def pool_stats() -> dict[str, int]:
+    return _POOL.stats()
+
+
+__all__ = [
+    "ConnectionPool",
+    "PooledConnection",
+    "abrir_conexao",
+    "acquire_connection",
+    "close_idle_connections",
+    "configurar_conexao",
+    "get_pool",
+    "pool_stats",
+]
@@ -2,8 +2,10 @@ from ._proxy import get_database_attr, proxy
 
 DB_PATH = get_database_attr("DB_PATH")
 get_connection = proxy("get_connection")
+get_read_connection = proxy("get_read_connection")
 
 __all__ = [
     "DB_PATH",
     "get_connection",
+    "get_read_connection",
 ]
@@ -318,6 +318,7 @@ def _upsert_professor_carga(
                 database._serializar_lista_texto(disciplinas),
             ),
         )
+        database.invalidar_limites_cota(conn, [usuario_id])
         conn.commit()
     finally:
         conn.close()
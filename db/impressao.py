@@ -16,18 +16,27 @@ cancelar_job = proxy("cancelar_job")
 consumir_cota = proxy("consumir_cota")
 criar_cota = proxy("criar_cota")
 criar_job = proxy("criar_job")
+estatisticas_cache_cota = proxy("estatisticas_cache_cota")
+garantir_cota_mes = proxy("garantir_cota_mes")
 gerar_relatorio_impressao = proxy("gerar_relatorio_impressao")
+gerar_relatorio_impressoras = proxy("gerar_relatorio_impressoras")
 gerar_relatorio_uso_recursos = proxy("gerar_relatorio_uso_recursos")
 gerar_relatorio_uso_recursos_por_professor = proxy("gerar_relatorio_uso_recursos_por_professor")
+invalidar_limites_cota = proxy("invalidar_limites_cota")
 listar_fila = proxy("listar_fila")
 listar_historico = proxy("listar_historico")
 listar_arquivo_paths_jobs_em_andamento = proxy("listar_arquivo_paths_jobs_em_andamento")
 listar_jobs_ativos = proxy("listar_jobs_ativos")
 listar_jobs_por_usuario = proxy("listar_jobs_por_usuario")
 normalizar_jobs_impressao_pendentes = proxy("normalizar_jobs_impressao_pendentes")
+materializar_limites_cota_mes = proxy("materializar_limites_cota_mes")
+obter_distribuicao_cota_professores = proxy("obter_distribuicao_cota_professores")
 obter_regras_cota = proxy("obter_regras_cota")
 obter_status_impressao = proxy("obter_status_impressao")
 recalcular_cotas_mes = proxy("recalcular_cotas_mes")
+reivindicar_proximo_job = proxy("reivindicar_proximo_job")
+reservar_paginas_cota = proxy("reservar_paginas_cota")
+segundos_ate_proximo_job = proxy("segundos_ate_proximo_job")
 
 __all__ = [
     "alterar_prioridade",
@@ -46,16 +55,25 @@ __all__ = [
     "consumir_cota",
     "criar_cota",
     "criar_job",
+    "estatisticas_cache_cota",
+    "garantir_cota_mes",
     "gerar_relatorio_impressao",
+    "gerar_relatorio_impressoras",
     "gerar_relatorio_uso_recursos",
     "gerar_relatorio_uso_recursos_por_professor",
+    "invalidar_limites_cota",
     "listar_fila",
     "listar_historico",
     "listar_arquivo_paths_jobs_em_andamento",
     "listar_jobs_ativos",
     "listar_jobs_por_usuario",
     "normalizar_jobs_impressao_pendentes",
+    "materializar_limites_cota_mes",
+    "obter_distribuicao_cota_professores",
     "obter_regras_cota",
     "obter_status_impressao",
     "recalcular_cotas_mes",
+    "reivindicar_proximo_job",
+    "reservar_paginas_cota",
+    "segundos_ate_proximo_job",
 ]
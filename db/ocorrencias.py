@@ -50,6 +50,7 @@ listar_apoios_estudante = proxy("listar_apoios_estudante")
 listar_incisos = proxy("listar_incisos")
 listar_leis = proxy("listar_leis")
 listar_ocorrencias = proxy("listar_ocorrencias")
+listar_ocorrencias_pagina = proxy("listar_ocorrencias_pagina")
 listar_regimento_itens = proxy("listar_regimento_itens")
 remover_alinea = proxy("remover_alinea")
 remover_artigo = proxy("remover_artigo")
@@ -114,6 +115,7 @@ __all__ = [
     "listar_incisos",
     "listar_leis",
     "listar_ocorrencias",
+    "listar_ocorrencias_pagina",
     "listar_regimento_itens",
     "remover_alinea",
     "remover_artigo",
@@ -136,7 +136,8 @@ def upgrade_database(db_path: str | None = None) -> list[str]:
     finally:
         conn.close()
 
-    database.criar_tabelas()
+    # Pedido explicito de upgrade: roda o caminho completo mesmo com carimbo atual.
+    database.criar_tabelas(forcar=True)
 
     conn = _open_connection(db_path)
     try:
@@ -0,0 +1,27 @@
+from ._proxy import proxy
+
+buscar_youtube_download_job = proxy("buscar_youtube_download_job")
+buscar_youtube_download_ticket = proxy("buscar_youtube_download_ticket")
+concluir_youtube_artefato = proxy("concluir_youtube_artefato")
+criar_youtube_download_ticket = proxy("criar_youtube_download_ticket")
+descartar_youtube_artefato = proxy("descartar_youtube_artefato")
+falhar_youtube_artefato = proxy("falhar_youtube_artefato")
+limpar_youtube_downloads_expirados = proxy("limpar_youtube_downloads_expirados")
+marcar_youtube_artefato_processando = proxy("marcar_youtube_artefato_processando")
+registrar_youtube_download_job = proxy("registrar_youtube_download_job")
+remover_youtube_artefatos_excedentes = proxy("remover_youtube_artefatos_excedentes")
+tocar_youtube_artefato = proxy("tocar_youtube_artefato")
+
+__all__ = [
+    "buscar_youtube_download_job",
+    "buscar_youtube_download_ticket",
+    "concluir_youtube_artefato",
+    "criar_youtube_download_ticket",
+    "descartar_youtube_artefato",
+    "falhar_youtube_artefato",
+    "limpar_youtube_downloads_expirados",
+    "marcar_youtube_artefato_processando",
+    "registrar_youtube_download_job",
+    "remover_youtube_artefatos_excedentes",
+    "tocar_youtube_artefato",
+]
@@ -2,9 +2,14 @@ import importlib
 import logging
 import sys
 import threading
+import time
 from datetime import datetime, UTC
 from contextlib import asynccontextmanager
 
+# Roteadores ja presentes antes deste import indicam reimportacao de ``main``
+# (testes, recarga em desenvolvimento); so nesse caso vale recarrega-los.
+_REIMPORTACAO = "routers.config" in sys.modules
+
 from fastapi import FastAPI, HTTPException
 from starlette.middleware.gzip import GZipMiddleware
 
@@ -35,6 +40,7 @@ import routers.config as config_module
 import modules.printing.router as impressao_router_module
 import routers.relatorios_router as relatorios_router_module
 import routers.download_router as download_router_module
+import routers.eventos_router as eventos_router_module
 import modules.scheduling.school_schedule_router as horario_escolar_router_module
 import routers.apc_router as apc_router_module
 import routers.pages_router as pages_router_module
@@ -42,6 +48,7 @@ import routers.professores_common as professores_common_module
 import routers.professores_router as professores_router_module
 import routers.system_router as system_router_module
 from services.auth_service import hash_senha
+from services.realtime_events import canal_eventos
 from services.worker import worker_loop
 from static_files import CachedStaticFiles
 
@@ -50,6 +57,8 @@ logger = logging.getLogger(__name__)
 
 
 def _reload_or_import(module):
+    if not _REIMPORTACAO:
+        return module
     nome_modulo = module.__name__
     modulo_registrado = sys.modules.get(nome_modulo)
 
@@ -70,6 +79,7 @@ admin_pages_router_module = _reload_or_import(admin_pages_router_module)
 impressao_router_module = _reload_or_import(impressao_router_module)
 relatorios_router_module = _reload_or_import(relatorios_router_module)
 download_router_module = _reload_or_import(download_router_module)
+eventos_router_module = _reload_or_import(eventos_router_module)
 horario_escolar_router_module = _reload_or_import(horario_escolar_router_module)
 apc_router_module = _reload_or_import(apc_router_module)
 scheduling_router_module = _reload_or_import(scheduling_router_module)
@@ -98,6 +108,7 @@ admin_pages_router = admin_pages_router_module.router
 impressao_router = impressao_router_module.router
 relatorios_router = relatorios_router_module.router
 download_router = download_router_module.router
+eventos_router = eventos_router_module.router
 horario_escolar_router = horario_escolar_router_module.router
 apc_router = apc_router_module.router
 agendamento_router = scheduling_router_module.router
@@ -177,13 +188,23 @@ async def lifespan(app: FastAPI):
     app.state.started_at = datetime.now(UTC)
     app.state.boot_status = "starting"
     app.state.worker_mode = "embedded" if ENABLE_EMBEDDED_WORKER else "external"
+    app.state.boot_timings_ms = tempos_boot = {}
+    inicio_boot = etapa_boot = time.perf_counter()
+
+    def marcar_etapa_boot(nome: str) -> None:
+        nonlocal etapa_boot
+        agora = time.perf_counter()
+        tempos_boot[nome] = round((agora - etapa_boot) * 1000, 2)
+        etapa_boot = agora
 
     try:
         resources_service.prepare_resource_image_storage(
             RESOURCE_IMAGE_DIR,
             STATIC_DIR / "img" / "resources",
         )
-        criar_tabelas()
+        marcar_etapa_boot("imagens_recursos")
+        schema = criar_tabelas()
+        marcar_etapa_boot(f"schema_{schema['caminho']}")
 
         criar_usuario_se_nao_existir(
             nome="Administrador",
@@ -203,7 +224,11 @@ async def lifespan(app: FastAPI):
             cargo="PROFESSOR",
         )
 
+        marcar_etapa_boot("usuarios_padrao")
         seed_recursos_padrao()
+        marcar_etapa_boot("recursos_padrao")
+        await canal_eventos.iniciar()
+        marcar_etapa_boot("canal_eventos")
 
         if ENABLE_EMBEDDED_WORKER:
             worker_thread = threading.Thread(target=worker_loop, daemon=True)
@@ -212,6 +237,8 @@ async def lifespan(app: FastAPI):
         else:
             logger.info("Aplicacao iniciada com worker externo esperado")
 
+        tempos_boot["total"] = round((time.perf_counter() - inicio_boot) * 1000, 2)
+        logger.info("Inicializacao em %.1f ms por etapa: %s", tempos_boot["total"], tempos_boot)
         app.state.boot_status = "ready"
         yield
     except Exception:
@@ -220,6 +247,7 @@ async def lifespan(app: FastAPI):
         raise
     finally:
         app.state.boot_status = "stopping"
+        canal_eventos.parar()
         logger.info("Aplicacao finalizada")
 
 
@@ -240,6 +268,7 @@ app.include_router(admin_classes_router)
 app.include_router(impressao_router)
 app.include_router(relatorios_router)
 app.include_router(download_router)
+app.include_router(eventos_router)
 app.include_router(horario_escolar_router)
 app.include_router(apc_router)
 app.include_router(agendamento_router)
@@ -0,0 +1,29 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    # Fila de solicitacoes APC alteradas que o worker de notificacoes ainda
+    # precisa reconciliar; ``version`` muda a cada novo enfileiramento para
+    # que o worker so remova a entrada que de fato processou.
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS notification_apc_dirty_periods (
+            period_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 1,
+            queued_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        """
+    )
+    existe_apc = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'apc_periodos'"
+    ).fetchone()
+    if existe_apc:
+        # Solicitacoes ainda abertas passam por uma reconciliacao inicial.
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO notification_apc_dirty_periods (period_id)
+            SELECT id FROM apc_periodos
+            WHERE datetime(prazo_envio) > datetime('now', 'localtime')
+            """
+        )
+    conn.commit()
@@ -0,0 +1,26 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS blog_post_renders (
+            post_id INTEGER PRIMARY KEY,
+            body_html_blog_path TEXT NOT NULL DEFAULT '',
+            body_html_public_host TEXT NOT NULL DEFAULT '',
+            reading_minutes INTEGER NOT NULL DEFAULT 1 CHECK(reading_minutes >= 1),
+            rendered_at TEXT NOT NULL DEFAULT (datetime('now')),
+            FOREIGN KEY(post_id) REFERENCES blog_posts(id) ON DELETE CASCADE
+        );
+        """
+    )
+    conn.commit()
+
+
+def downgrade(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        DROP TABLE IF EXISTS blog_post_renders;
+        """
+    )
+    conn.commit()
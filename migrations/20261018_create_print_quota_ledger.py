@@ -0,0 +1,43 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS cotas_movimentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cota_id INTEGER NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            mes TEXT NOT NULL,
+            paginas INTEGER NOT NULL,
+            tipo TEXT NOT NULL CHECK(tipo IN ('reserva', 'estorno')),
+            job_id INTEGER,
+            criado_em TEXT NOT NULL DEFAULT (datetime('now')),
+            FOREIGN KEY(cota_id) REFERENCES cotas(id) ON DELETE CASCADE
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_cotas_movimentos_usuario_mes
+        ON cotas_movimentos(usuario_id, mes, id);
+
+        CREATE TABLE IF NOT EXISTS cota_limites_estado (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            versao INTEGER NOT NULL DEFAULT 1,
+            atualizado_em TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+
+        INSERT OR IGNORE INTO cota_limites_estado (id, versao) VALUES (1, 1);
+
+        CREATE TABLE IF NOT EXISTS cota_limites_mensais (
+            usuario_id INTEGER NOT NULL,
+            mes TEXT NOT NULL,
+            limite_paginas INTEGER NOT NULL CHECK(limite_paginas >= 0),
+            versao INTEGER NOT NULL,
+            calculado_em TEXT NOT NULL DEFAULT (datetime('now')),
+            PRIMARY KEY (usuario_id, mes)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_cota_limites_mensais_mes
+        ON cota_limites_mensais(mes, versao);
+        """
+    )
+    conn.commit()
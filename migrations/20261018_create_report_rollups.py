@@ -0,0 +1,254 @@
+import sqlite3
+
+# Jobs contam nos relatorios quando concluidos, pela data de criacao;
+# agendamentos contam enquanto ativos, pela data reservada.
+_JOB_CONCLUIDO = "{alias}.status IN ('CONCLUIDO', 'FINALIZADO')"
+_TAGS_VALIDAS = (
+    "CASE WHEN json_valid({alias}.tags_json) AND json_type({alias}.tags_json) = 'array' "
+    "THEN {alias}.tags_json ELSE '[]' END"
+)
+
+# ``lower`` do SQLite so converte ASCII; as maiusculas acentuadas do
+# portugues sao trocadas antes, para ``AVALIAÇÃO`` e ``Avaliação`` cairem na
+# mesma chave, como no ``casefold`` de antes. Expressao SQL pura (e nao funcao
+# registrada em Python) porque os gatilhos tambem disparam em conexoes de
+# fora da aplicacao, onde uma funcao ausente faria qualquer escrita em
+# ``jobs`` falhar. A lista fica curta: cada letra aninha mais um ``replace``
+# e o parser do SQLite tem profundidade limitada.
+_MAIUSCULAS_ACENTUADAS = "ÁÀÂÃÉÊÍÓÔÕÚÜÇ"
+
+
+def _chave_tag(valor: str) -> str:
+    expressao = f"trim({valor})"
+    for letra in _MAIUSCULAS_ACENTUADAS:
+        expressao = f"replace({expressao}, '{letra}', '{letra.lower()}')"
+    return f"lower({expressao})"
+
+
+def _somar_job(alias: str) -> str:
+    concluido = _JOB_CONCLUIDO.format(alias=alias)
+    return f"""
+        INSERT INTO relatorio_impressao_diario (data, usuario_id, impressora, total_jobs, total_paginas)
+        SELECT
+            COALESCE(date({alias}.criado_em), ''),
+            COALESCE({alias}.usuario_id, 0),
+            COALESCE({alias}.printer_name, ''),
+            1,
+            MAX(COALESCE({alias}.paginas_totais, 0), 0)
+        WHERE {concluido}
+        ON CONFLICT(data, usuario_id, impressora) DO UPDATE SET
+            total_jobs = total_jobs + 1,
+            total_paginas = total_paginas + excluded.total_paginas;
+
+        INSERT INTO relatorio_tags_diario (data, tag_chave, tag, total_jobs, total_paginas)
+        SELECT
+            COALESCE(date({alias}.criado_em), ''),
+            jt.tag_chave,
+            jt.tag,
+            1,
+            MAX(COALESCE({alias}.paginas_totais, 0), 0)
+        FROM jobs_tags jt
+        WHERE jt.job_id = {alias}.id AND {concluido}
+        ON CONFLICT(data, tag_chave) DO UPDATE SET
+            total_jobs = total_jobs + 1,
+            total_paginas = total_paginas + excluded.total_paginas;
+    """
+
+
+def _subtrair_job(alias: str) -> str:
+    concluido = _JOB_CONCLUIDO.format(alias=alias)
+    return f"""
+        UPDATE relatorio_impressao_diario
+        SET total_jobs = total_jobs - 1,
+            total_paginas = total_paginas - MAX(COALESCE({alias}.paginas_totais, 0), 0)
+        WHERE {concluido}
+          AND data = COALESCE(date({alias}.criado_em), '')
+          AND usuario_id = COALESCE({alias}.usuario_id, 0)
+          AND impressora = COALESCE({alias}.printer_name, '');
+
+        UPDATE relatorio_tags_diario
+        SET total_jobs = total_jobs - 1,
+            total_paginas = total_paginas - MAX(COALESCE({alias}.paginas_totais, 0), 0)
+        WHERE {concluido}
+          AND data = COALESCE(date({alias}.criado_em), '')
+          AND tag_chave IN (SELECT tag_chave FROM jobs_tags WHERE job_id = {alias}.id);
+    """
+
+
+def _inserir_tags(alias: str, condicao: str = "1") -> str:
+    return f"""
+        INSERT OR IGNORE INTO jobs_tags (job_id, tag_chave, tag)
+        SELECT {alias}.id, {_chave_tag("t.value")}, trim(t.value)
+        FROM json_each({_TAGS_VALIDAS.format(alias=alias)}) t
+        WHERE t.type = 'text' AND trim(t.value) <> '' AND {condicao}
+        ORDER BY t.key;
+    """
+
+
+def _somar_reserva(alias: str) -> str:
+    return f"""
+        INSERT INTO relatorio_reservas_diario (data, recurso_id, usuario_id, total_reservas)
+        SELECT {alias}.data, {alias}.recurso_id, {alias}.usuario_id, 1
+        WHERE {alias}.status = 'ATIVO'
+        ON CONFLICT(data, recurso_id, usuario_id) DO UPDATE SET
+            total_reservas = total_reservas + 1;
+    """
+
+
+def _subtrair_reserva(alias: str) -> str:
+    return f"""
+        UPDATE relatorio_reservas_diario
+        SET total_reservas = total_reservas - 1
+        WHERE {alias}.status = 'ATIVO'
+          AND data = {alias}.data
+          AND recurso_id = {alias}.recurso_id
+          AND usuario_id = {alias}.usuario_id;
+    """
+
+
+def _garantir_coluna(conn: sqlite3.Connection, tabela: str, coluna: str, definicao: str) -> None:
+    # Bancos legados ganham estas colunas so na compatibilidade de schema,
+    # que roda depois das migracoes; os gatilhos precisam delas ja aqui.
+    colunas = {row[1] for row in conn.execute(f"PRAGMA table_info({tabela})")}
+    if coluna not in colunas:
+        conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    _garantir_coluna(conn, "jobs", "paginas_totais", "INTEGER NOT NULL DEFAULT 0")
+    _garantir_coluna(conn, "jobs", "printer_name", "TEXT")
+    _garantir_coluna(conn, "jobs", "tags_json", "TEXT NOT NULL DEFAULT '[]'")
+    _garantir_coluna(conn, "agendamentos", "status", "TEXT NOT NULL DEFAULT 'ATIVO'")
+
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS jobs_tags (
+            job_id INTEGER NOT NULL,
+            tag_chave TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (job_id, tag_chave)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_jobs_tags_tag ON jobs_tags(tag_chave, job_id);
+
+        CREATE TABLE IF NOT EXISTS relatorio_impressao_diario (
+            data TEXT NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            impressora TEXT NOT NULL,
+            total_jobs INTEGER NOT NULL DEFAULT 0,
+            total_paginas INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (data, usuario_id, impressora)
+        );
+
+        CREATE TABLE IF NOT EXISTS relatorio_tags_diario (
+            data TEXT NOT NULL,
+            tag_chave TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            total_jobs INTEGER NOT NULL DEFAULT 0,
+            total_paginas INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (data, tag_chave)
+        );
+
+        CREATE TABLE IF NOT EXISTS relatorio_reservas_diario (
+            data TEXT NOT NULL,
+            recurso_id INTEGER NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            total_reservas INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (data, recurso_id, usuario_id)
+        );
+
+        DROP TRIGGER IF EXISTS trg_jobs_relatorio_insert;
+        DROP TRIGGER IF EXISTS trg_jobs_relatorio_update;
+        DROP TRIGGER IF EXISTS trg_jobs_relatorio_delete;
+        DROP TRIGGER IF EXISTS trg_agendamentos_relatorio_insert;
+        DROP TRIGGER IF EXISTS trg_agendamentos_relatorio_update;
+        DROP TRIGGER IF EXISTS trg_agendamentos_relatorio_delete;
+
+        DELETE FROM jobs_tags;
+        DELETE FROM relatorio_impressao_diario;
+        DELETE FROM relatorio_tags_diario;
+        DELETE FROM relatorio_reservas_diario;
+        """
+    )
+
+    conn.executescript(
+        f"""
+        INSERT OR IGNORE INTO jobs_tags (job_id, tag_chave, tag)
+        SELECT j.id, {_chave_tag("t.value")}, trim(t.value)
+        FROM jobs j, json_each({_TAGS_VALIDAS.format(alias="j")}) t
+        WHERE t.type = 'text' AND trim(t.value) <> ''
+        ORDER BY j.id, t.key;
+
+        INSERT INTO relatorio_impressao_diario (data, usuario_id, impressora, total_jobs, total_paginas)
+        SELECT
+            COALESCE(date(j.criado_em), ''),
+            COALESCE(j.usuario_id, 0),
+            COALESCE(j.printer_name, ''),
+            COUNT(*),
+            SUM(MAX(COALESCE(j.paginas_totais, 0), 0))
+        FROM jobs j
+        WHERE {_JOB_CONCLUIDO.format(alias="j")}
+        GROUP BY 1, 2, 3;
+
+        INSERT INTO relatorio_tags_diario (data, tag_chave, tag, total_jobs, total_paginas)
+        SELECT
+            COALESCE(date(j.criado_em), ''),
+            jt.tag_chave,
+            MIN(jt.tag),
+            COUNT(*),
+            SUM(MAX(COALESCE(j.paginas_totais, 0), 0))
+        FROM jobs j
+        JOIN jobs_tags jt ON jt.job_id = j.id
+        WHERE {_JOB_CONCLUIDO.format(alias="j")}
+        GROUP BY 1, 2;
+
+        INSERT INTO relatorio_reservas_diario (data, recurso_id, usuario_id, total_reservas)
+        SELECT a.data, a.recurso_id, a.usuario_id, COUNT(*)
+        FROM agendamentos a
+        WHERE a.status = 'ATIVO'
+        GROUP BY a.data, a.recurso_id, a.usuario_id;
+
+        CREATE TRIGGER trg_jobs_relatorio_insert
+        AFTER INSERT ON jobs
+        BEGIN
+            {_inserir_tags("NEW")}
+            {_somar_job("NEW")}
+        END;
+
+        CREATE TRIGGER trg_jobs_relatorio_update
+        AFTER UPDATE OF status, usuario_id, printer_name, paginas_totais, criado_em, tags_json ON jobs
+        BEGIN
+            {_subtrair_job("OLD")}
+            DELETE FROM jobs_tags WHERE job_id = OLD.id AND NEW.tags_json IS NOT OLD.tags_json;
+            {_inserir_tags("NEW", "NEW.tags_json IS NOT OLD.tags_json")}
+            {_somar_job("NEW")}
+        END;
+
+        CREATE TRIGGER trg_jobs_relatorio_delete
+        AFTER DELETE ON jobs
+        BEGIN
+            {_subtrair_job("OLD")}
+            DELETE FROM jobs_tags WHERE job_id = OLD.id;
+        END;
+
+        CREATE TRIGGER trg_agendamentos_relatorio_insert
+        AFTER INSERT ON agendamentos
+        BEGIN
+            {_somar_reserva("NEW")}
+        END;
+
+        CREATE TRIGGER trg_agendamentos_relatorio_update
+        AFTER UPDATE OF status, data, recurso_id, usuario_id ON agendamentos
+        BEGIN
+            {_subtrair_reserva("OLD")}
+            {_somar_reserva("NEW")}
+        END;
+
+        CREATE TRIGGER trg_agendamentos_relatorio_delete
+        AFTER DELETE ON agendamentos
+        BEGIN
+            {_subtrair_reserva("OLD")}
+        END;
+        """
+    )
+    conn.commit()
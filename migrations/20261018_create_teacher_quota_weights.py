@@ -0,0 +1,14 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS cota_pesos_professores (
+            usuario_id INTEGER PRIMARY KEY,
+            peso REAL NOT NULL CHECK(peso >= 0),
+            calculado_em TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        """
+    )
+    conn.commit()
@@ -0,0 +1,38 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS relatorios_lotes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data_inicio TEXT NOT NULL,
+            data_fim TEXT NOT NULL,
+            assunto TEXT,
+            mensagem TEXT,
+            dry_run INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'PENDENTE',
+            erro TEXT,
+            criado_por INTEGER,
+            criado_em TEXT NOT NULL DEFAULT (datetime('now')),
+            iniciado_em TEXT,
+            finalizado_em TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS relatorios_lote_itens (
+            lote_id INTEGER NOT NULL,
+            professor_id INTEGER NOT NULL,
+            email TEXT,
+            status TEXT NOT NULL DEFAULT 'PENDENTE',
+            erro TEXT,
+            tentativas INTEGER NOT NULL DEFAULT 0,
+            processado_em TEXT,
+            PRIMARY KEY (lote_id, professor_id),
+            FOREIGN KEY (lote_id) REFERENCES relatorios_lotes(id) ON DELETE CASCADE
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_relatorios_lote_itens_status
+        ON relatorios_lote_itens(lote_id, status);
+        """
+    )
+    conn.commit()
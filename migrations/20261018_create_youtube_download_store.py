@@ -0,0 +1,56 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS youtube_download_artefatos (
+            chave TEXT PRIMARY KEY,
+            video_id TEXT NOT NULL,
+            formato TEXT NOT NULL,
+            qualidade TEXT NOT NULL DEFAULT '',
+            url TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'PENDENTE',
+            dono TEXT NOT NULL DEFAULT '',
+            arquivo_path TEXT,
+            arquivo_nome TEXT,
+            media_type TEXT,
+            tamanho_bytes INTEGER NOT NULL DEFAULT 0,
+            erro_mensagem TEXT,
+            criado_em TEXT NOT NULL,
+            atualizado_em TEXT NOT NULL,
+            ultimo_acesso_em TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_youtube_download_artefatos_lru
+        ON youtube_download_artefatos(status, ultimo_acesso_em);
+
+        CREATE TABLE IF NOT EXISTS youtube_download_jobs (
+            id TEXT PRIMARY KEY,
+            usuario_id INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            formato TEXT NOT NULL,
+            qualidade TEXT,
+            artefato_chave TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'PENDENTE',
+            erro_mensagem TEXT,
+            criado_em TEXT NOT NULL,
+            atualizado_em TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_youtube_download_jobs_artefato
+        ON youtube_download_jobs(artefato_chave, status);
+
+        CREATE INDEX IF NOT EXISTS idx_youtube_download_jobs_usuario
+        ON youtube_download_jobs(usuario_id, artefato_chave);
+
+        CREATE TABLE IF NOT EXISTS youtube_download_tickets (
+            ticket TEXT PRIMARY KEY,
+            job_id TEXT NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            expira_em TEXT NOT NULL,
+            FOREIGN KEY (job_id) REFERENCES youtube_download_jobs(id) ON DELETE CASCADE
+        );
+        """
+    )
+    conn.commit()
@@ -0,0 +1,14 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    # Usado pelo worker de notificacoes para anunciar avisos agendados que
+    # acabaram de ser liberados (contagem de nao lidas em tempo real).
+    conn.executescript(
+        """
+        CREATE INDEX IF NOT EXISTS idx_notifications_available_pending
+        ON notifications(available_at, recipient_user_id)
+        WHERE read_at IS NULL AND cancelled_at IS NULL;
+        """
+    )
+    conn.commit()
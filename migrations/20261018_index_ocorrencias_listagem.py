@@ -0,0 +1,22 @@
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    # Paginacao por keyset de /ocorrencias/pagina: cada indice termina na
+    # ordem completa da listagem (data, criado_em, id), entao o filtro mais
+    # comum (nenhum, status ou turma) vira uma busca no indice sem ordenacao.
+    # Os indices antigos sao prefixos destes e deixam de ser necessarios.
+    conn.executescript(
+        """
+        CREATE INDEX IF NOT EXISTS idx_ocorrencias_listagem
+        ON ocorrencias(data_ocorrencia DESC, criado_em DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_ocorrencias_status_listagem
+        ON ocorrencias(status, data_ocorrencia DESC, criado_em DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_ocorrencias_turma_listagem
+        ON ocorrencias(turma_id, data_ocorrencia DESC, criado_em DESC, id DESC);
+        DROP INDEX IF EXISTS idx_ocorrencias_data_criado;
+        DROP INDEX IF EXISTS idx_ocorrencias_status;
+        DROP INDEX IF EXISTS idx_ocorrencias_turma_id;
+        """
+    )
+    conn.commit()
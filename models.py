@@ -1136,6 +1136,33 @@ class OcorrenciaOut(BaseModel):
     atualizado_em: str
 
 
+class OcorrenciaResumoOut(BaseModel):
+    id: int
+    tipo_registro: str = "estudante"
+    nome_estudante: str
+    estudante_id: int | None = None
+    turma_id: int | None = None
+    turma_nome: str = ""
+    professor_requerente: str
+    professor_requerente_id: int | None = None
+    disciplina: str
+    data_ocorrencia: str
+    aula: str
+    descricao_resumo: str
+    descricao_truncada: bool = False
+    acao_aplicada: str
+    status: str
+    criado_em: str
+    atualizado_em: str
+
+
+class OcorrenciaPaginaOut(BaseModel):
+    itens: list[OcorrenciaResumoOut]
+    proximo_cursor: str | None = None
+    total: int | None = None
+    total_exato: bool | None = None
+
+
 class EstudanteCreateIn(BaseModel):
     nome: str
     turma_id: int
@@ -5,6 +5,10 @@ def _get_connection():
     return importlib.import_module("database").get_connection()
 
 
+def _invalidar_limites_cota(conn):
+    importlib.import_module("database").invalidar_limites_cota(conn)
+
+
 def listar_turmas(incluir_inativas: bool = False):
     conn = _get_connection()
     query = """
@@ -77,6 +81,7 @@ def criar_turma(nome, turno="", quantidade_estudantes=0, aula_inicial=None, aula
         (nome_limpo, turno_limpo, inicio, fim, quantidade),
     )
     turma_id = cursor.lastrowid
+    _invalidar_limites_cota(conn)
     conn.commit()
     conn.close()
     return turma_id
@@ -103,6 +108,7 @@ def atualizar_turma_dados(
                WHERE turma_id = ?""",
             (int(turma_id),),
         )
+        _invalidar_limites_cota(conn)
     conn.commit()
     conn.close()
     return alterado
@@ -111,6 +117,9 @@ def atualizar_turma_dados(
 def atualizar_status_turma(turma_id: int, ativo: bool):
     conn = _get_connection()
     cursor = conn.execute("UPDATE turmas SET ativo = ? WHERE id = ?", (1 if ativo else 0, turma_id))
+    alterado = cursor.rowcount > 0
+    if alterado:
+        _invalidar_limites_cota(conn)
     conn.commit()
     conn.close()
-    return cursor.rowcount > 0
+    return alterado
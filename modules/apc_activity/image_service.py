@@ -4,8 +4,6 @@ import re
 from pathlib import Path
 from uuid import uuid4
 
-from PIL import Image, ImageOps, UnidentifiedImageError
-
 
 MAX_IMAGE_BYTES = 5 * 1024 * 1024
 MAX_IMAGE_DIMENSION = 2400
@@ -25,6 +23,8 @@ def store_activity_image(content: bytes) -> dict:
         raise ValueError("Selecione uma imagem.")
     if len(content) > MAX_IMAGE_BYTES:
         raise ValueError("A imagem deve ter no maximo 5 MB.")
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
     try:
         with Image.open(io.BytesIO(content)) as source:
             if source.width * source.height > MAX_SOURCE_PIXELS:
@@ -2,7 +2,6 @@ from datetime import datetime
 from pathlib import Path
 
 from . import repository
-from .pdf_service import generate_activity_pdf
 from .sanitizer import sanitize_activity_html, visible_text
 
 
@@ -43,6 +42,13 @@ def _format_date(value: str) -> str:
         return str(value or "")
 
 
+def generate_activity_pdf(data: dict) -> bytes:
+    # ReportLab so e importado quando a API gera a primeira APC.
+    from .pdf_service import generate_activity_pdf as _generate
+
+    return _generate(data)
+
+
 def render_preview(data: dict) -> bytes:
     return generate_activity_pdf(data)
 
@@ -1,6 +1,7 @@
 import json
 
 from db._proxy import get_database_attr
+from db.busca_textual import filtro_busca
 
 
 def _get_connection():
@@ -104,19 +105,10 @@ def list_events(
     if actor_user_id is not None:
         clauses.append("actor_user_id = ?")
         params.append(actor_user_id)
-    if search:
-        clauses.append(
-            """
-            (
-                description LIKE ?
-                OR actor_name LIKE ?
-                OR actor_email LIKE ?
-                OR action LIKE ?
-            )
-            """
-        )
-        term = f"%{search}%"
-        params.extend([term, term, term, term])
+    search_sql, search_params = filtro_busca("auditoria", search, coluna_id="audit_events.id")
+    if search_sql:
+        clauses.append(search_sql)
+        params.extend(search_params)
 
     where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     conn = _get_connection()
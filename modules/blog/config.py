@@ -14,3 +14,8 @@ BLOG_PUBLIC_HOST = os.getenv("BLOG_PUBLIC_HOST", "blog.eepjd.com.br").strip().lo
 BLOG_PUBLIC_URL = os.getenv(
     "BLOG_PUBLIC_URL", f"https://{BLOG_PUBLIC_HOST}"
 ).strip().rstrip("/")
+
+try:
+    BLOG_PUBLIC_PAGE_CACHE_SECONDS = max(0, int(os.getenv("BLOG_PUBLIC_PAGE_CACHE_SECONDS", "30")))
+except ValueError:
+    BLOG_PUBLIC_PAGE_CACHE_SECONDS = 30
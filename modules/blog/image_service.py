@@ -1,12 +1,16 @@
+from __future__ import annotations
+
 import io
 import re
 from pathlib import Path
+from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from PIL import Image, ImageOps, UnidentifiedImageError
-
 from .config import BLOG_IMAGE_DIR
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 
 MAX_IMAGE_BYTES = 8 * 1024 * 1024
 MAX_IMAGE_DIMENSION = 2400
@@ -38,6 +42,9 @@ def _save_webp(image: Image.Image, destination: Path, *, quality: int) -> None:
 
 
 def _normalized_image(content: bytes) -> Image.Image:
+    # Pillow so e carregado no upload; servir imagens ja gravadas nao precisa dele.
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
     try:
         with Image.open(io.BytesIO(content)) as source:
             if source.format not in ALLOWED_IMAGE_FORMATS:
@@ -73,6 +80,8 @@ def store_blog_image(
         raise BlogImageValidationError("A imagem deve ter no maximo 8 MB.")
     # O MIME e informado pelo cliente e varia entre navegadores e sistemas.
     # A validacao confiavel e feita pelo conteudo real decodificado pelo Pillow.
+    from PIL import Image
+
     image = _normalized_image(content)
     image.thumbnail(
         (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION),
@@ -0,0 +1,122 @@
+"""Cache em memoria das paginas publicas do blog (home, artigos e sitemap).
+
+Cada pagina renderizada fica guardada por ``BLOG_PUBLIC_PAGE_CACHE_SECONDS``
+com ETag (SHA-256 do corpo) e Last-Modified (primeira vez que este processo
+gerou aquele mesmo corpo). Rajadas de crawlers sao atendidas da memoria, com
+304 quando o cliente ja tem a versao, sem consultar o SQLite. As alteracoes
+feitas pelo ``service`` limpam o cache do proprio processo; nos demais workers
+a pagina expira pelo tempo de vida.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Hashable
+
+from fastapi import Request, Response
+
+from services.file_delivery import etag_confere
+
+from .config import BLOG_PUBLIC_PAGE_CACHE_SECONDS
+
+
+_MAX_PAGES = 512
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    body: bytes
+    status_code: int
+    media_type: str | None
+    headers: dict[str, str]
+    etag: str
+    last_modified: datetime
+
+
+# ponytail: paginas prontas por chave (rota, base, parametros), em ordem LRU.
+_PAGES: "OrderedDict[Hashable, tuple[float, CachedPage]]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def _snapshot(response: Response, previous: CachedPage | None) -> CachedPage:
+    body = bytes(response.body)
+    etag = f'"{hashlib.sha256(body).hexdigest()}"'
+    headers = {
+        key: value
+        for key, value in response.headers.items()
+        if key.lower() not in {"content-length", "content-type", "etag", "last-modified"}
+    }
+    return CachedPage(
+        body=body,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type"),
+        headers=headers,
+        etag=etag,
+        last_modified=(
+            previous.last_modified
+            if previous is not None and previous.etag == etag
+            else datetime.now(timezone.utc).replace(microsecond=0)
+        ),
+    )
+
+
+def cached_page(
+    key: Hashable,
+    render: Callable[[], Response],
+) -> CachedPage:
+    now = time.monotonic()
+    with _LOCK:
+        item = _PAGES.get(key)
+        if item and item[0] > now:
+            _PAGES.move_to_end(key)
+            return item[1]
+
+    page = _snapshot(render(), item[1] if item else None)
+    if BLOG_PUBLIC_PAGE_CACHE_SECONDS > 0:
+        with _LOCK:
+            _PAGES[key] = (now + BLOG_PUBLIC_PAGE_CACHE_SECONDS, page)
+            _PAGES.move_to_end(key)
+            while len(_PAGES) > _MAX_PAGES:
+                _PAGES.popitem(last=False)
+    return page
+
+
+def invalidate() -> None:
+    with _LOCK:
+        _PAGES.clear()
+
+
+def _not_modified(request: Request, page: CachedPage) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_confere(if_none_match, page.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return page.last_modified <= since
+
+
+def respond(request: Request, page: CachedPage) -> Response:
+    headers = {
+        **page.headers,
+        "ETag": page.etag,
+        "Last-Modified": format_datetime(page.last_modified, usegmt=True),
+    }
+    if page.status_code == 200 and _not_modified(request, page):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        page.body,
+        status_code=page.status_code,
+        headers=headers,
+        media_type=page.media_type,
+    )
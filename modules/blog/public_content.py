@@ -108,3 +108,8 @@ def sanitize_public_html(
     parser.feed(str(value or ""))
     parser.close()
     return "".join(parser.parts)
+
+
+def reading_minutes(value: str) -> int:
+    words = re.findall(r"\w+", re.sub(r"<[^>]+>", " ", str(value or "")))
+    return max(1, round(len(words) / 200))
@@ -1,15 +1,13 @@
 from datetime import datetime
-import re
 from xml.sax.saxutils import escape
 
 from fastapi import APIRouter, HTTPException, Query, Request, Response, status
-from fastapi.responses import FileResponse
-
 from routers.config import render_template_response
+from services.file_delivery import responder_arquivo
 
-from . import service, tag_service
+from . import public_cache, service, tag_service
 from .config import BLOG_PUBLIC_HOST, BLOG_PUBLIC_URL
-from .public_content import sanitize_public_html
+from .public_content import reading_minutes
 
 
 router = APIRouter(prefix="/blog", tags=["Blog público"])
@@ -29,6 +27,10 @@ def _base_path(request: Request) -> str:
     return "" if _uses_public_host(request) else "/blog"
 
 
+def _cache_key(request: Request, *parts) -> tuple:
+    return (*parts, _base_path(request), str(request.scope.get("root_path", "")))
+
+
 def _mark_page_indexing(response: Response, request: Request, *, index: bool = True) -> Response:
     if not index or not _uses_public_host(request):
         response.headers["X-Robots-Tag"] = "noindex, nofollow"
@@ -45,7 +47,6 @@ def _date_label(value) -> str:
 
 def _public_post_summary(post: dict, *, base_path: str) -> dict:
     cover_token = str(post.get("cover_token") or "")
-    words = re.findall(r"\w+", re.sub(r"<[^>]+>", " ", str(post.get("body_html") or "")))
     tags = [
         {**tag, "url": f"{base_path}/?tag={tag['slug']}"}
         for tag in post.get("tags") or []
@@ -54,7 +55,9 @@ def _public_post_summary(post: dict, *, base_path: str) -> dict:
         **post,
         "tags": tags,
         "published_label": _date_label(post.get("published_at")),
-        "reading_minutes": max(1, round(len(words) / 200)),
+        "reading_minutes": int(
+            post.get("rendered_reading_minutes") or reading_minutes(post.get("body_html"))
+        ),
         "article_url": f"{base_path}/artigos/{post['slug']}",
         "cover_url": f"{base_path}/images/{cover_token}" if cover_token else "",
         "cover_thumbnail_url": (
@@ -70,15 +73,10 @@ def _public_tags(*, base_path: str) -> list[dict]:
     ]
 
 
-def _all_public_posts() -> list[dict]:
-    posts: list[dict] = []
-    offset = 0
-    while True:
-        batch = service.list_public_posts(limit=50, offset=offset)
-        posts.extend(batch)
-        if len(batch) < 50:
-            return posts
-        offset += len(batch)
+def _neighbor_link(post: dict | None, *, base_path: str) -> dict | None:
+    if not post:
+        return None
+    return {"title": post["title"], "article_url": f"{base_path}/artigos/{post['slug']}"}
 
 
 def _last_modified(value) -> str:
@@ -88,9 +86,17 @@ def _last_modified(value) -> str:
 
 @router.get("/", include_in_schema=False)
 def public_blog_home(request: Request, tag: str = Query(default="", max_length=48)):
+    selected_slug = tag_service.slugify_tag(tag) if tag else ""
+    page = public_cache.cached_page(
+        _cache_key(request, "home", selected_slug),
+        lambda: _render_home(request, selected_slug),
+    )
+    return public_cache.respond(request, page)
+
+
+def _render_home(request: Request, selected_slug: str) -> Response:
     base_path = _base_path(request)
     tags = _public_tags(base_path=base_path)
-    selected_slug = tag_service.slugify_tag(tag) if tag else ""
     selected_tag = next((item for item in tags if item["slug"] == selected_slug), None)
     posts = [
         _public_post_summary(post, base_path=base_path)
@@ -121,6 +127,14 @@ def public_blog_home(request: Request, tag: str = Query(default="", max_length=4
 
 @router.get("/artigos/{slug}", include_in_schema=False)
 def public_blog_article(request: Request, slug: str):
+    page = public_cache.cached_page(
+        _cache_key(request, "article", service.slugify(slug)),
+        lambda: _render_article(request, slug),
+    )
+    return public_cache.respond(request, page)
+
+
+def _render_article(request: Request, slug: str) -> Response:
     base_path = _base_path(request)
     try:
         post = service.get_public_post(slug)
@@ -140,21 +154,11 @@ def public_blog_article(request: Request, slug: str):
         return _mark_page_indexing(response, request, index=False)
 
     view = _public_post_summary(post, base_path=base_path)
-    view["body_public_html"] = sanitize_public_html(
-        str(post.get("body_html") or ""),
-        image_base_path=f"{base_path}/images",
-        images=post.get("images") or [],
-    )
-    all_posts = [
-        _public_post_summary(item, base_path=base_path)
-        for item in _all_public_posts()
-    ]
-    current_index = next(
-        (index for index, item in enumerate(all_posts) if int(item["id"]) == int(post["id"])),
-        -1,
+    view["body_public_html"] = (
+        post["rendered_html_public_host"] if _uses_public_host(request)
+        else post["rendered_html_blog_path"]
     )
-    previous_post = all_posts[current_index + 1] if 0 <= current_index < len(all_posts) - 1 else None
-    next_post = all_posts[current_index - 1] if current_index > 0 else None
+    neighbors = service.get_public_neighbors(post)
     tags = _public_tags(base_path=base_path)
     canonical_url = f"{BLOG_PUBLIC_URL}/artigos/{post['slug']}"
     response = render_template_response(
@@ -162,8 +166,8 @@ def public_blog_article(request: Request, slug: str):
         "blog/article.html",
         {
             "post": view,
-            "previous_post": previous_post,
-            "next_post": next_post,
+            "previous_post": _neighbor_link(neighbors["previous"], base_path=base_path),
+            "next_post": _neighbor_link(neighbors["next"], base_path=base_path),
             "navigation_tags": tags[:3],
             "blog_base_path": base_path,
             "canonical_url": canonical_url,
@@ -200,9 +204,14 @@ def public_blog_robots():
 
 
 @router.get("/sitemap.xml", include_in_schema=False)
-def public_blog_sitemap():
+def public_blog_sitemap(request: Request):
+    page = public_cache.cached_page(("sitemap",), _render_sitemap)
+    return public_cache.respond(request, page)
+
+
+def _render_sitemap() -> Response:
     entries = [f"  <url><loc>{escape(BLOG_PUBLIC_URL)}/</loc></url>"]
-    for post in _all_public_posts():
+    for post in service.list_public_sitemap_entries():
         location = escape(f"{BLOG_PUBLIC_URL}/artigos/{post['slug']}")
         last_modified = escape(_last_modified(post.get("updated_at")))
         lastmod = f"<lastmod>{last_modified}</lastmod>" if last_modified else ""
@@ -225,14 +234,15 @@ def public_blog_image(request: Request, token: str, thumbnail: bool = Query(defa
         resolved = service.resolve_image(token, public=True, thumbnail=thumbnail)
     except service.BlogNotFoundError as exc:
         raise HTTPException(status.HTTP_404_NOT_FOUND, str(exc)) from exc
-    headers = {
-        "Cache-Control": "public, max-age=31536000, immutable",
-        "Content-Disposition": f'inline; filename="{resolved["filename"]}"',
-    }
+    headers = {}
     if not _uses_public_host(request):
         headers["X-Robots-Tag"] = "noindex, noimageindex"
-    return FileResponse(
+    return responder_arquivo(
         resolved["path"],
+        request=request,
+        nome_arquivo=resolved["filename"],
         media_type=resolved["media_type"],
+        disposicao="inline",
+        cache_control="public, max-age=31536000, immutable",
         headers=headers,
     )
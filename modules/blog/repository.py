@@ -141,9 +141,11 @@ def list_public_posts(*, limit: int = 20, offset: int = 0, tag_slug: str = "") -
         params.extend((max(1, int(limit)), max(0, int(offset))))
         rows = conn.execute(
             f"""
-            SELECT p.*, c.token AS cover_token, c.alt_text AS cover_alt_text, c.caption AS cover_caption
+            SELECT p.*, c.token AS cover_token, c.alt_text AS cover_alt_text, c.caption AS cover_caption,
+                   r.reading_minutes AS rendered_reading_minutes
             FROM blog_posts AS p
             LEFT JOIN blog_images AS c ON c.post_id = p.id AND c.is_cover = 1
+            LEFT JOIN blog_post_renders AS r ON r.post_id = p.id
             {tag_join}
             WHERE p.status = ? AND p.published_at IS NOT NULL
               AND p.published_at <= datetime('now')
@@ -162,9 +164,14 @@ def get_public_post_by_slug(slug: str) -> dict | None:
     try:
         row = conn.execute(
             """
-            SELECT p.*, c.token AS cover_token, c.alt_text AS cover_alt_text, c.caption AS cover_caption
+            SELECT p.*, c.token AS cover_token, c.alt_text AS cover_alt_text, c.caption AS cover_caption,
+                   r.reading_minutes AS rendered_reading_minutes,
+                   r.body_html_blog_path AS rendered_html_blog_path,
+                   r.body_html_public_host AS rendered_html_public_host,
+                   r.rendered_at
             FROM blog_posts AS p
             LEFT JOIN blog_images AS c ON c.post_id = p.id AND c.is_cover = 1
+            LEFT JOIN blog_post_renders AS r ON r.post_id = p.id
             WHERE p.slug = ? AND p.status = ? AND p.published_at IS NOT NULL
               AND p.published_at <= datetime('now')
             """,
@@ -176,6 +183,83 @@ def get_public_post_by_slug(slug: str) -> dict | None:
         conn.close()
 
 
+def get_public_neighbors(post_id: int, published_at: str) -> dict:
+    """Artigos vizinhos na ordem da home, via idx_blog_posts_status_published."""
+    conn = get_connection()
+    try:
+        neighbors = {}
+        for key, comparison, order in (
+            ("previous", "<", "DESC"),
+            ("next", ">", "ASC"),
+        ):
+            row = conn.execute(
+                f"""
+                SELECT id, title, slug, published_at
+                FROM blog_posts
+                WHERE status = ? AND published_at IS NOT NULL
+                  AND published_at <= datetime('now')
+                  AND (published_at, id) {comparison} (?, ?)
+                ORDER BY published_at {order}, id {order}
+                LIMIT 1
+                """,
+                (PUBLIC_STATUS, published_at, int(post_id)),
+            ).fetchone()
+            neighbors[key] = _one(row)
+        return neighbors
+    finally:
+        conn.close()
+
+
+def list_public_sitemap_entries() -> list[dict]:
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            """
+            SELECT slug, updated_at
+            FROM blog_posts
+            WHERE status = ? AND published_at IS NOT NULL
+              AND published_at <= datetime('now')
+            ORDER BY published_at DESC, id DESC
+            """,
+            (PUBLIC_STATUS,),
+        ).fetchall()
+        return _many(rows)
+    finally:
+        conn.close()
+
+
+def save_post_render(
+    post_id: int, *, body_html_blog_path: str, body_html_public_host: str, reading_minutes: int
+) -> None:
+    conn = get_connection()
+    try:
+        conn.execute(
+            """
+            INSERT INTO blog_post_renders (
+                post_id, body_html_blog_path, body_html_public_host, reading_minutes, rendered_at
+            ) VALUES (?, ?, ?, ?, datetime('now'))
+            ON CONFLICT(post_id) DO UPDATE SET
+                body_html_blog_path = excluded.body_html_blog_path,
+                body_html_public_host = excluded.body_html_public_host,
+                reading_minutes = excluded.reading_minutes,
+                rendered_at = excluded.rendered_at
+            """,
+            (int(post_id), body_html_blog_path, body_html_public_host, max(1, int(reading_minutes))),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def delete_post_render(post_id: int) -> None:
+    conn = get_connection()
+    try:
+        conn.execute("DELETE FROM blog_post_renders WHERE post_id = ?", (int(post_id),))
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def list_public_tags() -> list[dict]:
     conn = get_connection()
     try:
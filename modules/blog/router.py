@@ -8,6 +8,7 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Request,
     Response,
     UploadFile,
     status,
@@ -16,6 +17,7 @@ from fastapi.responses import FileResponse
 
 from auth import get_usuario_logado
 from routers.common import exigir_admin
+from services.file_delivery import responder_arquivo
 
 from . import image_service, service
 from .models import BlogPostStatus
@@ -147,13 +149,15 @@ def remove_blog_image(post_id: int, image_id: int, user=Depends(require_blog_adm
 
 @router.get("/images/{token}", response_class=FileResponse)
 def get_blog_image(
+    request: Request,
     token: str,
     thumbnail: bool = False,
     user=Depends(require_blog_admin),
 ):
     resolved = _run(service.resolve_image, token, public=False, thumbnail=thumbnail)
-    return FileResponse(
+    return responder_arquivo(
         resolved["path"],
+        request=request,
         media_type=resolved["media_type"],
-        headers={"Cache-Control": "private, no-store"},
+        cache_control="private, no-store",
     )
@@ -4,8 +4,9 @@ import unicodedata
 from html.parser import HTMLParser
 from pathlib import Path
 
-from . import image_service, repository, tag_service
+from . import image_service, public_cache, repository, tag_service
 from .models import BlogPostStatus
+from .public_content import reading_minutes, sanitize_public_html
 from .schemas import BlogImageCreateIn, BlogImageUpdateIn, BlogPostCreateIn, BlogPostUpdateIn
 
 
@@ -78,6 +79,38 @@ def _post_values(payload: BlogPostCreateIn | BlogPostUpdateIn) -> dict:
     return {"title": title, "summary": summary, "body_html": body_html, "tags": tags}
 
 
+def refresh_public_render(post_id: int) -> dict | None:
+    """Regrava o HTML publico pre-renderizado do artigo e limpa o cache de paginas.
+
+    Artigos fora de ``PUBLISHED`` perdem o render; os publicados guardam o corpo
+    sanitizado para ``/blog`` e para o host publico, mais o tempo de leitura.
+    """
+    post = repository.get_post_by_id(int(post_id))
+    rendered = None
+    if not post or post["status"] != BlogPostStatus.PUBLISHED.value:
+        repository.delete_post_render(int(post_id))
+    else:
+        rendered = _save_public_render(post)
+    public_cache.invalidate()
+    return rendered
+
+
+def _save_public_render(post: dict) -> dict:
+    body_html = str(post.get("body_html") or "")
+    images = repository.list_images(int(post["id"]))
+    rendered = {
+        "body_html_blog_path": sanitize_public_html(
+            body_html, image_base_path="/blog/images", images=images
+        ),
+        "body_html_public_host": sanitize_public_html(
+            body_html, image_base_path="/images", images=images
+        ),
+        "reading_minutes": reading_minutes(body_html),
+    }
+    repository.save_post_render(int(post["id"]), **rendered)
+    return rendered
+
+
 def create_post(*, author_user_id: int, payload: BlogPostCreateIn) -> dict:
     if int(author_user_id or 0) <= 0:
         raise BlogValidationError("Autor invalido.")
@@ -122,6 +155,7 @@ def update_post(post_id: int, payload: BlogPostUpdateIn) -> dict:
         raise BlogConflictError("Ja existe um artigo com este identificador.") from exc
     if not updated:
         raise BlogNotFoundError("Artigo nao encontrado.")
+    refresh_public_render(int(post_id))
     return updated
 
 
@@ -149,17 +183,23 @@ def _validate_for_publication(post: dict, *, image_dir: Path | None = None) -> N
 def publish_post(post_id: int, *, image_dir: Path | None = None) -> dict:
     post = get_post(post_id)
     _validate_for_publication(post, image_dir=image_dir)
-    return repository.set_post_status(int(post_id), BlogPostStatus.PUBLISHED.value) or post
+    published = repository.set_post_status(int(post_id), BlogPostStatus.PUBLISHED.value) or post
+    refresh_public_render(int(post_id))
+    return published
 
 
 def unpublish_post(post_id: int) -> dict:
     get_post(post_id)
-    return repository.set_post_status(int(post_id), BlogPostStatus.DRAFT.value) or get_post(post_id)
+    unpublished = repository.set_post_status(int(post_id), BlogPostStatus.DRAFT.value)
+    refresh_public_render(int(post_id))
+    return unpublished or get_post(post_id)
 
 
 def archive_post(post_id: int) -> dict:
     post = get_post(post_id)
-    return repository.set_post_status(int(post_id), BlogPostStatus.ARCHIVED.value) or post
+    archived = repository.set_post_status(int(post_id), BlogPostStatus.ARCHIVED.value) or post
+    refresh_public_render(int(post_id))
+    return archived
 
 
 def restore_post(post_id: int) -> dict:
@@ -177,9 +217,11 @@ def add_image(post_id: int, payload: BlogImageCreateIn) -> dict:
     if not values["token"] or not values["stored_name"]:
         raise BlogValidationError("Dados da imagem invalidos.")
     try:
-        return repository.create_image(int(post_id), values)
+        image = repository.create_image(int(post_id), values)
     except sqlite3.IntegrityError as exc:
         raise BlogConflictError("Esta imagem ja foi vinculada a um artigo.") from exc
+    refresh_public_render(int(post_id))
+    return image
 
 
 def upload_image(
@@ -239,6 +281,7 @@ def update_image(post_id: int, image_id: int, payload: BlogImageUpdateIn) -> dic
     )
     if not updated:
         raise BlogNotFoundError("Imagem nao encontrada.")
+    refresh_public_render(int(post_id))
     return updated
 
 
@@ -247,6 +290,7 @@ def set_cover_image(post_id: int, image_id: int) -> dict:
     image = repository.set_cover_image(int(post_id), int(image_id))
     if not image:
         raise BlogNotFoundError("Imagem nao encontrada neste artigo.")
+    refresh_public_render(int(post_id))
     return image
 
 
@@ -255,6 +299,7 @@ def remove_image(post_id: int, image_id: int, *, image_dir: Path | None = None)
     if not image or int(image["post_id"]) != int(post_id):
         raise BlogNotFoundError("Imagem nao encontrada neste artigo.")
     removed = repository.delete_image(image_id) or image
+    refresh_public_render(int(post_id))
     image_service.delete_blog_image_files(
         removed["stored_name"], removed.get("thumbnail_name", ""), image_dir=image_dir
     )
@@ -297,6 +342,14 @@ def list_public_posts(*, limit: int = 20, offset: int = 0, tag_slug: str = "") -
     )
 
 
+def get_public_neighbors(post: dict) -> dict:
+    return repository.get_public_neighbors(int(post["id"]), str(post["published_at"]))
+
+
+def list_public_sitemap_entries() -> list[dict]:
+    return repository.list_public_sitemap_entries()
+
+
 def list_public_tags() -> list[dict]:
     return repository.list_public_tags()
 
@@ -305,4 +358,13 @@ def get_public_post(slug: str) -> dict:
     post = repository.get_public_post_by_slug(slugify(slug))
     if not post:
         raise BlogNotFoundError("Artigo nao encontrado.")
-    return {**post, "images": repository.list_images(int(post["id"]))}
+    if post.get("rendered_at") is None:
+        # Artigo publicado antes do render em blog_post_renders: gera uma vez.
+        rendered = _save_public_render(post)
+        post = {
+            **post,
+            "rendered_reading_minutes": rendered["reading_minutes"],
+            "rendered_html_blog_path": rendered["body_html_blog_path"],
+            "rendered_html_public_host": rendered["body_html_public_host"],
+        }
+    return post
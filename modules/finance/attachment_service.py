@@ -3,10 +3,6 @@ import re
 from pathlib import Path
 from uuid import uuid4
 
-from PIL import Image, UnidentifiedImageError
-from pypdf import PdfReader
-from pypdf.errors import PdfReadError
-
 from .config import FINANCE_ATTACHMENT_DIR
 
 
@@ -28,6 +24,9 @@ def attachment_directory(directory: Path | None = None) -> Path:
 
 def _detect_file(content: bytes) -> tuple[str, str]:
     if content.startswith(b"%PDF-"):
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+
         try:
             reader = PdfReader(io.BytesIO(content))
             if reader.is_encrypted or len(reader.pages) <= 0:
@@ -39,6 +38,8 @@ def _detect_file(content: bytes) -> tuple[str, str]:
         except (PdfReadError, OSError, ValueError) as exc:
             raise FinanceAttachmentValidationError("O arquivo PDF esta corrompido.") from exc
         return "pdf", "application/pdf"
+    from PIL import Image, UnidentifiedImageError
+
     try:
         with Image.open(io.BytesIO(content)) as image:
             if image.width * image.height > MAX_IMAGE_PIXELS:
@@ -9,7 +9,7 @@ from modules.audit.models import AuditOutcome
 from modules.audit.service import record_event
 from routers.common import exigir_admin
 
-from . import pdf_service, service
+from . import service
 from .schemas import (
     FinanceAttachmentOut,
     FinanceTransactionCancelIn,
@@ -176,6 +176,8 @@ def download_finance_report(
     user=Depends(require_finance_admin),
 ):
     report = _run(service.build_month_report, month)
+    from . import pdf_service
+
     content = pdf_service.generate_month_report_pdf(report)
     _audit(user, "finance.report.generate", "Relatorio financeiro mensal gerado.")
     return Response(
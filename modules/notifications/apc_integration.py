@@ -1,12 +1,19 @@
+import logging
+import time
 from collections import defaultdict
 from datetime import UTC, datetime, timedelta
 
 from services.apc_recipients import resolve_apc_recipients
+from services.worker_wakeup import notificar_worker_notificacoes
 
 from . import apc_repository, repository
 from .config import app_timezone
 from .service import create_notification
 
+logger = logging.getLogger(__name__)
+REMINDERS = ((72, "normal"), (24, "urgent"))
+REMINDER_HORIZON_HOURS = max(hours for hours, _priority in REMINDERS)
+
 
 def _parse_sqlite_local(value: str) -> datetime:
     parsed = datetime.fromisoformat(str(value or "").strip())
@@ -79,7 +86,7 @@ def sync_apc_period(period_id: int) -> int:
                 )
             )
 
-        for hours, priority in ((72, "normal"), (24, "urgent")):
+        for hours, priority in REMINDERS:
             marker = deadline - timedelta(hours=hours)
             key = f"apc:{period_id}:{deadline_key}:{hours}h:{teacher_id}"
             valid_keys.append(key)
@@ -115,11 +122,62 @@ def cancel_apc_period(period_id: int):
     return repository.cancel_source("apc_period", str(period_id))
 
 
-def reconcile_all_apc():
-    periods = apc_repository.list_periods()
-    current = {str(item["id"]) for item in periods}
-    for period in periods:
-        sync_apc_period(int(period["id"]))
+def enqueue_apc_period(period_id: int):
+    """Marca a solicitacao para o worker reconciliar e o acorda."""
+    apc_repository.enqueue_dirty_period(int(period_id))
+    notificar_worker_notificacoes()
+
+
+def reconcile_dirty_apc(limit: int = 100) -> dict:
+    started = time.perf_counter()
+    stats = {"periods": 0, "created": 0, "failed": 0}
+    for item in apc_repository.list_dirty_periods(limit):
+        try:
+            stats["created"] += sync_apc_period(item["period_id"])
+        except Exception:
+            # Sai da fila mesmo com falha para nao repetir o erro a cada ciclo;
+            # a varredura periodica volta a cobrir a solicitacao perto do prazo.
+            stats["failed"] += 1
+            logger.exception(
+                "Falha ao reconciliar notificacoes da solicitacao APC %s", item["period_id"]
+            )
+        apc_repository.ack_dirty_period(item["period_id"], item["version"])
+        stats["periods"] += 1
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if stats["periods"]:
+        logger.info(
+            "APC alteradas: %s solicitacao(oes), %s aviso(s) novo(s) em %.0f ms",
+            stats["periods"],
+            stats["created"],
+            stats["elapsed_ms"],
+        )
+    return stats
+
+
+def reconcile_apc_horizon() -> dict:
+    """Reconcilia apenas solicitacoes abertas cujo prazo cai dentro dos lembretes."""
+    started = time.perf_counter()
+    now_local = datetime.now(app_timezone())
+    until_local = now_local + timedelta(hours=REMINDER_HORIZON_HOURS)
+    period_ids = apc_repository.list_open_period_ids(
+        now_local.strftime("%Y-%m-%d %H:%M:%S"),
+        until_local.strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    stats = {"periods": len(period_ids), "created": 0, "cancelled_sources": 0}
+    for period_id in period_ids:
+        stats["created"] += sync_apc_period(period_id)
+
+    current = apc_repository.list_period_ids()
     for source_id in repository.list_active_source_ids("apc_period"):
         if source_id not in current:
             repository.cancel_source("apc_period", source_id)
+            stats["cancelled_sources"] += 1
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "Varredura APC: %s solicitacao(oes) no horizonte de %sh, %s aviso(s) novo(s) em %.0f ms",
+        stats["periods"],
+        REMINDER_HORIZON_HOURS,
+        stats["created"],
+        stats["elapsed_ms"],
+    )
+    return stats
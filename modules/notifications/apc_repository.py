@@ -1,4 +1,4 @@
-from db.apc import buscar_apc_periodo_por_id, listar_apc_envios, listar_apc_periodos
+from db.apc import buscar_apc_periodo_por_id, listar_apc_envios
 from db._proxy import proxy
 
 get_connection = proxy("get_connection")
@@ -8,10 +8,6 @@ def get_period(period_id: int):
     return buscar_apc_periodo_por_id(int(period_id))
 
 
-def list_periods():
-    return listar_apc_periodos()
-
-
 def list_submissions(period_id: int, teacher_id: int):
     return listar_apc_envios(
         periodo_id=int(period_id), professor_id=int(teacher_id)
@@ -45,3 +41,74 @@ def cancel_notification(notification_id: int):
         conn.commit()
     finally:
         conn.close()
+
+
+def enqueue_dirty_period(period_id: int):
+    conn = get_connection()
+    try:
+        conn.execute(
+            """
+            INSERT INTO notification_apc_dirty_periods (period_id)
+            VALUES (?)
+            ON CONFLICT(period_id) DO UPDATE SET
+                version = version + 1,
+                queued_at = datetime('now')
+            """,
+            (int(period_id),),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def list_dirty_periods(limit: int) -> list[dict]:
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            """
+            SELECT period_id, version FROM notification_apc_dirty_periods
+            ORDER BY queued_at, period_id
+            LIMIT ?
+            """,
+            (int(limit),),
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def ack_dirty_period(period_id: int, version: int):
+    conn = get_connection()
+    try:
+        conn.execute(
+            "DELETE FROM notification_apc_dirty_periods WHERE period_id = ? AND version = ?",
+            (int(period_id), int(version)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def list_open_period_ids(now_local: str, until_local: str) -> list[int]:
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            """
+            SELECT id FROM apc_periodos
+            WHERE datetime(prazo_envio) > datetime(?)
+              AND datetime(prazo_envio) <= datetime(?)
+            ORDER BY prazo_envio, id
+            """,
+            (now_local, until_local),
+        ).fetchall()
+        return [int(row[0]) for row in rows]
+    finally:
+        conn.close()
+
+
+def list_period_ids() -> set[str]:
+    conn = get_connection()
+    try:
+        return {str(row[0]) for row in conn.execute("SELECT id FROM apc_periodos").fetchall()}
+    finally:
+        conn.close()
@@ -8,6 +8,14 @@ def env_bool(name: str, default: bool = False) -> bool:
     return os.getenv(name, fallback).strip().lower() in {"1", "true", "yes", "on"}
 
 
+def env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        value = int(os.getenv(name, str(default)).strip())
+    except ValueError:
+        return default
+    return max(value, minimum)
+
+
 def app_timezone():
     name = os.getenv("APP_TIMEZONE", "America/Campo_Grande").strip()
     try:
@@ -27,4 +35,7 @@ def push_settings() -> dict:
         "subject": os.getenv(
             "VAPID_SUBJECT", "https://sistema.eepjd.com.br"
         ).strip(),
+        "batch_size": env_int("WEB_PUSH_BATCH_SIZE", 100, 1),
+        "concurrency": env_int("WEB_PUSH_CONCURRENCY", 8, 1),
+        "host_rate_per_second": env_int("WEB_PUSH_HOST_RATE_PER_SECOND", 50, 0),
     }
@@ -82,6 +82,11 @@ def seed_due_deliveries() -> int:
 
 
 def claim_delivery() -> dict | None:
+    deliveries = claim_deliveries(1)
+    return deliveries[0] if deliveries else None
+
+
+def claim_deliveries(limit: int) -> list[dict]:
     conn = get_connection()
     try:
         conn.execute("BEGIN IMMEDIATE")
@@ -93,7 +98,7 @@ def claim_delivery() -> dict | None:
               AND claimed_at < datetime('now', '-10 minutes')
             """
         )
-        row = conn.execute(
+        rows = conn.execute(
             """
             SELECT d.id, d.attempts, n.id AS notification_id, n.title, n.body,
                    n.action_url, n.priority, s.id AS subscription_id,
@@ -106,24 +111,52 @@ def claim_delivery() -> dict | None:
               AND d.attempts < 5
               AND n.cancelled_at IS NULL AND s.active = 1
             ORDER BY d.next_attempt_at, d.id
-            LIMIT 1
-            """
-        ).fetchone()
-        if not row:
-            conn.commit()
-            return None
-        conn.execute(
+            LIMIT ?
+            """,
+            (int(limit),),
+        ).fetchall()
+        conn.executemany(
             """
             UPDATE notification_push_deliveries
             SET status = 'processing', claimed_at = datetime('now'), attempts = attempts + 1
             WHERE id = ?
             """,
-            (int(row["id"]),),
+            [(int(row["id"]),) for row in rows],
         )
         conn.commit()
-        result = dict(row)
-        result["attempts"] = int(result["attempts"]) + 1
-        return result
+        deliveries = []
+        for row in rows:
+            result = dict(row)
+            result["attempts"] = int(result["attempts"]) + 1
+            deliveries.append(result)
+        return deliveries
+    finally:
+        conn.close()
+
+
+def record_outcomes(outcomes: list[dict]):
+    """Grava numa transacao o resultado de um lote de envios (ver ``push._send``)."""
+    conn = get_connection()
+    try:
+        for outcome in outcomes:
+            status = outcome["status"]
+            if status == "sent":
+                _mark_sent(conn, outcome["delivery_id"], outcome["subscription_id"])
+            elif status == "retry":
+                _mark_retry(
+                    conn,
+                    outcome["delivery_id"],
+                    attempts=outcome["attempts"],
+                    delay_seconds=outcome["delay_seconds"],
+                    error=outcome["error"],
+                )
+            elif status == "gone":
+                _disable_subscription(
+                    conn, outcome["subscription_id"], outcome["delivery_id"], outcome["error"]
+                )
+            else:
+                _mark_dead(conn, outcome["delivery_id"], outcome["error"])
+        conn.commit()
     finally:
         conn.close()
 
@@ -131,86 +164,95 @@ def claim_delivery() -> dict | None:
 def mark_sent(delivery_id: int, subscription_id: int):
     conn = get_connection()
     try:
-        conn.execute(
-            """
-            UPDATE notification_push_deliveries
-            SET status = 'sent', sent_at = datetime('now'), claimed_at = NULL, last_error = ''
-            WHERE id = ?
-            """,
-            (int(delivery_id),),
-        )
-        conn.execute(
-            """
-            UPDATE push_subscriptions
-            SET failures = 0, last_success_at = datetime('now'), updated_at = datetime('now')
-            WHERE id = ?
-            """,
-            (int(subscription_id),),
-        )
+        _mark_sent(conn, delivery_id, subscription_id)
         conn.commit()
     finally:
         conn.close()
 
 
+def _mark_sent(conn, delivery_id: int, subscription_id: int):
+    conn.execute(
+        """
+        UPDATE notification_push_deliveries
+        SET status = 'sent', sent_at = datetime('now'), claimed_at = NULL, last_error = ''
+        WHERE id = ?
+        """,
+        (int(delivery_id),),
+    )
+    conn.execute(
+        """
+        UPDATE push_subscriptions
+        SET failures = 0, last_success_at = datetime('now'), updated_at = datetime('now')
+        WHERE id = ?
+        """,
+        (int(subscription_id),),
+    )
+
+
 def mark_retry(delivery_id: int, *, attempts: int, delay_seconds: int, error: str):
-    status = "dead" if attempts >= 5 else "failed"
     conn = get_connection()
     try:
-        conn.execute(
-            """
-            UPDATE notification_push_deliveries
-            SET status = ?, claimed_at = NULL, last_error = ?,
-                next_attempt_at = datetime('now', ?)
-            WHERE id = ?
-            """,
-            (status, error[:300], f"+{int(delay_seconds)} seconds", int(delivery_id)),
-        )
+        _mark_retry(conn, delivery_id, attempts=attempts, delay_seconds=delay_seconds, error=error)
         conn.commit()
     finally:
         conn.close()
 
 
+def _mark_retry(conn, delivery_id: int, *, attempts: int, delay_seconds: int, error: str):
+    status = "dead" if attempts >= 5 else "failed"
+    conn.execute(
+        """
+        UPDATE notification_push_deliveries
+        SET status = ?, claimed_at = NULL, last_error = ?,
+            next_attempt_at = datetime('now', ?)
+        WHERE id = ?
+        """,
+        (status, error[:300], f"+{int(delay_seconds)} seconds", int(delivery_id)),
+    )
+
+
 def mark_dead(delivery_id: int, error: str):
     conn = get_connection()
     try:
-        conn.execute(
-            """
-            UPDATE notification_push_deliveries
-            SET status = 'dead', claimed_at = NULL, last_error = ?
-            WHERE id = ?
-            """,
-            (error[:300], int(delivery_id)),
-        )
+        _mark_dead(conn, delivery_id, error)
         conn.commit()
     finally:
         conn.close()
 
 
+def _mark_dead(conn, delivery_id: int, error: str):
+    conn.execute(
+        """
+        UPDATE notification_push_deliveries
+        SET status = 'dead', claimed_at = NULL, last_error = ?
+        WHERE id = ?
+        """,
+        (error[:300], int(delivery_id)),
+    )
+
+
 def disable_subscription(subscription_id: int, delivery_id: int, error: str):
     conn = get_connection()
     try:
-        conn.execute(
-            """
-            UPDATE push_subscriptions
-            SET active = 0, failures = failures + 1, disabled_at = datetime('now'),
-                updated_at = datetime('now')
-            WHERE id = ?
-            """,
-            (int(subscription_id),),
-        )
-        conn.execute(
-            """
-            UPDATE notification_push_deliveries
-            SET status = 'dead', claimed_at = NULL, last_error = ?
-            WHERE id = ?
-            """,
-            (error[:300], int(delivery_id)),
-        )
+        _disable_subscription(conn, subscription_id, delivery_id, error)
         conn.commit()
     finally:
         conn.close()
 
 
+def _disable_subscription(conn, subscription_id: int, delivery_id: int, error: str):
+    conn.execute(
+        """
+        UPDATE push_subscriptions
+        SET active = 0, failures = failures + 1, disabled_at = datetime('now'),
+            updated_at = datetime('now')
+        WHERE id = ?
+        """,
+        (int(subscription_id),),
+    )
+    _mark_dead(conn, delivery_id, error)
+
+
 def purge_old(days: int = 180) -> int:
     conn = get_connection()
     try:
@@ -1,5 +1,9 @@
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 from .config import push_settings
 from . import delivery_repository
@@ -7,6 +11,60 @@ from . import delivery_repository
 logger = logging.getLogger(__name__)
 
 
+class HostRateLimiter:
+    """Espaca os envios para cada host de push em no maximo ``rate_per_second``."""
+
+    def __init__(self, rate_per_second: float, *, clock=time.monotonic, sleep=time.sleep):
+        self._interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> float:
+        if not self._interval:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self._interval
+            if len(self._next_slot) > 256:
+                self._next_slot = {
+                    key: value for key, value in self._next_slot.items() if value > now
+                }
+        wait = slot - now
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+_settings = push_settings()
+# ponytail: pool, limitador e sessoes HTTP vivem o processo inteiro do worker.
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=_settings["concurrency"], thread_name_prefix="web-push"
+)
+_RATE_LIMITER = HostRateLimiter(_settings["host_rate_per_second"])
+_SESSIONS = threading.local()
+_METRICS_LOCK = threading.Lock()
+_METRICS = {
+    "batches": 0,
+    "sent": 0,
+    "retried": 0,
+    "dead": 0,
+    "gone": 0,
+    "rate_limit_wait_ms": 0.0,
+    "last_batch": {"size": 0, "elapsed_ms": 0.0, "per_second": 0.0},
+}
+_METRIC_BY_STATUS = {"sent": "sent", "retry": "retried", "dead": "dead", "gone": "gone"}
+
+
+def push_metrics() -> dict:
+    with _METRICS_LOCK:
+        metrics = dict(_METRICS)
+        metrics["last_batch"] = dict(_METRICS["last_batch"])
+    return metrics
+
+
 def _status_code(exc: Exception) -> int:
     response = getattr(exc, "response", None)
     try:
@@ -20,14 +78,39 @@ def _safe_error(exc: Exception, status: int) -> str:
     return f"{name} (HTTP {status})" if status else name
 
 
-def process_one_delivery() -> bool:
-    settings = push_settings()
-    if not settings["enabled"]:
-        return False
-    delivery_repository.seed_due_deliveries()
-    delivery = delivery_repository.claim_delivery()
-    if not delivery:
-        return False
+def _session():
+    # Uma sessao por thread do pool: requests.Session reaproveita a conexao
+    # TLS com o servico de push, mas nao deve ser compartilhada entre threads.
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        import requests
+
+        session = requests.Session()
+        _SESSIONS.session = session
+    return session
+
+
+def _endpoint_host(endpoint: str) -> str:
+    return urlsplit(str(endpoint or "")).netloc.lower()
+
+
+def _interleave_by_host(deliveries: list[dict]) -> list[dict]:
+    # Alterna os hosts para que o limitador de um servico nao segure a fila
+    # inteira enquanto outro servico esta livre.
+    by_host: dict[str, list[dict]] = {}
+    for delivery in deliveries:
+        by_host.setdefault(_endpoint_host(delivery["endpoint"]), []).append(delivery)
+    queues = list(by_host.values())
+    ordered = []
+    while queues:
+        for queue in list(queues):
+            ordered.append(queue.pop(0))
+            if not queue:
+                queues.remove(queue)
+    return ordered
+
+
+def _send(delivery: dict, settings: dict) -> dict:
     payload = json.dumps(
         {
             "id": delivery["notification_id"],
@@ -39,6 +122,12 @@ def process_one_delivery() -> bool:
         },
         ensure_ascii=False,
     )
+    outcome = {
+        "delivery_id": delivery["id"],
+        "subscription_id": delivery["subscription_id"],
+        "attempts": delivery["attempts"],
+        "rate_limit_wait": _RATE_LIMITER.acquire(_endpoint_host(delivery["endpoint"])),
+    }
     try:
         from pywebpush import webpush
 
@@ -51,28 +140,84 @@ def process_one_delivery() -> bool:
             vapid_private_key=settings["private_key"],
             vapid_claims={"sub": settings["subject"]},
             ttl=86400,
+            timeout=20,
+            requests_session=_session(),
         )
-        delivery_repository.mark_sent(delivery["id"], delivery["subscription_id"])
+        outcome["status"] = "sent"
     except Exception as exc:
         status = _status_code(exc)
-        safe_error = _safe_error(exc, status)
+        outcome["error"] = _safe_error(exc, status)
         if status in {404, 410}:
-            delivery_repository.disable_subscription(
-                delivery["subscription_id"], delivery["id"], safe_error
-            )
+            outcome["status"] = "gone"
         elif status == 0 or status == 429 or status >= 500:
-            delay = min(3600, 60 * (2 ** max(delivery["attempts"] - 1, 0)))
-            delivery_repository.mark_retry(
-                delivery["id"],
-                attempts=delivery["attempts"],
-                delay_seconds=delay,
-                error=safe_error,
+            outcome["status"] = "retry"
+            outcome["delay_seconds"] = min(
+                3600, 60 * (2 ** max(delivery["attempts"] - 1, 0))
             )
         else:
-            delivery_repository.mark_dead(delivery["id"], safe_error)
+            outcome["status"] = "dead"
         logger.warning(
             "Falha sanitizada no Web Push delivery=%s status=%s",
             delivery["id"],
             status or "unknown",
         )
-    return True
+    return outcome
+
+
+def _process_claimed(deliveries: list[dict], settings: dict) -> int:
+    if not deliveries:
+        return 0
+    started = time.perf_counter()
+    outcomes = list(
+        _EXECUTOR.map(
+            lambda delivery: _send(delivery, settings), _interleave_by_host(deliveries)
+        )
+    )
+    delivery_repository.record_outcomes(outcomes)
+    elapsed = time.perf_counter() - started
+
+    with _METRICS_LOCK:
+        _METRICS["batches"] += 1
+        for outcome in outcomes:
+            _METRICS[_METRIC_BY_STATUS[outcome["status"]]] += 1
+            _METRICS["rate_limit_wait_ms"] += outcome["rate_limit_wait"] * 1000
+        _METRICS["last_batch"] = {
+            "size": len(outcomes),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "per_second": round(len(outcomes) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+    return len(outcomes)
+
+
+def process_one_delivery() -> bool:
+    settings = push_settings()
+    if not settings["enabled"]:
+        return False
+    delivery_repository.seed_due_deliveries()
+    return _process_claimed(delivery_repository.claim_deliveries(1), settings) > 0
+
+
+def drain_deliveries() -> int:
+    """Semeia as entregas uma vez e envia lotes ate esvaziar a fila vencida."""
+    settings = push_settings()
+    if not settings["enabled"]:
+        return 0
+    delivery_repository.seed_due_deliveries()
+    started = time.perf_counter()
+    total = 0
+    while True:
+        processed = _process_claimed(
+            delivery_repository.claim_deliveries(settings["batch_size"]), settings
+        )
+        total += processed
+        if processed < settings["batch_size"]:
+            break
+    if total:
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Web Push: %s entrega(s) em %.0f ms (%.1f/s)",
+            total,
+            elapsed * 1000,
+            total / elapsed if elapsed > 0 else 0.0,
+        )
+    return total
@@ -113,6 +113,22 @@ def unread_count(user_id: int) -> int:
         conn.close()
 
 
+def recipients_released_between(start: str, end: str) -> list[int]:
+    conn = get_connection()
+    try:
+        cursor = conn.execute(
+            """
+            SELECT DISTINCT recipient_user_id FROM notifications
+            WHERE available_at > ? AND available_at <= ?
+              AND read_at IS NULL AND cancelled_at IS NULL
+            """,
+            (start, end),
+        )
+        return [int(row[0]) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
 def mark_read(notification_id: int, user_id: int) -> bool:
     conn = get_connection()
     try:
@@ -6,6 +6,7 @@ from fastapi import HTTPException
 
 from modules.audit.models import AuditCategory, AuditOutcome
 from modules.audit.service import record_event
+from services.realtime_events import publicar_nao_lidas
 
 from . import delivery_repository, management_repository, repository
 from .config import app_timezone, push_settings
@@ -61,7 +62,7 @@ def create_notification(
         raise ValueError("A URL da notificação deve ser interna.")
     if priority not in {"normal", "urgent"}:
         raise ValueError("Prioridade inválida.")
-    return repository.create_notification(
+    notification = repository.create_notification(
         {
             "recipient_user_id": int(recipient_user_id),
             "category": str(category).strip()[:50],
@@ -78,6 +79,23 @@ def create_notification(
             "available_at": utc_text(available_at),
         }
     )
+    if notification and notification["available_at"] <= utc_text() and not notification["read_at"]:
+        publish_unread_count(int(recipient_user_id))
+    return notification
+
+
+def publish_unread_count(user_id: int) -> int:
+    total = repository.unread_count(int(user_id))
+    publicar_nao_lidas(int(user_id), total)
+    return total
+
+
+def publish_released_notifications(start: str, end: str) -> int:
+    """Anuncia a contagem de quem teve avisos agendados liberados na janela."""
+    recipients = repository.recipients_released_between(start, end)
+    for user_id in recipients:
+        publish_unread_count(user_id)
+    return len(recipients)
 
 
 def list_inbox(user_id: int, *, filter_name: str, page: int, page_size: int) -> dict:
@@ -104,7 +122,7 @@ def list_inbox(user_id: int, *, filter_name: str, page: int, page_size: int) ->
 def mark_one_read(notification_id: int, user_id: int):
     if not repository.mark_read(notification_id, user_id):
         raise HTTPException(404, "Notificação não encontrada.")
-    return {"ok": True, "unread_count": repository.unread_count(user_id)}
+    return {"ok": True, "unread_count": publish_unread_count(user_id)}
 
 
 def get_unread_count(user_id: int) -> dict:
@@ -113,6 +131,8 @@ def get_unread_count(user_id: int) -> dict:
 
 def mark_all_read(user_id: int) -> dict:
     updated = repository.mark_all_read(int(user_id))
+    if updated:
+        publicar_nao_lidas(int(user_id), 0)
     return {"ok": True, "updated": updated, "unread_count": 0}
 
 
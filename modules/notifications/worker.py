@@ -2,10 +2,13 @@ import logging
 import time
 
 from db.bootstrap import criar_tabelas
+from services.worker_wakeup import sinalizador_notificacoes
 
 from . import delivery_repository
-from .apc_integration import reconcile_all_apc
-from .push import process_one_delivery
+from .apc_integration import reconcile_apc_horizon, reconcile_dirty_apc
+from .config import env_int
+from .push import drain_deliveries
+from .service import publish_released_notifications, utc_text
 
 logger = logging.getLogger(__name__)
 
@@ -14,22 +17,29 @@ def worker_loop():
     criar_tabelas()
     last_reconcile = 0.0
     last_cleanup = 0.0
-    logger.info("Worker de notificacoes iniciado")
+    last_release = utc_text()
+    sweep_seconds = env_int("APC_NOTIFICATION_SWEEP_SECONDS", 300, 30)
+    escutando_sinais = sinalizador_notificacoes.escutar()
+    logger.info(
+        "Worker de notificacoes iniciado (despertar: %s, varredura APC: %ss)",
+        f"udp {sinalizador_notificacoes.porta}" if escutando_sinais else "somente local",
+        sweep_seconds,
+    )
     while True:
         now = time.monotonic()
         try:
-            if now - last_reconcile >= 60:
-                reconcile_all_apc()
+            reconcile_dirty_apc()
+            if now - last_reconcile >= sweep_seconds:
+                reconcile_apc_horizon()
                 last_reconcile = now
             if now - last_cleanup >= 3600:
                 delivery_repository.purge_old(180)
                 last_cleanup = now
-            processed = False
-            for _ in range(20):
-                if not process_one_delivery():
-                    break
-                processed = True
-            time.sleep(1 if processed else 5)
+            release_until = utc_text()
+            publish_released_notifications(last_release, release_until)
+            last_release = release_until
+            processed = drain_deliveries()
+            sinalizador_notificacoes.aguardar(1 if processed else 5)
         except Exception:
             logger.exception("Falha no ciclo do worker de notificacoes")
             time.sleep(5)
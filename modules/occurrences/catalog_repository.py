@@ -1,24 +1,28 @@
+from db.busca_textual import juncao_busca
 from db.core import get_connection
 
 
 def search_students(term: str, limit: int = 20) -> list[dict]:
+    join_sql, params = juncao_busca("estudantes", term, coluna_id="e.id")
+    # Class names are short codes ("7A", "1º B"); a plain LIKE is enough there.
+    match_sql = "AND (busca.id IS NOT NULL OR LOWER(COALESCE(t.nome, '')) LIKE LOWER(?))" if join_sql else ""
+    order_sql = "busca.relevancia IS NULL, busca.relevancia, " if join_sql else ""
+    if join_sql:
+        params.append(f"%{term}%")
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute(
-        """
+        f"""
         SELECT e.id, e.nome, e.turma_id, COALESCE(t.nome, '') AS turma_nome
         FROM estudantes e
         LEFT JOIN turmas t ON t.id = e.turma_id
+        {join_sql}
         WHERE e.ativo = 1
-          AND (
-              ? = ''
-              OR LOWER(e.nome) LIKE LOWER(?)
-              OR LOWER(COALESCE(t.nome, '')) LIKE LOWER(?)
-          )
-        ORDER BY e.nome COLLATE NOCASE
+          {match_sql}
+        ORDER BY {order_sql}e.nome COLLATE NOCASE
         LIMIT ?
         """,
-        (term, f"%{term}%", f"%{term}%", int(limit)),
+        (*params, int(limit)),
     )
     rows = [dict(row) for row in cursor.fetchall()]
     conn.close()
@@ -1,5 +1,11 @@
 """Pre-conselho domain module."""
 
-from . import admin, context, models, records, reports, repository, schemas, service
+import importlib
 
 __all__ = ["admin", "context", "models", "records", "reports", "repository", "schemas", "service"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,6 @@
 """Printing domain module."""
 
-from . import config, dependencies, job_access, job_creation, jobs, models, repository, router, schemas, service
+import importlib
 
 __all__ = [
     "config",
@@ -13,4 +13,11 @@ __all__ = [
     "router",
     "schemas",
     "service",
+    "uploads",
 ]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,6 +3,7 @@ from pathlib import Path
 from fastapi import HTTPException
 
 from modules.printing import repository
+from services.realtime_events import publicar_job_impressao
 from modules.printing.policies import print_job_can_be_reused, resolve_job_pdf_path
 
 
@@ -28,7 +29,7 @@ def get_job_with_access(
     return job
 
 
-def read_reusable_job_pdf_content(
+def resolve_reusable_job_pdf(
     *,
     job_id: int,
     usuario: dict,
@@ -36,6 +37,7 @@ def read_reusable_job_pdf_content(
     buscar_job=None,
     usuario_pode_gerir_impressoes,
 ):
+    """Valida acesso e reuso do job e devolve ``(job, caminho_pdf)`` sem ler o arquivo."""
     job = get_job_with_access(
         job_id=job_id,
         usuario=usuario,
@@ -46,6 +48,32 @@ def read_reusable_job_pdf_content(
         raise HTTPException(409, "Apenas jobs concluídos podem ser reutilizados no preview.")
 
     caminho_arquivo = resolve_job_pdf_path(job, spool_dir)
+    try:
+        tamanho = caminho_arquivo.stat().st_size
+    except OSError as exc:
+        raise HTTPException(500, "Falha ao ler o arquivo vinculado a este job.") from exc
+
+    if not tamanho:
+        raise HTTPException(404, "O arquivo deste job está vazio ou indisponível.")
+
+    return job, caminho_arquivo
+
+
+def read_reusable_job_pdf_content(
+    *,
+    job_id: int,
+    usuario: dict,
+    spool_dir: Path,
+    buscar_job=None,
+    usuario_pode_gerir_impressoes,
+):
+    job, caminho_arquivo = resolve_reusable_job_pdf(
+        job_id=job_id,
+        usuario=usuario,
+        spool_dir=spool_dir,
+        buscar_job=buscar_job,
+        usuario_pode_gerir_impressoes=usuario_pode_gerir_impressoes,
+    )
     try:
         conteudo_pdf = caminho_arquivo.read_bytes()
     except OSError as exc:
@@ -92,6 +120,7 @@ def cancel_print_job(
             409,
             "Este job não pode mais ser cancelado (já está em impressão ou finalizado).",
         )
+    publicar_job_impressao(job, "CANCELADO")
 
     paginas_restantes = None
     if usuario_job_id is not None and not cota_ilimitada:
@@ -1,6 +1,5 @@
 import json
 import logging
-import shutil
 import uuid
 from math import ceil
 from pathlib import Path
@@ -20,6 +19,9 @@ from modules.printing.policies import (
     sanitize_file_name,
     validate_required_tags,
 )
+from services.artifact_cache import vincular_arquivo
+from services.realtime_events import publicar_job_impressao
+from services.worker_wakeup import notificar_worker_impressao
 
 
 def copy_job_pdf_to_spool(
@@ -32,7 +34,7 @@ def copy_job_pdf_to_spool(
     nome_base = Path(nome_sanitizado).stem or "documento"
     caminho_destino = spool_dir / f"{uuid.uuid4().hex}_{nome_base}.pdf"
     try:
-        shutil.copy2(caminho_origem, caminho_destino)
+        vincular_arquivo(caminho_origem, caminho_destino)
     except OSError as exc:
         raise HTTPException(
             500,
@@ -166,6 +168,8 @@ def create_job_from_ready_pdf(
             "Falha ao registrar o job de impressao.",
         ) from exc
 
+    notificar_worker_impressao()
+    publicar_job_impressao({"id": job_id, "usuario_id": usuario_responsavel["id"]}, "PENDENTE")
     record_event(
         category=AuditCategory.PRINTING,
         action="print.submitted",
@@ -2,6 +2,7 @@ from modules.printing.job_access import (
     cancel_print_job,
     get_job_with_access,
     read_reusable_job_pdf_content,
+    resolve_reusable_job_pdf,
 )
 from modules.printing.job_creation import (
     copy_job_pdf_to_spool,
@@ -16,4 +17,5 @@ __all__ = [
     "get_job_with_access",
     "read_reusable_job_pdf_content",
     "reprint_job_from_history",
+    "resolve_reusable_job_pdf",
 ]
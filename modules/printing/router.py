@@ -2,7 +2,8 @@ import logging
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import Response
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTasks
 
 from auth import get_usuario_logado
 from modules.printing import repository
@@ -32,14 +33,16 @@ from modules.printing.service import (
     list_serialized_jobs_for_user,
     prepare_uploaded_file_for_preview,
     prepare_uploaded_file_for_print,
-    read_reusable_job_pdf_content,
     reprint_job_from_history,
     resolve_active_printer,
+    resolve_reusable_job_pdf,
     validate_print_parameters,
 )
 from services.cota_service import obter_cota_atual, validar_e_consumir_cota
+from services.file_delivery import responder_arquivo
 from services.file_service import arquivo_suportado, converter_para_pdf, obter_extensao_arquivo
 from services.pdf_service import contar_paginas_pdf
+from services.realtime_events import publicar_job_impressao
 from routers.config import render_template_response
 
 router = APIRouter()
@@ -119,14 +122,14 @@ def imprimir(
     )
     impressora = resolve_active_printer(printer_name, get_default_printer_name())
 
-    conteudo_arquivo = arquivo.file.read()
     resultado_preparo = prepare_uploaded_file_for_print(
         nome_arquivo=arquivo.filename,
-        conteudo_arquivo=conteudo_arquivo,
+        arquivo_upload=arquivo.file,
         spool_dir=_ensure_spool_dir(),
         obter_extensao_arquivo=obter_extensao_arquivo,
         converter_para_pdf=converter_para_pdf,
         remover_arquivo_se_existir=_remove_file_if_exists,
+        tamanho_declarado=arquivo.size,
     )
 
     return create_job_from_ready_pdf(
@@ -160,20 +163,24 @@ def preview_impressao(
     if not arquivo_suportado(arquivo.filename):
         raise HTTPException(400, f"Formato não suportado. Envie {FORMATOS_UPLOAD_DESCRICAO}.")
 
-    conteudo_arquivo = arquivo.file.read()
     resultado_preview = prepare_uploaded_file_for_preview(
         nome_arquivo=arquivo.filename,
-        conteudo_arquivo=conteudo_arquivo,
+        arquivo_upload=arquivo.file,
         spool_dir=_ensure_spool_dir(),
         obter_extensao_arquivo=obter_extensao_arquivo,
         converter_para_pdf=converter_para_pdf,
         remover_arquivo_se_existir=_remove_file_if_exists,
+        tamanho_declarado=arquivo.size,
     )
 
-    return Response(
-        content=resultado_preview["conteudo_pdf"],
+    limpeza = BackgroundTasks()
+    for caminho in resultado_preview["arquivos_temporarios"]:
+        limpeza.add_task(_remove_file_if_exists, caminho)
+    return FileResponse(
+        resultado_preview["caminho_pdf"],
         media_type="application/pdf",
         headers={"Cache-Control": "no-store"},
+        background=limpeza,
     )
 
 
@@ -184,17 +191,18 @@ def fila(usuario=Depends(get_usuario_logado)):
 
 
 @router.get("/jobs/{job_id}/preview")
-def preview_job_historico(job_id: int, usuario=Depends(get_usuario_logado)):
-    _job, _caminho_arquivo, conteudo_pdf = read_reusable_job_pdf_content(
+def preview_job_historico(request: Request, job_id: int, usuario=Depends(get_usuario_logado)):
+    _job, caminho_arquivo = resolve_reusable_job_pdf(
         job_id=job_id,
         usuario=usuario,
         spool_dir=_ensure_spool_dir(),
         usuario_pode_gerir_impressoes=user_can_manage_prints,
     )
-    return Response(
-        content=conteudo_pdf,
+    return responder_arquivo(
+        caminho_arquivo,
+        request=request,
         media_type="application/pdf",
-        headers={"Cache-Control": "no-store"},
+        cache_control="no-store",
     )
 
 
@@ -263,6 +271,9 @@ def prioridade(
 ):
     require_print_manager(usuario)
     repository.update_job_priority(job_id, urgente)
+    job = repository.get_job(job_id)
+    if job:
+        publicar_job_impressao(job, urgente=bool(urgente))
     return {"mensagem": "Prioridade atualizada"}
 
 
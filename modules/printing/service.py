@@ -1,7 +1,7 @@
 import re
 import sqlite3
-import uuid
 from pathlib import Path
+from typing import BinaryIO
 
 from fastapi import HTTPException
 
@@ -13,6 +13,7 @@ from modules.printing.jobs import (
     get_job_with_access,
     read_reusable_job_pdf_content,
     reprint_job_from_history,
+    resolve_reusable_job_pdf,
 )
 from modules.printing.policies import (
     TAGS_IMPRESSAO_DISPONIVEIS,
@@ -30,6 +31,7 @@ from modules.printing.policies import (
     validate_print_parameters,
     validate_required_tags,
 )
+from modules.printing.uploads import store_upload_in_spool
 
 
 class PrinterConflictError(Exception):
@@ -43,24 +45,22 @@ class PrinterNotFoundError(Exception):
 def prepare_uploaded_file_for_print(
     *,
     nome_arquivo: str,
-    conteudo_arquivo: bytes,
+    arquivo_upload: BinaryIO,
     spool_dir: Path,
     obter_extensao_arquivo,
     converter_para_pdf,
     remover_arquivo_se_existir,
+    tamanho_declarado: int | None = None,
 ):
-    if not conteudo_arquivo:
-        raise HTTPException(400, "Arquivo vazio")
-
-    extensao_arquivo = obter_extensao_arquivo(nome_arquivo)
-    nome_arquivo_spool = f"{uuid.uuid4().hex}_{sanitize_file_name(nome_arquivo)}"
-    caminho_arquivo_original = spool_dir / nome_arquivo_spool
-
-    try:
-        with caminho_arquivo_original.open("wb") as destino:
-            destino.write(conteudo_arquivo)
-    except OSError as exc:
-        raise HTTPException(500, "Falha ao armazenar o arquivo para impressão.") from exc
+    upload = store_upload_in_spool(
+        arquivo_upload=arquivo_upload,
+        nome_arquivo=nome_arquivo,
+        extensao_arquivo=obter_extensao_arquivo(nome_arquivo),
+        spool_dir=spool_dir,
+        tamanho_declarado=tamanho_declarado,
+    )
+    caminho_arquivo_original = upload["caminho_arquivo"]
+    extensao_arquivo = upload["extensao_arquivo"]
 
     caminho_arquivo = caminho_arquivo_original
     caminho_convertido = caminho_arquivo_original.with_suffix(".pdf")
@@ -92,49 +92,53 @@ def prepare_uploaded_file_for_print(
 def prepare_uploaded_file_for_preview(
     *,
     nome_arquivo: str,
-    conteudo_arquivo: bytes,
+    arquivo_upload: BinaryIO,
     spool_dir: Path,
     obter_extensao_arquivo,
     converter_para_pdf,
     remover_arquivo_se_existir,
+    tamanho_declarado: int | None = None,
 ):
-    if not conteudo_arquivo:
-        raise HTTPException(400, "Arquivo vazio")
-
-    extensao_arquivo = obter_extensao_arquivo(nome_arquivo)
-    nome_arquivo_spool = f"preview_{uuid.uuid4().hex}_{sanitize_file_name(nome_arquivo)}"
-    caminho_arquivo_original = spool_dir / nome_arquivo_spool
-
-    try:
-        with caminho_arquivo_original.open("wb") as destino:
-            destino.write(conteudo_arquivo)
-    except OSError as exc:
-        raise HTTPException(500, "Falha ao armazenar arquivo para pré-visualização.") from exc
+    """Converte o upload e devolve o PDF no spool; o chamador remove ``arquivos_temporarios``."""
+    upload = store_upload_in_spool(
+        arquivo_upload=arquivo_upload,
+        nome_arquivo=nome_arquivo,
+        extensao_arquivo=obter_extensao_arquivo(nome_arquivo),
+        spool_dir=spool_dir,
+        prefixo="preview_",
+        tamanho_declarado=tamanho_declarado,
+    )
+    caminho_arquivo_original = upload["caminho_arquivo"]
+    extensao_arquivo = upload["extensao_arquivo"]
 
     caminho_arquivo_pdf = caminho_arquivo_original
     caminho_convertido = caminho_arquivo_original.with_suffix(".pdf")
+    arquivos_temporarios = [caminho_arquivo_original]
+    if caminho_convertido != caminho_arquivo_original:
+        arquivos_temporarios.append(caminho_convertido)
+
+    def remover_arquivos_temporarios():
+        for caminho in arquivos_temporarios:
+            remover_arquivo_se_existir(caminho)
 
     try:
         caminho_arquivo_pdf = converter_para_pdf(caminho_arquivo_original, extensao_arquivo)
-        conteudo_pdf = caminho_arquivo_pdf.read_bytes()
-        if not conteudo_pdf:
+        if caminho_arquivo_pdf.stat().st_size <= 0:
             raise HTTPException(500, "Falha ao gerar PDF de pré-visualização.")
     except HTTPException:
+        remover_arquivos_temporarios()
         raise
-    except ValueError as exc:
-        raise HTTPException(400, str(exc)) from exc
-    except RuntimeError as exc:
+    except (ValueError, RuntimeError) as exc:
+        remover_arquivos_temporarios()
         raise HTTPException(400, str(exc)) from exc
     except Exception as exc:
+        remover_arquivos_temporarios()
         raise HTTPException(500, "Falha ao gerar pré-visualização do documento.") from exc
-    finally:
-        remover_arquivo_se_existir(caminho_arquivo_original)
-        if caminho_convertido != caminho_arquivo_original:
-            remover_arquivo_se_existir(caminho_convertido)
 
     return {
         "extensao_arquivo": extensao_arquivo,
-        "conteudo_pdf": conteudo_pdf,
+        "caminho_pdf": caminho_arquivo_pdf,
+        "arquivos_temporarios": arquivos_temporarios,
     }
 
 
@@ -0,0 +1,177 @@
+"""Gravacao em streaming dos uploads de impressao no spool.
+
+O arquivo enviado e copiado em blocos direto para o spool, calculando o
+SHA-256 e identificando o formato pelo primeiro bloco. O formato detectado
+manda sobre a extensao do nome (um DOCX salvo como ``.doc`` ou um PNG
+chamado ``.jpg`` seguem para o conversor certo); so conteudo que nao casa com
+nenhum formato aceito e recusado. O limite de tamanho de cada formato e
+aplicado antes da copia (tamanho informado pelo multipart) e durante a copia,
+sem nunca manter o documento inteiro em memoria.
+"""
+
+import hashlib
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException
+
+from modules.printing.config import get_upload_formats_description
+from modules.printing.policies import sanitize_file_name
+from services.artifact_cache import cache_artefatos
+from services.file_service import OFFICE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_BLOCO_UPLOAD = 1024 * 1024
+
+
+def _env_int(nome: str, padrao: int) -> int:
+    valor = os.getenv(nome, str(padrao)).strip()
+    try:
+        return max(int(valor), 0)
+    except ValueError:
+        logger.warning("Valor invalido para %s=%r; usando %s.", nome, valor, padrao)
+        return padrao
+
+
+PRINT_UPLOAD_MAX_MB_PDF = _env_int("PRINT_UPLOAD_MAX_MB_PDF", 50)
+PRINT_UPLOAD_MAX_MB_OFFICE = _env_int("PRINT_UPLOAD_MAX_MB_OFFICE", 30)
+PRINT_UPLOAD_MAX_MB_IMAGE = _env_int("PRINT_UPLOAD_MAX_MB_IMAGE", 20)
+
+LIMITES_UPLOAD_MB = {
+    ".pdf": PRINT_UPLOAD_MAX_MB_PDF,
+    ".docx": PRINT_UPLOAD_MAX_MB_OFFICE,
+    ".doc": PRINT_UPLOAD_MAX_MB_OFFICE,
+    ".png": PRINT_UPLOAD_MAX_MB_IMAGE,
+    ".jpg": PRINT_UPLOAD_MAX_MB_IMAGE,
+    ".jpeg": PRINT_UPLOAD_MAX_MB_IMAGE,
+}
+
+# Extensao efetiva -> inicio do conteudo. DOCX e um pacote ZIP; DOC usa o
+# container OLE2 do Office 97-2003.
+ASSINATURAS_UPLOAD = {
+    ".pdf": (b"%PDF-",),
+    ".docx": (b"PK\x03\x04",),
+    ".doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+}
+# O Word tambem grava RTF e HTML/XML com extensao .doc; o LibreOffice os
+# converte pelo conteudo, entao valem quando o nome ja indica Office.
+INICIOS_OFFICE_TEXTO = (b"{\\rtf", b"<")
+
+
+def get_upload_limit_bytes(extensao: str) -> int:
+    """Limite em bytes para a extensao; ``0`` significa sem limite."""
+    return LIMITES_UPLOAD_MB.get(str(extensao or "").lower(), 0) * 1024 * 1024
+
+
+def _ensure_within_limit(tamanho: int, extensao: str) -> None:
+    limite = get_upload_limit_bytes(extensao)
+    if limite and tamanho > limite:
+        raise HTTPException(
+            413,
+            f"Arquivo {extensao.lstrip('.').upper()} acima do limite de "
+            f"{limite // (1024 * 1024)} MB.",
+        )
+
+
+def detect_upload_format(inicio: bytes, extensao: str) -> str:
+    """Extensao efetiva do upload a partir dos primeiros bytes.
+
+    Levanta 400 se o conteudo nao corresponde a nenhum formato aceito, como um
+    executavel renomeado para ``.pdf``.
+    """
+    extensao_declarada = str(extensao or "").lower()
+    if inicio.startswith(ASSINATURAS_UPLOAD.get(extensao_declarada, ())):
+        return extensao_declarada
+    for extensao_detectada, assinaturas in ASSINATURAS_UPLOAD.items():
+        if inicio.startswith(assinaturas):
+            return extensao_detectada
+    # PDFs gerados por alguns scanners trazem bytes antes do cabecalho.
+    if b"%PDF-" in inicio[:1024]:
+        return ".pdf"
+    texto = inicio.removeprefix(b"\xef\xbb\xbf").lstrip()
+    if extensao_declarada in OFFICE_EXTENSIONS and texto.startswith(INICIOS_OFFICE_TEXTO):
+        return extensao_declarada
+    raise HTTPException(
+        400,
+        "O conteúdo do arquivo não corresponde a nenhum formato suportado. "
+        f"Envie {get_upload_formats_description()}.",
+    )
+
+
+def store_upload_in_spool(
+    *,
+    arquivo_upload: BinaryIO,
+    nome_arquivo: str,
+    extensao_arquivo: str,
+    spool_dir: Path,
+    prefixo: str = "",
+    tamanho_declarado: int | None = None,
+) -> dict:
+    """Copia o upload em blocos para o spool.
+
+    Devolve caminho, tamanho, SHA-256 e ``extensao_arquivo`` detectada pelo
+    conteudo, que e a que deve escolher o conversor.
+    """
+    if tamanho_declarado:
+        _ensure_within_limit(int(tamanho_declarado), extensao_arquivo)
+
+    nome_arquivo_spool = f"{prefixo}{uuid.uuid4().hex}_{sanitize_file_name(nome_arquivo)}"
+    caminho_arquivo = spool_dir / nome_arquivo_spool
+    sha = hashlib.sha256()
+    tamanho = 0
+
+    try:
+        with caminho_arquivo.open("wb") as destino:
+            primeiro_bloco = arquivo_upload.read(TAMANHO_BLOCO_UPLOAD)
+            if primeiro_bloco:
+                extensao_arquivo = detect_upload_format(primeiro_bloco, extensao_arquivo)
+            bloco = primeiro_bloco
+            while bloco:
+                tamanho += len(bloco)
+                _ensure_within_limit(tamanho, extensao_arquivo)
+                sha.update(bloco)
+                destino.write(bloco)
+                bloco = arquivo_upload.read(TAMANHO_BLOCO_UPLOAD)
+    except HTTPException:
+        _discard(caminho_arquivo)
+        raise
+    except OSError as exc:
+        _discard(caminho_arquivo)
+        raise HTTPException(500, "Falha ao armazenar o arquivo enviado.") from exc
+
+    if tamanho == 0:
+        _discard(caminho_arquivo)
+        raise HTTPException(400, "Arquivo vazio")
+
+    digest = sha.hexdigest()
+    cache_artefatos.registrar_hash(caminho_arquivo, digest)
+    return {
+        "caminho_arquivo": caminho_arquivo,
+        "tamanho_bytes": tamanho,
+        "sha256": digest,
+        "extensao_arquivo": extensao_arquivo,
+    }
+
+
+def _discard(caminho: Path) -> None:
+    try:
+        caminho.unlink()
+    except OSError:
+        pass
+
+
+__all__ = [
+    "ASSINATURAS_UPLOAD",
+    "INICIOS_OFFICE_TEXTO",
+    "LIMITES_UPLOAD_MB",
+    "detect_upload_format",
+    "get_upload_limit_bytes",
+    "store_upload_in_spool",
+]
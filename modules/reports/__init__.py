@@ -1,3 +1,10 @@
-from . import pdf_service, repository, schemas, service
+import importlib
 
-__all__ = ["pdf_service", "repository", "schemas", "service"]
+__all__ = ["batch", "pdf_service", "repository", "schemas", "service"]
+
+
+def __getattr__(name: str):
+    # pdf_service (Pillow) so e carregado quando um relatorio e gerado.
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,242 @@
+"""Geracao e envio em lote dos relatorios individuais de professores.
+
+Os anexos do periodo sao consultados uma vez para o lote inteiro, os PDFs sao
+renderizados num pool de processos e os emails saem por uma unica sessao SMTP.
+Cada item grava seu status assim que termina, entao um lote interrompido pode
+ser retomado sem reenviar para quem ja recebeu.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+
+from fastapi import HTTPException
+
+from . import repository, service
+
+STATUS_LOTE_PENDENTE = "PENDENTE"
+STATUS_LOTE_PROCESSANDO = "PROCESSANDO"
+STATUS_LOTE_CONCLUIDO = "CONCLUIDO"
+STATUS_LOTE_ERRO = "ERRO"
+STATUS_ITEM_PENDENTE = "PENDENTE"
+STATUS_ITEM_ENVIADO = "ENVIADO"
+STATUS_ITEM_SIMULADO = "SIMULADO"
+STATUS_ITEM_ERRO = "ERRO"
+STATUS_ITEM_FINALIZADOS = (STATUS_ITEM_ENVIADO, STATUS_ITEM_SIMULADO)
+logger = logging.getLogger(__name__)
+
+
+def _resolver_env_int(nome: str, padrao: int, minimo: int) -> int:
+    valor_bruto = str(os.getenv(nome, str(padrao)) or "").strip()
+    try:
+        valor = int(valor_bruto)
+    except ValueError:
+        return padrao
+    return max(valor, minimo)
+
+
+PDF_WORKERS_LOTE = _resolver_env_int("REPORT_BATCH_PDF_WORKERS", min(4, os.cpu_count() or 1), 0)
+# ponytail: um lote por vez; o paralelismo fica no pool de PDFs, e o SMTP usa uma sessao so.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="relatorios-lote")
+_LOTES_EM_EXECUCAO: set[int] = set()
+_LOCK = threading.Lock()
+
+
+def iniciar_lote(
+    data_inicio: str,
+    data_fim: str,
+    *,
+    professor_ids: list[int] | None = None,
+    assunto: str | None = None,
+    mensagem: str | None = None,
+    dry_run: bool = False,
+    criado_por: int | None = None,
+) -> dict:
+    professores = service.list_teacher_report_recipients()
+    if professor_ids:
+        selecionados = {int(item) for item in professor_ids}
+        professores = [item for item in professores if item["id"] in selecionados]
+    if not professores:
+        raise HTTPException(400, "Nenhum professor ativo selecionado para o lote.")
+
+    lote_id = repository.create_report_batch(
+        data_inicio,
+        data_fim,
+        professores,
+        assunto=str(assunto or "").strip() or None,
+        mensagem=str(mensagem or "").strip() or None,
+        dry_run=dry_run,
+        criado_por=criado_por,
+    )
+    _agendar(lote_id)
+    return obter_lote(lote_id)
+
+
+def retomar_lote(lote_id: int) -> dict:
+    lote = obter_lote(lote_id)
+    if lote["em_execucao"]:
+        raise HTTPException(409, "Lote ja esta em processamento.")
+    if lote["pendentes"] == 0:
+        return lote
+    repository.update_report_batch(lote_id, STATUS_LOTE_PENDENTE)
+    _agendar(lote_id)
+    return obter_lote(lote_id)
+
+
+def obter_lote(lote_id: int) -> dict:
+    lote = repository.get_report_batch(lote_id)
+    if not lote:
+        raise HTTPException(404, "Lote de relatorios nao encontrado.")
+
+    por_status = lote.pop("itens_por_status")
+    total = sum(por_status.values())
+    enviados = por_status.get(STATUS_ITEM_ENVIADO, 0)
+    simulados = por_status.get(STATUS_ITEM_SIMULADO, 0)
+    with _LOCK:
+        em_execucao = int(lote_id) in _LOTES_EM_EXECUCAO
+    lote.update(
+        {
+            "dry_run": bool(lote["dry_run"]),
+            "total": total,
+            "enviados": enviados,
+            "simulados": simulados,
+            "erros": por_status.get(STATUS_ITEM_ERRO, 0),
+            "pendentes": total - enviados - simulados,
+            "em_execucao": em_execucao,
+        }
+    )
+    return lote
+
+
+def processar_lote(lote_id: int, *, pdf_workers: int | None = None) -> dict:
+    lote = repository.get_report_batch(lote_id)
+    if not lote:
+        raise HTTPException(404, "Lote de relatorios nao encontrado.")
+
+    itens = repository.list_pending_batch_items(lote_id, STATUS_ITEM_FINALIZADOS)
+    repository.update_report_batch(lote_id, STATUS_LOTE_PROCESSANDO)
+    try:
+        _processar_itens(lote, itens, PDF_WORKERS_LOTE if pdf_workers is None else pdf_workers)
+    except HTTPException as exc:
+        repository.update_report_batch(lote_id, STATUS_LOTE_ERRO, erro=str(exc.detail))
+    except Exception:
+        repository.update_report_batch(
+            lote_id,
+            STATUS_LOTE_ERRO,
+            erro="Falha inesperada ao processar o lote.",
+        )
+        raise
+    else:
+        repository.update_report_batch(lote_id, STATUS_LOTE_CONCLUIDO)
+    return obter_lote(lote_id)
+
+
+def _agendar(lote_id: int) -> None:
+    with _LOCK:
+        if lote_id in _LOTES_EM_EXECUCAO:
+            return
+        _LOTES_EM_EXECUCAO.add(lote_id)
+    _EXECUTOR.submit(_executar_agendado, lote_id)
+
+
+def _executar_agendado(lote_id: int) -> None:
+    try:
+        processar_lote(lote_id)
+    except Exception:
+        logger.exception("Falha ao processar lote de relatorios %s", lote_id)
+    finally:
+        with _LOCK:
+            _LOTES_EM_EXECUCAO.discard(lote_id)
+
+
+def _processar_itens(lote: dict, itens: list[dict], pdf_workers: int) -> None:
+    lote_id = int(lote["id"])
+    professores = []
+    for item in itens:
+        if item.get("nome") is None:
+            repository.update_report_batch_item(
+                lote_id,
+                item["professor_id"],
+                STATUS_ITEM_ERRO,
+                erro="Professor nao encontrado.",
+            )
+            continue
+        professores.append({"id": item["professor_id"], "nome": item["nome"], "email": item["email"]})
+    if not professores:
+        return
+
+    reports = service.build_teacher_reports(professores, lote["data_inicio"], lote["data_fim"])
+    dry_run = bool(lote["dry_run"])
+    # Sem SMTP no dry-run: PDFs e mensagens sao montados, mas nada sai do servidor.
+    with (nullcontext() if dry_run else service.SmtpSession()) as smtp:
+        for report, attachment in _renderizar_pdfs(list(reports.values()), pdf_workers):
+            professor = report["professor"]
+            if attachment is None:
+                repository.update_report_batch_item(
+                    lote_id, professor["id"], STATUS_ITEM_ERRO, erro="Falha ao gerar o PDF."
+                )
+                continue
+            if not professor["email"]:
+                repository.update_report_batch_item(
+                    lote_id, professor["id"], STATUS_ITEM_ERRO, erro="Professor sem email cadastrado."
+                )
+                continue
+
+            message = service.build_teacher_report_message(
+                report,
+                attachment,
+                from_email=None if smtp is None else smtp.settings["from_email"],
+                to_email=professor["email"],
+                assunto=lote["assunto"],
+                mensagem=lote["mensagem"],
+            )
+            if dry_run:
+                status = STATUS_ITEM_SIMULADO
+            else:
+                try:
+                    smtp.send(message)
+                except HTTPException as exc:
+                    # Destinatario recusado falha so o item; servidor fora do ar
+                    # interrompe o lote, que fica pendente para ser retomado.
+                    if exc.status_code != 400:
+                        raise
+                    repository.update_report_batch_item(
+                        lote_id, professor["id"], STATUS_ITEM_ERRO, email=professor["email"], erro=str(exc.detail)
+                    )
+                    continue
+                status = STATUS_ITEM_ENVIADO
+            repository.update_report_batch_item(lote_id, professor["id"], status, email=professor["email"])
+
+
+def _renderizar_pdfs(reports: list[dict], workers: int):
+    from . import pdf_service
+
+    if workers <= 1 or len(reports) <= 1:
+        for report in reports:
+            try:
+                yield report, pdf_service.generate_teacher_report_pdf(report)
+            except Exception:
+                logger.exception("Falha ao gerar PDF do professor %s", report["professor"]["id"])
+                yield report, None
+        return
+
+    # spawn evita herdar por fork as threads e conexoes abertas do servidor.
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(reports)),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    try:
+        futuros = [pool.submit(pdf_service.generate_teacher_report_pdf, report) for report in reports]
+        for report, futuro in zip(reports, futuros):
+            try:
+                yield report, futuro.result()
+            except Exception:
+                logger.exception("Falha ao gerar PDF do professor %s", report["professor"]["id"])
+                yield report, None
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
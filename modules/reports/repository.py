@@ -150,3 +150,140 @@ def get_teacher_resource_summary(professor_id: int, data_inicio: str, data_fim:
         }
     finally:
         conn.close()
+
+
+def create_report_batch(
+    data_inicio: str,
+    data_fim: str,
+    professores: list[dict],
+    *,
+    assunto: str | None,
+    mensagem: str | None,
+    dry_run: bool,
+    criado_por: int | None,
+) -> int:
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO relatorios_lotes (data_inicio, data_fim, assunto, mensagem, dry_run, criado_por)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (data_inicio, data_fim, assunto, mensagem, 1 if dry_run else 0, criado_por),
+        )
+        lote_id = int(cursor.lastrowid)
+        cursor.executemany(
+            """
+            INSERT INTO relatorios_lote_itens (lote_id, professor_id, email)
+            VALUES (?, ?, ?)
+            """,
+            [
+                (lote_id, int(item["id"]), str(item.get("email") or "").strip())
+                for item in professores
+            ],
+        )
+        conn.commit()
+        return lote_id
+    finally:
+        conn.close()
+
+
+def get_report_batch(lote_id: int) -> dict | None:
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM relatorios_lotes WHERE id = ?", (int(lote_id),))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        lote = dict(row)
+        cursor.execute(
+            """
+            SELECT status, COUNT(*) AS total
+            FROM relatorios_lote_itens
+            WHERE lote_id = ?
+            GROUP BY status
+            """,
+            (int(lote_id),),
+        )
+        lote["itens_por_status"] = {item["status"]: int(item["total"]) for item in cursor.fetchall()}
+        cursor.execute(
+            """
+            SELECT professor_id, email, erro, tentativas, processado_em
+            FROM relatorios_lote_itens
+            WHERE lote_id = ? AND status = 'ERRO'
+            ORDER BY professor_id ASC
+            """,
+            (int(lote_id),),
+        )
+        lote["falhas"] = [dict(item) for item in cursor.fetchall()]
+        return lote
+    finally:
+        conn.close()
+
+
+def list_pending_batch_items(lote_id: int, finished_status: tuple[str, ...]) -> list[dict]:
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        marcadores = ", ".join("?" for _ in finished_status)
+        cursor.execute(
+            f"""
+            SELECT i.professor_id, COALESCE(u.email, i.email) AS email, u.nome
+            FROM relatorios_lote_itens i
+            LEFT JOIN usuarios u ON u.id = i.professor_id AND COALESCE(u.ativo, 1) = 1
+            WHERE i.lote_id = ? AND i.status NOT IN ({marcadores})
+            ORDER BY i.professor_id ASC
+            """,
+            (int(lote_id), *finished_status),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def update_report_batch(lote_id: int, status: str, *, erro: str | None = None) -> None:
+    conn = database.get_connection()
+    try:
+        conn.execute(
+            """
+            UPDATE relatorios_lotes
+            SET status = ?,
+                erro = ?,
+                iniciado_em = CASE WHEN ? = 'PROCESSANDO' THEN datetime('now') ELSE iniciado_em END,
+                finalizado_em = CASE WHEN ? IN ('CONCLUIDO', 'ERRO') THEN datetime('now') ELSE NULL END
+            WHERE id = ?
+            """,
+            (status, erro, status, status, int(lote_id)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def update_report_batch_item(
+    lote_id: int,
+    professor_id: int,
+    status: str,
+    *,
+    email: str | None = None,
+    erro: str | None = None,
+) -> None:
+    conn = database.get_connection()
+    try:
+        conn.execute(
+            """
+            UPDATE relatorios_lote_itens
+            SET status = ?,
+                email = COALESCE(?, email),
+                erro = ?,
+                tentativas = tentativas + 1,
+                processado_em = datetime('now')
+            WHERE lote_id = ? AND professor_id = ?
+            """,
+            (status, email, erro, int(lote_id), int(professor_id)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
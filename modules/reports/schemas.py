@@ -5,3 +5,10 @@ class TeacherReportEmailIn(BaseModel):
     destino_email: str | None = Field(default=None, max_length=255)
     assunto: str | None = Field(default=None, max_length=180)
     mensagem: str | None = Field(default=None, max_length=1200)
+
+
+class TeacherReportBatchIn(BaseModel):
+    professor_ids: list[int] | None = None
+    assunto: str | None = Field(default=None, max_length=180)
+    mensagem: str | None = Field(default=None, max_length=1200)
+    dry_run: bool = False
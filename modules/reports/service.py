@@ -6,7 +6,7 @@ from email.message import EmailMessage
 
 from fastapi import HTTPException
 
-from . import pdf_service, repository
+from . import repository
 
 
 def get_dashboard(data_inicio: str, data_fim: str) -> dict:
@@ -33,19 +33,51 @@ def build_teacher_report(professor_id: int, data_inicio: str, data_fim: str) ->
     if not professor:
         raise HTTPException(404, "Professor nao encontrado.")
 
-    impressoes = repository.get_teacher_printing_summary(int(professor_id), data_inicio, data_fim)
-    recursos = repository.get_teacher_resource_summary(int(professor_id), data_inicio, data_fim)
     anexos_base = repository.get_attachments_report(data_inicio, data_fim)
-    pendencias = [
-        item
-        for item in anexos_base.get("tabelas", {}).get("professores_pendencias", [])
-        if int(item.get("professor_id") or 0) == int(professor_id)
-    ]
-    entregas = [
-        item
-        for item in anexos_base.get("tabelas", {}).get("entregas_recentes", [])
-        if int(item.get("professor_id") or 0) == int(professor_id)
-    ]
+    return _compose_teacher_report(
+        professor,
+        data_inicio,
+        data_fim,
+        pendencias=_filter_by_teacher(anexos_base, "professores_pendencias").get(int(professor_id), []),
+        entregas=_filter_by_teacher(anexos_base, "entregas_recentes").get(int(professor_id), []),
+    )
+
+
+def build_teacher_reports(professores: list[dict], data_inicio: str, data_fim: str) -> dict[int, dict]:
+    """Monta os relatorios de varios professores consultando os anexos do periodo uma unica vez."""
+    anexos_base = repository.get_attachments_report(data_inicio, data_fim)
+    pendencias = _filter_by_teacher(anexos_base, "professores_pendencias")
+    entregas = _filter_by_teacher(anexos_base, "entregas_recentes")
+    return {
+        int(professor["id"]): _compose_teacher_report(
+            professor,
+            data_inicio,
+            data_fim,
+            pendencias=pendencias.get(int(professor["id"]), []),
+            entregas=entregas.get(int(professor["id"]), []),
+        )
+        for professor in professores
+    }
+
+
+def _filter_by_teacher(anexos_base: dict, tabela: str) -> dict[int, list[dict]]:
+    agrupados: dict[int, list[dict]] = {}
+    for item in anexos_base.get("tabelas", {}).get(tabela, []):
+        agrupados.setdefault(int(item.get("professor_id") or 0), []).append(item)
+    return agrupados
+
+
+def _compose_teacher_report(
+    professor: dict,
+    data_inicio: str,
+    data_fim: str,
+    *,
+    pendencias: list[dict],
+    entregas: list[dict],
+) -> dict:
+    professor_id = int(professor.get("id") or 0)
+    impressoes = repository.get_teacher_printing_summary(professor_id, data_inicio, data_fim)
+    recursos = repository.get_teacher_resource_summary(professor_id, data_inicio, data_fim)
 
     resumo = {
         "total_paginas": impressoes["total_paginas"],
@@ -57,7 +89,7 @@ def build_teacher_report(professor_id: int, data_inicio: str, data_fim: str) ->
 
     return {
         "professor": {
-            "id": int(professor.get("id") or 0),
+            "id": professor_id,
             "nome": str(professor.get("nome") or "").strip(),
             "email": str(professor.get("email") or "").strip(),
         },
@@ -85,6 +117,8 @@ def _build_teacher_alerts(resumo: dict) -> list[str]:
 
 
 def generate_teacher_report_pdf(professor_id: int, data_inicio: str, data_fim: str) -> bytes:
+    from . import pdf_service
+
     report = build_teacher_report(professor_id, data_inicio, data_fim)
     return pdf_service.generate_teacher_report_pdf(report)
 
@@ -99,69 +133,130 @@ def send_teacher_report_email(
     mensagem: str | None = None,
 ) -> dict:
     report = build_teacher_report(professor_id, data_inicio, data_fim)
-    professor = report["professor"]
-    destination = str(destino_email or professor.get("email") or "").strip()
+    destination = str(destino_email or report["professor"].get("email") or "").strip()
     if not destination:
         raise HTTPException(400, "Professor sem email cadastrado.")
 
+    from . import pdf_service
+
+    attachment = pdf_service.generate_teacher_report_pdf(report)
+    with SmtpSession() as smtp:
+        smtp.send(
+            build_teacher_report_message(
+                report,
+                attachment,
+                from_email=smtp.settings["from_email"],
+                to_email=destination,
+                assunto=assunto,
+                mensagem=mensagem,
+            )
+        )
+    return {"mensagem": "Relatorio enviado com sucesso.", "destino_email": destination}
+
+
+def build_teacher_report_message(
+    report: dict,
+    attachment: bytes,
+    *,
+    from_email: str | None,
+    to_email: str,
+    assunto: str | None = None,
+    mensagem: str | None = None,
+) -> EmailMessage:
+    from .pdf_service import format_date_br
+
+    professor = report["professor"]
+    periodo = report["periodo"]
     subject = str(assunto or "").strip() or (
         f"Relatorio individual - {professor['nome']} - "
-        f"{pdf_service.format_date_br(data_inicio)} a {pdf_service.format_date_br(data_fim)}"
+        f"{format_date_br(periodo['data_inicio'])} a "
+        f"{format_date_br(periodo['data_fim'])}"
     )
     body = str(mensagem or "").strip() or (
         "Segue em anexo o relatorio individual do periodo selecionado."
     )
-    _send_email_with_attachment(
-        to_email=destination,
-        subject=subject,
-        body=body,
-        attachment=pdf_service.generate_teacher_report_pdf(report),
-        filename=f"relatorio-professor-{int(professor_id)}.pdf",
+
+    message = EmailMessage()
+    if from_email:
+        message["From"] = from_email
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.set_content(body)
+    message.add_attachment(
+        attachment,
+        maintype="application",
+        subtype="pdf",
+        filename=f"relatorio-professor-{int(professor['id'])}.pdf",
     )
-    return {"mensagem": "Relatorio enviado com sucesso.", "destino_email": destination}
+    return message
 
 
-def _send_email_with_attachment(
-    *,
-    to_email: str,
-    subject: str,
-    body: str,
-    attachment: bytes,
-    filename: str,
-):
+def _smtp_settings() -> dict:
     host = os.getenv("SMTP_HOST", "").strip()
     if not host:
         raise HTTPException(
             503,
             "Envio de email nao configurado. Defina SMTP_HOST, SMTP_PORT e SMTP_FROM.",
         )
-    port = int(os.getenv("SMTP_PORT", "587") or 587)
     from_email = os.getenv("SMTP_FROM", "").strip() or os.getenv("SMTP_USER", "").strip()
     if not from_email:
         raise HTTPException(503, "Envio de email sem remetente configurado.")
+    return {
+        "host": host,
+        "port": int(os.getenv("SMTP_PORT", "587") or 587),
+        "from_email": from_email,
+        "user": os.getenv("SMTP_USER", "").strip(),
+        "password": os.getenv("SMTP_PASSWORD", "").strip(),
+        "use_tls": os.getenv("SMTP_TLS", "1").strip().lower() not in {"0", "false", "nao", "no"},
+    }
 
-    message = EmailMessage()
-    message["From"] = from_email
-    message["To"] = to_email
-    message["Subject"] = subject
-    message.set_content(body)
-    message.add_attachment(
-        attachment,
-        maintype="application",
-        subtype="pdf",
-        filename=filename,
-    )
 
-    user = os.getenv("SMTP_USER", "").strip()
-    password = os.getenv("SMTP_PASSWORD", "").strip()
-    use_tls = os.getenv("SMTP_TLS", "1").strip().lower() not in {"0", "false", "nao", "no"}
+class SmtpSession:
+    """Sessao SMTP reaproveitada entre varios envios, reconectando uma vez se o servidor cair."""
+
+    def __init__(self):
+        self.settings = _smtp_settings()
+        self._smtp: smtplib.SMTP | None = None
+
+    def __enter__(self) -> "SmtpSession":
+        self._connect()
+        return self
 
-    try:
-        with smtplib.SMTP(host, port, timeout=20) as smtp:
-            if use_tls:
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _connect(self) -> None:
+        settings = self.settings
+        try:
+            smtp = smtplib.SMTP(settings["host"], settings["port"], timeout=20)
+            if settings["use_tls"]:
                 smtp.starttls()
-            if user and password:
-                smtp.login(user, password)
-            smtp.send_message(message)
-    except OSError as exc:
-        raise HTTPException(502, "Falha ao enviar email pelo servidor SMTP.") from exc
+            if settings["user"] and settings["password"]:
+                smtp.login(settings["user"], settings["password"])
+        except OSError as exc:
+            raise HTTPException(502, "Falha ao enviar email pelo servidor SMTP.") from exc
+        self._smtp = smtp
+
+    def send(self, message: EmailMessage) -> None:
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connect()
+            try:
+                self._smtp.send_message(message)
+            except OSError as exc:
+                raise HTTPException(502, "Falha ao enviar email pelo servidor SMTP.") from exc
+        except smtplib.SMTPRecipientsRefused as exc:
+            raise HTTPException(400, "Servidor SMTP recusou o destinatario.") from exc
+        except OSError as exc:
+            raise HTTPException(502, "Falha ao enviar email pelo servidor SMTP.") from exc
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (OSError, smtplib.SMTPException):
+            smtp.close()
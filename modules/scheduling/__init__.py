@@ -1,5 +1,13 @@
 """Scheduling domain module."""
 
-from . import config, dependencies, models, policies, repository, router, schemas, service
+import importlib
 
 __all__ = ["config", "dependencies", "models", "policies", "repository", "router", "schemas", "service"]
+
+
+def __getattr__(name: str):
+    # Os workers chegam aqui via db.horario_escolar -> repository; o router
+    # (e o FastAPI) so carrega quando alguem o pede.
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,7 @@
 from datetime import datetime
 from sqlite3 import IntegrityError
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from auth import get_usuario_logado
 from modules.scheduling.school_schedule_data_service import (
@@ -65,6 +65,7 @@ from routers.common import (
     usuario_eh_gestor,
     usuario_eh_professor,
 )
+from services.catalogo_cache import responder_pacote
 
 router = APIRouter()
 
@@ -115,13 +116,8 @@ def _enriquecer_itens_para_usuario(itens: list[dict], usuario: dict) -> list[dic
     ]
 
 
-@router.get("/horario-escolar/contexto")
-def obter_contexto_horario_escolar_api(usuario=Depends(get_usuario_logado)):
-    _exigir_visualizacao_horario(usuario)
-    professores = listar_professores_agendamento()
+def _montar_contexto_horario_escolar(eh_gestor: bool, professor_logado_id: int | None) -> dict:
     anos = anos_letivos_sugeridos(listar_anos_letivos_horario_escolar())
-    eh_gestor = usuario_eh_gestor(usuario)
-    professor_logado_id = _id_professor_logado(usuario)
     configuracoes_aulas = normalize_schedule_entries(
         listar_configuracoes_aulas(incluir_inativas=False)
     )
@@ -132,13 +128,27 @@ def obter_contexto_horario_escolar_api(usuario=Depends(get_usuario_logado)):
         "grade_aulas": configuracoes_aulas,
         "turmas": listar_turmas_ativas(),
         "disciplinas": listar_disciplinas_ativas() if eh_gestor else [],
-        "professores": _serializar_contexto_professores(professores) if eh_gestor else [],
+        "professores": (
+            _serializar_contexto_professores(listar_professores_agendamento()) if eh_gestor else []
+        ),
         "modo_interface": "gestor" if eh_gestor else "professor",
         "permite_edicao": eh_gestor,
         "professor_logado_id": professor_logado_id,
     }
 
 
+@router.get("/horario-escolar/contexto")
+def obter_contexto_horario_escolar_api(request: Request, usuario=Depends(get_usuario_logado)):
+    _exigir_visualizacao_horario(usuario)
+    eh_gestor = usuario_eh_gestor(usuario)
+    professor_logado_id = _id_professor_logado(usuario)
+    return responder_pacote(
+        request,
+        ("horario_escolar_contexto", datetime.now().year, eh_gestor, professor_logado_id),
+        lambda: _montar_contexto_horario_escolar(eh_gestor, professor_logado_id),
+    )
+
+
 @router.get("/horario-escolar/minhas-proximas-aulas")
 def obter_proximas_aulas_professor_api(usuario=Depends(get_usuario_logado)):
     professor_id = _id_professor_logado(usuario)
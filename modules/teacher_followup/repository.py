@@ -1,6 +1,7 @@
 import json
 
 from db._proxy import get_database_attr
+from db.busca_textual import juncao_busca
 
 
 def _get_connection():
@@ -47,19 +48,21 @@ def _map_teacher(row) -> dict:
 
 def list_teachers(search: str = "", limit: int = 200) -> list[dict]:
     term = str(search or "").strip().lower()
-    params: list[object] = []
+    join_sql, params = juncao_busca("usuarios", term, coluna_id="u.id", colunas=("nome",))
     search_sql = ""
+    order_sql = ""
 
-    if term:
+    if join_sql:
         like = f"%{term}%"
         search_sql = """
             AND (
-                LOWER(COALESCE(u.nome, '')) LIKE ?
+                busca.id IS NOT NULL
                 OR LOWER(COALESCE(d.nome, '')) LIKE ?
                 OR LOWER(COALESCE(pc.disciplinas, '')) LIKE ?
             )
         """
-        params.extend([like, like, like])
+        order_sql = "MIN(busca.relevancia) IS NULL, MIN(busca.relevancia), "
+        params.extend([like, like])
 
     conn = _get_connection()
     try:
@@ -75,11 +78,12 @@ def list_teachers(search: str = "", limit: int = 200) -> list[dict]:
             LEFT JOIN professores_carga pc ON pc.usuario_id = u.id
             LEFT JOIN professores_turmas_disciplinas ptd ON ptd.professor_usuario_id = u.id
             LEFT JOIN disciplinas d ON d.id = ptd.disciplina_id
+            {join_sql}
             WHERE {_active_user_clause("u")}
               AND {_teacher_clause("u")}
               {search_sql}
             GROUP BY u.id
-            ORDER BY u.nome COLLATE NOCASE ASC, u.id ASC
+            ORDER BY {order_sql}u.nome COLLATE NOCASE ASC, u.id ASC
             LIMIT ?
             """,
             [*params, max(1, int(limit or 200))],
@@ -1,4 +1,5 @@
 from db.core import get_connection
+from security.token_cache import token_cache
 
 
 def email_belongs_to_another_user(email: str, user_id: int) -> bool:
@@ -275,6 +276,7 @@ def update_profile(
                 (name, email, user_id),
             )
         conn.commit()
+        token_cache.invalidate_user(user_id)
         return cursor.rowcount > 0
     finally:
         conn.close()
@@ -2,7 +2,7 @@ import re
 import unicodedata
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
 
 from auth import get_usuario_logado
 from modules.occurrences import service as occurrence_pre_registration_service
@@ -59,6 +59,7 @@ from db.ocorrencias import (
     listar_incisos,
     listar_leis,
     listar_ocorrencias,
+    listar_ocorrencias_pagina,
     listar_regimento_itens,
     remover_alinea,
     remover_artigo,
@@ -100,19 +101,20 @@ from models import (
     OcorrenciaProfessorVinculadoIn,
     OcorrenciaCreateIn,
     OcorrenciaOut,
+    OcorrenciaPaginaOut,
     OcorrenciaUpdateIn,
     RegimentoItemCreateIn,
     RegimentoItemOut,
     RegimentoItemStatusIn,
     RegimentoItemUpdateIn,
 )
+from services.catalogo_cache import responder_pacote
 from services.csv_import_service import importar_base_legal_arquivo, importar_estudantes_arquivo
 from services.ocorrencia_disciplina_service import (
     acao_permitida_para_tipo_registro,
     inferir_gravidade_ocorrencia,
     listar_acoes_aplicadas,
 )
-from services.ocorrencia_pdf_service import gerar_pdf_ocorrencia_registro
 from routers.common import normalizar_cargo_usuario, usuario_tem_acesso_coordenacao
 
 router = APIRouter()
@@ -834,9 +836,7 @@ def _ler_upload_base_legal(arquivo: UploadFile) -> tuple[bytes, str, str]:
     return conteudo, nome_arquivo, tipo_conteudo
 
 
-@router.get("/ocorrencias/opcoes")
-def listar_opcoes_ocorrencias(usuario=Depends(get_usuario_logado)):
-    _exigir_gestor(usuario)
+def _montar_opcoes_ocorrencias() -> dict:
     turmas = listar_turmas_ativas()
     professores = listar_professores_agendamento()
 
@@ -907,6 +907,12 @@ def listar_opcoes_ocorrencias(usuario=Depends(get_usuario_logado)):
     }
 
 
+@router.get("/ocorrencias/opcoes")
+def listar_opcoes_ocorrencias(request: Request, usuario=Depends(get_usuario_logado)):
+    _exigir_gestor(usuario)
+    return responder_pacote(request, ("ocorrencias_opcoes",), _montar_opcoes_ocorrencias)
+
+
 @router.get("/ocorrencias/busca/professores")
 def buscar_professores_ocorrencia_api(
     q: str = Query(default=""),
@@ -1035,18 +1041,15 @@ def criar_ocorrencia_api(payload: OcorrenciaCreateIn, usuario=Depends(get_usuari
     return _montar_resposta_ocorrencia(ocorrencia_id)
 
 
-@router.get("/ocorrencias", response_model=list[OcorrenciaOut])
-def listar_ocorrencias_api(
-    tipo_registro: str | None = Query(default=None),
-    status: str | None = Query(default=None),
-    turma_id: int | None = Query(default=None),
-    nome_estudante: str | None = Query(default=None),
-    data_inicial: str | None = Query(default=None),
-    data_final: str | None = Query(default=None),
-    usuario=Depends(get_usuario_logado),
-):
-    _exigir_gestor(usuario)
-
+def _filtros_listagem_ocorrencias(
+    tipo_registro: str | None,
+    status: str | None,
+    turma_id: int | None,
+    nome_estudante: str | None,
+    data_inicial: str | None,
+    data_final: str | None,
+    texto: str | None = None,
+) -> dict:
     status_filtro = None
     if status is not None and str(status).strip():
         status_filtro = _validar_status(status)
@@ -1064,14 +1067,58 @@ def listar_ocorrencias_api(
     if turma_id is not None:
         turma_id_filtro = _validar_turma_id(turma_id)
 
+    return {
+        "tipo_registro": tipo_registro_filtro,
+        "status": status_filtro,
+        "turma_id": turma_id_filtro,
+        "nome_estudante": str(nome_estudante or "").strip() or None,
+        "data_inicial": data_inicial_norm,
+        "data_final": data_final_norm,
+        "texto": str(texto or "").strip() or None,
+    }
+
+
+@router.get("/ocorrencias", response_model=list[OcorrenciaOut])
+def listar_ocorrencias_api(
+    tipo_registro: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    turma_id: int | None = Query(default=None),
+    nome_estudante: str | None = Query(default=None),
+    data_inicial: str | None = Query(default=None),
+    data_final: str | None = Query(default=None),
+    texto: str | None = Query(default=None, max_length=200),
+    usuario=Depends(get_usuario_logado),
+):
+    _exigir_gestor(usuario)
     return listar_ocorrencias(
-        tipo_registro=tipo_registro_filtro,
-        status=status_filtro,
-        turma_id=turma_id_filtro,
-        nome_estudante=str(nome_estudante or "").strip() or None,
-        data_inicial=data_inicial_norm,
-        data_final=data_final_norm,
+        **_filtros_listagem_ocorrencias(
+            tipo_registro, status, turma_id, nome_estudante, data_inicial, data_final, texto
+        )
+    )
+
+
+@router.get("/ocorrencias/pagina", response_model=OcorrenciaPaginaOut)
+def listar_ocorrencias_pagina_api(
+    tipo_registro: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    turma_id: int | None = Query(default=None),
+    nome_estudante: str | None = Query(default=None),
+    data_inicial: str | None = Query(default=None),
+    data_final: str | None = Query(default=None),
+    texto: str | None = Query(default=None, max_length=200),
+    limite: int = Query(default=50, ge=1, le=100),
+    cursor: str | None = Query(default=None, max_length=200),
+    usuario=Depends(get_usuario_logado),
+):
+    """Listagem paginada e resumida; o detalhe completo vem de ``/ocorrencias/{id}``."""
+    _exigir_gestor(usuario)
+    filtros = _filtros_listagem_ocorrencias(
+        tipo_registro, status, turma_id, nome_estudante, data_inicial, data_final, texto
     )
+    try:
+        return listar_ocorrencias_pagina(**filtros, limite=limite, cursor_pagina=cursor or None)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
 
 
 @router.get("/ocorrencias/{ocorrencia_id}", response_model=OcorrenciaOut)
@@ -1081,11 +1128,26 @@ def buscar_ocorrencia_api(ocorrencia_id: int, usuario=Depends(get_usuario_logado
 
 
 @router.get("/ocorrencias/{ocorrencia_id}/pdf")
-def gerar_pdf_ocorrencia_api(ocorrencia_id: int, usuario=Depends(get_usuario_logado)):
+def gerar_pdf_ocorrencia_api(
+    ocorrencia_id: int,
+    renderizacao: str | None = Query(default=None),
+    usuario=Depends(get_usuario_logado),
+):
     _exigir_gestor(usuario)
     ocorrencia = _montar_resposta_ocorrencia(ocorrencia_id)
     turma = buscar_turma_por_id(int(ocorrencia.get("turma_id") or 0))
-    pdf_bytes = gerar_pdf_ocorrencia_registro(ocorrencia, turma=turma)
+    # Pillow + ReportLab carregam no primeiro PDF, fora da partida da API.
+    from services.ocorrencia_pdf_service import gerar_pdf_ocorrencia_registro, resolver_modo_renderizacao
+
+    try:
+        modo_renderizacao = resolver_modo_renderizacao(renderizacao)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
+    pdf_bytes = gerar_pdf_ocorrencia_registro(
+        ocorrencia,
+        turma=turma,
+        modo_renderizacao=modo_renderizacao,
+    )
     nome_arquivo = _nome_arquivo_pdf_ocorrencia(ocorrencia)
     return Response(
         content=pdf_bytes,
@@ -21,7 +21,6 @@ from models import (
     PcpiTextoPreviewIn,
 )
 from routers.common import normalizar_cargo_usuario, usuario_tem_acesso_coordenacao
-from services.pcpi_pdf_service import gerar_pdf_texto_pcpi
 from services.pcpi_service import (
     TURNOS_PCPI_CONFIG,
     agendamento_pertence_ao_turno_pcpi,
@@ -402,6 +401,8 @@ def gerar_texto_pcpi_pdf_api(
 ):
     _exigir_gestor(usuario)
     dados_texto = gerar_texto_pcpi_preview_api(payload=payload, usuario=usuario)
+    from services.pcpi_pdf_service import gerar_pdf_texto_pcpi
+
     pdf_bytes = gerar_pdf_texto_pcpi(dados_texto)
     nome_arquivo = f"pcpi-{dados_texto['data']}-{dados_texto['turno'].lower()}.pdf"
     headers = {"Content-Disposition": f'attachment; filename="{nome_arquivo}"'}
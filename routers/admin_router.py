@@ -1,7 +1,7 @@
 import sqlite3
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 
 from auth import get_usuario_logado
 from db.catalogos import (
@@ -27,12 +27,12 @@ from db.docencia import (
 from db.impressao import (
     atualizar_regras_cota,
     atualizar_status_impressao,
-    calcular_cotas_mensais_professores,
     gerar_relatorio_impressao,
     gerar_relatorio_uso_recursos,
     gerar_relatorio_uso_recursos_por_professor,
     listar_historico,
     listar_jobs_ativos,
+    obter_distribuicao_cota_professores,
     obter_status_impressao,
     obter_regras_cota,
     recalcular_cotas_mes,
@@ -67,9 +67,11 @@ from modules.printing.service import (
     PrinterNotFoundError,
     create_registered_printer,
     delete_registered_printer,
+    get_formatted_print_status,
     list_registered_printers,
     update_registered_printer_status,
 )
+from modules.printing.policies import build_print_status_alert
 from models import (
     CoordenadorCreateIn,
     DisciplinaCreateIn,
@@ -91,6 +93,8 @@ from models import (
 from security.nt_hash import generate_nt_hash
 from services.atribuicoes_docentes_import_service import importar_atribuicoes_docentes_arquivo
 from services.auth_service import hash_senha
+from services.catalogo_cache import responder_pacote
+from services.realtime_events import publicar_status_impressao
 from modules.audit.models import AuditCategory, AuditOutcome
 from modules.audit.service import record_event
 
@@ -406,10 +410,12 @@ def atualizar_status_impressao_admin(
     usuario=Depends(get_usuario_logado),
 ):
     exigir_admin(usuario)
-    return atualizar_status_impressao(
+    status = atualizar_status_impressao(
         sem_papel=bool(payload.sem_papel),
         mensagem=payload.mensagem,
     )
+    publicar_status_impressao(build_print_status_alert(status))
+    return status
 
 
 @router.get("/admin/impressao/impressoras")
@@ -441,6 +447,7 @@ def atualizar_impressora_admin(
         update_registered_printer_status(printer_id, payload.active)
     except PrinterNotFoundError as exc:
         raise HTTPException(404, str(exc)) from exc
+    publicar_status_impressao(get_formatted_print_status())
     return {"mensagem": "Status da impressora atualizado."}
 
 
@@ -643,17 +650,22 @@ def atualizar_status_disciplina_admin(
     return {"mensagem": "Status da disciplina atualizado com sucesso."}
 
 
-@router.get("/admin/turmas-disciplinas/contexto")
-def listar_contexto_turmas_disciplinas_admin(usuario=Depends(get_usuario_logado)):
-    exigir_admin(usuario)
-    professores = listar_professores_agendamento()
+def _montar_contexto_turmas_disciplinas() -> dict:
     return {
-        "professores": _serializar_contexto_professores(professores),
+        "professores": _serializar_contexto_professores(listar_professores_agendamento()),
         "turmas": listar_turmas(incluir_inativas=True),
         "disciplinas": listar_disciplinas(incluir_inativas=True),
     }
 
 
+@router.get("/admin/turmas-disciplinas/contexto")
+def listar_contexto_turmas_disciplinas_admin(request: Request, usuario=Depends(get_usuario_logado)):
+    exigir_admin(usuario)
+    return responder_pacote(
+        request, ("admin_turmas_disciplinas_contexto",), _montar_contexto_turmas_disciplinas
+    )
+
+
 @router.get("/admin/turmas-disciplinas", response_model=list[TurmaDisciplinaOut])
 def listar_turmas_disciplinas_admin_api(
     turma_id: int | None = None,
@@ -722,17 +734,22 @@ def opcoes_professores_admin(usuario=Depends(get_usuario_logado)):
     return obter_opcoes_cadastro_professor()
 
 
-@router.get("/admin/atribuicoes-docentes/contexto")
-def listar_contexto_atribuicoes_docentes_admin(usuario=Depends(get_usuario_logado)):
-    exigir_admin(usuario)
-    professores = listar_professores_agendamento()
+def _montar_contexto_atribuicoes_docentes() -> dict:
     return {
-        "professores": _serializar_contexto_professores(professores),
+        "professores": _serializar_contexto_professores(listar_professores_agendamento()),
         "turmas": listar_turmas_ativas(),
         "disciplinas": listar_disciplinas_ativas(),
     }
 
 
+@router.get("/admin/atribuicoes-docentes/contexto")
+def listar_contexto_atribuicoes_docentes_admin(request: Request, usuario=Depends(get_usuario_logado)):
+    exigir_admin(usuario)
+    return responder_pacote(
+        request, ("admin_atribuicoes_docentes_contexto",), _montar_contexto_atribuicoes_docentes
+    )
+
+
 @router.get("/admin/atribuicoes-docentes", response_model=list[ProfessorTurmaDisciplinaOut])
 def listar_atribuicoes_docentes_admin_api(
     professor_id: int | None = None,
@@ -832,8 +849,10 @@ def listar_professores_painel(
     mes_referencia = validar_mes_referencia(mes) if mes else mes_atual_referencia()
     regras = obter_regras_cota()
     professores = listar_professores_admin(mes_referencia)
-    calculos = calcular_cotas_mensais_professores()
-    calculos_por_usuario = {int(calculo["usuario_id"]): calculo for calculo in calculos}
+    distribuicao = obter_distribuicao_cota_professores()
+    calculos_por_usuario = {
+        int(calculo["usuario_id"]): calculo for calculo in distribuicao["calculos"]
+    }
 
     for professor in professores:
         calculo_professor = calculos_por_usuario.get(int(professor["id"]), {})
@@ -843,6 +862,7 @@ def listar_professores_painel(
     return {
         "mes_referencia": mes_referencia,
         "regras_cota": regras,
+        "versao_cota": distribuicao["versao"],
         "professores": professores,
     }
 
@@ -1,9 +1,9 @@
 import sqlite3
 import logging
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import FileResponse, Response
 
 from auth import get_usuario_logado
@@ -47,7 +47,7 @@ from modules.audit.models import AuditCategory, AuditOutcome
 from modules.audit.service import record_event
 from modules.notifications.apc_integration import (
     cancel_apc_period,
-    sync_apc_period,
+    enqueue_apc_period,
 )
 from modules.printing.attachment_printing import imprimir_anexo_pdf
 from services.apc_service import (
@@ -81,8 +81,11 @@ from services.apc_recipient_service import (
     merge_recipient_options,
 )
 from services.apc_recipients import resolve_apc_recipients
+from services.catalogo_cache import responder_pacote
+from services.file_delivery import responder_arquivo
 from services.file_service import arquivo_suportado
 from services.horario_escolar_service import validar_ano_letivo
+from services.worker_wakeup import notificar_worker_preview_apc
 
 from .common import normalizar_cargo_usuario, usuario_eh_professor, usuario_tem_acesso_coordenacao
 from .config import APC_DIR, FORMATOS_UPLOAD_DESCRICAO
@@ -181,6 +184,7 @@ def _agendar_preview_apc(envio: dict):
             arquivo_path=str(envio.get("arquivo_path") or ""),
             arquivo_nome_original=str(envio.get("arquivo_nome_original") or ""),
         )
+        notificar_worker_preview_apc()
     except Exception:
         logger.exception("Falha ao agendar preview APC para envio %s", envio.get("id"))
 
@@ -352,12 +356,13 @@ def _obter_elegiveis_periodo(periodo: dict, professor_id: int | None = None) ->
     return resolve_apc_recipients(periodo, professor_id=professor_id)
 
 
-def _sync_notifications_safely(periodo_id: int):
+def _enfileirar_notificacoes_apc(periodo_id: int):
+    # O worker de notificacoes reconcilia a solicitacao fora da requisicao.
     try:
-        sync_apc_period(periodo_id)
+        enqueue_apc_period(periodo_id)
     except Exception:
         logger.exception(
-            "Falha ao sincronizar notificacoes da solicitacao APC %s", periodo_id
+            "Falha ao enfileirar notificacoes da solicitacao APC %s", periodo_id
         )
 
 
@@ -533,16 +538,15 @@ def _montar_resumo_gestao_apc(periodo: dict) -> dict:
     }
 
 
-@router.get("/apc/contexto")
-def obter_contexto_apc_api(usuario=Depends(get_usuario_logado)):
+def _montar_contexto_apc(hoje: date, usuario_contexto: dict) -> dict:
     anos_existentes = sorted(
         set(listar_anos_letivos_apc()) | set(listar_anos_letivos_horario_escolar())
     )
     return {
         "anos_letivos": contexto_apc_anos(anos_existentes),
-        "ano_letivo_atual": datetime.now().year,
-        "mes_atual": datetime.now().strftime("%Y-%m"),
-        "hoje": datetime.now().date().isoformat(),
+        "ano_letivo_atual": hoje.year,
+        "mes_atual": hoje.strftime("%Y-%m"),
+        "hoje": hoje.isoformat(),
         "publicos_alvo": [
             {
                 "valor": APC_PUBLICO_ALVO_TODOS_PROFESSORES,
@@ -571,14 +575,25 @@ def obter_contexto_apc_api(usuario=Depends(get_usuario_logado)):
                 "label": nome_tipo_entrega(APC_TIPO_ENTREGA_PROVA_BIMESTRAL),
             },
         ],
-        "usuario": {
-            "id": int(usuario["id"]),
-            "nome": str(usuario.get("nome") or "").strip(),
-            "cargo": normalizar_cargo_usuario(usuario),
-            "pode_gerir": _pode_gerir_apc(usuario),
-            "eh_professor": usuario_eh_professor(usuario),
-        },
+        "usuario": usuario_contexto,
+    }
+
+
+@router.get("/apc/contexto")
+def obter_contexto_apc_api(request: Request, usuario=Depends(get_usuario_logado)):
+    hoje = datetime.now().date()
+    usuario_contexto = {
+        "id": int(usuario["id"]),
+        "nome": str(usuario.get("nome") or "").strip(),
+        "cargo": normalizar_cargo_usuario(usuario),
+        "pode_gerir": _pode_gerir_apc(usuario),
+        "eh_professor": usuario_eh_professor(usuario),
     }
+    return responder_pacote(
+        request,
+        ("apc_contexto", hoje, *usuario_contexto.values()),
+        lambda: _montar_contexto_apc(hoje, usuario_contexto),
+    )
 
 
 @router.get("/apc/destinatarios/opcoes")
@@ -734,7 +749,7 @@ def criar_periodo_apc_api(payload: ApcPeriodoIn, usuario=Depends(get_usuario_log
             409,
             "Ja existe uma solicitacao semelhante cadastrada para essa data no ano letivo.",
         ) from exc
-    _sync_notifications_safely(int(periodo["id"]))
+    _enfileirar_notificacoes_apc(int(periodo["id"]))
     return enriquecer_periodo_apc(periodo)
 
 
@@ -775,7 +790,7 @@ def atualizar_periodo_apc_api(
 
     if not periodo:
         raise HTTPException(404, "Solicitacao de entrega nao encontrada.")
-    _sync_notifications_safely(periodo_id)
+    _enfileirar_notificacoes_apc(periodo_id)
     return enriquecer_periodo_apc(periodo)
 
 
@@ -907,6 +922,7 @@ def enviar_arquivo_apc_api(
 
     _remover_preview_cache_envio(int(envio["id"]))
     _agendar_preview_apc(envio)
+    _enfileirar_notificacoes_apc(periodo_id)
 
     record_event(
         category=AuditCategory.ATTACHMENTS,
@@ -1029,6 +1045,7 @@ def criar_atividade_apc_api(
 
     _remover_preview_cache_envio(int(envio["id"]))
     _agendar_preview_apc(envio)
+    _enfileirar_notificacoes_apc(periodo_id)
     record_event(
         category=AuditCategory.ATTACHMENTS,
         action="attachment.generated",
@@ -1124,6 +1141,7 @@ def excluir_envio_apc_api(envio_id: int, usuario=Depends(get_usuario_logado)):
 
     if not excluir_apc_envio(envio_id):
         raise HTTPException(404, "Envio nao encontrado.")
+    _enfileirar_notificacoes_apc(int(periodo["id"]))
 
     if caminho_arquivo:
         _remover_arquivo_se_existir(caminho_arquivo)
@@ -1132,7 +1150,11 @@ def excluir_envio_apc_api(envio_id: int, usuario=Depends(get_usuario_logado)):
 
 
 @router.get("/apc/envios/{envio_id}/arquivo")
-def baixar_arquivo_apc_api(envio_id: int, usuario=Depends(get_usuario_logado)):
+def baixar_arquivo_apc_api(
+    request: Request,
+    envio_id: int,
+    usuario=Depends(get_usuario_logado),
+):
     envio = buscar_apc_envio_por_id(envio_id)
     if not envio:
         raise HTTPException(404, "Envio nao encontrado.")
@@ -1143,9 +1165,10 @@ def baixar_arquivo_apc_api(envio_id: int, usuario=Depends(get_usuario_logado)):
 
     caminho = _resolver_caminho_envio_seguro(envio.get("arquivo_path"))
     media_type = str(envio.get("arquivo_tipo") or "").strip() or "application/octet-stream"
-    return FileResponse(
-        path=str(caminho),
-        filename=str(envio.get("arquivo_nome_original") or caminho.name),
+    return responder_arquivo(
+        caminho,
+        request=request,
+        nome_arquivo=str(envio.get("arquivo_nome_original") or caminho.name),
         media_type=media_type,
     )
 
@@ -1,12 +1,17 @@
+from __future__ import annotations
+
 import os
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from fastapi import Request
-from fastapi.templating import Jinja2Templates
 from modules.blog.config import BLOG_IMAGE_DIR
 
+if TYPE_CHECKING:
+    from fastapi import Request
+    from fastapi.templating import Jinja2Templates
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "static"
 TEMPLATES_DIR = BASE_DIR / "templates"
@@ -60,13 +65,31 @@ def _resolver_radius_internal_secret() -> str:
 
 
 RADIUS_INTERNAL_SECRET = _resolver_radius_internal_secret()
-templates = Jinja2Templates(
-    directory=[
-        str(TEMPLATES_DIR),
-        str(BASE_DIR / "modules" / "admin" / "templates"),
-    ]
-)
-templates.env.policies["json.dumps_kwargs"] = {"ensure_ascii": False}
+# ponytail: ambiente Jinja2 criado no primeiro render; os workers importam este
+# modulo so pelas constantes e nao precisam carregar FastAPI/Jinja2.
+_TEMPLATES: Jinja2Templates | None = None
+
+
+def _obter_templates() -> Jinja2Templates:
+    global _TEMPLATES
+    if _TEMPLATES is None:
+        from fastapi.templating import Jinja2Templates
+
+        templates = Jinja2Templates(
+            directory=[
+                str(TEMPLATES_DIR),
+                str(BASE_DIR / "modules" / "admin" / "templates"),
+            ]
+        )
+        templates.env.policies["json.dumps_kwargs"] = {"ensure_ascii": False}
+        _TEMPLATES = templates
+    return _TEMPLATES
+
+
+def __getattr__(nome: str):
+    if nome == "templates":
+        return _obter_templates()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 
 def render_template_response(
@@ -83,7 +106,7 @@ def render_template_response(
     root_path = str(request.scope.get("root_path", "")).rstrip("/")
     context["help_contexts_url"] = f"{root_path}/help/contexts.json"
 
-    response = templates.TemplateResponse(request, template_name, context)
+    response = _obter_templates().TemplateResponse(request, template_name, context)
     response.charset = "utf-8"
     if cache_control:
         response.headers["Cache-Control"] = cache_control
@@ -1,11 +1,11 @@
 from pydantic import BaseModel
 
-from fastapi import APIRouter, Depends, Header, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from starlette.background import BackgroundTask
 
 from auth import get_usuario_logado
 from services.auth_service import validar_token
+from services.file_delivery import responder_arquivo
 from services.youtube_download_jobs import (
     YoutubeDownloadJobNotFoundError,
     YoutubeDownloadJobNotReadyError,
@@ -93,6 +93,7 @@ def criar_ticket_download_api(job_id: str, usuario=Depends(get_usuario_logado)):
 
 @router.get("/download/jobs/{job_id}/arquivo")
 def baixar_arquivo_job_api(
+    request: Request,
     job_id: str,
     authorization: str | None = Header(None),
     ticket: str | None = None,
@@ -105,9 +106,10 @@ def baixar_arquivo_job_api(
     except YoutubeDownloadJobNotReadyError as exc:
         raise HTTPException(409, str(exc)) from exc
 
-    return FileResponse(
-        path=str(caminho),
-        filename=nome_arquivo,
+    return responder_arquivo(
+        caminho,
+        request=request,
+        nome_arquivo=nome_arquivo,
         media_type=media_type,
     )
 
@@ -123,9 +125,10 @@ def baixar_video_youtube(payload: YoutubeDownloadIn, _usuario=Depends(get_usuari
     except YoutubeDownloadError as exc:
         raise HTTPException(400, str(exc)) from exc
 
-    return FileResponse(
-        path=str(caminho),
-        filename=nome_arquivo,
+    return responder_arquivo(
+        caminho,
+        nome_arquivo=nome_arquivo,
         media_type=media_type,
         background=BackgroundTask(remover_arquivo_se_existir, caminho),
+        etag=False,
     )
@@ -0,0 +1,68 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from auth import get_usuario_logado
+from services.realtime_events import (
+    REALTIME_HEARTBEAT_SECONDS,
+    canal_eventos,
+    formatar_sse,
+)
+
+from .common import exigir_gestor, usuario_eh_gestor
+
+router = APIRouter()
+
+INTERVALO_RECONEXAO_MS = 5000
+
+
+async def _stream_eventos(request: Request, conexao):
+    try:
+        yield f"retry: {INTERVALO_RECONEXAO_MS}\n\n"
+        yield formatar_sse(
+            {
+                "tipo": "conectado",
+                "dados": {
+                    "conexao_id": conexao.id,
+                    "heartbeat_segundos": REALTIME_HEARTBEAT_SECONDS,
+                },
+            }
+        )
+        while True:
+            try:
+                mensagem = await asyncio.wait_for(
+                    conexao.fila.get(), timeout=REALTIME_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comentario SSE: mantem proxies e o navegador cientes da conexao.
+                yield ": ping\n\n"
+                continue
+            conexao.entregues += 1
+            yield formatar_sse(mensagem)
+    finally:
+        canal_eventos.desconectar(conexao)
+
+
+@router.get("/eventos")
+async def eventos(request: Request, usuario=Depends(get_usuario_logado)):
+    conexao = canal_eventos.conectar(usuario["id"], gestor=usuario_eh_gestor(usuario))
+    return StreamingResponse(
+        _stream_eventos(request, conexao),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache, no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/eventos/metricas")
+def metricas_eventos(usuario=Depends(get_usuario_logado)):
+    exigir_gestor(usuario)
+    return {
+        "resumo": canal_eventos.stats(),
+        "conexoes": canal_eventos.conexoes(),
+    }
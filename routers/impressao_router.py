@@ -1,8 +1,6 @@
 import logging
 from pathlib import Path
 
-from fastapi.responses import Response
-
 from modules.printing.config import DEFAULT_PRINTER_NAME, get_default_printer_name, get_spool_dir
 from modules.printing.dependencies import user_can_manage_prints, user_has_unlimited_quota
 from modules.printing.repository import (
@@ -38,6 +36,7 @@ from modules.printing.service import (
     read_reusable_job_pdf_content,
     reprint_job_from_history,
     resolve_job_pdf_path,
+    resolve_reusable_job_pdf,
     resolve_print_tags,
     sanitize_file_name,
     serialize_print_job,
@@ -45,6 +44,7 @@ from modules.printing.service import (
     validate_required_tags,
 )
 from services.cota_service import validar_e_consumir_cota
+from services.file_delivery import responder_arquivo
 from services.pdf_service import contar_paginas_pdf
 
 logger = logging.getLogger(__name__)
@@ -176,18 +176,19 @@ def criar_job_a_partir_pdf_pronto(
     )
 
 
-def preview_job_historico(job_id: int, usuario):
-    _job, _caminho_arquivo, conteudo_pdf = read_reusable_job_pdf_content(
+def preview_job_historico(job_id: int, usuario, request=None):
+    _job, caminho_arquivo = resolve_reusable_job_pdf(
         job_id=job_id,
         usuario=usuario,
         spool_dir=garantir_diretorio_spool(),
         buscar_job=buscar_job,
         usuario_pode_gerir_impressoes=user_can_manage_prints,
     )
-    return Response(
-        content=conteudo_pdf,
+    return responder_arquivo(
+        caminho_arquivo,
+        request=request,
         media_type="application/pdf",
-        headers={"Cache-Control": "no-store"},
+        cache_control="no-store",
     )
 
 
@@ -4,8 +4,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import Response
 
 from auth import get_usuario_logado
+from modules.reports import batch as reports_batch
 from modules.reports import service as reports_service
-from modules.reports.schemas import TeacherReportEmailIn
+from modules.reports.schemas import TeacherReportBatchIn, TeacherReportEmailIn
 
 from .common import usuario_tem_acesso_coordenacao, validar_data_agendamento
 
@@ -69,6 +70,38 @@ def relatorios_professores_api(usuario=Depends(get_usuario_logado)):
     return reports_service.list_teacher_report_recipients()
 
 
+@router.post("/api/relatorios/professores/lotes")
+def relatorios_professores_lote_api(
+    payload: TeacherReportBatchIn,
+    data_inicio: str | None = None,
+    data_fim: str | None = None,
+    usuario=Depends(get_usuario_logado),
+):
+    _exigir_acesso_relatorios(usuario)
+    inicio, fim = _resolver_periodo(data_inicio, data_fim)
+    return reports_batch.iniciar_lote(
+        inicio,
+        fim,
+        professor_ids=payload.professor_ids,
+        assunto=payload.assunto,
+        mensagem=payload.mensagem,
+        dry_run=payload.dry_run,
+        criado_por=int(usuario["id"]),
+    )
+
+
+@router.get("/api/relatorios/professores/lotes/{lote_id}")
+def relatorios_professores_lote_status_api(lote_id: int, usuario=Depends(get_usuario_logado)):
+    _exigir_acesso_relatorios(usuario)
+    return reports_batch.obter_lote(lote_id)
+
+
+@router.post("/api/relatorios/professores/lotes/{lote_id}/retomar")
+def relatorios_professores_lote_retomar_api(lote_id: int, usuario=Depends(get_usuario_logado)):
+    _exigir_acesso_relatorios(usuario)
+    return reports_batch.retomar_lote(lote_id)
+
+
 @router.get("/api/relatorios/professores/{professor_id}/resumo")
 def relatorio_professor_resumo_api(
     professor_id: int,
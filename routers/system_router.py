@@ -4,9 +4,15 @@ from fastapi import APIRouter, Depends, Header, Request
 from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 
 from auth import get_usuario_logado
+from db.connection_pool import pool_stats
 from db.core import get_connection
+from db.impressao import estatisticas_cache_cota
 from db.schema_migrations import get_pending_migration_names
 from models import RadiusEnsureNtHashIn
+from security.token_cache import token_cache
+from services.artifact_cache import cache_artefatos
+from services.office_converter import estatisticas_pool_conversao_office
+from services.realtime_events import canal_eventos
 from services.radius_service import ensure_nt_hash_for_radius
 
 from .common import (
@@ -64,6 +70,15 @@ def health(request: Request):
             "database": "ok",
             "migrations": "ok",
         },
+        "metrics": {
+            "token_cache": token_cache.stats(),
+            "db_pool": pool_stats(),
+            "office_converter": estatisticas_pool_conversao_office(),
+            "print_cache": cache_artefatos.stats(),
+            "realtime": canal_eventos.stats(),
+            "quota_cache": estatisticas_cache_cota(),
+            "boot_ms": getattr(request.app.state, "boot_timings_ms", None),
+        },
     }
 
     if isinstance(started_at, datetime):
@@ -0,0 +1,98 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Callable, Hashable
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default)).strip()), 0)
+    except ValueError:
+        return default
+
+
+TOKEN_CACHE_TTL_SECONDS = _env_int("TOKEN_CACHE_TTL_SECONDS", 30)
+TOKEN_CACHE_MAX_ENTRIES = _env_int("TOKEN_CACHE_MAX_ENTRIES", 2048)
+
+
+class TokenCache:
+    """LRU com TTL de token -> usuario autenticado.
+
+    Entradas sao invalidadas explicitamente nas escritas que mudam o usuario ou
+    revogam tokens; o TTL limita a defasagem entre processos uvicorn distintos.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = TOKEN_CACHE_TTL_SECONDS,
+        max_entries: int = TOKEN_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.ttl_seconds = max(float(ttl_seconds), 0.0)
+        self.max_entries = max(int(max_entries), 0)
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, int, dict]] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> dict | None:
+        if not self.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dict(entry[2])
+
+    def put(self, key: Hashable, usuario: dict) -> None:
+        if not self.enabled or not usuario:
+            return
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, int(usuario.get("id") or 0), dict(usuario))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, usuario_id: int) -> int:
+        usuario_id = int(usuario_id or 0)
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry[1] == usuario_id]
+            for key in keys:
+                del self._entries[key]
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+            }
+
+
+# ponytail: process-local like rate_limiter; each uvicorn worker keeps its own cache.
+token_cache = TokenCache()
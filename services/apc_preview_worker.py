@@ -1,17 +1,47 @@
+import atexit
 import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from pathlib import Path
 
 from db.apc import (
     buscar_apc_envio_por_id,
-    buscar_proximo_apc_preview_job,
     concluir_apc_preview_job,
     falhar_apc_preview_job,
-    marcar_apc_preview_job_processando,
+    reivindicar_proximo_apc_preview_job,
 )
 from routers.config import APC_DIR
 from services.apc_preview_service import gerar_preview_pdf_apc
+from services.office_converter import OFFICE_CONVERTER_POOL_SIZE
+from services.worker_wakeup import sinalizador_preview_apc
 
 logger = logging.getLogger(__name__)
+INTERVALO_POLLING_SEGUNDOS = 30
+
+
+def _resolver_concorrencia() -> int:
+    valor = os.getenv("APC_PREVIEW_WORKERS", "2").strip()
+    try:
+        concorrencia = int(valor)
+    except ValueError:
+        logger.warning("Valor invalido para APC_PREVIEW_WORKERS=%r; usando 2.", valor)
+        return 2
+    return max(concorrencia, 1)
+
+
+APC_PREVIEW_WORKERS = _resolver_concorrencia()
+# Com worker dedicado (apc_preview_worker_main.py) o worker de impressao nao gera previews.
+APC_PREVIEW_EXTERNAL_WORKER = os.getenv("APC_PREVIEW_EXTERNAL_WORKER", "").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+}
 
 
 def _diretorio_previews() -> Path:
@@ -26,34 +56,188 @@ def caminho_preview_apc(job: dict) -> Path:
     return _diretorio_previews() / f"apc_preview_{envio_id}_{job_id}.pdf"
 
 
+def gerar_arquivo_preview_apc(job: dict, envio: dict | None) -> str:
+    """Converte o anexo do envio e grava o PDF de preview; nao acessa o banco."""
+    if not envio:
+        raise RuntimeError("Envio APC nao encontrado para gerar preview.")
+
+    caminho_origem = Path(str(job.get("arquivo_path") or "")).resolve(strict=False)
+    caminho_envio = Path(str(envio.get("arquivo_path") or "")).resolve(strict=False)
+    if caminho_origem != caminho_envio:
+        raise RuntimeError("Arquivo do envio foi substituido antes da conversao.")
+    if not caminho_origem.exists() or not caminho_origem.is_file():
+        raise RuntimeError("Arquivo do envio nao encontrado para gerar preview.")
+
+    nome_arquivo = str(job.get("arquivo_nome_original") or caminho_origem.name)
+    conteudo_pdf = gerar_preview_pdf_apc(caminho_origem, nome_arquivo)
+    caminho_pdf = caminho_preview_apc(job)
+    caminho_pdf.write_bytes(conteudo_pdf)
+    return str(caminho_pdf)
+
+
+def _registrar_falha(job_id: int, exc: BaseException):
+    logger.warning("Falha ao gerar preview APC do job %s: %s", job_id, exc)
+    falhar_apc_preview_job(job_id, str(exc) or exc.__class__.__name__)
+
+
 def processar_proximo_apc_preview_job() -> bool:
-    job = buscar_proximo_apc_preview_job()
+    """Processa um preview na thread atual (uso pontual e testes)."""
+    job = reivindicar_proximo_apc_preview_job()
     if not job:
         return False
 
     job_id = int(job["id"])
-    if not marcar_apc_preview_job_processando(job_id):
-        return True
-
     try:
         envio = buscar_apc_envio_por_id(int(job["envio_id"]))
-        if not envio:
-            raise RuntimeError("Envio APC nao encontrado para gerar preview.")
-
-        caminho_origem = Path(str(job.get("arquivo_path") or "")).resolve(strict=False)
-        caminho_envio = Path(str(envio.get("arquivo_path") or "")).resolve(strict=False)
-        if caminho_origem != caminho_envio:
-            raise RuntimeError("Arquivo do envio foi substituido antes da conversao.")
-        if not caminho_origem.exists() or not caminho_origem.is_file():
-            raise RuntimeError("Arquivo do envio nao encontrado para gerar preview.")
-
-        nome_arquivo = str(job.get("arquivo_nome_original") or caminho_origem.name)
-        conteudo_pdf = gerar_preview_pdf_apc(caminho_origem, nome_arquivo)
-        caminho_pdf = caminho_preview_apc(job)
-        caminho_pdf.write_bytes(conteudo_pdf)
-        concluir_apc_preview_job(job_id, str(caminho_pdf))
-        return True
+        concluir_apc_preview_job(job_id, gerar_arquivo_preview_apc(job, envio))
     except Exception as exc:
-        logger.warning("Falha ao gerar preview APC do job %s: %s", job_id, exc)
-        falhar_apc_preview_job(job_id, str(exc))
-        return True
+        _registrar_falha(job_id, exc)
+    return True
+
+
+def _inicializar_processo_conversao():
+    # Cada processo do pool usa um perfil proprio e uma unica instancia LibreOffice quente.
+    from services.file_service import definir_perfil_libreoffice
+    from services.office_converter import configurar_pool_conversao_office
+
+    configurar_pool_conversao_office(min(OFFICE_CONVERTER_POOL_SIZE, 1))
+
+    perfil = tempfile.mkdtemp(prefix="apc-preview-lo-")
+    definir_perfil_libreoffice(perfil)
+    atexit.register(shutil.rmtree, perfil, True)
+
+
+def _criar_executor_processos(concorrencia: int):
+    return ProcessPoolExecutor(
+        max_workers=concorrencia,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_inicializar_processo_conversao,
+    )
+
+
+class PoolPreviewApc:
+    """Gera previews APC em paralelo, fora do processo que despacha impressao.
+
+    O laco principal reivindica jobs no banco (seguro com varios consumidores)
+    e entrega a conversao a um pool de processos com ``concorrencia`` slots.
+    Conclusao e falha sao gravadas pelo processo supervisor, que e acordado por
+    ``sinalizador_preview_apc`` quando um preview e agendado ou termina.
+    """
+
+    def __init__(self, concorrencia: int = APC_PREVIEW_WORKERS, criar_executor=None):
+        self.concorrencia = max(int(concorrencia), 1)
+        self._criar_executor = criar_executor or _criar_executor_processos
+        self._executor = None
+        self._em_andamento: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._ocioso = threading.Condition(self._lock)
+        self._concluidos = 0
+        self._falhas = 0
+
+    def _obter_executor(self):
+        if self._executor is None:
+            self._executor = self._criar_executor(self.concorrencia)
+        return self._executor
+
+    def lotado(self) -> bool:
+        with self._lock:
+            return len(self._em_andamento) >= self.concorrencia
+
+    def despachar(self) -> int:
+        despachados = 0
+        while not self.lotado():
+            job = reivindicar_proximo_apc_preview_job()
+            if not job:
+                break
+
+            job_id = int(job["id"])
+            try:
+                envio = buscar_apc_envio_por_id(int(job["envio_id"]))
+                futuro = self._obter_executor().submit(gerar_arquivo_preview_apc, job, envio)
+            except BrokenProcessPool as exc:
+                self._descartar_executor()
+                _registrar_falha(job_id, exc)
+                continue
+            except Exception as exc:
+                _registrar_falha(job_id, exc)
+                continue
+
+            with self._lock:
+                self._em_andamento[job_id] = futuro
+            futuro.add_done_callback(partial(self._finalizar, job_id))
+            despachados += 1
+        return despachados
+
+    def _finalizar(self, job_id: int, futuro: Future):
+        concluido = False
+        try:
+            caminho_pdf = futuro.result()
+            concluir_apc_preview_job(job_id, caminho_pdf)
+            concluido = True
+        except BrokenProcessPool as exc:
+            self._descartar_executor()
+            _registrar_falha(job_id, exc)
+        except Exception as exc:
+            _registrar_falha(job_id, exc)
+        finally:
+            with self._lock:
+                self._em_andamento.pop(job_id, None)
+                if concluido:
+                    self._concluidos += 1
+                else:
+                    self._falhas += 1
+                self._ocioso.notify_all()
+            sinalizador_preview_apc.notificar()
+
+    def _descartar_executor(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def aguardar_ociosos(self, timeout: float | None = None) -> bool:
+        with self._ocioso:
+            return self._ocioso.wait_for(lambda: not self._em_andamento, timeout)
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def resumo(self) -> dict:
+        with self._lock:
+            return {
+                "concorrencia": self.concorrencia,
+                "em_andamento": sorted(self._em_andamento),
+                "concluidos": self._concluidos,
+                "falhas": self._falhas,
+            }
+
+
+def apc_preview_worker_loop(pool: PoolPreviewApc | None = None):
+    pool = pool or PoolPreviewApc()
+    escutando_sinais = sinalizador_preview_apc.escutar()
+    logger.info(
+        "Worker de preview APC iniciado (processos: %s, despertar: %s, polling de seguranca: %ss)",
+        pool.concorrencia,
+        f"udp {sinalizador_preview_apc.porta}" if escutando_sinais else "somente local",
+        INTERVALO_POLLING_SEGUNDOS,
+    )
+
+    try:
+        while True:
+            try:
+                pool.despachar()
+            except Exception:
+                logger.exception("Falha inesperada ao despachar previews APC")
+            sinalizador_preview_apc.aguardar(INTERVALO_POLLING_SEGUNDOS)
+    finally:
+        pool.encerrar()
+
+
+def iniciar_preview_apc_em_thread() -> threading.Thread | None:
+    """Roda o pool de previews ao lado do worker de impressao, sem bloquea-lo."""
+    if APC_PREVIEW_EXTERNAL_WORKER:
+        return None
+    thread = threading.Thread(target=apc_preview_worker_loop, name="apc-preview", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,312 @@
+"""Cache por conteudo dos artefatos de impressao (PDF convertido, paginas, N-up).
+
+Arquivos ficam em ``PRINT_CACHE_DIR`` (padrao ``SPOOL_DIR/cache``) com nome
+derivado do SHA-256 do conteudo de origem. Reuso no spool e feito por hard
+link: reimpressoes e uploads repetidos apontam para o mesmo inode em vez de
+copiar o PDF. Apagar o arquivo do job (``KEEP_SPOOL_FILES=false``) ou a entrada
+do cache nao afeta o outro lado.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# Mude quando a conversao ou o layout gerarem saidas diferentes para a mesma entrada.
+VERSAO_ARTEFATOS = "1"
+TAMANHO_BLOCO_HASH = 1024 * 1024
+MAX_HASHES_MEMORIZADOS = 4096
+FRACAO_ALVO_LIMPEZA = 0.9
+
+
+def _env_int(nome: str, padrao: int) -> int:
+    valor = os.getenv(nome, str(padrao)).strip()
+    try:
+        return max(int(valor), 0)
+    except ValueError:
+        logger.warning("Valor invalido para %s=%r; usando %s.", nome, valor, padrao)
+        return padrao
+
+
+def _resolver_diretorio_cache() -> Path:
+    valor = os.getenv("PRINT_CACHE_DIR", "").strip()
+    if valor:
+        return Path(valor)
+    return Path(os.getenv("SPOOL_DIR", str(BASE_DIR / "spool"))) / "cache"
+
+
+PRINT_CACHE_MAX_MB = _env_int("PRINT_CACHE_MAX_MB", 1024)
+SPOOL_RETENTION_DAYS = _env_int("SPOOL_RETENTION_DAYS", 0)
+
+
+def vincular_arquivo(origem: Path, destino: Path) -> Path:
+    """Cria ``destino`` como hard link de ``origem``; copia se o link nao for possivel."""
+    try:
+        os.link(origem, destino)
+    except OSError:
+        shutil.copy2(origem, destino)
+    return destino
+
+
+def _adotar_arquivo(gerado: Path, destino: Path) -> None:
+    try:
+        os.replace(gerado, destino)
+    except OSError:
+        shutil.move(str(gerado), str(destino))
+
+
+class CacheArtefatos:
+    """Cache em disco, limitado por tamanho, dos artefatos de impressao.
+
+    Entradas sao tocadas (mtime) a cada reuso; a limpeza remove as menos
+    usadas ate voltar abaixo de ``max_bytes`` e, com ``retencao_dias`` > 0,
+    tudo que nao foi usado dentro da retencao do spool.
+    """
+
+    def __init__(
+        self,
+        diretorio: Path,
+        max_bytes: int,
+        retencao_dias: int = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max(int(max_bytes), 0)
+        self.retencao_dias = max(int(retencao_dias), 0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hashes: OrderedDict[tuple, str] = OrderedDict()
+        self._paginas: OrderedDict[str, int] = OrderedDict()
+        self._bytes_estimados: int | None = None
+        self._acertos = 0
+        self._faltas = 0
+        self._removidos = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.max_bytes > 0
+
+    def hash_arquivo(self, caminho: Path) -> str:
+        estado = os.stat(caminho)
+        chave = (estado.st_dev, estado.st_ino, estado.st_size, estado.st_mtime_ns)
+        with self._lock:
+            digest = self._hashes.get(chave)
+            if digest is not None:
+                self._hashes.move_to_end(chave)
+                return digest
+
+        sha = hashlib.sha256()
+        with open(caminho, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b""):
+                sha.update(bloco)
+        digest = sha.hexdigest()
+        self._memorizar_hash(chave, digest)
+        return digest
+
+    def _memorizar_hash(self, chave: tuple, digest: str) -> None:
+        with self._lock:
+            self._hashes[chave] = digest
+            while len(self._hashes) > MAX_HASHES_MEMORIZADOS:
+                self._hashes.popitem(last=False)
+
+    def registrar_hash(self, caminho: Path, digest: str) -> None:
+        """Memoriza o hash ja calculado por quem gravou o arquivo (ex.: upload)."""
+        try:
+            estado = os.stat(caminho)
+        except OSError:
+            return
+        self._memorizar_hash(
+            (estado.st_dev, estado.st_ino, estado.st_size, estado.st_mtime_ns), digest
+        )
+
+    def _caminho_conversao(self, hash_origem: str, extensao: str) -> Path:
+        extensao_limpa = str(extensao or "").lower().lstrip(".") or "bin"
+        return self.diretorio / "pdf" / f"{hash_origem}-{extensao_limpa}-v{VERSAO_ARTEFATOS}.pdf"
+
+    def _caminho_layout(
+        self, hash_pdf: str, paginas_por_folha: int, intervalo_paginas: str, orientacao: str
+    ) -> Path:
+        intervalo = hashlib.sha1(str(intervalo_paginas or "").strip().encode()).hexdigest()[:12]
+        orientacao_limpa = str(orientacao or "retrato").strip().lower() or "retrato"
+        return self.diretorio / "nup" / (
+            f"{hash_pdf}-{int(paginas_por_folha)}up-{orientacao_limpa}-{intervalo}"
+            f"-v{VERSAO_ARTEFATOS}.pdf"
+        )
+
+    def _obter(self, caminho: Path) -> Path | None:
+        try:
+            os.utime(caminho)
+        except FileNotFoundError:
+            with self._lock:
+                self._faltas += 1
+            return None
+        except OSError:
+            pass
+        with self._lock:
+            self._acertos += 1
+        return caminho
+
+    def _guardar(self, origem: Path, caminho_cache: Path) -> None:
+        try:
+            caminho_cache.parent.mkdir(parents=True, exist_ok=True)
+            temporario = caminho_cache.with_name(f".{uuid.uuid4().hex}.tmp")
+            vincular_arquivo(origem, temporario)
+            os.replace(temporario, caminho_cache)
+            tamanho = caminho_cache.stat().st_size
+        except OSError as exc:
+            logger.warning("Nao foi possivel guardar %s no cache de impressao: %s", origem, exc)
+            return
+        self._registrar_crescimento(tamanho)
+
+    def vincular_conversao(self, hash_origem: str, extensao: str, destino: Path) -> Path | None:
+        """Coloca em ``destino`` o PDF ja convertido desse conteudo, se existir."""
+        if not self.ativo:
+            return None
+        caminho_cache = self._obter(self._caminho_conversao(hash_origem, extensao))
+        if caminho_cache is None:
+            return None
+        try:
+            if destino.exists():
+                destino.unlink()
+            return vincular_arquivo(caminho_cache, destino)
+        except OSError as exc:
+            logger.warning("Falha ao reutilizar PDF convertido do cache: %s", exc)
+            return None
+
+    def guardar_conversao(self, hash_origem: str, extensao: str, caminho_pdf: Path) -> None:
+        if self.ativo:
+            self._guardar(Path(caminho_pdf), self._caminho_conversao(hash_origem, extensao))
+
+    def contar_paginas(self, caminho: Path, contar: Callable[[str], int]) -> int:
+        try:
+            digest = self.hash_arquivo(Path(caminho))
+        except OSError:
+            return contar(str(caminho))
+
+        with self._lock:
+            paginas = self._paginas.get(digest)
+            if paginas is not None:
+                self._paginas.move_to_end(digest)
+                return paginas
+
+        paginas = contar(str(caminho))
+        with self._lock:
+            self._paginas[digest] = paginas
+            while len(self._paginas) > MAX_HASHES_MEMORIZADOS:
+                self._paginas.popitem(last=False)
+        return paginas
+
+    def obter_layout_nup(
+        self,
+        caminho_origem: Path,
+        paginas_por_folha: int,
+        intervalo_paginas: str,
+        orientacao: str,
+        gerar: Callable[..., Path],
+    ) -> tuple[Path, bool]:
+        """Devolve ``(caminho, temporario)``; ``temporario`` indica arquivo fora do cache."""
+        parametros = {
+            "caminho_origem": caminho_origem,
+            "paginas_por_folha": paginas_por_folha,
+            "intervalo_paginas": intervalo_paginas,
+            "orientacao": orientacao,
+        }
+        if not self.ativo:
+            return gerar(**parametros), True
+
+        caminho_cache = self._caminho_layout(
+            self.hash_arquivo(caminho_origem), paginas_por_folha, intervalo_paginas, orientacao
+        )
+        if self._obter(caminho_cache) is not None:
+            return caminho_cache, False
+
+        gerado = gerar(**parametros)
+        try:
+            caminho_cache.parent.mkdir(parents=True, exist_ok=True)
+            _adotar_arquivo(gerado, caminho_cache)
+        except OSError as exc:
+            logger.warning("Nao foi possivel guardar layout N-up no cache: %s", exc)
+            return gerado, True
+        self._registrar_crescimento(caminho_cache.stat().st_size)
+        return caminho_cache, False
+
+    def _registrar_crescimento(self, tamanho: int) -> None:
+        with self._lock:
+            if self._bytes_estimados is not None:
+                self._bytes_estimados += tamanho
+            precisa_limpar = (
+                self._bytes_estimados is None or self._bytes_estimados > self.max_bytes
+            )
+        if precisa_limpar:
+            self.limpar()
+
+    def _listar_entradas(self) -> list[tuple[float, int, Path]]:
+        entradas = []
+        if not self.diretorio.exists():
+            return entradas
+        for caminho in self.diretorio.rglob("*.pdf"):
+            try:
+                estado = caminho.stat()
+            except OSError:
+                continue
+            entradas.append((estado.st_mtime, estado.st_size, caminho))
+        return entradas
+
+    def limpar(self) -> int:
+        """Remove entradas expiradas pela retencao e as menos usadas acima do limite."""
+        entradas = sorted(self._listar_entradas())
+        limite_mtime = (
+            self._clock() - self.retencao_dias * 86400 if self.retencao_dias > 0 else None
+        )
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        alvo = int(self.max_bytes * FRACAO_ALVO_LIMPEZA)
+        removidos = 0
+
+        for mtime, tamanho, caminho in entradas:
+            expirado = limite_mtime is not None and mtime <= limite_mtime
+            if not expirado and total <= alvo:
+                continue
+            try:
+                caminho.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning("Nao foi possivel remover %s do cache de impressao: %s", caminho, exc)
+                continue
+            total -= tamanho
+            removidos += 1
+
+        with self._lock:
+            self._bytes_estimados = total
+            self._removidos += removidos
+        return removidos
+
+    def stats(self) -> dict:
+        with self._lock:
+            consultas = self._acertos + self._faltas
+            return {
+                "ativo": self.ativo,
+                "max_bytes": self.max_bytes,
+                "bytes_estimados": self._bytes_estimados,
+                "acertos": self._acertos,
+                "faltas": self._faltas,
+                "removidos": self._removidos,
+                "hit_ratio": round(self._acertos / consultas, 4) if consultas else 0.0,
+            }
+
+
+# ponytail: in-memory hash/page memo is per process; API and worker share the files on disk.
+cache_artefatos = CacheArtefatos(
+    _resolver_diretorio_cache(),
+    max_bytes=PRINT_CACHE_MAX_MB * 1024 * 1024,
+    retencao_dias=SPOOL_RETENTION_DAYS,
+)
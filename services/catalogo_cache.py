@@ -0,0 +1,88 @@
+"""Pacotes de opcoes montados uma vez por versao do catalogo e servidos com ETag.
+
+As telas de ocorrencias, APC, horario escolar e cadastros administrativos
+abrem com um pacote de opcoes (turmas, professores, disciplinas, base legal,
+grade de aulas) que custa varias consultas para montar. Aqui o pacote fica em
+memoria ja serializado, junto com a versao do catalogo em que foi montado
+(``db.catalogo_versao``): enquanto a versao nao muda, cada requisicao custa
+uma leitura de uma linha, e o navegador que ja tem o ETag recebe 304.
+
+A chave identifica a rota e tudo que varia por requisicao (perfil do usuario,
+data corrente); o que vem do banco precisa estar coberto pelos gatilhos de
+``TABELAS_CATALOGO``, senao o pacote fica velho ate a proxima alteracao.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from db.catalogos import obter_versao_catalogo
+from services.file_delivery import CACHE_CONTROL_PRIVADO, etag_confere
+
+_MAX_PACOTES = 512
+
+
+@dataclass(frozen=True)
+class PacoteCatalogo:
+    versao: tuple[str, int]
+    corpo: bytes
+    etag: str
+
+
+# ponytail: pacotes serializados por chave (rota, variante), em ordem LRU.
+_PACOTES: "OrderedDict[Hashable, PacoteCatalogo]" = OrderedDict()
+_LOCK = threading.Lock()
+# Uma montagem por vez: requisicoes que chegam juntas logo apos uma alteracao
+# esperam a primeira e reaproveitam o pacote em vez de repetir as consultas.
+_LOCK_MONTAGEM = threading.Lock()
+
+
+def _pacote_em_cache(chave: Hashable, versao: tuple[str, int]) -> PacoteCatalogo | None:
+    with _LOCK:
+        pacote = _PACOTES.get(chave)
+        if pacote is None or pacote.versao != versao:
+            return None
+        _PACOTES.move_to_end(chave)
+        return pacote
+
+
+def pacote_catalogo(chave: Hashable, montar: Callable[[], Any]) -> PacoteCatalogo:
+    # A versao e lida antes de montar: uma escrita concorrente deixa o pacote
+    # registrado na versao anterior e a proxima requisicao monta de novo.
+    versao = obter_versao_catalogo()
+    pacote = _pacote_em_cache(chave, versao)
+    if pacote is not None:
+        return pacote
+
+    with _LOCK_MONTAGEM:
+        pacote = _pacote_em_cache(chave, versao)
+        if pacote is not None:
+            return pacote
+        corpo = bytes(JSONResponse(jsonable_encoder(montar())).body)
+        pacote = PacoteCatalogo(
+            versao=versao,
+            corpo=corpo,
+            etag=f'"{hashlib.sha256(corpo).hexdigest()}"',
+        )
+        with _LOCK:
+            _PACOTES[chave] = pacote
+            _PACOTES.move_to_end(chave)
+            while len(_PACOTES) > _MAX_PACOTES:
+                _PACOTES.popitem(last=False)
+    return pacote
+
+
+def responder_pacote(request: Request, chave: Hashable, montar: Callable[[], Any]) -> Response:
+    """Resposta JSON do pacote ``chave``, ou 304 se ``If-None-Match`` ja tem o ETag."""
+    pacote = pacote_catalogo(chave, montar)
+    cabecalhos = {"ETag": pacote.etag, "Cache-Control": CACHE_CONTROL_PRIVADO}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_confere(if_none_match, pacote.etag):
+        return Response(status_code=304, headers=cabecalhos)
+    return Response(pacote.corpo, headers=cabecalhos, media_type="application/json")
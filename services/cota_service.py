@@ -1,18 +1,17 @@
 from datetime import datetime
 from db.impressao import (
-    buscar_cota,
-    criar_cota,
-    consumir_cota,
     buscar_cota_do_usuario,
     calcular_limite_cota_usuario,
+    garantir_cota_mes,
+    reservar_paginas_cota,
 )
 
 LIMITE_PADRAO = 100
 
 
-def _obter_limite_usuario(usuario_id: int) -> int:
+def _obter_limite_usuario(usuario_id: int, mes: str | None = None) -> int:
     try:
-        limite = int(calcular_limite_cota_usuario(usuario_id))
+        limite = int(calcular_limite_cota_usuario(usuario_id, mes))
         return max(limite, 0)
     except Exception:
         return LIMITE_PADRAO
@@ -21,26 +20,13 @@ def _obter_limite_usuario(usuario_id: int) -> int:
 def validar_e_consumir_cota(usuario_id: int, paginas: int):
     mes_atual = datetime.now().strftime("%Y-%m")
 
-    cota = buscar_cota(usuario_id, mes_atual)
-
-    if not cota:
-        criar_cota(usuario_id, mes_atual, _obter_limite_usuario(usuario_id))
-        cota = buscar_cota(usuario_id, mes_atual)
-
-        if not cota:
-            # erro grave de banco
-            raise Exception("Erro ao criar cota")
-
-    limite = int(cota["limite_paginas"])
-    usadas = int(cota["usadas_paginas"])
-
-    restante = limite - usadas
-
-    if paginas > restante:
-        return False, restante
-
-    consumir_cota(cota["id"], paginas)
-    return True, restante - paginas
+    resultado = reservar_paginas_cota(
+        usuario_id,
+        mes_atual,
+        paginas,
+        resolver_limite=lambda: _obter_limite_usuario(usuario_id, mes_atual),
+    )
+    return resultado["autorizado"], resultado["restante"]
 
 
 def obter_cota_atual(usuario_id: int):
@@ -49,8 +35,11 @@ def obter_cota_atual(usuario_id: int):
     cota = buscar_cota_do_usuario(usuario_id, mes_atual)
 
     if not cota:
-        criar_cota(usuario_id, mes_atual, _obter_limite_usuario(usuario_id))
-        cota = buscar_cota_do_usuario(usuario_id, mes_atual)
+        cota = garantir_cota_mes(
+            usuario_id,
+            mes_atual,
+            lambda: _obter_limite_usuario(usuario_id, mes_atual),
+        )
 
     restante = cota["limite_paginas"] - cota["usadas_paginas"]
 
@@ -0,0 +1,127 @@
+"""Entrega de arquivos grandes com ETag forte, Range e repasse ao Nginx.
+
+Todos os endpoints que devolvem arquivos do disco (videos baixados, anexos da
+APC, PDFs do historico de impressao, imagens do blog) passam por
+``responder_arquivo``:
+
+- o ETag e o SHA-256 do conteudo, memorizado por inode/tamanho/mtime em
+  ``cache_artefatos``; ``If-None-Match`` igual responde 304 sem corpo
+  (``etag=False`` dispensa o hash em arquivos temporarios de uso unico);
+- ``Range``/``If-Range`` ficam com o ``FileResponse`` do Starlette, entao
+  avancar um video ou retomar um download transfere so o trecho pedido;
+- com ``X_ACCEL_REDIRECT_MAP`` configurado, arquivos sob as raizes mapeadas
+  saem pelo Nginx (``X-Accel-Redirect``), que usa ``sendfile`` e atende Range
+  sem passar os bytes pelo processo Python.
+"""
+
+import logging
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from services.artifact_cache import cache_artefatos
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL_PRIVADO = "private, no-cache"
+
+
+def _resolver_mapa_x_accel() -> list[tuple[Path, str]]:
+    """Le ``X_ACCEL_REDIRECT_MAP`` no formato ``/raiz=/prefixo-interno,...``."""
+    valor_bruto = str(os.getenv("X_ACCEL_REDIRECT_MAP", "") or "").strip()
+    mapa = []
+    for item in valor_bruto.split(","):
+        raiz, separador, prefixo = item.strip().partition("=")
+        if not separador or not raiz.strip() or not prefixo.strip().startswith("/"):
+            if item.strip():
+                logger.warning("Entrada invalida em X_ACCEL_REDIRECT_MAP: %r", item.strip())
+            continue
+        mapa.append((Path(raiz.strip()).expanduser().resolve(), "/" + prefixo.strip().strip("/")))
+    # Raizes mais especificas primeiro, para SPOOL_DIR/apc vencer SPOOL_DIR.
+    return sorted(mapa, key=lambda item: len(item[0].parts), reverse=True)
+
+
+X_ACCEL_REDIRECT_MAP = _resolver_mapa_x_accel()
+
+
+def etag_arquivo(caminho: Path) -> str:
+    return f'"{cache_artefatos.hash_arquivo(caminho)}"'
+
+
+def etag_confere(if_none_match: str, etag: str) -> bool:
+    for candidato in if_none_match.split(","):
+        valor = candidato.strip()
+        if valor == "*" or valor.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _uri_x_accel(caminho: Path) -> str | None:
+    if not X_ACCEL_REDIRECT_MAP:
+        return None
+    caminho_real = caminho.resolve()
+    for raiz, prefixo in X_ACCEL_REDIRECT_MAP:
+        try:
+            relativo = caminho_real.relative_to(raiz)
+        except ValueError:
+            continue
+        return f"{prefixo}/{quote(relativo.as_posix())}"
+    return None
+
+
+def _content_disposition(nome_arquivo: str, disposicao: str) -> str:
+    nome_codificado = quote(nome_arquivo)
+    if nome_codificado != nome_arquivo:
+        return f"{disposicao}; filename*=utf-8''{nome_codificado}"
+    return f'{disposicao}; filename="{nome_arquivo}"'
+
+
+def responder_arquivo(
+    caminho: Path | str,
+    *,
+    request: Request | None = None,
+    nome_arquivo: str | None = None,
+    media_type: str = "application/octet-stream",
+    disposicao: str = "attachment",
+    cache_control: str = CACHE_CONTROL_PRIVADO,
+    headers: dict[str, str] | None = None,
+    background=None,
+    etag: bool = True,
+) -> Response:
+    caminho = Path(caminho)
+    # ``etag=False`` e para arquivos de uso unico (apagados logo apos a
+    # entrega): nenhum pedido condicional volta a eles, entao ler o arquivo
+    # inteiro para o hash so atrasaria o primeiro byte.
+    try:
+        estado = caminho.stat()
+        valor_etag = etag_arquivo(caminho) if etag else None
+    except OSError as exc:
+        raise HTTPException(404, "Arquivo nao encontrado.") from exc
+
+    cabecalhos = {"Cache-Control": cache_control, **(headers or {})}
+    if valor_etag is not None:
+        cabecalhos["ETag"] = valor_etag
+    if nome_arquivo is not None:
+        cabecalhos.setdefault("Content-Disposition", _content_disposition(nome_arquivo, disposicao))
+
+    if_none_match = request.headers.get("if-none-match") if request is not None else None
+    if valor_etag is not None and if_none_match and etag_confere(if_none_match, valor_etag):
+        return Response(status_code=304, headers=cabecalhos, background=background)
+
+    # Com tarefa de fundo (ex.: apagar o arquivo), o Nginx leria o arquivo
+    # depois de apagado; nesse caso o proprio processo entrega.
+    uri_interna = _uri_x_accel(caminho) if background is None else None
+    if uri_interna is not None:
+        cabecalhos["X-Accel-Redirect"] = uri_interna
+        return Response(status_code=200, headers=cabecalhos, media_type=media_type)
+
+    return FileResponse(
+        path=str(caminho),
+        headers=cabecalhos,
+        media_type=media_type,
+        background=background,
+        stat_result=estado,
+    )
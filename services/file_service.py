@@ -3,6 +3,14 @@ import shutil
 import os
 from pathlib import Path
 
+from services.artifact_cache import cache_artefatos
+from services.office_converter import (
+    ConversaoOfficeIndisponivel,
+    ModuloUnoIndisponivel,
+    desativar_pool_conversao_office,
+    obter_pool_conversao_office,
+)
+
 SUPPORTED_UPLOAD_EXTENSIONS = {".pdf", ".docx", ".doc", ".png", ".jpg", ".jpeg"}
 OFFICE_EXTENSIONS = {".docx", ".doc"}
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
@@ -10,6 +18,9 @@ SOFFICE_TIMEOUT_SECONDS = 120
 PDF_RESOLUTION_DPI = 300
 A4_RETRATO_PIXELS_300_DPI = (2480, 3508)
 A4_PAISAGEM_PIXELS_300_DPI = (3508, 2480)
+# Perfil proprio evita que conversoes paralelas (processos distintos) disputem
+# o perfil padrao do usuario, o que faz o soffice falhar ou delegar a outra instancia.
+PERFIL_LIBREOFFICE_DIR = os.getenv("LIBREOFFICE_PROFILE_DIR", "").strip()
 SOFFICE_PATHS_COMUNS = (
     "/Applications/LibreOffice.app/Contents/MacOS/soffice",
     "/usr/bin/soffice",
@@ -33,13 +44,34 @@ def converter_para_pdf(caminho_origem: Path, extensao: str) -> Path:
     if extensao_limpa == ".pdf":
         return caminho_origem
     if extensao_limpa in OFFICE_EXTENSIONS:
-        return converter_office_para_pdf(caminho_origem)
+        return _converter_com_cache(caminho_origem, extensao_limpa, converter_office_para_pdf)
     if extensao_limpa in IMAGE_EXTENSIONS:
-        return converter_imagem_para_pdf(caminho_origem)
+        return _converter_com_cache(caminho_origem, extensao_limpa, converter_imagem_para_pdf)
 
     raise ValueError("Formato de arquivo não suportado para impressão.")
 
 
+def _converter_com_cache(caminho_origem: Path, extensao: str, converter) -> Path:
+    if not cache_artefatos.ativo:
+        return converter(caminho_origem)
+
+    hash_origem = cache_artefatos.hash_arquivo(caminho_origem)
+    reaproveitado = cache_artefatos.vincular_conversao(
+        hash_origem, extensao, caminho_origem.with_suffix(".pdf")
+    )
+    if reaproveitado is not None:
+        return reaproveitado
+
+    caminho_pdf = converter(caminho_origem)
+    cache_artefatos.guardar_conversao(hash_origem, extensao, caminho_pdf)
+    return caminho_pdf
+
+
+def definir_perfil_libreoffice(diretorio: str | Path | None):
+    global PERFIL_LIBREOFFICE_DIR
+    PERFIL_LIBREOFFICE_DIR = str(diretorio or "").strip()
+
+
 def _descobrir_comando_soffice() -> str | None:
     comando_env = os.getenv("LIBREOFFICE_COMMAND", "").strip()
     if comando_env:
@@ -75,8 +107,31 @@ def converter_office_para_pdf(caminho_origem: Path) -> Path:
     if caminho_destino.exists():
         caminho_destino.unlink()
 
-    cmd = [
-        comando_soffice,
+    pool = obter_pool_conversao_office(comando_soffice)
+    if pool is not None:
+        try:
+            pool.converter(caminho_origem, caminho_destino, timeout=SOFFICE_TIMEOUT_SECONDS)
+        except ModuloUnoIndisponivel as exc:
+            desativar_pool_conversao_office(str(exc))
+        except ConversaoOfficeIndisponivel:
+            # Falha ao subir uma instancia: so este pedido vai a frio; o pool
+            # tenta de novo depois da espera de reinicio.
+            pass
+        else:
+            if not caminho_destino.exists():
+                raise RuntimeError("Conversão de DOC/DOCX finalizou sem gerar PDF.")
+            return caminho_destino
+
+    return _converter_office_para_pdf_subprocesso(comando_soffice, caminho_origem, caminho_destino)
+
+
+def _converter_office_para_pdf_subprocesso(
+    comando_soffice: str, caminho_origem: Path, caminho_destino: Path
+) -> Path:
+    cmd = [comando_soffice]
+    if PERFIL_LIBREOFFICE_DIR:
+        cmd.append(f"-env:UserInstallation={Path(PERFIL_LIBREOFFICE_DIR).resolve().as_uri()}")
+    cmd += [
         "--headless",
         "--nologo",
         "--convert-to",
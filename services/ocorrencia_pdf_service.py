@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import io
+import logging
+import os
 import re
 from dataclasses import dataclass
 from datetime import UTC, datetime
@@ -8,18 +10,49 @@ from html.parser import HTMLParser
 from pathlib import Path
 
 from PIL import Image, ImageDraw, ImageFont, ImageOps
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+from reportlab.pdfgen import canvas
 from services.ocorrencia_disciplina_service import (
     inferir_gravidade_ocorrencia,
     rotulo_acao_ocorrencia,
     rotulo_gravidade_ocorrencia,
 )
 
+logger = logging.getLogger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "static"
 LOGO_ESCOLA_PATH = STATIC_DIR / "img" / "logo_escola.PNG"
 
 PDF_RESOLUTION_DPI = 300
 A4_RETRATO_PIXELS_300_DPI = (2480, 3508)
+PONTOS_POR_PIXEL = 72 / PDF_RESOLUTION_DPI
+
+# "vetorial" gera texto selecionavel com reportlab; "raster" mantem as paginas
+# como imagens de 300 DPI. O layout (medidas e quebras) e o mesmo nos dois.
+MODO_RENDERIZACAO_VETORIAL = "vetorial"
+MODO_RENDERIZACAO_RASTER = "raster"
+MODOS_RENDERIZACAO = (MODO_RENDERIZACAO_VETORIAL, MODO_RENDERIZACAO_RASTER)
+
+
+def _resolver_modo_renderizacao_padrao() -> str:
+    valor = os.getenv("OCORRENCIA_PDF_RENDERER", "").strip().lower()
+    if not valor:
+        return MODO_RENDERIZACAO_VETORIAL
+    if valor not in MODOS_RENDERIZACAO:
+        logger.warning(
+            "Valor invalido para OCORRENCIA_PDF_RENDERER=%r; usando %s.",
+            valor,
+            MODO_RENDERIZACAO_VETORIAL,
+        )
+        return MODO_RENDERIZACAO_VETORIAL
+    return valor
+
+
+MODO_RENDERIZACAO_PADRAO = _resolver_modo_renderizacao_padrao()
+FONTE_VETORIAL_FALLBACK = "Times-Roman"
 
 COR_FUNDO = (255, 255, 255)
 COR_TEXTO = (0, 0, 0)
@@ -880,9 +913,9 @@ class _RenderizadorRegistroOcorrencia:
         self.turma = turma or {}
         self.fontes = _carregar_fontes()
         self.logo = _carregar_logo()
-        self.paginas: list[Image.Image] = []
-        self.pagina_atual: Image.Image | None = None
-        self.draw: ImageDraw.ImageDraw | None = None
+        self.paginas: list = []
+        self.pagina_atual = None
+        self.draw = None
         self.y = 0
         self._nova_pagina(continuacao=False)
 
@@ -934,9 +967,15 @@ class _RenderizadorRegistroOcorrencia:
     def limite_pagina_util(self) -> int:
         return self.altura - MARGEM_BASE
 
-    def _nova_pagina(self, *, continuacao: bool):
+    def _criar_pagina(self):
         pagina = Image.new("RGB", A4_RETRATO_PIXELS_300_DPI, COR_FUNDO)
-        draw = ImageDraw.Draw(pagina)
+        return pagina, ImageDraw.Draw(pagina)
+
+    def _superficie_da_pagina(self, pagina):
+        return ImageDraw.Draw(pagina)
+
+    def _nova_pagina(self, *, continuacao: bool):
+        pagina, draw = self._criar_pagina()
         self.paginas.append(pagina)
         self.pagina_atual = pagina
         self.draw = draw
@@ -1712,7 +1751,7 @@ class _RenderizadorRegistroOcorrencia:
     def _desenhar_numeracao_paginas(self):
         total = len(self.paginas)
         for indice, pagina in enumerate(self.paginas, start=1):
-            draw = ImageDraw.Draw(pagina)
+            draw = self._superficie_da_pagina(pagina)
             texto = f"Página {indice}/{total}"
             bbox = draw.textbbox((0, 0), texto, font=self.fontes.rodape)
             largura = bbox[2] - bbox[0]
@@ -1794,7 +1833,9 @@ class _RenderizadorRegistroOcorrencia:
             self._desenhar_linha()
 
         self._desenhar_rodape()
+        return self._exportar_pdf()
 
+    def _exportar_pdf(self) -> bytes:
         saida = io.BytesIO()
         primeira, *restantes = self.paginas
         primeira.save(
@@ -1807,6 +1848,181 @@ class _RenderizadorRegistroOcorrencia:
         return saida.getvalue()
 
 
-def gerar_pdf_ocorrencia_registro(ocorrencia: dict, *, turma: dict | None = None) -> bytes:
-    renderizador = _RenderizadorRegistroOcorrencia(ocorrencia, turma=turma)
+def _nome_fonte_vetorial(fonte: ImageFont.ImageFont) -> str:
+    caminho = getattr(fonte, "path", None)
+    if not isinstance(caminho, str):
+        return FONTE_VETORIAL_FALLBACK
+    nome = f"Ocorrencia-{Path(caminho).stem}"
+    if nome in pdfmetrics.getRegisteredFontNames():
+        return nome
+    try:
+        pdfmetrics.registerFont(TTFont(nome, caminho))
+    except (TTFError, OSError):
+        return FONTE_VETORIAL_FALLBACK
+    return nome
+
+
+def _cor_reportlab(cor) -> tuple[float, float, float]:
+    return tuple(componente / 255 for componente in cor)
+
+
+class _SuperficieVetorial:
+    """Pagina que registra as primitivas do ImageDraw usadas pelo renderizador.
+
+    As medidas continuam vindo das fontes do Pillow, entao quebras de linha e
+    posicoes sao identicas as do modo raster; na exportacao cada primitiva
+    vira o equivalente em reportlab, em pontos (1 px = 72/300 pt).
+    """
+
+    _medidor = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+    def __init__(self):
+        self.operacoes: list[tuple] = []
+
+    def textbbox(self, xy, texto: str, font: ImageFont.ImageFont):
+        return self._medidor.textbbox(xy, texto, font=font)
+
+    def text(self, xy, texto: str, fill=COR_TEXTO, font: ImageFont.ImageFont | None = None):
+        self.operacoes.append(("texto", tuple(xy), texto, fill, font))
+
+    def rectangle(self, caixa, fill=None, outline=None, width: int = 1):
+        self.operacoes.append(("retangulo", tuple(caixa), fill, outline, width))
+
+    def line(self, caixa, fill=COR_BORDA, width: int = 1):
+        self.operacoes.append(("linha", tuple(caixa), fill, width))
+
+    def paste(self, imagem: Image.Image, xy, _mascara=None):
+        self.operacoes.append(("imagem", tuple(xy), imagem))
+
+    def reproduzir(self, documento: canvas.Canvas, altura_pixels: int):
+        escala = PONTOS_POR_PIXEL
+        for operacao in self.operacoes:
+            tipo = operacao[0]
+            if tipo == "texto":
+                _, (x, y), texto, cor, fonte = operacao
+                self._reproduzir_texto(documento, altura_pixels, x, y, texto, cor, fonte)
+            elif tipo == "retangulo":
+                _, (x0, y0, x1, y1), cor_fundo, cor_borda, largura = operacao
+                if cor_fundo is not None:
+                    documento.setFillColorRGB(*_cor_reportlab(cor_fundo))
+                    documento.rect(
+                        x0 * escala,
+                        (altura_pixels - y1 - 1) * escala,
+                        (x1 - x0 + 1) * escala,
+                        (y1 - y0 + 1) * escala,
+                        stroke=0,
+                        fill=1,
+                    )
+                if cor_borda is not None:
+                    # O Pillow desenha a borda para dentro da caixa.
+                    meia = largura / 2
+                    documento.setStrokeColorRGB(*_cor_reportlab(cor_borda))
+                    documento.setLineWidth(largura * escala)
+                    documento.rect(
+                        (x0 + meia) * escala,
+                        (altura_pixels - y1 - 1 + meia) * escala,
+                        (x1 - x0 + 1 - largura) * escala,
+                        (y1 - y0 + 1 - largura) * escala,
+                        stroke=1,
+                        fill=0,
+                    )
+            elif tipo == "linha":
+                _, (x0, y0, x1, y1), cor, largura = operacao
+                documento.setStrokeColorRGB(*_cor_reportlab(cor))
+                documento.setLineWidth(largura * escala)
+                documento.line(
+                    x0 * escala,
+                    (altura_pixels - y0) * escala,
+                    x1 * escala,
+                    (altura_pixels - y1) * escala,
+                )
+            elif tipo == "imagem":
+                _, (x, y), imagem = operacao
+                # A imagem (logo) e codificada uma vez por documento e repetida
+                # nas demais paginas como XObject.
+                nome_form = f"imagem{id(imagem)}"
+                if not documento.hasForm(nome_form):
+                    documento.beginForm(nome_form)
+                    documento.drawImage(
+                        ImageReader(imagem),
+                        0,
+                        0,
+                        width=imagem.width * escala,
+                        height=imagem.height * escala,
+                        mask="auto",
+                    )
+                    documento.endForm()
+                documento.saveState()
+                documento.translate(x * escala, (altura_pixels - y - imagem.height) * escala)
+                documento.doForm(nome_form)
+                documento.restoreState()
+
+    def _reproduzir_texto(self, documento, altura_pixels, x, y, texto, cor, fonte):
+        if not texto:
+            return
+        escala = PONTOS_POR_PIXEL
+        nome_fonte = _nome_fonte_vetorial(fonte)
+        tamanho = float(getattr(fonte, "size", 10)) * escala
+        if hasattr(fonte, "getmetrics"):
+            ascendente = fonte.getmetrics()[0]
+        else:
+            ascendente = self.textbbox((0, 0), texto, fonte)[3]
+
+        objeto_texto = documento.beginText(x * escala, (altura_pixels - y - ascendente) * escala)
+        objeto_texto.setFont(nome_fonte, tamanho)
+        objeto_texto.setFillColorRGB(*_cor_reportlab(cor))
+        # Ajusta a largura ao avanco medido pelo Pillow (hinting a 300 DPI),
+        # para que textos centralizados e justificados caiam no mesmo lugar.
+        largura_alvo = fonte.getlength(texto) * escala if hasattr(fonte, "getlength") else 0
+        largura_reportlab = pdfmetrics.stringWidth(texto, nome_fonte, tamanho)
+        if largura_alvo > 0 and largura_reportlab > 0:
+            objeto_texto.setHorizScale(100 * largura_alvo / largura_reportlab)
+        objeto_texto.textOut(texto)
+        documento.drawText(objeto_texto)
+
+
+class _RenderizadorRegistroOcorrenciaVetorial(_RenderizadorRegistroOcorrencia):
+    def _criar_pagina(self):
+        superficie = _SuperficieVetorial()
+        return superficie, superficie
+
+    def _superficie_da_pagina(self, pagina):
+        return pagina
+
+    def _exportar_pdf(self) -> bytes:
+        saida = io.BytesIO()
+        documento = canvas.Canvas(
+            saida,
+            pagesize=(self.largura * PONTOS_POR_PIXEL, self.altura * PONTOS_POR_PIXEL),
+            pageCompression=1,
+        )
+        documento.setTitle(_obter_titulo_documento(self.ocorrencia))
+        for pagina in self.paginas:
+            pagina.reproduzir(documento, self.altura)
+            documento.showPage()
+        documento.save()
+        return saida.getvalue()
+
+
+def resolver_modo_renderizacao(modo: str | None) -> str:
+    modo_normalizado = str(modo or "").strip().lower()
+    if not modo_normalizado:
+        return MODO_RENDERIZACAO_PADRAO
+    if modo_normalizado not in MODOS_RENDERIZACAO:
+        raise ValueError(
+            f"Modo de renderizacao invalido: {modo!r}. Use {' ou '.join(MODOS_RENDERIZACAO)}."
+        )
+    return modo_normalizado
+
+
+def gerar_pdf_ocorrencia_registro(
+    ocorrencia: dict,
+    *,
+    turma: dict | None = None,
+    modo_renderizacao: str | None = None,
+) -> bytes:
+    if resolver_modo_renderizacao(modo_renderizacao) == MODO_RENDERIZACAO_RASTER:
+        renderizador = _RenderizadorRegistroOcorrencia(ocorrencia, turma=turma)
+    else:
+        renderizador = _RenderizadorRegistroOcorrenciaVetorial(ocorrencia, turma=turma)
     return renderizador.renderizar()
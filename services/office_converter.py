@@ -0,0 +1,402 @@
+"""Pool de instancias LibreOffice mantidas abertas para converter DOC/DOCX em PDF.
+
+Cada instancia e um ``soffice --headless`` escutando um pipe UNO com perfil
+proprio; a conversao abre o documento e exporta PDF sem iniciar um processo
+novo. Requer o modulo ``uno`` (pacote ``python3-uno`` do LibreOffice); sem ele
+``obter_pool_conversao_office`` devolve ``None`` e ``services.file_service``
+segue com o ``soffice --convert-to`` a frio.
+"""
+
+import atexit
+import importlib.util
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(nome: str, padrao: int) -> int:
+    valor = os.getenv(nome, str(padrao)).strip()
+    try:
+        return max(int(valor), 0)
+    except ValueError:
+        logger.warning("Valor invalido para %s=%r; usando %s.", nome, valor, padrao)
+        return padrao
+
+
+OFFICE_CONVERTER_POOL_SIZE = _env_int("OFFICE_CONVERTER_POOL_SIZE", 2)
+OFFICE_CONVERTER_QUEUE_TIMEOUT_SECONDS = _env_int("OFFICE_CONVERTER_QUEUE_TIMEOUT_SECONDS", 60)
+OFFICE_CONVERTER_START_TIMEOUT_SECONDS = _env_int("OFFICE_CONVERTER_START_TIMEOUT_SECONDS", 30)
+OFFICE_CONVERTER_MAX_CONVERSIONS = _env_int("OFFICE_CONVERTER_MAX_CONVERSIONS", 200)
+OFFICE_CONVERTER_RESTART_BACKOFF_SECONDS = _env_int("OFFICE_CONVERTER_RESTART_BACKOFF_SECONDS", 30)
+# Teto da espera entre tentativas de subir o LibreOffice apos falhas seguidas.
+ESPERA_MAXIMA_REINICIO_SEGUNDOS = 600
+
+
+class ConversaoOfficeIndisponivel(RuntimeError):
+    """O pool nao conseguiu uma instancia LibreOffice; use a conversao a frio."""
+
+
+class ModuloUnoIndisponivel(ConversaoOfficeIndisponivel):
+    """Sem o modulo ``uno`` o pool nunca funciona neste processo."""
+
+
+def _propriedade(uno, nome: str, valor):
+    prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+    prop.Name = nome
+    prop.Value = valor
+    return prop
+
+
+class InstanciaLibreOffice:
+    """Um ``soffice`` headless com pipe UNO dedicado; uma conversao por vez."""
+
+    def __init__(
+        self,
+        comando_soffice: str,
+        nome: str,
+        timeout_inicio: float = OFFICE_CONVERTER_START_TIMEOUT_SECONDS,
+    ):
+        self.comando_soffice = comando_soffice
+        self.nome = nome
+        self.timeout_inicio = max(float(timeout_inicio), 1.0)
+        self.conversoes = 0
+        self._processo: subprocess.Popen | None = None
+        self._perfil: str | None = None
+        self._desktop = None
+        self._uno = None
+
+    def iniciar(self):
+        try:
+            import uno
+        except ModuleNotFoundError as exc:
+            raise ModuloUnoIndisponivel("Modulo 'uno' do LibreOffice nao encontrado.") from exc
+
+        self._uno = uno
+        self._perfil = tempfile.mkdtemp(prefix="office-converter-")
+        pipe = f"sistema_impress_{os.getpid()}_{self.nome}"
+        try:
+            self._processo = subprocess.Popen(
+                [
+                    self.comando_soffice,
+                    f"-env:UserInstallation={Path(self._perfil).as_uri()}",
+                    "--headless",
+                    "--invisible",
+                    "--nologo",
+                    "--nodefault",
+                    "--norestore",
+                    "--nolockcheck",
+                    f"--accept=pipe,name={pipe};urp;StarOffice.ComponentContext",
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            self.encerrar()
+            raise ConversaoOfficeIndisponivel(f"Falha ao iniciar LibreOffice: {exc}") from exc
+
+        contexto_local = uno.getComponentContext()
+        resolver = contexto_local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", contexto_local
+        )
+        limite = time.monotonic() + self.timeout_inicio
+        while True:
+            if self._processo.poll() is not None:
+                self.encerrar()
+                raise ConversaoOfficeIndisponivel("LibreOffice encerrou durante a inicializacao.")
+            try:
+                contexto = resolver.resolve(
+                    f"uno:pipe,name={pipe};urp;StarOffice.ComponentContext"
+                )
+                break
+            except Exception:
+                if time.monotonic() >= limite:
+                    self.encerrar()
+                    raise ConversaoOfficeIndisponivel(
+                        "LibreOffice nao respondeu dentro do tempo de inicializacao."
+                    )
+                time.sleep(0.2)
+
+        self._desktop = contexto.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", contexto
+        )
+        return self
+
+    def saudavel(self) -> bool:
+        if self._processo is None or self._processo.poll() is not None or self._desktop is None:
+            return False
+        try:
+            self._desktop.getComponents()
+        except Exception:
+            return False
+        return True
+
+    def converter(self, caminho_origem: Path, caminho_destino: Path) -> Path:
+        uno = self._uno
+        documento = self._desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(Path(caminho_origem).resolve())),
+            "_blank",
+            0,
+            (_propriedade(uno, "Hidden", True), _propriedade(uno, "ReadOnly", True)),
+        )
+        if documento is None:
+            raise RuntimeError("LibreOffice nao conseguiu abrir o documento.")
+        try:
+            documento.storeToURL(
+                uno.systemPathToFileUrl(str(Path(caminho_destino).resolve())),
+                (_propriedade(uno, "FilterName", "writer_pdf_Export"),),
+            )
+        finally:
+            try:
+                documento.close(True)
+            except Exception:
+                pass
+        self.conversoes += 1
+        return Path(caminho_destino)
+
+    def encerrar(self):
+        self._desktop = None
+        processo, self._processo = self._processo, None
+        if processo is not None and processo.poll() is None:
+            processo.kill()
+            try:
+                processo.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                logger.warning("LibreOffice %s nao encerrou apos kill.", self.nome)
+        perfil, self._perfil = self._perfil, None
+        if perfil:
+            shutil.rmtree(perfil, ignore_errors=True)
+
+
+class PoolConversaoOffice:
+    """Fila de conversoes sobre ``tamanho`` instancias LibreOffice quentes.
+
+    Instancias sobem sob demanda e sao verificadas antes de cada uso. Uma
+    conversao que estoura ``timeout`` derruba a instancia (o LibreOffice travado
+    e morto e outra sobe no proximo pedido); instancias tambem sao recicladas
+    apos ``max_conversoes`` para limitar vazamento de memoria do soffice.
+
+    Se uma instancia nao sobe (encerrou ou nao respondeu a tempo), novas
+    tentativas de subir ficam suspensas por ``espera_reinicio``, dobrando a cada
+    falha seguida ate ``ESPERA_MAXIMA_REINICIO_SEGUNDOS``. Nesse intervalo os
+    pedidos que cairiam numa instancia parada recebem
+    ``ConversaoOfficeIndisponivel`` e seguem a frio; as instancias saudaveis
+    continuam atendendo.
+    """
+
+    def __init__(
+        self,
+        tamanho: int,
+        criar_instancia: Callable[[str], object],
+        timeout_fila: float = OFFICE_CONVERTER_QUEUE_TIMEOUT_SECONDS,
+        max_conversoes: int = OFFICE_CONVERTER_MAX_CONVERSIONS,
+        espera_reinicio: float = OFFICE_CONVERTER_RESTART_BACKOFF_SECONDS,
+    ):
+        self.tamanho = max(int(tamanho), 1)
+        self.timeout_fila = max(float(timeout_fila), 0.0)
+        self.max_conversoes = max(int(max_conversoes), 0)
+        self.espera_reinicio = max(float(espera_reinicio), 0.0)
+        self._criar_instancia = criar_instancia
+        self._ociosas: queue.Queue = queue.Queue()
+        for indice in range(self.tamanho):
+            self._ociosas.put((indice, None))
+        self._lock = threading.Lock()
+        self._conversoes = 0
+        self._falhas = 0
+        self._timeouts = 0
+        self._reinicios = 0
+        self._falhas_inicio_seguidas = 0
+        self._reinicio_liberado_em = 0.0
+        self._espera_fila_total = 0.0
+        self._duracao_total = 0.0
+
+    def converter(self, caminho_origem: Path, caminho_destino: Path, timeout: float) -> Path:
+        inicio = time.monotonic()
+        try:
+            indice, instancia = self._ociosas.get(timeout=self.timeout_fila)
+        except queue.Empty as exc:
+            raise RuntimeError("Fila de conversao de documentos ocupada; tente novamente.") from exc
+
+        espera = time.monotonic() - inicio
+        try:
+            if instancia is None or not instancia.saudavel():
+                instancia = self._reiniciar(indice, instancia)
+
+            inicio_conversao = time.monotonic()
+            try:
+                resultado = self._converter_com_timeout(
+                    instancia, caminho_origem, caminho_destino, timeout
+                )
+            except TimeoutError as exc:
+                instancia.encerrar()
+                instancia = None
+                self._contar(timeouts=1, falhas=1, espera=espera)
+                raise RuntimeError("Timeout ao converter documento Office para PDF.") from exc
+            except Exception:
+                if not instancia.saudavel():
+                    instancia.encerrar()
+                    instancia = None
+                self._contar(falhas=1, espera=espera)
+                raise
+
+            self._contar(
+                conversoes=1,
+                espera=espera,
+                duracao=time.monotonic() - inicio_conversao,
+            )
+            if self.max_conversoes and instancia.conversoes >= self.max_conversoes:
+                instancia.encerrar()
+                instancia = None
+            return resultado
+        finally:
+            self._ociosas.put((indice, instancia))
+
+    def _reiniciar(self, indice: int, instancia):
+        if instancia is not None:
+            logger.warning("Instancia LibreOffice %s sem resposta; reiniciando.", indice)
+            instancia.encerrar()
+        with self._lock:
+            restante = self._reinicio_liberado_em - time.monotonic()
+        if restante > 0:
+            raise ConversaoOfficeIndisponivel(
+                f"Inicio do LibreOffice suspenso por mais {restante:.0f}s apos falha."
+            )
+
+        nova = self._criar_instancia(str(indice))
+        try:
+            nova.iniciar()
+        except ModuloUnoIndisponivel:
+            raise
+        except ConversaoOfficeIndisponivel as exc:
+            with self._lock:
+                self._falhas_inicio_seguidas += 1
+                espera = min(
+                    self.espera_reinicio * 2 ** (self._falhas_inicio_seguidas - 1),
+                    ESPERA_MAXIMA_REINICIO_SEGUNDOS,
+                )
+                self._reinicio_liberado_em = time.monotonic() + espera
+            logger.warning(
+                "Instancia LibreOffice %s nao iniciou (%s); nova tentativa em %.0fs.",
+                indice,
+                exc,
+                espera,
+            )
+            raise
+        with self._lock:
+            self._reinicios += 1
+            self._falhas_inicio_seguidas = 0
+            self._reinicio_liberado_em = 0.0
+        return nova
+
+    @staticmethod
+    def _converter_com_timeout(instancia, caminho_origem, caminho_destino, timeout: float):
+        resultado: dict = {}
+
+        def executar():
+            try:
+                resultado["caminho"] = instancia.converter(caminho_origem, caminho_destino)
+            except BaseException as exc:
+                resultado["erro"] = exc
+
+        thread = threading.Thread(target=executar, name="office-converter", daemon=True)
+        thread.start()
+        thread.join(max(float(timeout), 0.0))
+        if thread.is_alive():
+            raise TimeoutError
+        if "erro" in resultado:
+            raise resultado["erro"]
+        return resultado["caminho"]
+
+    def _contar(self, conversoes=0, falhas=0, timeouts=0, espera=0.0, duracao=0.0):
+        with self._lock:
+            self._conversoes += conversoes
+            self._falhas += falhas
+            self._timeouts += timeouts
+            self._espera_fila_total += espera
+            self._duracao_total += duracao
+
+    def encerrar(self):
+        instancias = []
+        while True:
+            try:
+                instancias.append(self._ociosas.get_nowait())
+            except queue.Empty:
+                break
+        for indice, instancia in instancias:
+            if instancia is not None:
+                instancia.encerrar()
+            self._ociosas.put((indice, None))
+
+    def stats(self) -> dict:
+        with self._lock:
+            atendidas = self._conversoes + self._falhas
+            return {
+                "tamanho": self.tamanho,
+                "conversoes": self._conversoes,
+                "falhas": self._falhas,
+                "timeouts": self._timeouts,
+                "reinicios": self._reinicios,
+                "falhas_inicio_seguidas": self._falhas_inicio_seguidas,
+                "espera_media_fila_segundos": (
+                    round(self._espera_fila_total / atendidas, 3) if atendidas else 0.0
+                ),
+                "duracao_media_segundos": (
+                    round(self._duracao_total / self._conversoes, 3) if self._conversoes else 0.0
+                ),
+            }
+
+
+_POOL: PoolConversaoOffice | None = None
+_POOL_DESATIVADO = False
+_POOL_LOCK = threading.Lock()
+
+
+def configurar_pool_conversao_office(tamanho: int):
+    """Ajusta o tamanho antes do primeiro uso (ex.: 1 por processo do pool APC)."""
+    global OFFICE_CONVERTER_POOL_SIZE
+    OFFICE_CONVERTER_POOL_SIZE = max(int(tamanho), 0)
+
+
+def obter_pool_conversao_office(comando_soffice: str) -> PoolConversaoOffice | None:
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+    if _POOL_DESATIVADO or OFFICE_CONVERTER_POOL_SIZE <= 0:
+        return None
+    if importlib.util.find_spec("uno") is None:
+        desativar_pool_conversao_office("modulo 'uno' do LibreOffice nao encontrado")
+        return None
+
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = PoolConversaoOffice(
+                OFFICE_CONVERTER_POOL_SIZE,
+                criar_instancia=lambda nome: InstanciaLibreOffice(comando_soffice, nome),
+            )
+            atexit.register(_POOL.encerrar)
+    return _POOL
+
+
+def desativar_pool_conversao_office(motivo: str):
+    global _POOL, _POOL_DESATIVADO
+    with _POOL_LOCK:
+        if not _POOL_DESATIVADO:
+            logger.warning("Pool de conversao LibreOffice desativado (%s); usando soffice a frio.", motivo)
+        _POOL_DESATIVADO = True
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.encerrar()
+
+
+def estatisticas_pool_conversao_office() -> dict | None:
+    pool = _POOL
+    return pool.stats() if pool is not None else None
@@ -1,8 +1,21 @@
+"""Contagem de paginas e montagem N-up de PDFs.
+
+O ``pypdf`` so e importado na primeira contagem/montagem: a API e os workers
+carregam este modulo na partida, mas nem todo processo chega a abrir um PDF.
+"""
+
+from __future__ import annotations
+
 import re
 import uuid
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from pypdf import PdfReader, PdfWriter, Transformation
+from services.artifact_cache import cache_artefatos
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import StreamObject
 
 A4_RETRATO_LARGURA_PT = 595.28
 A4_RETRATO_ALTURA_PT = 841.89
@@ -10,9 +23,29 @@ A4_PAISAGEM_LARGURA_PT = 841.89
 A4_PAISAGEM_ALTURA_PT = 595.28
 
 
+def _contar_paginas_pelo_catalogo(reader: PdfReader) -> int | None:
+    try:
+        total = int(reader.trailer["/Root"]["/Pages"]["/Count"])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    return total if total > 0 else None
+
+
+def _contar_paginas_pdf_sem_cache(caminho_arquivo: str) -> int:
+    # Abrir pelo handle evita que o pypdf leia o arquivo inteiro para memoria,
+    # e o /Count da raiz da arvore de paginas dispensa resolver cada pagina.
+    from pypdf import PdfReader
+
+    with open(caminho_arquivo, "rb") as arquivo:
+        reader = PdfReader(arquivo)
+        total = _contar_paginas_pelo_catalogo(reader)
+        if total is None:
+            total = len(reader.pages)
+    return total
+
+
 def contar_paginas_pdf(caminho_arquivo: str) -> int:
-    reader = PdfReader(caminho_arquivo)
-    return len(reader.pages)
+    return cache_artefatos.contar_paginas(Path(caminho_arquivo), _contar_paginas_pdf_sem_cache)
 
 
 def _listar_paginas_intervalo(intervalo: str, total_paginas: int) -> list[int]:
@@ -55,15 +88,79 @@ def _listar_paginas_intervalo(intervalo: str, total_paginas: int) -> list[int]:
     return sorted(paginas)
 
 
+def _caixa_pagina(page) -> tuple[float, float, float, float]:
+    caixa = page.cropbox
+    if float(caixa.width) <= 0 or float(caixa.height) <= 0:
+        caixa = page.mediabox
+    return float(caixa.left), float(caixa.bottom), float(caixa.right), float(caixa.top)
+
+
 def _medidas_pagina(page) -> tuple[float, float]:
-    largura = float(page.cropbox.width)
-    altura = float(page.cropbox.height)
-    if largura <= 0 or altura <= 0:
-        largura = float(page.mediabox.width)
-        altura = float(page.mediabox.height)
+    esquerda, base, direita, topo = _caixa_pagina(page)
+    largura = direita - esquerda
+    altura = topo - base
+    if int(page.get("/Rotate", 0) or 0) % 180:
+        return altura, largura
     return largura, altura
 
 
+def _matriz_rotacao(page) -> list[float]:
+    """Leva o conteudo original ao espaco exibido (ja girado) com origem em (0, 0)."""
+    esquerda, base, direita, topo = _caixa_pagina(page)
+    largura = direita - esquerda
+    altura = topo - base
+    rotacao = int(page.get("/Rotate", 0) or 0) % 360
+    if rotacao == 90:
+        return [0, -1, 1, 0, -base, esquerda + largura]
+    if rotacao == 180:
+        return [-1, 0, 0, -1, esquerda + largura, base + altura]
+    if rotacao == 270:
+        return [0, 1, -1, 0, base + altura, -esquerda]
+    return [1, 0, 0, 1, -esquerda, -base]
+
+
+def _conteudo_como_xobject(writer: PdfWriter, page) -> StreamObject:
+    """Empacota a pagina como Form XObject sem interpretar o content stream."""
+    from pypdf.generic import (
+        ArrayObject,
+        DecodedStreamObject,
+        DictionaryObject,
+        FloatObject,
+        NameObject,
+        StreamObject,
+    )
+
+    conteudo = page.get("/Contents")
+    conteudo = conteudo.get_object() if conteudo is not None else None
+    if isinstance(conteudo, StreamObject):
+        xobject = StreamObject()
+        xobject._data = conteudo._data
+        for chave in ("/Filter", "/DecodeParms"):
+            if chave in conteudo:
+                xobject[NameObject(chave)] = conteudo[chave].clone(writer)
+    else:
+        partes = [
+            parte.get_object().get_data() for parte in (conteudo or []) if parte is not None
+        ]
+        xobject = DecodedStreamObject()
+        xobject.set_data(b"\n".join(partes))
+        xobject = xobject.flate_encode()
+
+    recursos = page.get("/Resources")
+    xobject.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): ArrayObject(FloatObject(v) for v in _caixa_pagina(page)),
+            NameObject("/Matrix"): ArrayObject(FloatObject(v) for v in _matriz_rotacao(page)),
+            NameObject("/Resources"): (
+                recursos.get_object().clone(writer) if recursos is not None else DictionaryObject()
+            ),
+        }
+    )
+    return xobject
+
+
 def _normalizar_orientacao(orientacao: str) -> str:
     orientacao_norm = str(orientacao or "").strip().lower()
     return "paisagem" if orientacao_norm == "paisagem" else "retrato"
@@ -87,16 +184,15 @@ def _obter_layout_nup(paginas_por_folha: int, orientacao: str = "retrato") -> tu
     raise ValueError(f"Paginação por folha não suportada: {paginas_por_folha}")
 
 
-def gerar_pdf_n_por_folha(
-    caminho_origem: Path,
+def _montar_folhas_n_por_folha(
+    reader: PdfReader,
     paginas_por_folha: int,
-    intervalo_paginas: str = "",
-    orientacao: str = "retrato",
-) -> Path:
-    if paginas_por_folha not in (1, 2, 4):
-        raise ValueError("Paginação por folha inválida para geração de layout.")
+    intervalo_paginas: str,
+    orientacao: str,
+) -> PdfWriter:
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
 
-    reader = PdfReader(str(caminho_origem))
     total_paginas = len(reader.pages)
     paginas_selecionadas = _listar_paginas_intervalo(intervalo_paginas, total_paginas)
     if not paginas_selecionadas:
@@ -109,21 +205,28 @@ def gerar_pdf_n_por_folha(
 
     orientacao_norm = _normalizar_orientacao(orientacao)
 
-    writer = PdfWriter()
     largura_folha, altura_folha = _obter_tamanho_folha(orientacao_norm)
     colunas, linhas = _obter_layout_nup(paginas_por_folha, orientacao_norm)
     largura_celula = largura_folha / colunas
     altura_celula = altura_folha / linhas
 
+    writer = PdfWriter()
+    # Cada pagina de origem vira um unico Form XObject, reaproveitado em todas
+    # as folhas em que aparece.
+    xobjects = {}
+
     for inicio in range(0, len(paginas_selecionadas), paginas_por_folha):
         numeros_da_folha = paginas_selecionadas[inicio : inicio + paginas_por_folha]
         folha = writer.add_blank_page(width=largura_folha, height=altura_folha)
+        recursos_folha = DictionaryObject()
+        operacoes = []
 
         for indice_slot, numero_pagina in enumerate(numeros_da_folha):
             coluna = indice_slot % colunas
             linha = indice_slot // colunas
             pagina = reader.pages[numero_pagina - 1]
-            pagina.transfer_rotation_to_content()
+            if numero_pagina not in xobjects:
+                xobjects[numero_pagina] = writer._add_object(_conteudo_como_xobject(writer, pagina))
 
             largura_pagina, altura_pagina = _medidas_pagina(pagina)
             escala = min(largura_celula / largura_pagina, altura_celula / altura_pagina)
@@ -136,17 +239,42 @@ def gerar_pdf_n_por_folha(
             deslocamento_x = origem_x_celula + ((largura_celula - largura_render) / 2.0)
             deslocamento_y = origem_y_celula + ((altura_celula - altura_render) / 2.0)
 
-            transformacao = (
-                Transformation()
-                .scale(escala, escala)
-                .translate(tx=deslocamento_x, ty=deslocamento_y)
+            nome = f"/P{numero_pagina}"
+            recursos_folha[NameObject(nome)] = xobjects[numero_pagina]
+            operacoes.append(
+                f"q {escala:.6f} 0 0 {escala:.6f} {deslocamento_x:.4f} {deslocamento_y:.4f} cm "
+                f"{nome} Do Q"
             )
-            folha.merge_transformed_page(pagina, transformacao, expand=False)
+
+        conteudo_folha = DecodedStreamObject()
+        conteudo_folha.set_data("\n".join(operacoes).encode("ascii"))
+        folha[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/XObject"): recursos_folha}
+        )
+        folha[NameObject("/Contents")] = writer._add_object(conteudo_folha.flate_encode())
+
+    return writer
+
+
+def gerar_pdf_n_por_folha(
+    caminho_origem: Path,
+    paginas_por_folha: int,
+    intervalo_paginas: str = "",
+    orientacao: str = "retrato",
+) -> Path:
+    if paginas_por_folha not in (1, 2, 4):
+        raise ValueError("Paginação por folha inválida para geração de layout.")
+    from pypdf import PdfReader
 
     nome_temporario = f"{caminho_origem.stem}_{paginas_por_folha}up_{uuid.uuid4().hex}.pdf"
     caminho_destino = caminho_origem.with_name(nome_temporario)
-    with caminho_destino.open("wb") as destino:
-        writer.write(destino)
+    # Leitor sobre o handle aberto, sem copiar o arquivo inteiro para memoria.
+    with open(caminho_origem, "rb") as arquivo_origem:
+        writer = _montar_folhas_n_por_folha(
+            PdfReader(arquivo_origem), paginas_por_folha, intervalo_paginas, orientacao
+        )
+        with caminho_destino.open("wb") as destino:
+            writer.write(destino)
 
     return caminho_destino
 
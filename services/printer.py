@@ -6,6 +6,7 @@ import shlex
 import subprocess
 from pathlib import Path
 
+from services.artifact_cache import cache_artefatos
 from services.pdf_service import gerar_pdf_n_por_folha
 
 LP_COMMAND = os.getenv("CUPS_LP_COMMAND", "lp")
@@ -115,11 +116,12 @@ def _forcar_layout_n_por_folha(caminho: Path, job, opcoes_cups):
         job.get("intervalo_paginas") or opcoes_cups.get("page-ranges") or ""
     ).strip()
     orientacao_layout = _normalizar_orientacao_layout(job, opcoes_cups)
-    caminho_layout = gerar_pdf_n_por_folha(
-        caminho_origem=caminho,
-        paginas_por_folha=paginas_por_folha,
-        intervalo_paginas=intervalo_paginas,
-        orientacao=orientacao_layout,
+    caminho_layout, temporario = cache_artefatos.obter_layout_nup(
+        caminho,
+        paginas_por_folha,
+        intervalo_paginas,
+        orientacao_layout,
+        gerar=gerar_pdf_n_por_folha,
     )
 
     opcoes_ajustadas = dict(opcoes_cups)
@@ -129,7 +131,7 @@ def _forcar_layout_n_por_folha(caminho: Path, job, opcoes_cups):
     opcoes_ajustadas.pop("landscape", None)
     opcoes_ajustadas.pop("page-ranges", None)
 
-    return caminho_layout, opcoes_ajustadas, caminho_layout
+    return caminho_layout, opcoes_ajustadas, caminho_layout if temporario else None
 
 
 def imprimir_job(job):
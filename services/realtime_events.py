@@ -0,0 +1,304 @@
+"""Canal de eventos em tempo real (server-sent events) da API.
+
+Produtores (rotas da API, worker de impressao, worker de notificacoes)
+chamam ``publicar_evento``. No processo da API o evento e distribuido direto
+para as conexoes abertas; nos workers externos ele segue por um datagrama
+UDP local ate a API, no mesmo estilo do ``worker_wakeup``. Cada conexao tem
+uma fila limitada: se o navegador nao acompanha, a fila e descartada e o
+cliente recebe ``resync`` para recarregar tudo pelo HTTP normal.
+
+O canal e apenas otimizacao: o frontend mantem o polling como fallback
+quando a conexao cai, entao nenhuma falha aqui interrompe o fluxo principal.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+EVENTOS_HOST = "127.0.0.1"
+TAMANHO_MAXIMO_DATAGRAMA = 60_000
+
+EVENTO_IMPRESSAO_JOB = "impressao.job"
+EVENTO_IMPRESSAO_STATUS = "impressao.status"
+EVENTO_NOTIFICACOES_NAO_LIDAS = "notificacoes.nao_lidas"
+EVENTO_RESYNC = "resync"
+
+
+def _env_int(nome: str, padrao: int, minimo: int = 0) -> int:
+    valor = os.getenv(nome, str(padrao)).strip()
+    try:
+        return max(int(valor), minimo)
+    except ValueError:
+        logger.warning("Valor invalido para %s=%r; usando %s.", nome, valor, padrao)
+        return padrao
+
+
+def _resolver_porta(nome: str, padrao: int) -> int:
+    porta = _env_int(nome, padrao)
+    return porta if porta <= 65535 else padrao
+
+
+REALTIME_EVENTS_PORT = _resolver_porta("REALTIME_EVENTS_PORT", 8768)
+REALTIME_QUEUE_SIZE = _env_int("REALTIME_QUEUE_SIZE", 100, minimo=1)
+REALTIME_HEARTBEAT_SECONDS = _env_int("REALTIME_HEARTBEAT_SECONDS", 25, minimo=1)
+
+
+class ConexaoEventos:
+    """Uma aba conectada ao stream, com fila propria e contadores de entrega."""
+
+    def __init__(self, conexao_id: int, usuario_id: int, gestor: bool, tamanho_fila: int):
+        self.id = conexao_id
+        self.usuario_id = int(usuario_id)
+        self.gestor = bool(gestor)
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize=tamanho_fila)
+        self.conectado_em = time.monotonic()
+        self.enfileirados = 0
+        self.entregues = 0
+        self.descartados = 0
+        self.resyncs = 0
+
+    def aceita(self, evento: dict) -> bool:
+        usuarios = evento.get("usuarios")
+        if usuarios is None:
+            return True
+        if self.usuario_id in usuarios:
+            return True
+        return bool(evento.get("gestores")) and self.gestor
+
+    def enfileirar(self, mensagem: dict) -> None:
+        try:
+            self.fila.put_nowait(mensagem)
+            self.enfileirados += 1
+            return
+        except asyncio.QueueFull:
+            pass
+
+        # Cliente lento: descarta o atraso e pede um recarregamento completo.
+        while not self.fila.empty():
+            self.fila.get_nowait()
+            self.descartados += 1
+        self.descartados += 1
+        self.resyncs += 1
+        self.fila.put_nowait({"tipo": EVENTO_RESYNC, "dados": {}})
+
+    def stats(self) -> dict:
+        return {
+            "id": self.id,
+            "usuario_id": self.usuario_id,
+            "gestor": self.gestor,
+            "conectado_segundos": round(time.monotonic() - self.conectado_em, 1),
+            "enfileirados": self.enfileirados,
+            "entregues": self.entregues,
+            "descartados": self.descartados,
+            "resyncs": self.resyncs,
+            "pendentes": self.fila.qsize(),
+        }
+
+
+class _ProtocoloEventosUdp(asyncio.DatagramProtocol):
+    def __init__(self, canal: "CanalEventos"):
+        self.canal = canal
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            evento = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            self.canal._invalidos += 1
+            return
+        if not isinstance(evento, dict) or not evento.get("tipo"):
+            self.canal._invalidos += 1
+            return
+        self.canal._recebidos_udp += 1
+        self.canal._distribuir(evento)
+
+
+class CanalEventos:
+    """Hub de eventos do processo da API.
+
+    Vive no event loop do uvicorn: ``iniciar`` registra o loop e abre o
+    socket UDP; ``publicar`` pode ser chamado de qualquer thread (rotas
+    sincronas rodam no threadpool e o worker embutido roda em thread propria).
+    """
+
+    def __init__(self, porta: int = REALTIME_EVENTS_PORT, tamanho_fila: int = REALTIME_QUEUE_SIZE):
+        self.porta = int(porta)
+        self.tamanho_fila = max(int(tamanho_fila), 1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._transporte = None
+        self._conexoes: dict[int, ConexaoEventos] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._publicados = 0
+        self._recebidos_udp = 0
+        self._invalidos = 0
+        self._conexoes_total = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    @property
+    def escutando(self) -> bool:
+        return self._transporte is not None
+
+    async def iniciar(self) -> bool:
+        """Associa o canal ao loop atual e escuta eventos de outros processos."""
+        self._loop = asyncio.get_running_loop()
+        if self._transporte is not None or self.porta <= 0:
+            return self._transporte is not None
+        try:
+            self._transporte, _ = await self._loop.create_datagram_endpoint(
+                lambda: _ProtocoloEventosUdp(self),
+                local_addr=(EVENTOS_HOST, self.porta),
+            )
+        except OSError as exc:
+            logger.warning(
+                "Nao foi possivel escutar eventos em tempo real em %s:%s (%s); "
+                "somente eventos locais serao entregues.",
+                EVENTOS_HOST,
+                self.porta,
+                exc,
+            )
+            return False
+        return True
+
+    def parar(self) -> None:
+        if self._transporte is not None:
+            self._transporte.close()
+            self._transporte = None
+        self._loop = None
+
+    def conectar(self, usuario_id: int, gestor: bool = False) -> ConexaoEventos:
+        """Registra uma conexao; deve ser chamado dentro do event loop do canal."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        conexao = ConexaoEventos(next(self._ids), usuario_id, gestor, self.tamanho_fila)
+        with self._lock:
+            self._conexoes[conexao.id] = conexao
+            self._conexoes_total += 1
+        return conexao
+
+    def desconectar(self, conexao: ConexaoEventos) -> None:
+        with self._lock:
+            self._conexoes.pop(conexao.id, None)
+
+    def publicar(self, evento: dict) -> bool:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        try:
+            loop.call_soon_threadsafe(self._distribuir, evento)
+        except RuntimeError:
+            # Loop encerrado entre a checagem e o agendamento.
+            return False
+        return True
+
+    def _distribuir(self, evento: dict) -> None:
+        self._publicados += 1
+        mensagem = {"tipo": evento["tipo"], "dados": evento.get("dados") or {}}
+        with self._lock:
+            conexoes = list(self._conexoes.values())
+        for conexao in conexoes:
+            if conexao.aceita(evento):
+                conexao.enfileirar(mensagem)
+
+    def conexoes(self) -> list[dict]:
+        with self._lock:
+            conexoes = list(self._conexoes.values())
+        return [conexao.stats() for conexao in conexoes]
+
+    def stats(self) -> dict:
+        conexoes = self.conexoes()
+        return {
+            "porta": self.porta if self.escutando else None,
+            "conexoes_ativas": len(conexoes),
+            "conexoes_total": self._conexoes_total,
+            "eventos_publicados": self._publicados,
+            "eventos_recebidos_udp": self._recebidos_udp,
+            "datagramas_invalidos": self._invalidos,
+            "entregues": sum(item["entregues"] for item in conexoes),
+            "descartados": sum(item["descartados"] for item in conexoes),
+            "pendentes": sum(item["pendentes"] for item in conexoes),
+        }
+
+
+# ponytail: one hub per API process; workers reach it over loopback UDP.
+canal_eventos = CanalEventos()
+
+
+def publicar_evento(
+    tipo: str,
+    dados: dict | None = None,
+    *,
+    usuarios: list[int] | None = None,
+    gestores: bool = False,
+) -> None:
+    """Publica um evento para os navegadores conectados.
+
+    ``usuarios=None`` entrega a todos; com lista, apenas a esses usuarios e,
+    se ``gestores`` for verdadeiro, tambem a quem gerencia impressoes.
+    """
+    evento = {
+        "tipo": tipo,
+        "dados": dados or {},
+        "usuarios": None if usuarios is None else sorted({int(u) for u in usuarios}),
+        "gestores": bool(gestores),
+    }
+    if canal_eventos.publicar(evento):
+        return
+    if canal_eventos.porta <= 0:
+        return
+    try:
+        datagrama = json.dumps(evento, ensure_ascii=True, default=str).encode("ascii")
+        if len(datagrama) > TAMANHO_MAXIMO_DATAGRAMA:
+            logger.warning("Evento %s grande demais para o canal UDP; ignorado.", tipo)
+            return
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(datagrama, (EVENTOS_HOST, canal_eventos.porta))
+    except OSError:
+        # Evento e apenas otimizacao; os clientes seguem com polling.
+        pass
+
+
+def formatar_sse(mensagem: dict, evento_id: int | None = None) -> str:
+    linhas = []
+    if evento_id is not None:
+        linhas.append(f"id: {evento_id}")
+    linhas.append(f"event: {mensagem['tipo']}")
+    linhas.append(f"data: {json.dumps(mensagem.get('dados') or {}, ensure_ascii=False, default=str)}")
+    return "\n".join(linhas) + "\n\n"
+
+
+def publicar_job_impressao(job: dict, status: str | None = None, **extras) -> None:
+    usuario_id = job.get("usuario_id")
+    dados = {
+        "job_id": int(job["id"]),
+        "status": status or job.get("status"),
+        "usuario_id": int(usuario_id) if usuario_id is not None else None,
+    }
+    dados.update(extras)
+    publicar_evento(
+        EVENTO_IMPRESSAO_JOB,
+        dados,
+        usuarios=[usuario_id] if usuario_id is not None else [],
+        gestores=True,
+    )
+
+
+def publicar_status_impressao(status: dict) -> None:
+    publicar_evento(EVENTO_IMPRESSAO_STATUS, status)
+
+
+def publicar_nao_lidas(usuario_id: int, total: int) -> None:
+    publicar_evento(
+        EVENTO_NOTIFICACOES_NAO_LIDAS,
+        {"unread_count": int(total)},
+        usuarios=[usuario_id],
+    )
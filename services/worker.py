@@ -1,27 +1,36 @@
 import os
 import time
 import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
 from pathlib import Path
 from db.impressao import (
-    buscar_proximo_job,
     normalizar_jobs_impressao_pendentes,
+    reivindicar_proximo_job,
     atualizar_status,
     atualizar_job_cups,
     atualizar_erro_job,
     listar_arquivo_paths_jobs_em_andamento,
+    segundos_ate_proximo_job,
 )
 from services.printer import imprimir_job
-from services.apc_preview_worker import processar_proximo_apc_preview_job
+from services.apc_preview_worker import iniciar_preview_apc_em_thread
+from services.realtime_events import publicar_job_impressao
+from services.worker_wakeup import sinalizador_impressao
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-INTERVALO = 2  # segundos
+ESPERA_MINIMA_SEGUNDOS = 0.2
+MARGEM_JANELA_SEGUNDOS = 0.25
 INTERVALO_LIMPEZA_SPOOL_SEGUNDOS = 3600
+INTERVALO_RESUMO_METRICAS_SEGUNDOS = 600
 MANTER_ARQUIVOS_SPOOL = os.getenv("KEEP_SPOOL_FILES", "true").strip().lower() in {
     "1",
     "true",
     "yes",
 }
 logger = logging.getLogger(__name__)
+IMPRESSORA_PADRAO = os.getenv("CUPS_PRINTER", "").strip()
 DIRETORIO_SPOOL = Path(os.getenv("SPOOL_DIR", str(BASE_DIR / "spool")))
 ULTIMA_LIMPEZA_SPOOL_MONOTONIC = 0.0
 
@@ -49,8 +58,116 @@ def _resolver_retencao_spool_dias() -> int:
     return max(dias, 0)
 
 
+def _resolver_intervalo_fallback() -> float:
+    valor = os.getenv("PRINT_WORKER_POLL_SECONDS", "30").strip()
+    try:
+        segundos = float(valor)
+    except ValueError:
+        return 30.0
+    return max(segundos, 1.0)
+
+
+def _resolver_max_raias() -> int:
+    valor = os.getenv("PRINT_WORKER_MAX_LANES", "4").strip()
+    try:
+        raias = int(valor)
+    except ValueError:
+        logger.warning("Valor invalido para PRINT_WORKER_MAX_LANES=%r; usando 4.", valor)
+        return 4
+    return max(raias, 1)
+
+
 JANELA_CANCELAMENTO_SEGUNDOS = _resolver_janela_cancelamento()
 RETENCAO_SPOOL_DIAS = _resolver_retencao_spool_dias()
+# Polling de seguranca: o worker normalmente acorda por sinal ou pela janela calculada.
+INTERVALO = _resolver_intervalo_fallback()
+MAX_RAIAS_IMPRESSAO = _resolver_max_raias()
+
+
+class MetricasFilaImpressao:
+    """Tempo de espera na fila (criacao do job -> despacho ao CUPS)."""
+
+    def __init__(self, amostras: int = 500):
+        self._esperas = deque(maxlen=amostras)
+        self._lock = threading.Lock()
+        self._total = 0
+        self._acordado_por_sinal = 0
+        self._acordado_por_timeout = 0
+
+    def registrar_despacho(self, job: dict, agora: datetime | None = None) -> float | None:
+        criado_em = _parse_data_job(job.get("criado_em"))
+        if criado_em is None:
+            return None
+        agora = agora or datetime.now(timezone.utc)
+        espera = max((agora - criado_em).total_seconds(), 0.0)
+        with self._lock:
+            self._esperas.append(espera)
+            self._total += 1
+        return espera
+
+    def registrar_despertar(self, por_sinal: bool) -> None:
+        with self._lock:
+            if por_sinal:
+                self._acordado_por_sinal += 1
+            else:
+                self._acordado_por_timeout += 1
+
+    def resumo(self) -> dict:
+        with self._lock:
+            esperas = sorted(self._esperas)
+            total = self._total
+            por_sinal = self._acordado_por_sinal
+            por_timeout = self._acordado_por_timeout
+
+        resumo = {
+            "jobs_despachados": total,
+            "acordado_por_sinal": por_sinal,
+            "acordado_por_timeout": por_timeout,
+            "janela_cancelamento_segundos": JANELA_CANCELAMENTO_SEGUNDOS,
+            "espera_media_segundos": None,
+            "espera_p95_segundos": None,
+            "espera_maxima_segundos": None,
+            "atraso_medio_apos_janela_segundos": None,
+        }
+        if not esperas:
+            return resumo
+
+        media = sum(esperas) / len(esperas)
+        indice_p95 = min(int(round(0.95 * (len(esperas) - 1))), len(esperas) - 1)
+        resumo.update(
+            {
+                "espera_media_segundos": round(media, 3),
+                "espera_p95_segundos": round(esperas[indice_p95], 3),
+                "espera_maxima_segundos": round(esperas[-1], 3),
+                "atraso_medio_apos_janela_segundos": round(
+                    max(media - JANELA_CANCELAMENTO_SEGUNDOS, 0.0), 3
+                ),
+            }
+        )
+        return resumo
+
+
+def _parse_data_job(valor) -> datetime | None:
+    texto = str(valor or "").strip()
+    if not texto:
+        return None
+    try:
+        data = datetime.fromisoformat(texto.replace(" ", "T"))
+    except ValueError:
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return data
+
+
+METRICAS_FILA = MetricasFilaImpressao()
+ULTIMO_RESUMO_METRICAS_MONOTONIC = 0.0
+
+
+def obter_metricas_fila() -> dict:
+    resumo = METRICAS_FILA.resumo()
+    resumo["raias"] = DESPACHANTE_IMPRESSAO.resumo()
+    return resumo
 
 
 def limpar_arquivo_job(job):
@@ -167,12 +284,149 @@ def limpar_spool_expirado_se_necessario():
         )
 
 
-def processar_preview_apc_se_disponivel() -> bool:
+def registrar_resumo_metricas_se_necessario():
+    global ULTIMO_RESUMO_METRICAS_MONOTONIC
+
+    agora = time.monotonic()
+    if (agora - ULTIMO_RESUMO_METRICAS_MONOTONIC) < INTERVALO_RESUMO_METRICAS_SEGUNDOS:
+        return
+    ULTIMO_RESUMO_METRICAS_MONOTONIC = agora
+
+    resumo = METRICAS_FILA.resumo()
+    if not resumo["jobs_despachados"]:
+        return
+    logger.info(
+        "Fila de impressao: %s job(s) despachados, espera media %ss, p95 %ss, maxima %ss "
+        "(janela de cancelamento %ss).",
+        resumo["jobs_despachados"],
+        resumo["espera_media_segundos"],
+        resumo["espera_p95_segundos"],
+        resumo["espera_maxima_segundos"],
+        JANELA_CANCELAMENTO_SEGUNDOS,
+    )
+
+
+def chave_raia(job: dict) -> str:
+    """Raia de despacho do job: a impressora de destino (ou a padrao do CUPS)."""
+    return str(job.get("printer_name") or IMPRESSORA_PADRAO).strip().lower()
+
+
+def processar_job(job: dict):
     try:
-        return processar_proximo_apc_preview_job()
+        METRICAS_FILA.registrar_despacho(job)
+        resultado = imprimir_job(job)
+        atualizar_job_cups(
+            job_id=job["id"],
+            cups_job_id=resultado.get("cups_job_id"),
+            printer_name=resultado.get("printer_name"),
+        )
+        atualizar_status(job["id"], "CONCLUIDO")
+        publicar_job_impressao(job, "CONCLUIDO")
+        limpar_arquivo_job(job)
+    except Exception as exc:
+        logger.exception("Erro ao imprimir job %s", job["id"])
+        atualizar_erro_job(job["id"], str(exc))
+        atualizar_status(job["id"], "ERRO")
+        publicar_job_impressao(job, "ERRO")
+
+
+class DespachanteImpressao:
+    """Despacha jobs em paralelo, no maximo um por impressora.
+
+    Cada impressora e uma raia serial (a ordem da fila por impressora e
+    preservada) e ``max_raias`` limita quantos jobs ficam no CUPS/N-up ao mesmo
+    tempo. A escolha do proximo job segue a ordem global da fila
+    (``prioridade DESC, criado_em ASC``) entre as raias livres; a reivindicacao
+    e atomica no banco, entao nenhum job e impresso duas vezes.
+    """
+
+    def __init__(self, max_raias: int = MAX_RAIAS_IMPRESSAO, processar=None):
+        self.max_raias = max(int(max_raias), 1)
+        self._processar = processar or processar_job
+        self._ocupadas: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def raias_ocupadas(self) -> list[str]:
+        with self._lock:
+            return list(self._ocupadas)
+
+    def lotado(self) -> bool:
+        with self._lock:
+            return len(self._ocupadas) >= self.max_raias
+
+    def despachar(self) -> int:
+        despachados = 0
+        while not self.lotado():
+            job = reivindicar_proximo_job(
+                atraso_minimo_segundos=JANELA_CANCELAMENTO_SEGUNDOS,
+                impressoras_ocupadas=self.raias_ocupadas(),
+                impressora_padrao=IMPRESSORA_PADRAO,
+            )
+            if not job:
+                break
+
+            publicar_job_impressao(job, "IMPRIMINDO")
+            raia = chave_raia(job)
+            with self._lock:
+                self._ocupadas[raia] = int(job["id"])
+            threading.Thread(
+                target=self._executar,
+                args=(raia, job),
+                name=f"impressao-{raia or 'padrao'}",
+                daemon=True,
+            ).start()
+            despachados += 1
+        return despachados
+
+    def _executar(self, raia: str, job: dict):
+        try:
+            self._processar(job)
+        except Exception:
+            logger.exception("Falha inesperada na raia de impressao %r", raia)
+        finally:
+            with self._lock:
+                self._ocupadas.pop(raia, None)
+            # Libera a raia: o laco principal pode despachar o proximo job dela.
+            sinalizador_impressao.notificar()
+
+    def resumo(self) -> dict:
+        with self._lock:
+            return {
+                "max_raias": self.max_raias,
+                "ocupadas": {raia or "padrao": job_id for raia, job_id in self._ocupadas.items()},
+            }
+
+
+DESPACHANTE_IMPRESSAO = DespachanteImpressao()
+
+
+def calcular_espera_ociosa() -> float:
+    """Dorme ate o proximo job sair da janela de cancelamento, limitado ao polling.
+
+    Jobs de raias ocupadas nao contam: o fim da impressao em andamento acorda o
+    worker pelo sinalizador.
+    """
+    if DESPACHANTE_IMPRESSAO.lotado():
+        return INTERVALO
+    try:
+        segundos = segundos_ate_proximo_job(
+            atraso_minimo_segundos=JANELA_CANCELAMENTO_SEGUNDOS,
+            impressoras_ocupadas=DESPACHANTE_IMPRESSAO.raias_ocupadas(),
+            impressora_padrao=IMPRESSORA_PADRAO,
+        )
     except Exception:
-        logger.exception("Falha inesperada ao processar fila de previews APC")
-        return False
+        logger.exception("Falha ao calcular a espera ate o proximo job de impressao")
+        return INTERVALO
+
+    if segundos is None:
+        return INTERVALO
+    return min(max(segundos + MARGEM_JANELA_SEGUNDOS, ESPERA_MINIMA_SEGUNDOS), INTERVALO)
+
+
+def aguardar_proximo_trabalho() -> bool:
+    por_sinal = sinalizador_impressao.aguardar(calcular_espera_ociosa())
+    METRICAS_FILA.registrar_despertar(por_sinal)
+    return por_sinal
 
 
 def worker_loop():
@@ -187,32 +441,28 @@ def worker_loop():
     except Exception:
         logger.exception("Falha ao normalizar jobs pendentes antes de iniciar o worker")
 
+    escutando_sinais = sinalizador_impressao.escutar()
+    if iniciar_preview_apc_em_thread() is None:
+        logger.info("Previews APC a cargo do worker dedicado (apc_preview_worker_main.py)")
     logger.info(
-        "Worker de impressao iniciado (janela de cancelamento: %ss, retencao do spool: %s)",
+        "Worker de impressao iniciado (janela de cancelamento: %ss, retencao do spool: %s, "
+        "despertar: %s, polling de seguranca: %ss, raias paralelas: %s)",
         JANELA_CANCELAMENTO_SEGUNDOS,
         f"{RETENCAO_SPOOL_DIAS} dia(s)" if RETENCAO_SPOOL_DIAS > 0 else "desativada",
+        f"udp {sinalizador_impressao.porta}" if escutando_sinais else "somente local",
+        INTERVALO,
+        DESPACHANTE_IMPRESSAO.max_raias,
     )
 
     while True:
         limpar_spool_expirado_se_necessario()
-        job = buscar_proximo_job(atraso_minimo_segundos=JANELA_CANCELAMENTO_SEGUNDOS)
-
-        if job:
-            try:
-                atualizar_status(job["id"], "IMPRIMINDO")
-                resultado = imprimir_job(job)
-                atualizar_job_cups(
-                    job_id=job["id"],
-                    cups_job_id=resultado.get("cups_job_id"),
-                    printer_name=resultado.get("printer_name"),
-                )
-                atualizar_status(job["id"], "CONCLUIDO")
-                limpar_arquivo_job(job)
-            except Exception as exc:
-                logger.exception("Erro ao imprimir job %s", job["id"])
-                atualizar_erro_job(job["id"], str(exc))
-                atualizar_status(job["id"], "ERRO")
-        elif processar_preview_apc_se_disponivel():
-            continue
-        else:
-            time.sleep(INTERVALO)
+        registrar_resumo_metricas_se_necessario()
+
+        try:
+            despachados = DESPACHANTE_IMPRESSAO.despachar()
+        except Exception:
+            logger.exception("Falha ao despachar jobs de impressao")
+            despachados = 0
+
+        if not despachados:
+            aguardar_proximo_trabalho()
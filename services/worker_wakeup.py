@@ -0,0 +1,135 @@
+import logging
+import os
+import select
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+WAKE_HOST = "127.0.0.1"
+WAKE_PAYLOAD = b"wake"
+
+
+def _resolver_porta(nome: str, padrao: int) -> int:
+    valor = os.getenv(nome, str(padrao)).strip()
+    try:
+        porta = int(valor)
+    except ValueError:
+        logger.warning("Valor invalido para %s=%r; usando %s.", nome, valor, padrao)
+        return padrao
+    return porta if 0 <= porta <= 65535 else padrao
+
+
+PRINT_WORKER_WAKE_PORT = _resolver_porta("PRINT_WORKER_WAKE_PORT", 8766)
+APC_PREVIEW_WORKER_WAKE_PORT = _resolver_porta("APC_PREVIEW_WORKER_WAKE_PORT", 8767)
+NOTIFICATION_WORKER_WAKE_PORT = _resolver_porta("NOTIFICATION_WORKER_WAKE_PORT", 8769)
+
+
+class SinalizadorWorker:
+    """Acorda um worker ocioso assim que chega trabalho novo.
+
+    O worker escuta um socket UDP local; produtores (API ou worker embutido)
+    enviam um datagrama sem esperar resposta. Quando a porta e ``0`` ou o bind
+    falha, o sinal fica restrito ao proprio processo via ``threading.Event``
+    e o worker continua coberto pelo polling de fallback.
+    """
+
+    def __init__(self, porta: int):
+        self.porta = int(porta)
+        self._evento = threading.Event()
+        self._socket: socket.socket | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def escutando(self) -> bool:
+        return self._socket is not None
+
+    def escutar(self) -> bool:
+        with self._lock:
+            if self._socket is not None:
+                return True
+            if self.porta <= 0:
+                return False
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.bind((WAKE_HOST, self.porta))
+            except OSError as exc:
+                sock.close()
+                logger.warning(
+                    "Nao foi possivel escutar sinais do worker em %s:%s (%s); usando polling.",
+                    WAKE_HOST,
+                    self.porta,
+                    exc,
+                )
+                return False
+            sock.setblocking(False)
+            self._socket = sock
+            return True
+
+    def notificar(self) -> None:
+        self._evento.set()
+        if self.porta <= 0:
+            return
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.sendto(WAKE_PAYLOAD, (WAKE_HOST, self.porta))
+        except OSError:
+            # Sinal e apenas otimizacao; o worker segue com polling de fallback.
+            pass
+
+    def aguardar(self, timeout: float) -> bool:
+        timeout = max(float(timeout), 0.0)
+        if self._evento.is_set():
+            self._evento.clear()
+            self._drenar()
+            return True
+
+        sock = self._socket
+        if sock is None:
+            acordado = self._evento.wait(timeout)
+            self._evento.clear()
+            return acordado
+
+        legiveis, _, _ = select.select([sock], [], [], timeout)
+        self._evento.clear()
+        self._drenar()
+        return bool(legiveis)
+
+    def _drenar(self) -> None:
+        sock = self._socket
+        if sock is None:
+            return
+        while True:
+            try:
+                sock.recv(64)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+
+sinalizador_impressao = SinalizadorWorker(PRINT_WORKER_WAKE_PORT)
+
+
+def notificar_worker_impressao() -> None:
+    sinalizador_impressao.notificar()
+
+
+sinalizador_preview_apc = SinalizadorWorker(APC_PREVIEW_WORKER_WAKE_PORT)
+
+
+def notificar_worker_preview_apc() -> None:
+    sinalizador_preview_apc.notificar()
+
+
+sinalizador_notificacoes = SinalizadorWorker(NOTIFICATION_WORKER_WAKE_PORT)
+
+
+def notificar_worker_notificacoes() -> None:
+    sinalizador_notificacoes.notificar()
@@ -1,16 +1,40 @@
+"""Jobs de download do YouTube persistidos no SQLite, com cache compartilhado.
+
+Cada pedido vira um job do usuario apontando para um artefato identificado por
+(video, formato, qualidade). Pedidos iguais, de qualquer professor ou processo
+da API, se penduram no mesmo artefato: so o primeiro baixa, e os demais recebem
+o arquivo quando ele fica pronto. Artefatos concluidos ficam em
+``SPOOL_DIR/youtube/cache`` ate o total passar de
+``YOUTUBE_DOWNLOAD_CACHE_MAX_MB``; dai saem os menos acessados.
+"""
+
 import logging
 import os
-import threading
-import time
+import shutil
 import uuid
 from concurrent.futures import ThreadPoolExecutor
-from copy import deepcopy
 from datetime import UTC, datetime
 from pathlib import Path
 
+from db.youtube import (
+    buscar_youtube_download_job,
+    buscar_youtube_download_ticket,
+    concluir_youtube_artefato,
+    criar_youtube_download_ticket,
+    descartar_youtube_artefato,
+    falhar_youtube_artefato,
+    limpar_youtube_downloads_expirados,
+    marcar_youtube_artefato_processando,
+    registrar_youtube_download_job,
+    remover_youtube_artefatos_excedentes,
+    tocar_youtube_artefato,
+)
+from services.file_delivery import etag_arquivo
 from services.youtube_download_service import (
     YoutubeDownloadError,
     baixar_arquivo,
+    extrair_id_video,
+    garantir_diretorio_download,
     preparar_solicitacao_download,
     remover_arquivo_se_existir,
 )
@@ -23,6 +47,9 @@ STATUS_DOWNLOAD_FINALIZADOS = {STATUS_DOWNLOAD_CONCLUIDO, STATUS_DOWNLOAD_ERRO}
 _MAX_WORKERS_PADRAO = 2
 _TTL_JOB_PADRAO_SEGUNDOS = 1800
 _TTL_TICKET_PADRAO_SEGUNDOS = 120
+_CACHE_MAX_MB_PADRAO = 4096
+_MINUTOS_DOWNLOAD_TRAVADO = 120
+_MENSAGEM_ARQUIVO_EXPIRADO = "O arquivo expirou ou nao esta mais disponivel."
 logger = logging.getLogger(__name__)
 
 
@@ -50,13 +77,14 @@ TTL_TICKET_DOWNLOAD_SEGUNDOS = _resolver_env_int(
     _TTL_TICKET_PADRAO_SEGUNDOS,
     30,
 )
+CACHE_MAX_BYTES_DOWNLOAD = (
+    _resolver_env_int("YOUTUBE_DOWNLOAD_CACHE_MAX_MB", _CACHE_MAX_MB_PADRAO, 1) * 1024 * 1024
+)
+# ponytail: o pool e por processo; a coordenacao entre processos fica no SQLite.
 _EXECUTOR = ThreadPoolExecutor(
     max_workers=MAX_WORKERS_DOWNLOAD,
     thread_name_prefix="youtube-download",
 )
-_JOBS: dict[str, dict] = {}
-_TICKETS: dict[str, dict] = {}
-_LOCK = threading.Lock()
 
 
 class YoutubeDownloadJobError(RuntimeError):
@@ -75,16 +103,18 @@ class YoutubeDownloadTicketInvalidError(YoutubeDownloadJobError):
     pass
 
 
-def _agora_ts() -> float:
-    return time.time()
-
-
-def _agora_iso() -> str:
-    return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+def _sql_para_datetime(valor) -> datetime | None:
+    try:
+        return datetime.strptime(str(valor or "")[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=UTC)
+    except ValueError:
+        return None
 
 
-def _ts_para_iso(timestamp: float) -> str:
-    return datetime.fromtimestamp(timestamp, UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+def _sql_para_iso(valor) -> str:
+    data = _sql_para_datetime(valor)
+    if data is None:
+        return str(valor or "")
+    return data.isoformat().replace("+00:00", "Z")
 
 
 def _mensagem_status(job: dict) -> str:
@@ -112,8 +142,8 @@ def _job_publico(job: dict) -> dict:
         "arquivo_nome": job.get("arquivo_nome"),
         "media_type": job.get("media_type"),
         "erro_mensagem": job.get("erro_mensagem"),
-        "criado_em": job["criado_em"],
-        "atualizado_em": job["atualizado_em"],
+        "criado_em": _sql_para_iso(job["criado_em"]),
+        "atualizado_em": _sql_para_iso(job["atualizado_em"]),
         "mensagem_status": _mensagem_status(job),
         "pronto": job["status"] == STATUS_DOWNLOAD_CONCLUIDO and bool(job.get("arquivo_path")),
     }
@@ -122,268 +152,175 @@ def _job_publico(job: dict) -> dict:
     return payload
 
 
-def _atualizar_job(job: dict, **campos):
-    job.update(campos)
-    job["atualizado_em"] = _agora_iso()
-    job["updated_ts"] = _agora_ts()
+def _chave_artefato(video_id: str, formato: str, qualidade: str | None) -> str:
+    return f"{video_id}:{formato}:{qualidade or ''}"
 
 
-def _job_expirado(job: dict, agora: float) -> bool:
-    if job.get("status") not in STATUS_DOWNLOAD_FINALIZADOS:
-        return False
-    return (agora - float(job.get("updated_ts") or 0.0)) >= TTL_JOB_DOWNLOAD_SEGUNDOS
-
-
-def _limpar_jobs_expirados_locked():
-    agora = _agora_ts()
-    removidos = []
-    for job_id, job in _JOBS.items():
-        if not _job_expirado(job, agora):
-            continue
-        removidos.append((job_id, job.get("arquivo_path")))
-
-    for job_id, arquivo_path in removidos:
-        _JOBS.pop(job_id, None)
-        for ticket_id, ticket in list(_TICKETS.items()):
-            if ticket.get("job_id") == job_id:
-                _TICKETS.pop(ticket_id, None)
-        if arquivo_path:
-            remover_arquivo_se_existir(Path(arquivo_path))
-
-
-def _limpar_tickets_expirados_locked():
-    agora = _agora_ts()
-    for ticket_id, ticket in list(_TICKETS.items()):
-        if float(ticket.get("expira_ts") or 0.0) <= agora:
-            _TICKETS.pop(ticket_id, None)
-
-
-def _buscar_job_reutilizavel_locked(usuario_id: int, url: str, formato: str, qualidade: str | None) -> dict | None:
-    for job in _JOBS.values():
-        if int(job["usuario_id"]) != int(usuario_id):
-            continue
-        if job["url"] != url or job["formato"] != formato or job.get("qualidade") != qualidade:
-            continue
-        if job["status"] in {STATUS_DOWNLOAD_PENDENTE, STATUS_DOWNLOAD_PROCESSANDO}:
-            return job
-        if job["status"] == STATUS_DOWNLOAD_CONCLUIDO and job.get("arquivo_path"):
-            caminho = Path(job["arquivo_path"])
-            if caminho.exists():
-                return job
-    return None
-
-
-def _obter_job_do_usuario_locked(job_id: str, usuario_id: int) -> dict:
-    job = _JOBS.get(str(job_id))
-    if job is None or int(job["usuario_id"]) != int(usuario_id):
-        raise YoutubeDownloadJobNotFoundError("Download nao encontrado.")
-    return job
+def _diretorio_cache() -> Path:
+    diretorio = garantir_diretorio_download() / "cache"
+    diretorio.mkdir(parents=True, exist_ok=True)
+    return diretorio
 
 
-def _processar_job(job_id: str):
-    with _LOCK:
-        job = _JOBS.get(job_id)
-        if job is None:
-            return
-        _atualizar_job(job, status=STATUS_DOWNLOAD_PROCESSANDO, erro_mensagem=None)
-        payload = {
-            "url": job["url"],
-            "formato": job["formato"],
-            "qualidade": job.get("qualidade"),
-        }
+def _guardar_no_cache(caminho: Path, chave: str, dono: str) -> Path:
+    # O sufixo do dono evita sobrescrever um arquivo ainda servido quando o
+    # mesmo artefato e baixado de novo.
+    destino = _diretorio_cache() / f"{chave.replace(':', '_')}_{dono[:12]}{caminho.suffix.lower()}"
+    try:
+        os.replace(caminho, destino)
+    except OSError:
+        shutil.move(str(caminho), str(destino))
+    return destino
+
+
+def _aplicar_limite_cache(chave_preservada: str):
+    caminhos = remover_youtube_artefatos_excedentes(
+        CACHE_MAX_BYTES_DOWNLOAD,
+        _MENSAGEM_ARQUIVO_EXPIRADO,
+        preservar_chave=chave_preservada,
+    )
+    for caminho in caminhos:
+        remover_arquivo_se_existir(Path(caminho))
+    if caminhos:
+        logger.info("Cache de downloads do YouTube: %s arquivo(s) removido(s) pelo limite de tamanho", len(caminhos))
+
+
+def _processar_artefato(chave: str, dono: str, url: str, formato: str, qualidade: str | None):
+    if not marcar_youtube_artefato_processando(chave, dono):
+        return
 
     try:
-        caminho, nome_arquivo, media_type = baixar_arquivo(
-            payload["url"],
-            payload["formato"],
-            payload["qualidade"],
-        )
+        caminho, nome_arquivo, media_type = baixar_arquivo(url, formato, qualidade)
     except YoutubeDownloadError as exc:
-        with _LOCK:
-            job = _JOBS.get(job_id)
-            if job is not None:
-                _atualizar_job(
-                    job,
-                    status=STATUS_DOWNLOAD_ERRO,
-                    erro_mensagem=str(exc),
-                    arquivo_path=None,
-                    arquivo_nome=None,
-                    media_type=None,
-                )
+        falhar_youtube_artefato(chave, dono, str(exc))
         return
     except Exception:
-        logger.exception("Falha inesperada ao processar job de download %s", job_id)
-        with _LOCK:
-            job = _JOBS.get(job_id)
-            if job is not None:
-                _atualizar_job(
-                    job,
-                    status=STATUS_DOWNLOAD_ERRO,
-                    erro_mensagem="Falha inesperada ao preparar o download.",
-                    arquivo_path=None,
-                    arquivo_nome=None,
-                    media_type=None,
-                )
+        logger.exception("Falha inesperada ao processar download %s", chave)
+        falhar_youtube_artefato(chave, dono, "Falha inesperada ao preparar o download.")
         return
 
-    with _LOCK:
-        job = _JOBS.get(job_id)
-        if job is None:
-            remover_arquivo_se_existir(caminho)
-            return
-        _atualizar_job(
-            job,
-            status=STATUS_DOWNLOAD_CONCLUIDO,
-            erro_mensagem=None,
-            arquivo_path=str(caminho),
-            arquivo_nome=nome_arquivo,
-            media_type=media_type,
-        )
+    try:
+        caminho_cache = _guardar_no_cache(Path(caminho), chave, dono)
+        tamanho_bytes = caminho_cache.stat().st_size
+        # Calcula o ETag aqui, para a primeira entrega nao ler o video inteiro.
+        etag_arquivo(caminho_cache)
+    except OSError:
+        logger.exception("Falha ao guardar download %s no cache", chave)
+        remover_arquivo_se_existir(Path(caminho))
+        falhar_youtube_artefato(chave, dono, "Falha inesperada ao preparar o download.")
+        return
 
+    publicado = concluir_youtube_artefato(
+        chave,
+        dono,
+        arquivo_path=str(caminho_cache),
+        arquivo_nome=nome_arquivo,
+        media_type=media_type,
+        tamanho_bytes=tamanho_bytes,
+    )
+    if not publicado:
+        remover_arquivo_se_existir(caminho_cache)
+        return
+    _aplicar_limite_cache(chave)
 
-def criar_job_download(usuario_id: int, url: str, formato: str, qualidade: str | None = None) -> dict:
-    url_validada, formato_limpo, qualidade_limpa = preparar_solicitacao_download(url, formato, qualidade)
 
-    with _LOCK:
-        _limpar_jobs_expirados_locked()
-        job_existente = _buscar_job_reutilizavel_locked(
-            int(usuario_id),
-            url_validada,
-            formato_limpo,
-            qualidade_limpa,
-        )
-        if job_existente is not None:
-            return deepcopy(_job_publico(job_existente))
-
-        job_id = uuid.uuid4().hex
-        job = {
-            "id": job_id,
-            "usuario_id": int(usuario_id),
-            "url": url_validada,
-            "formato": formato_limpo,
-            "qualidade": qualidade_limpa,
-            "status": STATUS_DOWNLOAD_PENDENTE,
-            "erro_mensagem": None,
-            "arquivo_path": None,
-            "arquivo_nome": None,
-            "media_type": None,
-            "criado_em": _agora_iso(),
-            "atualizado_em": _agora_iso(),
-            "updated_ts": _agora_ts(),
-        }
-        _JOBS[job_id] = job
+def _job_expirado(job: dict) -> bool:
+    if job.get("status") not in STATUS_DOWNLOAD_FINALIZADOS:
+        return False
+    atualizado_em = _sql_para_datetime(job.get("atualizado_em"))
+    if atualizado_em is None:
+        return False
+    return (datetime.now(UTC) - atualizado_em).total_seconds() >= TTL_JOB_DOWNLOAD_SEGUNDOS
+
 
-    try:
-        _EXECUTOR.submit(_processar_job, job_id)
-    except Exception:
-        with _LOCK:
-            job = _JOBS.get(job_id)
-            if job is not None:
-                _atualizar_job(
-                    job,
-                    status=STATUS_DOWNLOAD_ERRO,
-                    erro_mensagem="Nao foi possivel iniciar o processamento do download.",
-                )
-                return deepcopy(_job_publico(job))
-        raise
+def _obter_job_do_usuario(job_id: str, usuario_id: int) -> dict:
+    job = buscar_youtube_download_job(str(job_id))
+    if job is None or int(job["usuario_id"]) != int(usuario_id) or _job_expirado(job):
+        raise YoutubeDownloadJobNotFoundError("Download nao encontrado.")
+    return job
 
-    with _LOCK:
-        return deepcopy(_job_publico(_JOBS[job_id]))
 
+def _obter_arquivo_pronto(job: dict) -> Path:
+    if job["status"] != STATUS_DOWNLOAD_CONCLUIDO or not job.get("arquivo_path"):
+        raise YoutubeDownloadJobNotReadyError("O arquivo ainda esta sendo preparado.")
 
-def obter_job_download(job_id: str, usuario_id: int) -> dict:
-    with _LOCK:
-        _limpar_jobs_expirados_locked()
-        job = _obter_job_do_usuario_locked(job_id, int(usuario_id))
-        if job["status"] == STATUS_DOWNLOAD_CONCLUIDO and job.get("arquivo_path"):
-            if not Path(job["arquivo_path"]).exists():
-                _atualizar_job(
-                    job,
-                    status=STATUS_DOWNLOAD_ERRO,
-                    erro_mensagem="O arquivo expirou ou nao esta mais disponivel.",
-                    arquivo_path=None,
-                    arquivo_nome=None,
-                    media_type=None,
-                )
-        return deepcopy(_job_publico(job))
+    caminho = Path(job["arquivo_path"])
+    if not caminho.exists():
+        descartar_youtube_artefato(job["artefato_chave"], _MENSAGEM_ARQUIVO_EXPIRADO)
+        raise YoutubeDownloadJobNotFoundError(_MENSAGEM_ARQUIVO_EXPIRADO)
+    return caminho
 
 
-def obter_arquivo_job_download(job_id: str, usuario_id: int) -> tuple[Path, str, str]:
-    with _LOCK:
-        _limpar_jobs_expirados_locked()
-        job = _obter_job_do_usuario_locked(job_id, int(usuario_id))
+def criar_job_download(usuario_id: int, url: str, formato: str, qualidade: str | None = None) -> dict:
+    url_validada, formato_limpo, qualidade_limpa = preparar_solicitacao_download(url, formato, qualidade)
+    video_id = extrair_id_video(url_validada)
+    chave = _chave_artefato(video_id, formato_limpo, qualidade_limpa)
+    dono = uuid.uuid4().hex
+
+    limpar_youtube_downloads_expirados(TTL_JOB_DOWNLOAD_SEGUNDOS)
+    job, iniciar_download = registrar_youtube_download_job(
+        job_id=uuid.uuid4().hex,
+        usuario_id=int(usuario_id),
+        url=url_validada,
+        formato=formato_limpo,
+        qualidade=qualidade_limpa,
+        video_id=video_id,
+        chave=chave,
+        dono=dono,
+        minutos_travado=_MINUTOS_DOWNLOAD_TRAVADO,
+    )
+    if not iniciar_download:
+        return _job_publico(job)
 
-        if job["status"] != STATUS_DOWNLOAD_CONCLUIDO or not job.get("arquivo_path"):
-            raise YoutubeDownloadJobNotReadyError("O arquivo ainda esta sendo preparado.")
+    try:
+        _EXECUTOR.submit(_processar_artefato, chave, dono, url_validada, formato_limpo, qualidade_limpa)
+    except Exception:
+        falhar_youtube_artefato(chave, dono, "Nao foi possivel iniciar o processamento do download.")
+        job = buscar_youtube_download_job(job["id"])
+        if job is None:
+            raise
+    return _job_publico(job)
 
-        caminho = Path(job["arquivo_path"])
-        nome_arquivo = str(job.get("arquivo_nome") or caminho.name)
-        media_type = str(job.get("media_type") or "application/octet-stream")
 
-    if not caminho.exists():
-        with _LOCK:
-            job = _JOBS.get(str(job_id))
-            if job is not None:
-                _atualizar_job(
-                    job,
-                    status=STATUS_DOWNLOAD_ERRO,
-                    erro_mensagem="O arquivo expirou ou nao esta mais disponivel.",
-                    arquivo_path=None,
-                    arquivo_nome=None,
-                    media_type=None,
-                )
-        raise YoutubeDownloadJobNotFoundError("O arquivo expirou ou nao esta mais disponivel.")
+def obter_job_download(job_id: str, usuario_id: int) -> dict:
+    job = _obter_job_do_usuario(job_id, int(usuario_id))
+    if job["status"] == STATUS_DOWNLOAD_CONCLUIDO and job.get("arquivo_path"):
+        if not Path(job["arquivo_path"]).exists():
+            descartar_youtube_artefato(job["artefato_chave"], _MENSAGEM_ARQUIVO_EXPIRADO)
+            job = buscar_youtube_download_job(job["id"]) or job
+    return _job_publico(job)
 
+
+def obter_arquivo_job_download(job_id: str, usuario_id: int) -> tuple[Path, str, str]:
+    job = _obter_job_do_usuario(job_id, int(usuario_id))
+    caminho = _obter_arquivo_pronto(job)
+    tocar_youtube_artefato(job["artefato_chave"])
+    nome_arquivo = str(job.get("arquivo_nome") or caminho.name)
+    media_type = str(job.get("media_type") or "application/octet-stream")
     return caminho, nome_arquivo, media_type
 
 
 def criar_ticket_download(job_id: str, usuario_id: int) -> dict:
-    with _LOCK:
-        _limpar_jobs_expirados_locked()
-        _limpar_tickets_expirados_locked()
-        job = _obter_job_do_usuario_locked(job_id, int(usuario_id))
-        if job["status"] != STATUS_DOWNLOAD_CONCLUIDO or not job.get("arquivo_path"):
-            raise YoutubeDownloadJobNotReadyError("O arquivo ainda esta sendo preparado.")
-
-        caminho = Path(job["arquivo_path"])
-        if not caminho.exists():
-            _atualizar_job(
-                job,
-                status=STATUS_DOWNLOAD_ERRO,
-                erro_mensagem="O arquivo expirou ou nao esta mais disponivel.",
-                arquivo_path=None,
-                arquivo_nome=None,
-                media_type=None,
-            )
-            raise YoutubeDownloadJobNotFoundError("O arquivo expirou ou nao esta mais disponivel.")
-
-        ticket = uuid.uuid4().hex
-        expira_ts = _agora_ts() + TTL_TICKET_DOWNLOAD_SEGUNDOS
-        _TICKETS[ticket] = {
-            "ticket": ticket,
-            "job_id": str(job_id),
-            "usuario_id": int(usuario_id),
-            "expira_ts": expira_ts,
-            "criado_em": _agora_iso(),
-        }
-        return {
-            "ticket": ticket,
-            "arquivo_nome": str(job.get("arquivo_nome") or caminho.name),
-            "download_url": f"/download/jobs/{job_id}/arquivo?ticket={ticket}",
-            "expira_em": _ts_para_iso(expira_ts),
-        }
+    job = _obter_job_do_usuario(job_id, int(usuario_id))
+    caminho = _obter_arquivo_pronto(job)
+
+    ticket = uuid.uuid4().hex
+    expira_em = criar_youtube_download_ticket(ticket, job["id"], int(usuario_id), TTL_TICKET_DOWNLOAD_SEGUNDOS)
+    return {
+        "ticket": ticket,
+        "arquivo_nome": str(job.get("arquivo_nome") or caminho.name),
+        "download_url": f"/download/jobs/{job_id}/arquivo?ticket={ticket}",
+        "expira_em": _sql_para_iso(expira_em),
+    }
 
 
 def validar_ticket_download(job_id: str, ticket: str) -> int:
-    with _LOCK:
-        _limpar_jobs_expirados_locked()
-        _limpar_tickets_expirados_locked()
-        ticket_info = _TICKETS.get(str(ticket))
-        if ticket_info is None or str(ticket_info.get("job_id")) != str(job_id):
-            raise YoutubeDownloadTicketInvalidError("Ticket de download invalido ou expirado.")
-
-        job = _JOBS.get(str(job_id))
-        if job is None or job.get("arquivo_path") is None:
-            raise YoutubeDownloadTicketInvalidError("Ticket de download invalido ou expirado.")
-
-        return int(ticket_info["usuario_id"])
+    ticket_info = buscar_youtube_download_ticket(str(ticket))
+    if ticket_info is None or str(ticket_info.get("job_id")) != str(job_id):
+        raise YoutubeDownloadTicketInvalidError("Ticket de download invalido ou expirado.")
+
+    job = buscar_youtube_download_job(str(job_id))
+    if job is None or job.get("arquivo_path") is None:
+        raise YoutubeDownloadTicketInvalidError("Ticket de download invalido ou expirado.")
+
+    return int(ticket_info["usuario_id"])
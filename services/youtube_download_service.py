@@ -1,4 +1,5 @@
 import os
+import hashlib
 import re
 import shutil
 import ssl
@@ -8,6 +9,7 @@ import uuid
 from copy import deepcopy
 from pathlib import Path
 from urllib.error import URLError
+from urllib.parse import parse_qs, urlsplit
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DOWNLOAD_DIR = Path(os.getenv("SPOOL_DIR", str(BASE_DIR / "spool"))) / "youtube"
@@ -23,6 +25,8 @@ QUALIDADE_ALTURAS_MP4 = {
     "2160p": 2160,
 }
 FORMATOS_VALIDOS_DOWNLOAD = {"mp4", "mp3"}
+VIDEO_ID_REGEX = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_PREFIXOS_CAMINHO_VIDEO = ("shorts", "embed", "live", "v")
 _INFO_VIDEO_CACHE: dict[str, tuple[float, dict]] = {}
 _INFO_VIDEO_CACHE_LOCK = threading.Lock()
 
@@ -102,6 +106,31 @@ def validar_url_youtube(url: str) -> str:
     return url_limpa
 
 
+def extrair_id_video(url: str) -> str:
+    """Identifica o video para o cache de downloads, independente da forma do link.
+
+    Links do YouTube (``watch?v=``, ``youtu.be/``, ``/shorts/``, ``/embed/``,
+    ``/live/``) viram o id de 11 caracteres; outros links caem num hash da URL.
+    """
+    url_limpa = validar_url_youtube(url)
+    partes = urlsplit(url_limpa)
+    host = partes.netloc.lower().split(":", 1)[0]
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+    segmentos = [item for item in partes.path.split("/") if item]
+
+    candidato = ""
+    if host == "youtu.be" and segmentos:
+        candidato = segmentos[0]
+    elif host in {"youtube.com", "music.youtube.com", "youtube-nocookie.com"}:
+        candidato = (parse_qs(partes.query).get("v") or [""])[0]
+        if not candidato and len(segmentos) >= 2 and segmentos[0] in _PREFIXOS_CAMINHO_VIDEO:
+            candidato = segmentos[1]
+    if VIDEO_ID_REGEX.match(candidato):
+        return candidato
+    return "url-" + hashlib.sha256(url_limpa.encode("utf-8")).hexdigest()[:24]
+
+
 def sanitizar_nome_arquivo(nome: str) -> str:
     nome_limpo = re.sub(r"[^\w.\- ]+", "", str(nome or "").strip(), flags=re.ASCII)
     nome_limpo = re.sub(r"\s+", " ", nome_limpo).strip().replace(" ", "_")
@@ -0,0 +1,144 @@
+(function (window, document) {
+    // Canal /eventos (server-sent events) lido via fetch para enviar o token no
+    // cabecalho Authorization, o que o EventSource nativo nao permite.
+    const RECONNECT_MIN_MS = 2000;
+    const RECONNECT_MAX_MS = 60000;
+    const state = {
+        started: false,
+        connected: false,
+        everConnected: false,
+        controller: null,
+        retryMs: RECONNECT_MIN_MS,
+        retryTimer: null,
+    };
+
+    function emit(type, detail) {
+        document.dispatchEvent(new CustomEvent(`app-events:${type}`, { detail: detail || {} }));
+    }
+
+    function setConnected(connected) {
+        if (state.connected === connected) return;
+        state.connected = connected;
+        emit("connection", { connected });
+    }
+
+    function parseBlock(block) {
+        let event = "message";
+        const data = [];
+        block.split("\n").forEach((line) => {
+            if (!line || line.startsWith(":")) return;
+            const separator = line.indexOf(":");
+            const field = separator < 0 ? line : line.slice(0, separator);
+            let value = separator < 0 ? "" : line.slice(separator + 1);
+            if (value.startsWith(" ")) value = value.slice(1);
+            if (field === "event") event = value;
+            if (field === "data") data.push(value);
+        });
+        if (!data.length) return null;
+        try {
+            return { event, data: JSON.parse(data.join("\n")) };
+        } catch (_error) {
+            return null;
+        }
+    }
+
+    function handleMessage(message) {
+        if (message.event === "conectado") {
+            state.retryMs = RECONNECT_MIN_MS;
+            setConnected(true);
+            // Eventos perdidos durante a queda: as telas recarregam pelo HTTP.
+            if (state.everConnected) emit("resync");
+            state.everConnected = true;
+            return;
+        }
+        emit(message.event, message.data);
+    }
+
+    async function readStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) return;
+            buffer += decoder.decode(value, { stream: true }).replace(/\r\n?/g, "\n");
+            let end = buffer.indexOf("\n\n");
+            while (end >= 0) {
+                const message = parseBlock(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+                if (message) handleMessage(message);
+                end = buffer.indexOf("\n\n");
+            }
+        }
+    }
+
+    function scheduleReconnect() {
+        if (!state.started || state.retryTimer) return;
+        const delay = state.retryMs + Math.floor(Math.random() * 1000);
+        state.retryMs = Math.min(state.retryMs * 2, RECONNECT_MAX_MS);
+        state.retryTimer = window.setTimeout(() => {
+            state.retryTimer = null;
+            connect();
+        }, delay);
+    }
+
+    async function connect() {
+        if (!state.started || state.controller || !window.AppAuth?.obterToken?.()) return;
+        const controller = new AbortController();
+        state.controller = controller;
+        try {
+            const response = await fetch("/eventos", {
+                headers: Object.assign({ Accept: "text/event-stream" }, window.AppAuth.criarHeadersAuth()),
+                cache: "no-store",
+                signal: controller.signal,
+            });
+            if (response.status === 401 || response.status === 403) {
+                state.started = false;
+            } else if (response.ok && response.body) {
+                await readStream(response);
+            }
+        } catch (_error) {
+            // Queda de rede ou stop(): as telas seguem com o polling de fallback.
+        }
+        if (state.controller === controller) state.controller = null;
+        setConnected(false);
+        scheduleReconnect();
+    }
+
+    function start() {
+        if (state.started) return;
+        if (!window.fetch || !window.ReadableStream || !window.TextDecoder) return;
+        state.started = true;
+        connect();
+    }
+
+    function stop() {
+        state.started = false;
+        window.clearTimeout(state.retryTimer);
+        state.retryTimer = null;
+        state.controller?.abort();
+        state.controller = null;
+        setConnected(false);
+    }
+
+    window.addEventListener("online", () => {
+        if (!state.started || state.controller) return;
+        window.clearTimeout(state.retryTimer);
+        state.retryTimer = null;
+        state.retryMs = RECONNECT_MIN_MS;
+        connect();
+    });
+    window.addEventListener("pagehide", stop);
+    window.addEventListener("pageshow", (event) => {
+        if (event.persisted) start();
+    });
+
+    window.AppEvents = Object.assign(window.AppEvents || {}, {
+        start,
+        stop,
+        isConnected: () => state.connected,
+    });
+    document.readyState === "loading"
+        ? document.addEventListener("DOMContentLoaded", start, { once: true })
+        : start();
+})(window, document);
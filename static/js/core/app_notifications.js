@@ -248,6 +248,11 @@
         });
         window.addEventListener("focus", loadCount);
         window.addEventListener("online", loadCount);
+        document.addEventListener("app-events:notificacoes.nao_lidas", (event) => {
+            setBadge(event.detail.unread_count);
+            if (state.open) loadInbox();
+        });
+        document.addEventListener("app-events:resync", loadCount);
         navigator.serviceWorker?.addEventListener("message", (event) => {
             if (event.data?.type === "notification-received") {
                 loadCount();
@@ -266,7 +271,10 @@
         markFromUrl();
         reconcileSubscription();
         loadCount();
-        window.setInterval(() => { if (!document.hidden) loadCount(); }, 60000);
+        // Fallback: com o canal /eventos conectado a contagem chega por push.
+        window.setInterval(() => {
+            if (!document.hidden && !window.AppEvents?.isConnected?.()) loadCount();
+        }, 60000);
     }
 
     window.AppNotifications = Object.assign(window.AppNotifications || {}, {
@@ -257,7 +257,17 @@
             showFeedback(error.message || "Não foi possível carregar os professores.", true);
         }
         await refresh();
-        pollTimer = window.setInterval(refresh, POLL_INTERVAL_MS);
+        // Com o canal /eventos conectado, o polling fica so como fallback.
+        pollTimer = window.setInterval(() => {
+            if (!window.AppEvents?.isConnected?.()) refresh();
+        }, POLL_INTERVAL_MS);
+        let pushRefreshTimer = null;
+        const refreshFromPush = () => {
+            window.clearTimeout(pushRefreshTimer);
+            pushRefreshTimer = window.setTimeout(refresh, 300);
+        };
+        document.addEventListener("app-events:impressao.job", refreshFromPush);
+        document.addEventListener("app-events:resync", refreshFromPush);
     }
 
     window.addEventListener("beforeunload", () => window.clearInterval(pollTimer));
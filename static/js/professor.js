@@ -2301,6 +2301,8 @@ function iniciarPollingFila() {
     }
 
     filaPollingTimer = window.setInterval(() => {
+        // Com o canal /eventos conectado, o polling fica so como fallback.
+        if (window.AppEvents?.isConnected?.()) return;
         carregarStatusImpressao().catch(() => {
             // Evita poluir a UI com erros intermitentes durante polling.
         });
@@ -2310,6 +2312,30 @@ function iniciarPollingFila() {
     }, FILA_POLLING_MS);
 }
 
+let filaEventosTimer = null;
+
+function agendarRecargaFilaPorEvento({ cota = false } = {}) {
+    window.clearTimeout(filaEventosTimer);
+    filaEventosTimer = window.setTimeout(() => {
+        carregarFila().catch(() => {});
+        if (cota) carregarCota().catch(() => {});
+    }, 300);
+}
+
+function assinarEventosImpressao() {
+    document.addEventListener("app-events:impressao.job", (event) => {
+        agendarRecargaFilaPorEvento({ cota: event.detail?.status === "CANCELADO" });
+    });
+    document.addEventListener("app-events:impressao.status", (event) => {
+        statusImpressaoAtual = event.detail;
+        aplicarStatusImpressaoNaTela({ mostrarModal: false });
+    });
+    document.addEventListener("app-events:resync", () => {
+        carregarStatusImpressao().catch(() => {});
+        agendarRecargaFilaPorEvento({ cota: true });
+    });
+}
+
 async function carregarPreview(file) {
     previewLoadSeq += 1;
     const cargaAtual = previewLoadSeq;
@@ -3533,6 +3559,7 @@ async function inicializarPagina() {
     }
 
     iniciarPollingFila();
+    assinarEventosImpressao();
 }
 
 inicializarPagina();
@@ -928,6 +928,45 @@ async function enviarRelatorioProfessorEmail() {
     setMensagemProfessor(resposta?.mensagem || "Relatório enviado com sucesso.");
 }
 
+function descreverLoteRelatorios(lote = {}) {
+    const processados = Number(lote.enviados || 0) + Number(lote.simulados || 0) + Number(lote.erros || 0);
+    const progresso = `${formatarNumero(processados)} de ${formatarNumero(lote.total || 0)}`;
+    if (lote.status === "CONCLUIDO") {
+        return lote.erros
+            ? `Envio em lote concluído: ${progresso}, com ${formatarNumero(lote.erros)} falha(s).`
+            : `Envio em lote concluído: ${progresso} relatório(s) enviados.`;
+    }
+    if (lote.status === "ERRO") {
+        return `Envio em lote interrompido (${progresso}): ${lote.erro || "falha no envio"}.`;
+    }
+    return `Enviando relatórios em lote: ${progresso}...`;
+}
+
+async function enviarRelatoriosTodosProfessores() {
+    if (!window.confirm("Gerar e enviar o relatório do período para todos os professores?")) {
+        return;
+    }
+
+    const botao = el("btnEnviarRelatoriosTodos");
+    botao.disabled = true;
+    try {
+        let lote = await fetchJson(`/api/relatorios/professores/lotes${queryPeriodo()}`, {
+            method: "POST",
+            headers: Object.assign({}, headers, { "Content-Type": "application/json" }),
+            body: JSON.stringify({}),
+        });
+        setMensagemProfessor(descreverLoteRelatorios(lote));
+        while (lote.em_execucao) {
+            await new Promise((resolve) => window.setTimeout(resolve, 2000));
+            lote = await fetchJson(`/api/relatorios/professores/lotes/${lote.id}`, { headers });
+            setMensagemProfessor(descreverLoteRelatorios(lote));
+        }
+        setMensagemProfessor(descreverLoteRelatorios(lote), lote.status === "CONCLUIDO" && !lote.erros ? "info" : "erro");
+    } finally {
+        botao.disabled = false;
+    }
+}
+
 function ativarTab(tabId) {
     document.querySelectorAll("[data-relatorios-tab-trigger]").forEach((botao) => {
         const ativo = botao.dataset.relatoriosTabTrigger === tabId;
@@ -1052,6 +1091,14 @@ function registrarEventos() {
         }
     });
 
+    el("btnEnviarRelatoriosTodos").addEventListener("click", async () => {
+        try {
+            await enviarRelatoriosTodosProfessores();
+        } catch (err) {
+            setMensagemProfessor(err.message || "Não foi possível enviar os relatórios em lote.", "erro");
+        }
+    });
+
     el("relProfessorSelect").addEventListener("change", () => {
         relatorioProfessorAtual = null;
         atualizarAcoesRelatorioProfessor(false);
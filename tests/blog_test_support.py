@@ -19,3 +19,4 @@ def load_blog_migration(filename: str):
 def apply_blog_migrations(conn: sqlite3.Connection) -> None:
     load_blog_migration("20260812_create_blog_module.py").upgrade(conn)
     load_blog_migration("20260813_add_blog_tags.py").upgrade(conn)
+    load_blog_migration("20261018_create_blog_post_renders.py").upgrade(conn)
@@ -1,9 +1,12 @@
 import importlib
+import json
 import os
 import sys
 import tempfile
 import unittest
 
+from fastapi import Request
+
 
 RELOADED_MODULES = (
     "services.auth_service",
@@ -17,6 +20,11 @@ RELOADED_MODULES = (
 )
 
 
+def _resposta_json(rota, **kwargs):
+    resposta = rota(request=Request({"type": "http", "headers": []}), **kwargs)
+    return json.loads(resposta.body)
+
+
 def _reload_modules(db_path: str):
     os.environ["DB_PATH"] = db_path
     os.environ["ENABLE_EMBEDDED_WORKER"] = "0"
@@ -82,8 +90,8 @@ class AdminAtribuicoesDocentesTest(unittest.TestCase):
             geometria_id = int(database.criar_disciplina("Geometria", 3))
             letramento_id = int(database.criar_disciplina("Letramento e Raciocinio Matematico", 5))
 
-            contexto = main.listar_contexto_atribuicoes_docentes_admin(
-                usuario=self._usuario_admin()
+            contexto = _resposta_json(
+                main.listar_contexto_atribuicoes_docentes_admin, usuario=self._usuario_admin()
             )
             self.assertTrue(
                 any(int(item["id"]) == professor_id for item in contexto["professores"])
@@ -32,6 +32,16 @@ class AdminClassesRepositoryTests(unittest.TestCase):
                     aula_numero INTEGER,
                     faixa_global INTEGER
                 );
+                CREATE TABLE cota_limites_estado (
+                    id INTEGER PRIMARY KEY,
+                    versao INTEGER NOT NULL,
+                    atualizado_em TEXT
+                );
+                INSERT INTO cota_limites_estado (id, versao) VALUES (1, 1);
+                CREATE TABLE cota_pesos_professores (
+                    usuario_id INTEGER PRIMARY KEY,
+                    peso REAL NOT NULL
+                );
                 """
             )
             conn.close()
@@ -1,9 +1,17 @@
 import importlib
+import json
 import os
 import sys
 import tempfile
 import unittest
 
+from fastapi import Request
+
+
+def _resposta_json(rota, **kwargs):
+    resposta = rota(request=Request({"type": "http", "headers": []}), **kwargs)
+    return json.loads(resposta.body)
+
 
 def _reload_modules(db_path: str):
     os.environ["DB_PATH"] = db_path
@@ -68,7 +76,9 @@ class AdminTurmasDisciplinasTest(unittest.TestCase):
             turma_id = int(database.criar_turma("1 EM A", "VESPERTINO_EM", 30))
             disciplina_id = int(database.criar_disciplina("Geometria", 3))
 
-            contexto = main.listar_contexto_turmas_disciplinas_admin(usuario=self._usuario_admin())
+            contexto = _resposta_json(
+                main.listar_contexto_turmas_disciplinas_admin, usuario=self._usuario_admin()
+            )
             self.assertTrue(any(int(item["id"]) == turma_id for item in contexto["turmas"]))
             self.assertTrue(
                 any(int(item["id"]) == disciplina_id for item in contexto["disciplinas"])
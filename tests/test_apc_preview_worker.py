@@ -0,0 +1,163 @@
+import importlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+
+class ApcPreviewWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self._old_env = {nome: os.environ.get(nome) for nome in ("DB_PATH", "APC_DIR")}
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        self.db_path = str(self.tmp_path / "impressao.db")
+        os.environ["DB_PATH"] = self.db_path
+        os.environ["APC_DIR"] = str(self.tmp_path / "apc")
+        for nome_modulo in ("database", "routers.config", "services.apc_preview_worker"):
+            sys.modules.pop(nome_modulo, None)
+        self.database = importlib.import_module("database")
+        self.database.criar_tabelas()
+        self.preview_worker = importlib.import_module("services.apc_preview_worker")
+
+    def tearDown(self):
+        for nome_modulo in ("database", "routers.config", "services.apc_preview_worker"):
+            sys.modules.pop(nome_modulo, None)
+        for nome, valor in self._old_env.items():
+            if valor is None:
+                os.environ.pop(nome, None)
+            else:
+                os.environ[nome] = valor
+        self._tmp_dir.cleanup()
+
+    def _agendar_previews(self, quantidade: int) -> list[dict]:
+        database = self.database
+        professor_id = int(
+            database.criar_professor(
+                nome="Professor Preview",
+                email="preview@escola.local",
+                senha_hash=database.hash_senha("Senha@123"),
+            )
+        )
+        periodo = database.criar_apc_periodo(
+            ano_letivo=2035,
+            data_referencia="2035-11-14",
+            prazo_envio="2035-11-14T23:59",
+            titulo="Atividade",
+            observacao="",
+            publico_alvo="TODOS_PROFESSORES",
+            tipo_entrega="GERAL",
+            criado_por_usuario_id=professor_id,
+        )
+        jobs = []
+        for indice in range(quantidade):
+            caminho = self.tmp_path / "apc" / f"anexo-{indice}.docx"
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            caminho.write_bytes(b"docx")
+            envio = database.criar_apc_envio(
+                periodo_id=int(periodo["id"]),
+                professor_usuario_id=professor_id,
+                turma_id=int(database.criar_turma(f"Turma {indice}", "MATUTINO", 30)),
+                disciplina_id=int(database.criar_disciplina(f"Disciplina {indice}", 1)),
+                arquivo_nome_cliente=caminho.name,
+                arquivo_nome_original=caminho.name,
+                arquivo_path=str(caminho),
+                arquivo_tamanho=caminho.stat().st_size,
+                arquivo_tipo="application/pdf",
+            )
+            jobs.append(
+                database.agendar_apc_preview_job(
+                    envio_id=int(envio["id"]),
+                    arquivo_path=str(caminho),
+                    arquivo_nome_original=caminho.name,
+                )
+            )
+        return jobs
+
+    def test_reivindicacoes_concorrentes_nunca_repetem_preview(self):
+        jobs = self._agendar_previews(8)
+        reivindicados = []
+        lock = threading.Lock()
+
+        def consumir():
+            while True:
+                job = self.database.reivindicar_proximo_apc_preview_job()
+                if not job:
+                    return
+                with lock:
+                    reivindicados.append(job["id"])
+
+        threads = [threading.Thread(target=consumir) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(reivindicados), sorted(job["id"] for job in jobs))
+
+    def test_processando_travado_volta_para_nova_tentativa(self):
+        (job,) = self._agendar_previews(1)
+        self.assertEqual(self.database.reivindicar_proximo_apc_preview_job()["id"], job["id"])
+        self.assertIsNone(self.database.reivindicar_proximo_apc_preview_job())
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE apc_preview_jobs SET atualizado_em = datetime('now', '-30 minutes') WHERE id = ?",
+            (job["id"],),
+        )
+        conn.commit()
+        conn.close()
+
+        retomado = self.database.reivindicar_proximo_apc_preview_job()
+        self.assertEqual(retomado["id"], job["id"])
+        self.assertEqual(retomado["tentativas"], 2)
+
+    def test_pool_converte_em_paralelo_e_registra_resultado(self):
+        jobs = self._agendar_previews(3)
+        convertendo = threading.Barrier(3, timeout=5)
+
+        def gerar_preview(caminho_origem, _nome_arquivo):
+            if caminho_origem.name == "anexo-2.docx":
+                raise RuntimeError("documento corrompido")
+            # Os dois primeiros so terminam juntos, depois do despacho ser conferido.
+            convertendo.wait()
+            return b"%PDF-preview"
+
+        pool = self.preview_worker.PoolPreviewApc(
+            concorrencia=2,
+            criar_executor=lambda concorrencia: ThreadPoolExecutor(max_workers=concorrencia),
+        )
+        with patch.object(self.preview_worker, "gerar_preview_pdf_apc", side_effect=gerar_preview):
+            self.assertEqual(pool.despachar(), 2)
+            self.assertTrue(pool.lotado())
+            convertendo.wait()
+            self.assertTrue(pool.aguardar_ociosos(5))
+            # O job com erro volta para a fila ate esgotar as 3 tentativas.
+            tentativas_com_erro = 0
+            while True:
+                despachados = pool.despachar()
+                self.assertTrue(pool.aguardar_ociosos(5))
+                if not despachados:
+                    break
+                tentativas_com_erro += despachados
+            self.assertEqual(tentativas_com_erro, 3)
+        pool.encerrar()
+
+        status = {
+            job["id"]: self.database.buscar_apc_preview_job_por_envio(job["envio_id"])["status"]
+            for job in jobs
+        }
+        self.assertEqual(
+            [status[job["id"]] for job in jobs],
+            ["CONCLUIDO", "CONCLUIDO", "ERRO"],
+        )
+        self.assertEqual(pool.resumo()["concluidos"], 2)
+        self.assertEqual(pool.resumo()["falhas"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import importlib
 import io
+import json
 import os
 import sys
 import tempfile
@@ -7,10 +8,15 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-from fastapi import HTTPException, UploadFile
+from fastapi import HTTPException, Request, UploadFile
 from starlette.datastructures import Headers
 
 
+def _resposta_json(rota, **kwargs):
+    resposta = rota(request=Request({"type": "http", "headers": []}), **kwargs)
+    return json.loads(resposta.body)
+
+
 def _reload_modules(db_path: str, apc_dir: str):
     os.environ["DB_PATH"] = db_path
     os.environ["APC_DIR"] = apc_dir
@@ -159,7 +165,7 @@ class ApcRouterTest(unittest.TestCase):
                 aula_numero=2,
             )
 
-            contexto = apc_router.obter_contexto_apc_api(usuario=self._usuario_coord())
+            contexto = _resposta_json(apc_router.obter_contexto_apc_api, usuario=self._usuario_coord())
             self.assertIn("anos_letivos", contexto)
             self.assertGreater(len(contexto["publicos_alvo"]), 0)
             self.assertTrue(contexto["usuario"]["pode_gerir"])
@@ -374,6 +380,7 @@ class ApcRouterTest(unittest.TestCase):
             )
 
             resposta_arquivo = apc_router.baixar_arquivo_apc_api(
+                request=Request({"type": "http", "headers": []}),
                 envio_id=int(envio["id"]),
                 usuario=self._usuario_professor(professor_id),
             )
@@ -1066,7 +1073,7 @@ class ApcRouterTest(unittest.TestCase):
             )
 
             usuario_hibrido = self._usuario_professor_coordenacao(professor_coord_id)
-            contexto = apc_router.obter_contexto_apc_api(usuario=usuario_hibrido)
+            contexto = _resposta_json(apc_router.obter_contexto_apc_api, usuario=usuario_hibrido)
             self.assertTrue(contexto["usuario"]["pode_gerir"])
             self.assertTrue(contexto["usuario"]["eh_professor"])
 
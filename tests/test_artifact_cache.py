@@ -0,0 +1,116 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from modules.printing.job_creation import copy_job_pdf_to_spool
+from services import file_service
+from services.artifact_cache import CacheArtefatos
+
+
+class CacheArtefatosTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        self.spool = self.tmp_path / "spool"
+        self.spool.mkdir()
+        self.cache = CacheArtefatos(self.spool / "cache", max_bytes=10 * 1024 * 1024)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _upload(self, nome: str, conteudo: bytes = b"docx-identico") -> Path:
+        caminho = self.spool / nome
+        caminho.write_bytes(conteudo)
+        return caminho
+
+    def test_upload_repetido_reaproveita_conversao_por_hard_link(self):
+        conversoes = []
+
+        def converter(caminho_origem: Path) -> Path:
+            conversoes.append(caminho_origem)
+            destino = caminho_origem.with_suffix(".pdf")
+            destino.write_bytes(b"%PDF-convertido")
+            return destino
+
+        with (
+            patch.object(file_service, "cache_artefatos", self.cache),
+            patch.object(file_service, "converter_office_para_pdf", side_effect=converter),
+        ):
+            primeiro = file_service.converter_para_pdf(self._upload("a_atividade.docx"), ".docx")
+            segundo = file_service.converter_para_pdf(self._upload("b_atividade.docx"), ".docx")
+            outro = file_service.converter_para_pdf(
+                self._upload("c_outra.docx", b"docx-diferente"), ".docx"
+            )
+
+        self.assertEqual(len(conversoes), 2)
+        self.assertEqual(segundo.read_bytes(), b"%PDF-convertido")
+        self.assertEqual(os.stat(primeiro).st_ino, os.stat(segundo).st_ino)
+        self.assertNotEqual(os.stat(primeiro).st_ino, os.stat(outro).st_ino)
+        self.assertEqual(self.cache.stats()["acertos"], 1)
+
+    def test_contagem_de_paginas_e_memorizada_por_conteudo(self):
+        contar_chamadas = []
+
+        def contar(caminho: str) -> int:
+            contar_chamadas.append(caminho)
+            return 7
+
+        primeiro = self._upload("a.pdf", b"%PDF-mesmo")
+        segundo = self._upload("b.pdf", b"%PDF-mesmo")
+        self.assertEqual(self.cache.contar_paginas(primeiro, contar), 7)
+        self.assertEqual(self.cache.contar_paginas(segundo, contar), 7)
+        self.assertEqual(len(contar_chamadas), 1)
+
+    def test_layout_nup_gerado_uma_vez(self):
+        gerados = []
+
+        def gerar(caminho_origem, paginas_por_folha, intervalo_paginas, orientacao):
+            gerados.append((paginas_por_folha, intervalo_paginas, orientacao))
+            destino = caminho_origem.with_name(f"tmp_{len(gerados)}.pdf")
+            destino.write_bytes(b"%PDF-nup")
+            return destino
+
+        origem = self._upload("job.pdf", b"%PDF-job")
+        caminho, temporario = self.cache.obter_layout_nup(origem, 2, "", "retrato", gerar)
+        reuso, _ = self.cache.obter_layout_nup(origem, 2, "", "retrato", gerar)
+        self.cache.obter_layout_nup(origem, 4, "", "retrato", gerar)
+
+        self.assertFalse(temporario)
+        self.assertEqual(caminho, reuso)
+        self.assertEqual(len(gerados), 2)
+        self.assertFalse((self.spool / "tmp_1.pdf").exists())
+
+    def test_limpeza_respeita_tamanho_e_retencao(self):
+        agora = [time.time()]
+        cache = CacheArtefatos(
+            self.spool / "cache", max_bytes=2500, retencao_dias=2, clock=lambda: agora[0]
+        )
+        for indice in range(3):
+            pdf = self._upload(f"{indice}.pdf", bytes([indice]) * 1000)
+            cache.guardar_conversao(f"hash{indice}", ".docx", pdf)
+            entrada = cache._caminho_conversao(f"hash{indice}", ".docx")
+            os.utime(entrada, (agora[0] - 60 + indice, agora[0] - 60 + indice))
+
+        cache.limpar()
+        restantes = sorted(p.name for p in (self.spool / "cache" / "pdf").glob("*.pdf"))
+        self.assertEqual(restantes, ["hash1-docx-v1.pdf", "hash2-docx-v1.pdf"])
+
+        agora[0] += 3 * 86400
+        cache.limpar()
+        self.assertEqual(list((self.spool / "cache" / "pdf").glob("*.pdf")), [])
+
+    def test_reimpressao_usa_hard_link(self):
+        origem = self._upload("historico.pdf", b"%PDF-historico")
+        copia = copy_job_pdf_to_spool(
+            caminho_origem=origem, nome_referencia="Historico.pdf", spool_dir=self.spool
+        )
+        self.assertEqual(os.stat(origem).st_ino, os.stat(copia).st_ino)
+        origem.unlink()
+        self.assertEqual(copia.read_bytes(), b"%PDF-historico")
+
+
+if __name__ == "__main__":
+    unittest.main()
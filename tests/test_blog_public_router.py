@@ -9,7 +9,7 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.testclient import TestClient
 
-from modules.blog import public_router, repository
+from modules.blog import public_cache, public_router, repository
 from modules.blog.host_middleware import BlogSubdomainMiddleware
 from routers.config import STATIC_DIR
 from tests.blog_test_support import apply_blog_migrations
@@ -37,6 +37,8 @@ class BlogPublicRouterTests(unittest.TestCase):
         )
         self.connection_patch.start()
         self.image_dir_patch.start()
+        public_cache.invalidate()
+        self.addCleanup(public_cache.invalidate)
 
         self.published_token = "a" * 32
         self.draft_token = "b" * 32
@@ -184,6 +186,64 @@ class BlogPublicRouterTests(unittest.TestCase):
         self.assertNotIn(self.draft["slug"], sitemap.text)
         self.assertNotIn("/blog/artigos/", sitemap.text)
 
+    def test_article_links_neighbors_and_stores_render(self):
+        newer = self._create_post(
+            title="Olimpiada de matematica",
+            slug="olimpiada-de-matematica",
+            token="c" * 32,
+            published=True,
+        )
+
+        older_page = self.client.get(f"/blog/artigos/{self.published['slug']}")
+        newer_page = self.client.get(f"/blog/artigos/{newer['slug']}")
+
+        self.assertIn(f'href="/blog/artigos/{newer["slug"]}"', older_page.text)
+        self.assertIn("Próximo artigo", older_page.text)
+        self.assertNotIn("Artigo anterior", older_page.text)
+        self.assertIn(f'href="/blog/artigos/{self.published["slug"]}"', newer_page.text)
+        self.assertNotIn("Próximo artigo", newer_page.text)
+        conn = self._connect()
+        try:
+            rendered = conn.execute(
+                "SELECT body_html_blog_path, body_html_public_host FROM blog_post_renders WHERE post_id = ?",
+                (self.published["id"],),
+            ).fetchone()
+        finally:
+            conn.close()
+        self.assertIn(f'src="/blog/images/{self.published_token}"', rendered[0])
+        self.assertIn(f'src="/images/{self.published_token}"', rendered[1])
+
+    def test_public_pages_are_cached_and_revalidated_with_etag(self):
+        for path in ("/", f"/artigos/{self.published['slug']}", "/sitemap.xml"):
+            with self.subTest(path=path):
+                first = self.client.get(path, headers={"host": "blog.eepjd.com.br"})
+                self.assertEqual(first.status_code, 200)
+                self.assertIn("etag", first.headers)
+                self.assertIn("last-modified", first.headers)
+
+                with patch(
+                    "modules.blog.repository.get_connection",
+                    side_effect=AssertionError("consultou o SQLite"),
+                ):
+                    cached = self.client.get(path, headers={"host": "blog.eepjd.com.br"})
+                    not_modified = self.client.get(
+                        path,
+                        headers={"host": "blog.eepjd.com.br", "If-None-Match": first.headers["etag"]},
+                    )
+                    since = self.client.get(
+                        path,
+                        headers={
+                            "host": "blog.eepjd.com.br",
+                            "If-Modified-Since": first.headers["last-modified"],
+                        },
+                    )
+
+                self.assertEqual(cached.content, first.content)
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified.content, b"")
+                self.assertEqual(not_modified.headers["etag"], first.headers["etag"])
+                self.assertEqual(since.status_code, 304)
+
     def test_public_host_adds_security_headers_and_removes_blog_prefix(self):
         response = self.client.get(
             "https://blog.eepjd.com.br/", follow_redirects=False
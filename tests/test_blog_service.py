@@ -117,6 +117,36 @@ class BlogServiceTests(unittest.TestCase):
         service.archive_post(post["id"])
         self.assertEqual(service.list_public_posts(), [])
 
+    def test_public_render_follows_publication_and_updates(self):
+        post = service.create_post(author_user_id=7, payload=self._payload("Mostra de ciencias"))
+        self._add_stored_image(post["id"], token="d" * 32, alt_text="Bancada", is_cover=True)
+
+        def render():
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT body_html_blog_path, reading_minutes FROM blog_post_renders WHERE post_id = ?",
+                    (post["id"],),
+                ).fetchone()
+                return tuple(row) if row else None
+            finally:
+                conn.close()
+
+        self.assertIsNone(render())
+        service.publish_post(post["id"], image_dir=self.image_dir)
+        self.assertEqual(render(), ("<p>Conteudo do artigo.</p>", 1))
+
+        payload = BlogPostUpdateIn(**self._payload("Mostra de ciencias").model_dump())
+        payload.body_html = "<p onclick='x()'>" + "palavra " * 450 + "</p>"
+        service.update_post(post["id"], payload)
+        body_html, minutes = render()
+        self.assertNotIn("onclick", body_html)
+        self.assertEqual(minutes, 2)
+        self.assertEqual(service.get_public_post(post["slug"])["rendered_reading_minutes"], 2)
+
+        service.unpublish_post(post["id"])
+        self.assertIsNone(render())
+
     def test_tags_are_normalized_deduplicated_and_replaced(self):
         payload = self._payload("Projeto com tags")
         payload.tags = [" #Projetos ", "projetos", "Vida Escolar"]
@@ -0,0 +1,153 @@
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+from db.busca_textual import expressao_busca, filtro_busca
+
+
+def _reload_modulos(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    for nome_modulo in ("database", "modules.audit.repository", "modules.audit.service"):
+        sys.modules.pop(nome_modulo, None)
+    database = importlib.import_module("database")
+    audit_service = importlib.import_module("modules.audit.service")
+    return database, audit_service
+
+
+class ExpressaoBuscaTest(unittest.TestCase):
+    def test_cada_palavra_vira_prefixo_sem_acento(self):
+        self.assertEqual(expressao_busca("  João  SIL "), '"joao"* "sil"*')
+        self.assertEqual(expressao_busca('Conceição "7º"'), '"conceicao"* "7o"*')
+        self.assertEqual(expressao_busca("ana", ("nome",)), '{nome} : ("ana"*)')
+
+    def test_termo_sem_palavras_nao_casa_nada(self):
+        self.assertIsNone(expressao_busca("@@ -- "))
+        self.assertEqual(filtro_busca("estudantes", "@@", coluna_id="e.id"), ("0 = 1", []))
+        self.assertEqual(filtro_busca("estudantes", "  ", coluna_id="e.id"), ("", []))
+        with self.assertRaises(ValueError):
+            filtro_busca("estudantes", "ana", coluna_id="e.id", colunas=("email",))
+
+
+class BuscaTextualBancoTest(unittest.TestCase):
+    def setUp(self):
+        self._old_db_path = os.environ.get("DB_PATH")
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.database, self.audit_service = _reload_modulos(os.path.join(self._tmp_dir.name, "impressao.db"))
+        self.database.criar_tabelas()
+        self.turma_id = int(self.database.criar_turma("6A", "MATUTINO", 30))
+
+    def tearDown(self):
+        sys.modules.pop("database", None)
+        if self._old_db_path is None:
+            os.environ.pop("DB_PATH", None)
+        else:
+            os.environ["DB_PATH"] = self._old_db_path
+        self._tmp_dir.cleanup()
+
+    def _nomes(self, itens, chave="nome"):
+        return [item[chave] for item in itens]
+
+    def test_estudantes_sem_acento_por_prefixo_e_relevancia(self):
+        for nome in ("Ana Júlia Conceição", "João Pedro Silva", "Silvana Souza", "Maria José"):
+            self.database.criar_estudante(nome, self.turma_id)
+
+        self.assertEqual(
+            self._nomes(self.database.buscar_estudantes_ocorrencia("joao sil")),
+            ["João Pedro Silva"],
+        )
+        self.assertEqual(
+            self._nomes(self.database.listar_estudantes(nome="CONCEICAO")),
+            ["Ana Júlia Conceição"],
+        )
+        self.assertEqual(
+            sorted(self._nomes(self.database.buscar_estudantes_ocorrencia("silv"))),
+            ["João Pedro Silva", "Silvana Souza"],
+        )
+        # Casa inicio de palavra, nao trecho do meio.
+        self.assertEqual(self.database.buscar_estudantes_ocorrencia("ilva"), [])
+
+    def test_gatilhos_acompanham_edicao_e_exclusao(self):
+        estudante_id = int(self.database.criar_estudante("Otávio Lima", self.turma_id))
+
+        self.database.atualizar_estudante(estudante_id, "Octávio Ramos", self.turma_id, True)
+        self.assertEqual(self.database.listar_estudantes(nome="lima"), [])
+        self.assertEqual(self._nomes(self.database.listar_estudantes(nome="octavio ram")), ["Octávio Ramos"])
+
+        self.database.remover_estudante(estudante_id)
+        self.assertEqual(self.database.listar_estudantes(nome="octavio", incluir_inativos=True), [])
+
+    def test_professores_e_auditoria_sem_acento(self):
+        self.database.criar_usuario("Márcia Gonçalves", "marcia@escola", "senha123", "professor", "PROFESSOR")
+        self.database.criar_usuario("Marcos Dias", "marcos@escola", "senha123", "professor", "PROFESSOR")
+        self.audit_service.record_event(
+            category="users",
+            action="user.delete",
+            outcome="success",
+            description="Exclusão do usuário Márcia Gonçalves.",
+        )
+
+        self.assertEqual(
+            [item["email"] for item in self.database.buscar_professores_ocorrencia("goncalves marc")],
+            ["marcia@escola"],
+        )
+        self.assertEqual(len(self.database.buscar_professores_ocorrencia("marc")), 2)
+        self.assertEqual(self.audit_service.list_audit_events(search="exclusao")["total"], 1)
+        self.assertEqual(self.audit_service.list_audit_events(search="user.delete")["total"], 1)
+        self.assertEqual(self.audit_service.list_audit_events(search="inclusao")["total"], 0)
+
+    def test_ocorrencias_por_nome_e_por_texto_da_descricao(self):
+        conn = self.database.get_connection()
+        conn.executemany(
+            """
+            INSERT INTO ocorrencias (
+                nome_estudante, turma_id, professor_requerente, disciplina, data_ocorrencia,
+                aula, horario_ocorrencia, descricao, acao_aplicada
+            )
+            VALUES (?, ?, 'Professor', 'Historia', '2026-03-10', '1', '07:30', ?, 'advertencia')
+            """,
+            [
+                ("Célia Prado", self.turma_id, "Agressão verbal a colega durante o intervalo."),
+                ("Caio Agres", self.turma_id, "Uso de celular em sala."),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(
+            sorted(self._nomes(self.database.listar_ocorrencias(texto="agres"), "nome_estudante")),
+            ["Caio Agres", "Célia Prado"],
+        )
+        self.assertEqual(
+            self._nomes(self.database.listar_ocorrencias(texto="agressao"), "nome_estudante"),
+            ["Célia Prado"],
+        )
+        self.assertEqual(
+            self._nomes(self.database.listar_ocorrencias(nome_estudante="agres"), "nome_estudante"),
+            ["Caio Agres"],
+        )
+        pagina = self.database.listar_ocorrencias_pagina(nome_estudante="celia", texto="intervalo")
+        self.assertEqual(self._nomes(pagina["itens"], "nome_estudante"), ["Célia Prado"])
+
+    def test_caminho_completo_reconstroi_indice_sem_gatilhos(self):
+        self.database.criar_estudante("Beatriz Antunes", self.turma_id)
+        conn = self.database.get_connection()
+        # Simula a recriacao legada da tabela: os gatilhos somem e escritas
+        # feitas nesse meio tempo nao chegam ao indice.
+        conn.execute("DROP TRIGGER busca_estudantes_ai")
+        conn.execute("INSERT INTO estudantes (nome, turma_id, ativo) VALUES ('Benício Antunes', ?, 1)", (self.turma_id,))
+        conn.commit()
+        conn.close()
+        self.assertEqual(self._nomes(self.database.listar_estudantes(nome="antunes")), ["Beatriz Antunes"])
+
+        self.database.criar_tabelas(forcar=True)
+
+        self.assertEqual(
+            self._nomes(self.database.listar_estudantes(nome="antunes")),
+            ["Beatriz Antunes", "Benício Antunes"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi import Request
+
+
+def _reload_modulos(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    for nome_modulo in ("database", "ocorrencias_router"):
+        sys.modules.pop(nome_modulo, None)
+    database = importlib.import_module("database")
+    ocorrencias_router = importlib.import_module("ocorrencias_router")
+    return database, ocorrencias_router
+
+
+def _requisicao(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+class CatalogoCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._old_db_path = os.environ.get("DB_PATH")
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.database, self.ocorrencias_router = _reload_modulos(
+            os.path.join(self._tmp_dir.name, "impressao.db")
+        )
+        self.database.criar_tabelas()
+
+    def tearDown(self):
+        sys.modules.pop("database", None)
+        if self._old_db_path is None:
+            os.environ.pop("DB_PATH", None)
+        else:
+            os.environ["DB_PATH"] = self._old_db_path
+        self._tmp_dir.cleanup()
+
+    def _opcoes(self, if_none_match: str | None = None):
+        return self.ocorrencias_router.listar_opcoes_ocorrencias(
+            request=_requisicao(if_none_match), usuario={"cargo": "ADMIN"}
+        )
+
+    def test_versao_muda_com_escritas_no_catalogo_e_ignora_senha(self):
+        geracao, versao = self.database.obter_versao_catalogo()
+
+        self.database.criar_turma("8B", "VESPERTINO", 28)
+        self.database.criar_lei("Estatuto da Crianca e do Adolescente")
+        self.assertEqual(self.database.obter_versao_catalogo(), (geracao, versao + 2))
+
+        self.database.criar_usuario("Rita Alves", "rita@escola", "senha123", "professor", "PROFESSOR")
+        usuario_id = int(self.database.buscar_usuario_por_email("rita@escola")["id"])
+        depois_do_cadastro = self.database.obter_versao_catalogo()
+        self.assertGreater(depois_do_cadastro[1], versao + 2)
+
+        self.database.atualizar_senha_usuario(usuario_id, "outrasenha456")
+        self.assertEqual(self.database.obter_versao_catalogo(), depois_do_cadastro)
+
+    def test_opcoes_montadas_uma_vez_por_versao_com_etag(self):
+        with patch.object(
+            self.ocorrencias_router,
+            "listar_turmas_ativas",
+            wraps=self.ocorrencias_router.listar_turmas_ativas,
+        ) as listar_turmas:
+            primeira = self._opcoes()
+            segunda = self._opcoes()
+            self.assertEqual(listar_turmas.call_count, 1)
+
+            etag = primeira.headers["etag"]
+            self.assertEqual(segunda.headers["etag"], etag)
+            self.assertEqual(primeira.headers["cache-control"], "private, no-cache")
+
+            nao_modificada = self._opcoes(f'W/{etag}')
+            self.assertEqual(nao_modificada.status_code, 304)
+            self.assertEqual(nao_modificada.body, b"")
+
+            self.database.criar_turma("9C", "MATUTINO", 30)
+            atualizada = self._opcoes(etag)
+            self.assertEqual(listar_turmas.call_count, 2)
+
+        self.assertEqual(atualizada.status_code, 200)
+        self.assertNotEqual(atualizada.headers["etag"], etag)
+        nomes = {turma["nome"] for turma in json.loads(atualizada.body)["turmas"]}
+        self.assertIn("9C", nomes)
+
+    def test_caminho_completo_recria_gatilho_e_avanca_versao(self):
+        conn = self.database.get_connection()
+        conn.execute("DROP TRIGGER catalogo_versao_disciplinas_ai")
+        conn.commit()
+        conn.close()
+        _, antes = self.database.obter_versao_catalogo()
+
+        self.database.criar_tabelas(forcar=True)
+        _, depois = self.database.obter_versao_catalogo()
+        self.assertGreater(depois, antes)
+
+        self.database.criar_disciplina("Robotica", 2)
+        self.assertEqual(self.database.obter_versao_catalogo()[1], depois + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
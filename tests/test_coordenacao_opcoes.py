@@ -1,9 +1,17 @@
 import importlib
+import json
 import os
 import sys
 import tempfile
 import unittest
 
+from fastapi import Request
+
+
+def _resposta_json(rota, **kwargs):
+    resposta = rota(request=Request({"type": "http", "headers": []}), **kwargs)
+    return json.loads(resposta.body)
+
 
 def _reload_modulos(db_path: str):
     os.environ["DB_PATH"] = db_path
@@ -38,7 +46,7 @@ class CoordenacaoOpcoesTest(unittest.TestCase):
                 inciso_descricao="Integrar-se ao processo pedagogico desenvolvido pela unidade escolar.",
             )
 
-            resposta = ocorrencias_router.listar_opcoes_ocorrencias(usuario={"cargo": "ADMIN"})
+            resposta = _resposta_json(ocorrencias_router.listar_opcoes_ocorrencias, usuario={"cargo": "ADMIN"})
 
             self.assertIn("disciplinas", resposta)
             self.assertTrue(isinstance(resposta["disciplinas"], list))
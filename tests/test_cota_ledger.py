@@ -0,0 +1,194 @@
+import importlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+MES = "2026-10"
+
+
+class CotaLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self._old_db_path = os.environ.get("DB_PATH")
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, "impressao.db")
+        os.environ["DB_PATH"] = self.db_path
+        sys.modules.pop("database", None)
+        self.database = importlib.import_module("database")
+        self.database.criar_tabelas()
+        self.database.atualizar_regras_cota(30, 2, 5, 10000)
+        self.database.criar_usuario("Admin", "admin@example.com", "senha123", "admin")
+        self.usuario_id = int(self.database.buscar_usuario_por_email("admin@example.com")["id"])
+
+    def tearDown(self):
+        sys.modules.pop("database", None)
+        if self._old_db_path is None:
+            os.environ.pop("DB_PATH", None)
+        else:
+            os.environ["DB_PATH"] = self._old_db_path
+        self._tmp_dir.cleanup()
+
+    def _consultar(self, sql: str, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchone()
+        finally:
+            conn.close()
+
+    def _criar_professor(self, email: str, aulas: int, turmas: int) -> int:
+        return int(
+            self.database.criar_professor(
+                "Professor",
+                email,
+                "hash",
+                aulas_semanais=aulas,
+                turmas_quantidade=turmas,
+            )
+        )
+
+    def test_reservas_concorrentes_nunca_ultrapassam_o_limite(self):
+        resultados = []
+        lock = threading.Lock()
+        barreira = threading.Barrier(12)
+
+        def reservar():
+            barreira.wait()
+            resultado = self.database.reservar_paginas_cota(
+                self.usuario_id, MES, 7, resolver_limite=lambda: 30
+            )
+            with lock:
+                resultados.append(resultado)
+
+        threads = [threading.Thread(target=reservar) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        autorizados = [item for item in resultados if item["autorizado"]]
+        usadas = self._consultar(
+            "SELECT usadas_paginas FROM cotas WHERE usuario_id = ? AND mes = ?",
+            (self.usuario_id, MES),
+        )[0]
+        ledger = self._consultar(
+            "SELECT COUNT(*), SUM(paginas) FROM cotas_movimentos WHERE usuario_id = ? AND mes = ?",
+            (self.usuario_id, MES),
+        )
+
+        self.assertEqual(len(autorizados), 30 // 7)
+        self.assertEqual(usadas, 28)
+        self.assertEqual(ledger, (len(autorizados), usadas))
+        self.assertTrue(all(item["restante"] < 7 for item in resultados if not item["autorizado"]))
+
+    def test_cancelamento_registra_estorno_no_ledger(self):
+        self.database.reservar_paginas_cota(self.usuario_id, MES, 6, resolver_limite=lambda: 30)
+        job_id = self.database.criar_job(
+            usuario_id=self.usuario_id,
+            arquivo="aula.pdf",
+            arquivo_path="spool/aula.pdf",
+            copias=1,
+            paginas_totais=6,
+        )
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE jobs SET criado_em = ? WHERE id = ?", (f"{MES}-15 10:00:00", job_id))
+        conn.commit()
+        conn.close()
+
+        resultado = self.database.cancelar_job(job_id)
+
+        self.assertEqual(resultado["paginas_estornadas"], 6)
+        self.assertEqual(
+            self._consultar(
+                "SELECT tipo, paginas, job_id FROM cotas_movimentos ORDER BY id DESC LIMIT 1"
+            ),
+            ("estorno", -6, job_id),
+        )
+        self.assertEqual(
+            self._consultar("SELECT SUM(paginas) FROM cotas_movimentos")[0],
+            self._consultar("SELECT usadas_paginas FROM cotas WHERE usuario_id = ?", (self.usuario_id,))[0],
+        )
+
+    def test_limites_materializados_uma_vez_ate_a_proxima_invalidacao(self):
+        primeiro = self._criar_professor("p1@example.com", 10, 2)
+        segundo = self._criar_professor("p2@example.com", 20, 4)
+        original = self.database.calcular_limites_cota_professores
+        calcular_distribuicao = self.database._calcular_distribuicao_cota_professores
+        chamadas = []
+
+        def contar(versao):
+            chamadas.append(versao)
+            return calcular_distribuicao(versao)
+
+        with patch.object(self.database, "_calcular_distribuicao_cota_professores", side_effect=contar):
+            limite_primeiro = self.database.calcular_limite_cota_usuario(primeiro, MES)
+            limite_segundo = self.database.calcular_limite_cota_usuario(segundo, MES)
+            self.assertEqual(len(chamadas), 1)
+            self.assertEqual(
+                {primeiro: limite_primeiro, segundo: limite_segundo},
+                {chave: valor for chave, valor in original().items() if chave in (primeiro, segundo)},
+            )
+
+            self.database.atualizar_regras_cota(30, 4, 5, 10000)
+            self.database.calcular_limite_cota_usuario(primeiro, MES)
+            self.database.calcular_limite_cota_usuario(segundo, MES)
+            self.assertEqual(len(chamadas), 2)
+
+            self.database.salvar_carga_professor(primeiro, 30, 2)
+            self.assertEqual(
+                self.database.calcular_limite_cota_usuario(primeiro, MES),
+                original()[primeiro],
+            )
+            self.assertEqual(len(chamadas), 3)
+
+    def test_usuario_sem_perfil_professor_usa_base_das_regras(self):
+        self.assertEqual(self.database.calcular_limite_cota_usuario(self.usuario_id, MES), 30)
+        self.assertIsNone(self._consultar("SELECT 1 FROM cota_limites_mensais"))
+
+    def test_pesos_recalculados_apenas_para_professores_invalidados(self):
+        primeiro = self._criar_professor("p1@example.com", 10, 2)
+        segundo = self._criar_professor("p2@example.com", 20, 4)
+        self.database.salvar_carga_professor(primeiro, 10, 2)
+
+        inicial = self.database.obter_distribuicao_cota_professores()
+        self.assertEqual(self.database.estatisticas_cache_cota()["pesos_recalculados"], 2)
+
+        self.database.salvar_carga_professor(primeiro, 30, 2)
+        atualizada = self.database.obter_distribuicao_cota_professores()
+        estatisticas = self.database.estatisticas_cache_cota()
+
+        self.assertGreater(atualizada["versao"], inicial["versao"])
+        self.assertEqual(estatisticas["pesos_recalculados"], 3)
+        self.assertEqual(estatisticas["pesos_reaproveitados"], 1)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM cota_pesos_professores")
+        conn.commit()
+        conn.close()
+        self.assertEqual(
+            atualizada["calculos"],
+            self.database._calcular_distribuicao_cota_professores(atualizada["versao"]),
+        )
+        self.assertEqual({item["usuario_id"] for item in atualizada["calculos"]}, {primeiro, segundo})
+
+    def test_snapshot_reaproveitado_ate_mudanca_de_versao(self):
+        self._criar_professor("p1@example.com", 10, 2)
+        self.database.obter_distribuicao_cota_professores()
+
+        with patch.object(self.database, "_calcular_distribuicao_cota_professores") as calcular:
+            self.database.calcular_cotas_mensais_professores()
+            self.database.calcular_limite_cota_usuario(self.usuario_id, MES)
+            calcular.assert_not_called()
+
+        recalculados = self.database.estatisticas_cache_cota()["pesos_recalculados"]
+        self.database.atualizar_regras_cota(30, 2, 5, 20000)
+        distribuicao = self.database.obter_distribuicao_cota_professores()
+
+        self.assertEqual(self.database.estatisticas_cache_cota()["pesos_recalculados"], recalculados)
+        self.assertEqual(distribuicao["versao"], self.database.estatisticas_cache_cota()["versao_snapshot"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from db.connection_pool import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp_dir.name) / "pool.db"
+        self.pool = ConnectionPool(tamanho=2)
+
+    def tearDown(self):
+        self.pool.close_idle()
+        self._tmp_dir.cleanup()
+
+    def test_reutiliza_conexao_da_mesma_thread(self):
+        conn = self.pool.acquire(self.db_path)
+        conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY, nome TEXT)")
+        conn.commit()
+        conn.close()
+
+        reaberta = self.pool.acquire(self.db_path)
+        self.assertIs(reaberta, conn)
+        self.assertEqual(reaberta.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(reaberta.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        reaberta.close()
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["abertas"], 1)
+        self.assertEqual(stats["reutilizadas"], 1)
+
+    def test_devolucao_desfaz_transacao_pendente(self):
+        conn = self.pool.acquire(self.db_path)
+        conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY, nome TEXT)")
+        conn.commit()
+        conn.execute("INSERT INTO itens (nome) VALUES ('rascunho')")
+        conn.close()
+
+        conn = self.pool.acquire(self.db_path)
+        total = conn.execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+        conn.close()
+        self.assertEqual(total, 0)
+
+    def test_pool_de_leitura_bloqueia_escrita(self):
+        conn = self.pool.acquire(self.db_path)
+        conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY, nome TEXT)")
+        conn.commit()
+        conn.close()
+
+        leitura = self.pool.acquire(self.db_path, read_only=True)
+        self.assertIsNot(leitura, conn)
+        with self.assertRaises(sqlite3.OperationalError):
+            leitura.execute("INSERT INTO itens (nome) VALUES ('x')")
+        leitura.close()
+
+    def test_conexoes_nao_sao_compartilhadas_entre_threads(self):
+        principal = self.pool.acquire(self.db_path)
+        principal.close()
+        recebidas = []
+
+        def usar_pool():
+            conn = self.pool.acquire(self.db_path)
+            recebidas.append(conn)
+            conn.close()
+            self.pool.close_idle()
+
+        thread = threading.Thread(target=usar_pool)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(len(recebidas), 1)
+        self.assertIsNot(recebidas[0], principal)
+
+    def test_troca_de_caminho_descarta_ociosas(self):
+        conn = self.pool.acquire(self.db_path)
+        conn.close()
+
+        outro = self.pool.acquire(Path(self._tmp_dir.name) / "outro.db")
+        outro.close()
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_limite_de_conexoes_ociosas(self):
+        conexoes = [self.pool.acquire(self.db_path) for _ in range(3)]
+        for conn in conexoes:
+            conn.close()
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conexoes[-1].execute("SELECT 1")
+        self.assertEqual(self.pool.stats()["devolvidas"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
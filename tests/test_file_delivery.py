@@ -0,0 +1,116 @@
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.background import BackgroundTask
+
+import services.file_delivery as file_delivery
+
+
+class FileDeliveryTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.raiz = Path(self._tmp_dir.name).resolve()
+        self.caminho = self.raiz / "videos" / "aula.mp4"
+        self.caminho.parent.mkdir()
+        self.conteudo = bytes(range(256)) * 40
+        self.caminho.write_bytes(self.conteudo)
+        self.etag = f'"{hashlib.sha256(self.conteudo).hexdigest()}"'
+
+        app = FastAPI()
+
+        @app.get("/arquivo")
+        def arquivo(request: Request):
+            return file_delivery.responder_arquivo(
+                self.caminho,
+                request=request,
+                nome_arquivo="Aula 1.mp4",
+                media_type="video/mp4",
+            )
+
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_entrega_completa_com_etag_forte_do_conteudo(self):
+        resposta = self.client.get("/arquivo")
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.content, self.conteudo)
+        self.assertEqual(resposta.headers["etag"], self.etag)
+        self.assertEqual(resposta.headers["accept-ranges"], "bytes")
+        self.assertEqual(resposta.headers["cache-control"], "private, no-cache")
+        self.assertEqual(resposta.headers["content-disposition"], "attachment; filename*=utf-8''Aula%201.mp4")
+
+    def test_if_none_match_responde_304_sem_corpo(self):
+        resposta = self.client.get("/arquivo", headers={"If-None-Match": f'W/"outro", {self.etag}'})
+
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta.content, b"")
+        self.assertEqual(resposta.headers["etag"], self.etag)
+
+    def test_range_entrega_so_o_trecho_pedido(self):
+        resposta = self.client.get("/arquivo", headers={"Range": "bytes=1000-1099"})
+
+        self.assertEqual(resposta.status_code, 206)
+        self.assertEqual(resposta.content, self.conteudo[1000:1100])
+        self.assertEqual(resposta.headers["content-range"], f"bytes 1000-1099/{len(self.conteudo)}")
+
+        retomada = self.client.get("/arquivo", headers={"Range": "bytes=10000-", "If-Range": self.etag})
+        self.assertEqual(retomada.status_code, 206)
+        self.assertEqual(retomada.content, self.conteudo[10000:])
+
+        mudou = self.client.get("/arquivo", headers={"Range": "bytes=10000-", "If-Range": '"versao-antiga"'})
+        self.assertEqual(mudou.status_code, 200)
+        self.assertEqual(mudou.content, self.conteudo)
+
+    def test_x_accel_redirect_repassa_arquivo_mapeado_ao_nginx(self):
+        with patch.dict("os.environ", {"X_ACCEL_REDIRECT_MAP": f"/nao/existe=/_x,{self.raiz}=/_arquivos/spool/"}):
+            mapa = file_delivery._resolver_mapa_x_accel()
+        with patch.object(file_delivery, "X_ACCEL_REDIRECT_MAP", mapa):
+            resposta = self.client.get("/arquivo")
+            nao_modificado = self.client.get("/arquivo", headers={"If-None-Match": self.etag})
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.content, b"")
+        self.assertEqual(resposta.headers["x-accel-redirect"], "/_arquivos/spool/videos/aula.mp4")
+        self.assertEqual(resposta.headers["content-type"], "video/mp4")
+        self.assertEqual(resposta.headers["etag"], self.etag)
+        self.assertEqual(nao_modificado.status_code, 304)
+        self.assertNotIn("x-accel-redirect", nao_modificado.headers)
+
+    def test_arquivo_temporario_sem_etag_nao_calcula_hash(self):
+        app = FastAPI()
+
+        @app.get("/temporario")
+        def temporario(request: Request):
+            return file_delivery.responder_arquivo(
+                self.caminho,
+                request=request,
+                media_type="video/mp4",
+                background=BackgroundTask(self.caminho.unlink),
+                etag=False,
+            )
+
+        with patch.object(file_delivery, "etag_arquivo") as etag_arquivo:
+            resposta = TestClient(app).get("/temporario", headers={"If-None-Match": self.etag})
+
+        etag_arquivo.assert_not_called()
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.content, self.conteudo)
+        self.assertNotEqual(resposta.headers.get("etag"), self.etag)
+        self.assertFalse(self.caminho.exists())
+
+    def test_arquivo_ausente_responde_404(self):
+        self.caminho.unlink()
+
+        self.assertEqual(self.client.get("/arquivo").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,16 @@
 import importlib
+import json
 import os
 import sys
 import tempfile
 import unittest
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+
+
+def _resposta_json(rota, **kwargs):
+    resposta = rota(request=Request({"type": "http", "headers": []}), **kwargs)
+    return json.loads(resposta.body)
 
 
 def _reload_modules(db_path: str):
@@ -101,7 +107,8 @@ class HorarioEscolarRouterTest(unittest.TestCase):
             )
             database.criar_atribuicao_docente(professor_id, turma_id, disciplina_id)
 
-            contexto = horario_router.obter_contexto_horario_escolar_api(
+            contexto = _resposta_json(
+                horario_router.obter_contexto_horario_escolar_api,
                 usuario=self._usuario_coord(),
             )
             self.assertTrue(any(int(item["id"]) == turma_id for item in contexto["turmas"]))
@@ -572,7 +579,8 @@ class HorarioEscolarRouterTest(unittest.TestCase):
                 usuario=self._usuario_coord(),
             )
 
-            contexto = horario_router.obter_contexto_horario_escolar_api(
+            contexto = _resposta_json(
+                horario_router.obter_contexto_horario_escolar_api,
                 usuario=self._usuario_professor(professor_logado_id),
             )
             self.assertEqual(contexto["modo_interface"], "professor")
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+_SCRIPT = """
+import importlib, json, sys
+importlib.import_module(sys.argv[1])
+print(json.dumps(sorted(nome for nome in sys.argv[2:] if nome in sys.modules)))
+"""
+
+
+def _bibliotecas_carregadas(modulo: str, *bibliotecas: str) -> list[str]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        saida = subprocess.run(
+            [sys.executable, "-c", _SCRIPT, modulo, *bibliotecas],
+            cwd=BASE_DIR,
+            env={**os.environ, "DB_PATH": os.path.join(tmp_dir, "impressao.db")},
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+class ImportPontosDeEntradaTest(unittest.TestCase):
+    def test_api_nao_carrega_bibliotecas_de_pdf_e_imagem_na_partida(self):
+        self.assertEqual(_bibliotecas_carregadas("main", "pypdf", "PIL", "reportlab", "yt_dlp"), [])
+
+    def test_workers_de_impressao_e_preview_nao_carregam_fastapi(self):
+        for modulo in ("worker_main", "apc_preview_worker_main"):
+            with self.subTest(modulo=modulo):
+                self.assertEqual(_bibliotecas_carregadas(modulo, "fastapi", "pypdf", "PIL", "reportlab"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
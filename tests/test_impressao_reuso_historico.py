@@ -95,7 +95,8 @@ class ImpressaoReusoHistoricoTest(unittest.TestCase):
 
             self.assertEqual(resposta.media_type, "application/pdf")
             self.assertEqual(resposta.headers.get("Cache-Control"), "no-store")
-            self.assertEqual(resposta.body, caminho_pdf.read_bytes())
+            self.assertEqual(Path(resposta.path), caminho_pdf)
+            self.assertTrue(resposta.headers.get("ETag"))
 
     def test_reimprimir_job_historico_cria_novo_job_com_copia_no_spool(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
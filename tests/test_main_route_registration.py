@@ -44,6 +44,8 @@ class MainRouteRegistrationTest(unittest.TestCase):
         self.assertIn(("GET", "/notificacoes/gestao"), registered)
         self.assertIn(("GET", "/service-worker.js"), registered)
         self.assertIn(("GET", "/impressao/impressoras"), registered)
+        self.assertIn(("GET", "/eventos"), registered)
+        self.assertIn(("GET", "/eventos/metricas"), registered)
         self.assertIn(("GET", "/impressao/historico"), registered)
         self.assertIn(("GET", "/agendamento/meus-agendamentos"), registered)
         self.assertIn(("GET", "/agendamento/calendario"), registered)
@@ -1,13 +1,19 @@
+import base64
+import http.server
 import importlib
 import json
 import os
 import sqlite3
 import sys
 import tempfile
+import threading
 import types
 import unittest
 from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
 
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 from pydantic import ValidationError
 from fastapi import HTTPException
 
@@ -95,6 +101,46 @@ class NotificationsTest(unittest.TestCase):
             self.assertTrue(repository.mark_read(item["id"], first))
             self.assertEqual(repository.unread_count(first), 0)
 
+    def test_unread_count_is_pushed_on_create_read_and_scheduled_release(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            database, service, _repository, _integration = _reload(
+                os.path.join(tmp, "db.sqlite")
+            )
+            teacher = self._teacher(database, "realtime")
+            published = []
+            service.publicar_nao_lidas = lambda user_id, total: published.append((user_id, total))
+
+            item = service.create_notification(
+                recipient_user_id=teacher,
+                category="manual",
+                title="Agora",
+                body="Aviso imediato.",
+            )
+            release_at = datetime.now(UTC) + timedelta(minutes=5)
+            service.create_notification(
+                recipient_user_id=teacher,
+                category="manual",
+                title="Depois",
+                body="Aviso agendado.",
+                available_at=release_at,
+            )
+            service.mark_one_read(item["id"], teacher)
+            self.assertEqual(published, [(teacher, 1), (teacher, 0)])
+
+            conn = database.get_connection()
+            conn.execute(
+                "UPDATE notifications SET available_at = datetime('now') WHERE title = 'Depois'"
+            )
+            conn.commit()
+            conn.close()
+            released = service.publish_released_notifications(
+                service.utc_text(datetime.now(UTC) - timedelta(minutes=1)), service.utc_text()
+            )
+            self.assertEqual(released, 1)
+            self.assertEqual(published[-1], (teacher, 1))
+            now = service.utc_text()
+            self.assertEqual(service.publish_released_notifications(now, now), 0)
+
     def test_audience_union_and_internal_url_validation(self):
         with tempfile.TemporaryDirectory() as tmp:
             database, service, _repository, _integration = _reload(
@@ -295,6 +341,81 @@ class NotificationsTest(unittest.TestCase):
                 conn.close()
             self.assertEqual(total, 1)
 
+    def _apc_period(self, database, integration, teacher: int, hours: float, title: str) -> int:
+        deadline = datetime.now(integration.app_timezone()) + timedelta(hours=hours)
+        period = database.criar_apc_periodo(
+            ano_letivo=deadline.year,
+            data_referencia=deadline.date().isoformat(),
+            prazo_envio=deadline.strftime("%Y-%m-%d %H:%M:%S"),
+            titulo=title,
+            observacao="",
+            publico_alvo="TODOS_PROFESSORES",
+            tipo_entrega="GERAL",
+            criado_por_usuario_id=teacher,
+        )
+        return int(period["id"])
+
+    def _apc_notification_sources(self, database) -> set[str]:
+        conn = database.get_connection()
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT source_id FROM notifications WHERE source_type = 'apc_period'"
+            ).fetchall()
+            return {row[0] for row in rows}
+        finally:
+            conn.close()
+
+    def test_apc_dirty_queue_reconciles_only_changed_periods(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            database, _service, _repository, integration = _reload(
+                os.path.join(tmp, "db.sqlite")
+            )
+            apc_repository = importlib.import_module("modules.notifications.apc_repository")
+            teacher = self._teacher(database, "dirty")
+            changed = self._apc_period(database, integration, teacher, 120, "Alterada")
+            untouched = self._apc_period(database, integration, teacher, 100, "Intocada")
+
+            integration.enqueue_apc_period(changed)
+            stats = integration.reconcile_dirty_apc()
+
+            self.assertEqual((stats["periods"], stats["created"], stats["failed"]), (1, 3, 0))
+            self.assertIn("elapsed_ms", stats)
+            self.assertEqual(self._apc_notification_sources(database), {str(changed)})
+            self.assertEqual(integration.reconcile_dirty_apc()["periods"], 0)
+
+            sync = integration.sync_apc_period
+
+            def requeue_while_syncing(period_id):
+                apc_repository.enqueue_dirty_period(period_id)
+                return sync(period_id)
+
+            integration.enqueue_apc_period(untouched)
+            integration.sync_apc_period = requeue_while_syncing
+            try:
+                integration.reconcile_dirty_apc()
+            finally:
+                integration.sync_apc_period = sync
+            self.assertEqual(
+                [item["period_id"] for item in apc_repository.list_dirty_periods(10)],
+                [untouched],
+            )
+
+    def test_apc_sweep_covers_only_open_periods_within_reminder_horizon(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            database, _service, _repository, integration = _reload(
+                os.path.join(tmp, "db.sqlite")
+            )
+            teacher = self._teacher(database, "sweep")
+            near = self._apc_period(database, integration, teacher, 12, "Perto")
+            self._apc_period(database, integration, teacher, 24 * 10, "Longe")
+            self._apc_period(database, integration, teacher, -24, "Encerrada")
+
+            stats = integration.reconcile_apc_horizon()
+
+            self.assertEqual(stats["periods"], 1)
+            self.assertEqual(self._apc_notification_sources(database), {str(near)})
+            self.assertGreaterEqual(stats["elapsed_ms"], 0)
+
     def test_apc_completion_deadline_change_recipient_removal_and_delete(self):
         with tempfile.TemporaryDirectory() as tmp:
             database, _service, _repository, integration = _reload(
@@ -533,6 +654,167 @@ class NotificationsTest(unittest.TestCase):
             self.assertEqual(active, 0)
 
 
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+class _FakePushHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with self.server.lock:
+            self.server.requests.append((self.path, self.client_address[1]))
+        status = 410 if self.path.endswith("/gone") else 201
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *_args):
+        pass
+
+
+class WebPushBatchTest(unittest.TestCase):
+    ENV = (
+        "DB_PATH",
+        "APP_TIMEZONE",
+        "ENABLE_EMBEDDED_WORKER",
+        "WEB_PUSH_ENABLED",
+        "VAPID_PUBLIC_KEY",
+        "VAPID_PRIVATE_KEY",
+        "VAPID_SUBJECT",
+        "WEB_PUSH_BATCH_SIZE",
+        "WEB_PUSH_CONCURRENCY",
+        "WEB_PUSH_HOST_RATE_PER_SECOND",
+    )
+
+    def setUp(self):
+        self.old_env = {name: os.environ.get(name) for name in self.ENV}
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FakePushHandler)
+        self.server.daemon_threads = True
+        self.server.requests = []
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        vapid_key = ec.generate_private_key(ec.SECP256R1())
+        os.environ.update(
+            {
+                "WEB_PUSH_ENABLED": "true",
+                "VAPID_PUBLIC_KEY": "public-key",
+                "VAPID_PRIVATE_KEY": _b64url(
+                    vapid_key.private_numbers().private_value.to_bytes(32, "big")
+                ),
+                "VAPID_SUBJECT": "mailto:secretaria@escola.local",
+                "WEB_PUSH_BATCH_SIZE": "5",
+                "WEB_PUSH_CONCURRENCY": "4",
+                "WEB_PUSH_HOST_RATE_PER_SECOND": "0",
+            }
+        )
+        # Outros testes trocam o pywebpush por um stub; aqui o envio e real.
+        sys.modules.pop("pywebpush", None)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+        for name, value in self.old_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    def _prepare(self, endpoints: list[str]):
+        database, service, _repository, _integration = _reload(
+            os.path.join(self.tmp.name, "db.sqlite")
+        )
+        delivery_repo = importlib.import_module("modules.notifications.delivery_repository")
+        push = importlib.import_module("modules.notifications.push")
+        teacher = int(
+            database.criar_professor(
+                nome="Professor lote",
+                email="professor-lote@escola.local",
+                senha_hash=database.hash_senha("Senha@123"),
+                data_nascimento="1990-01-01",
+                aulas_semanais=10,
+                turmas_quantidade=1,
+            )
+        )
+        client_key = ec.generate_private_key(ec.SECP256R1()).public_key()
+        p256dh = _b64url(
+            client_key.public_bytes(
+                serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+            )
+        )
+        for endpoint in endpoints:
+            delivery_repo.upsert_subscription(teacher, endpoint, p256dh, _b64url(b"a" * 16), "test")
+        service.create_notification(
+            recipient_user_id=teacher,
+            category="manual",
+            title="Aviso geral",
+            body="Reuniao no auditorio.",
+        )
+        return database, delivery_repo, push
+
+    def _statuses(self, database) -> dict:
+        conn = database.get_connection()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM notification_push_deliveries GROUP BY status"
+            ).fetchall()
+            return {row[0]: row[1] for row in rows}
+        finally:
+            conn.close()
+
+    def test_drain_claims_in_batches_and_reuses_connections(self):
+        base = f"http://127.0.0.1:{self.server.server_address[1]}/push"
+        endpoints = [f"{base}/{index}" for index in range(11)] + [f"{base}/gone"]
+        database, delivery_repo, push = self._prepare(endpoints)
+
+        with patch.object(
+            delivery_repo, "seed_due_deliveries", wraps=delivery_repo.seed_due_deliveries
+        ) as seed, patch.object(
+            delivery_repo, "claim_deliveries", wraps=delivery_repo.claim_deliveries
+        ) as claim:
+            self.assertEqual(push.drain_deliveries(), 12)
+
+        seed.assert_called_once()
+        self.assertEqual([call.args[0] for call in claim.call_args_list], [5, 5, 5])
+        self.assertEqual(len(self.server.requests), 12)
+        self.assertLessEqual(len({port for _path, port in self.server.requests}), 4)
+        self.assertEqual(self._statuses(database), {"sent": 11, "dead": 1})
+        metrics = push.push_metrics()
+        self.assertEqual((metrics["batches"], metrics["sent"], metrics["gone"]), (3, 11, 1))
+        self.assertEqual(metrics["last_batch"]["size"], 2)
+        self.assertGreater(metrics["last_batch"]["per_second"], 0)
+        self.assertEqual(push.drain_deliveries(), 0)
+
+    def test_rate_limit_is_applied_per_endpoint_host(self):
+        os.environ["WEB_PUSH_HOST_RATE_PER_SECOND"] = "20"
+        port = self.server.server_address[1]
+        endpoints = [f"http://127.0.0.1:{port}/push/{index}" for index in range(4)]
+        endpoints.append(f"http://localhost:{port}/push/other")
+        database, _delivery_repo, push = self._prepare(endpoints)
+
+        self.assertEqual(push.drain_deliveries(), 5)
+
+        self.assertEqual(self._statuses(database), {"sent": 5})
+        # 4 envios para o mesmo host a 20/s esperam 50 + 100 + 150 ms.
+        self.assertGreaterEqual(push.push_metrics()["rate_limit_wait_ms"], 250)
+
+    def test_host_rate_limiter_spaces_requests_per_host(self):
+        push = importlib.import_module("modules.notifications.push")
+        waits = []
+        limiter = push.HostRateLimiter(10, clock=lambda: 0.0, sleep=waits.append)
+
+        self.assertEqual(
+            [limiter.acquire(host) for host in ("a", "a", "b", "a")],
+            [0.0, 0.1, 0.0, 0.2],
+        )
+        self.assertEqual(len(waits), 2)
+        self.assertEqual(push.HostRateLimiter(0).acquire("a"), 0.0)
+
+
 class NotificationMigrationTest(unittest.TestCase):
     def test_migration_is_idempotent(self):
         module = importlib.import_module(
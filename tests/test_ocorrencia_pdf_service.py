@@ -1,9 +1,24 @@
 import io
+import os
+import shutil
+import subprocess
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageStat
 from pypdf import PdfReader
 
 from services.ocorrencia_pdf_service import (
+    A4_RETRATO_PIXELS_300_DPI,
+    COR_FUNDO,
+    MODO_RENDERIZACAO_RASTER,
+    MODO_RENDERIZACAO_VETORIAL,
+    PDF_RESOLUTION_DPI,
+    PONTOS_POR_PIXEL,
+    _RenderizadorRegistroOcorrencia,
+    _RenderizadorRegistroOcorrenciaVetorial,
     _formatar_aula,
     _montar_blocos_base_legal,
     _obter_identificacao_ata,
@@ -11,6 +26,7 @@ from services.ocorrencia_pdf_service import (
     _obter_gravidade_ocorrencia,
     _obter_titulo_assinatura_estudante,
     _obter_titulo_documento,
+    _resolver_modo_renderizacao_padrao,
     gerar_pdf_ocorrencia_registro,
 )
 
@@ -389,5 +405,144 @@ class OcorrenciaPdfServiceTest(unittest.TestCase):
         self.assertGreaterEqual(len(reader.pages), 2)
 
 
+
+def _ocorrencia_completa() -> dict:
+    ocorrencia = _ocorrencia_base(
+        " ".join(
+            "O estudante interrompeu a aula repetidas vezes e nao atendeu as orientacoes."
+            for _ in range(90)
+        )
+    )
+    ocorrencia["quem_assina"] = "ambos"
+    ocorrencia["regimento_itens"] = [
+        {
+            "regimento_item_id": 2,
+            "artigo": "Art. 76 - VII",
+            "descricao": "Integrar-se ao processo pedagogico desenvolvido pela unidade escolar.",
+            "ordem": 1,
+        }
+    ]
+    return ocorrencia
+
+
+def _reproduzir_em_imagem(superficie) -> Image.Image:
+    pagina = Image.new("RGB", A4_RETRATO_PIXELS_300_DPI, COR_FUNDO)
+    draw = ImageDraw.Draw(pagina)
+    for operacao in superficie.operacoes:
+        tipo = operacao[0]
+        if tipo == "texto":
+            draw.text(operacao[1], operacao[2], fill=operacao[3], font=operacao[4])
+        elif tipo == "retangulo":
+            draw.rectangle(operacao[1], fill=operacao[2], outline=operacao[3], width=operacao[4])
+        elif tipo == "linha":
+            draw.line(operacao[1], fill=operacao[2], width=operacao[3])
+        elif tipo == "imagem":
+            pagina.paste(operacao[2], operacao[1], operacao[2])
+    return pagina
+
+
+class OcorrenciaPdfVetorialTest(unittest.TestCase):
+    def setUp(self):
+        self.ocorrencia = _ocorrencia_completa()
+        self.raster = _RenderizadorRegistroOcorrencia(self.ocorrencia, turma={"turno": "MATUTINO"})
+        self.pdf_raster = self.raster.renderizar()
+        self.vetorial = _RenderizadorRegistroOcorrenciaVetorial(
+            self.ocorrencia, turma={"turno": "MATUTINO"}
+        )
+        self.pdf_vetorial = self.vetorial.renderizar()
+
+    def test_lista_de_desenho_reproduz_as_paginas_raster(self):
+        self.assertEqual(len(self.vetorial.paginas), len(self.raster.paginas))
+        for pagina_raster, superficie in zip(self.raster.paginas, self.vetorial.paginas):
+            diferenca = ImageChops.difference(pagina_raster, _reproduzir_em_imagem(superficie))
+            self.assertIsNone(diferenca.getbbox())
+
+    def test_texto_vetorial_fica_na_posicao_do_raster(self):
+        altura = A4_RETRATO_PIXELS_300_DPI[1]
+        reader = PdfReader(io.BytesIO(self.pdf_vetorial))
+        self.assertEqual(len(reader.pages), len(self.raster.paginas))
+
+        for pagina_pdf, superficie in zip(reader.pages, self.vetorial.paginas):
+            posicoes = {}
+
+            def visitar(texto, cm, tm, _fonte, _tamanho):
+                if texto.strip():
+                    x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+                    y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+                    posicoes.setdefault(texto, []).append((x, y))
+
+            pagina_pdf.extract_text(visitor_text=visitar)
+            for _tipo, (x, y), texto, _cor, fonte in (
+                operacao for operacao in superficie.operacoes if operacao[0] == "texto"
+            ):
+                if not texto.strip():
+                    continue
+                esperado = (
+                    x * PONTOS_POR_PIXEL,
+                    (altura - y - fonte.getmetrics()[0]) * PONTOS_POR_PIXEL,
+                )
+                self.assertTrue(
+                    any(
+                        abs(px - esperado[0]) < 0.5 and abs(py - esperado[1]) < 0.5
+                        for px, py in posicoes.get(texto, [])
+                    ),
+                    texto,
+                )
+
+    def test_pdf_vetorial_tem_texto_selecionavel_e_e_menor(self):
+        reader = PdfReader(io.BytesIO(self.pdf_vetorial))
+        texto = "\n".join(pagina.extract_text() or "" for pagina in reader.pages)
+        self.assertIn("CENTRAL DE REGISTROS", texto)
+        self.assertIn("ATA 01/2026", texto)
+        self.assertIn("BASE LEGAL", texto.upper())
+        self.assertLess(len(self.pdf_vetorial), len(self.pdf_raster) // 5)
+
+    def test_modo_raster_continua_disponivel_por_chamada(self):
+        pdf_bytes = gerar_pdf_ocorrencia_registro(
+            _ocorrencia_base("Descricao curta."),
+            turma={"turno": "MATUTINO"},
+            modo_renderizacao=MODO_RENDERIZACAO_RASTER,
+        )
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        self.assertEqual((reader.pages[0].extract_text() or "").strip(), "")
+        with self.assertRaisesRegex(ValueError, "'svg'"):
+            gerar_pdf_ocorrencia_registro(_ocorrencia_base("x"), modo_renderizacao="svg")
+
+    def test_renderizador_invalido_no_ambiente_cai_no_vetorial(self):
+        with (
+            patch.dict(os.environ, {"OCORRENCIA_PDF_RENDERER": "foo"}),
+            self.assertLogs("services.ocorrencia_pdf_service", level="WARNING"),
+        ):
+            self.assertEqual(_resolver_modo_renderizacao_padrao(), MODO_RENDERIZACAO_VETORIAL)
+        with patch.dict(os.environ, {"OCORRENCIA_PDF_RENDERER": " Raster "}):
+            self.assertEqual(_resolver_modo_renderizacao_padrao(), MODO_RENDERIZACAO_RASTER)
+
+    @unittest.skipUnless(shutil.which("pdftoppm"), "pdftoppm nao instalado")
+    def test_diferenca_visual_rasterizando_o_pdf_vetorial(self):
+        reducao = 8
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            caminho_pdf = Path(tmp_dir) / "vetorial.pdf"
+            caminho_pdf.write_bytes(self.pdf_vetorial)
+            subprocess.run(
+                ["pdftoppm", "-r", str(PDF_RESOLUTION_DPI), "-gray", "-png", str(caminho_pdf),
+                 str(Path(tmp_dir) / "pagina")],
+                check=True,
+            )
+            paginas_rasterizadas = sorted(Path(tmp_dir).glob("pagina*.png"))
+            self.assertEqual(len(paginas_rasterizadas), len(self.raster.paginas))
+
+            for caminho_png, pagina_raster in zip(paginas_rasterizadas, self.raster.paginas):
+                tamanho = (pagina_raster.width // reducao, pagina_raster.height // reducao)
+                with Image.open(caminho_png) as imagem_vetorial:
+                    vetorial = imagem_vetorial.convert("L").resize(tamanho).filter(
+                        ImageFilter.GaussianBlur(1)
+                    )
+                raster = pagina_raster.convert("L").resize(tamanho).filter(
+                    ImageFilter.GaussianBlur(1)
+                )
+                media = ImageStat.Stat(ImageChops.difference(vetorial, raster)).mean[0]
+                self.assertLess(media, 6.0)
+
+
 if __name__ == "__main__":
     unittest.main()
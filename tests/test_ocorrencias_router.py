@@ -3,6 +3,9 @@ import os
 import sys
 import tempfile
 import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
 
 
 def _reload_modulos(db_path: str):
@@ -386,6 +389,46 @@ class OcorrenciasRouterTest(unittest.TestCase):
                 [professor["nome"]],
             )
 
+    def test_pdf_rejeita_so_modo_de_renderizacao_invalido(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "impressao.db")
+            database, ocorrencias_router = _reload_modulos(db_path)
+            database.criar_tabelas()
+
+            professor = self._criar_professor(database, "Professor PDF", "professor.pdf@escola.test")
+            resposta = ocorrencias_router.criar_ocorrencia_api(
+                ocorrencias_router.OcorrenciaCreateIn(
+                    tipo_registro="professor",
+                    professor_requerente=professor["nome"],
+                    professor_requerente_id=int(professor["id"]),
+                    disciplina="Alinhamento pedagogico",
+                    data_ocorrencia="2026-03-24",
+                    horario_ocorrencia="09:00",
+                    descricao="Registro individual de orientacao ao professor.",
+                    regimento_item_ids=[],
+                    acao_aplicada="orientacao_professor",
+                    status="registrado",
+                ),
+                usuario={"cargo": "ADMIN"},
+            )
+            ocorrencia_id = int(resposta["id"])
+
+            with self.assertRaises(HTTPException) as ctx:
+                ocorrencias_router.gerar_pdf_ocorrencia_api(
+                    ocorrencia_id, renderizacao="svg", usuario={"cargo": "ADMIN"}
+                )
+            self.assertEqual(ctx.exception.status_code, 400)
+            self.assertIn("'svg'", ctx.exception.detail)
+
+            with patch(
+                "services.ocorrencia_pdf_service.gerar_pdf_ocorrencia_registro",
+                side_effect=ValueError("falha interna"),
+            ):
+                with self.assertRaisesRegex(ValueError, "falha interna"):
+                    ocorrencias_router.gerar_pdf_ocorrencia_api(
+                        ocorrencia_id, renderizacao=None, usuario={"cargo": "ADMIN"}
+                    )
+
     def test_criar_registro_de_professor_preserva_base_legal_opcional(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
             db_path = os.path.join(tmp_dir, "impressao.db")
@@ -780,6 +823,91 @@ class OcorrenciasRouterTest(unittest.TestCase):
             self.assertEqual(int(cursor.fetchone()["total"]), 1)
             conn.close()
 
+    def test_listagem_paginada_percorre_todas_as_ocorrencias_por_keyset(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "impressao.db")
+            database, ocorrencias_router = _reload_modulos(db_path)
+            database.criar_tabelas()
+            turma_id = int(database.criar_turma("9A", "MATUTINO", 30))
+
+            conn = database.get_connection()
+            # Varias ocorrencias no mesmo dia e mesmo criado_em: so o id desempata.
+            conn.executemany(
+                """
+                INSERT INTO ocorrencias (
+                    nome_estudante, turma_id, professor_requerente, disciplina, data_ocorrencia,
+                    aula, horario_ocorrencia, descricao, acao_aplicada, status, criado_em
+                )
+                VALUES (?, ?, 'Professor', 'Historia', ?, '1', '07:30', ?, 'advertencia', ?, ?)
+                """,
+                [
+                    (f"Estudante {indice}", turma_id, data, "x" * 200 if indice == 0 else "Curta", status, criado_em)
+                    for indice, (data, status, criado_em) in enumerate(
+                        [
+                            ("2026-03-10", "registrado", "2026-03-10 08:00:00"),
+                            ("2026-03-10", "resolvido", "2026-03-10 08:00:00"),
+                            ("2026-03-10", "registrado", "2026-03-10 08:00:00"),
+                            ("2026-03-11", "registrado", "2026-03-11 09:00:00"),
+                            ("2026-03-09", "resolvido", "2026-03-09 10:00:00"),
+                            ("2026-03-10", "registrado", "2026-03-10 09:30:00"),
+                            ("2026-03-08", "registrado", "2026-03-08 07:00:00"),
+                        ]
+                    )
+                ],
+            )
+            conn.commit()
+            conn.close()
+            esperados = [
+                item["id"]
+                for item in sorted(
+                    database.listar_ocorrencias(),
+                    key=lambda item: (item["data_ocorrencia"], item["criado_em"], item["id"]),
+                    reverse=True,
+                )
+            ]
+
+            def listar(**filtros):
+                return ocorrencias_router.listar_ocorrencias_pagina_api(
+                    tipo_registro=None,
+                    status=filtros.get("status"),
+                    turma_id=None,
+                    nome_estudante=None,
+                    data_inicial=None,
+                    data_final=None,
+                    texto=None,
+                    limite=filtros.get("limite", 3),
+                    cursor=filtros.get("cursor"),
+                    usuario={"cargo": "ADMIN"},
+                )
+
+            primeira = listar()
+            self.assertEqual((primeira["total"], primeira["total_exato"]), (7, True))
+            ids = [item["id"] for item in primeira["itens"]]
+            cursor = primeira["proximo_cursor"]
+            while cursor:
+                pagina = listar(cursor=cursor)
+                self.assertIsNone(pagina["total"])
+                ids.extend(item["id"] for item in pagina["itens"])
+                cursor = pagina["proximo_cursor"]
+            self.assertEqual(ids, esperados)
+
+            resumo = {item["nome_estudante"]: item for item in primeira["itens"] + listar(limite=7)["itens"]}
+            self.assertEqual(len(resumo["Estudante 0"]["descricao_resumo"]), 160)
+            self.assertTrue(resumo["Estudante 0"]["descricao_truncada"])
+            self.assertNotIn("regimento_itens", resumo["Estudante 0"])
+
+            resolvidas = listar(status="resolvido", limite=1)
+            self.assertEqual((resolvidas["total"], len(resolvidas["itens"])), (2, 1))
+            self.assertEqual(listar(status="resolvido", cursor=resolvidas["proximo_cursor"])["proximo_cursor"], None)
+
+            with patch.object(database, "LIMITE_CONTAGEM_OCORRENCIAS", 4):
+                estimada = listar()
+            self.assertEqual((estimada["total"], estimada["total_exato"]), (4, False))
+
+            with self.assertRaises(HTTPException) as erro:
+                listar(cursor="nao-e-um-cursor")
+            self.assertEqual(erro.exception.status_code, 400)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,208 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from services import file_service, office_converter
+from services.office_converter import (
+    ConversaoOfficeIndisponivel,
+    ModuloUnoIndisponivel,
+    PoolConversaoOffice,
+)
+
+
+class InstanciaFalsa:
+    criadas: list["InstanciaFalsa"] = []
+
+    def __init__(self, nome: str, atraso: float = 0.0):
+        self.nome = nome
+        self.atraso = atraso
+        self.conversoes = 0
+        self.ativa = False
+        self.encerrada = False
+        InstanciaFalsa.criadas.append(self)
+
+    def iniciar(self):
+        self.ativa = True
+        return self
+
+    def saudavel(self) -> bool:
+        return self.ativa
+
+    def converter(self, caminho_origem: Path, caminho_destino: Path) -> Path:
+        time.sleep(self.atraso)
+        if not self.ativa:
+            raise RuntimeError("instancia encerrada")
+        Path(caminho_destino).write_bytes(b"%PDF-" + Path(caminho_origem).read_bytes())
+        self.conversoes += 1
+        return Path(caminho_destino)
+
+    def encerrar(self):
+        self.ativa = False
+        self.encerrada = True
+
+
+class PoolConversaoOfficeTest(unittest.TestCase):
+    def setUp(self):
+        InstanciaFalsa.criadas = []
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.origem = Path(self._tmp_dir.name) / "atividade.docx"
+        self.origem.write_bytes(b"docx")
+        self.destino = self.origem.with_suffix(".pdf")
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_reutiliza_instancia_quente(self):
+        pool = PoolConversaoOffice(1, criar_instancia=InstanciaFalsa)
+        for _ in range(3):
+            pool.converter(self.origem, self.destino, timeout=5)
+
+        self.assertEqual(len(InstanciaFalsa.criadas), 1)
+        self.assertEqual(self.destino.read_bytes(), b"%PDF-docx")
+        self.assertEqual(pool.stats()["conversoes"], 3)
+        self.assertEqual(pool.stats()["reinicios"], 1)
+
+    def test_pedidos_excedentes_aguardam_na_fila(self):
+        pool = PoolConversaoOffice(1, criar_instancia=lambda nome: InstanciaFalsa(nome, 0.2))
+        threads = [
+            threading.Thread(
+                target=pool.converter,
+                args=(self.origem, Path(self._tmp_dir.name) / f"saida-{indice}.pdf", 5),
+            )
+            for indice in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(InstanciaFalsa.criadas), 1)
+        self.assertGreater(pool.stats()["espera_media_fila_segundos"], 0.05)
+
+    def test_fila_cheia_expira(self):
+        pool = PoolConversaoOffice(
+            1, criar_instancia=lambda nome: InstanciaFalsa(nome, 0.5), timeout_fila=0.05
+        )
+        thread = threading.Thread(target=pool.converter, args=(self.origem, self.destino, 5))
+        thread.start()
+        time.sleep(0.1)
+        with self.assertRaisesRegex(RuntimeError, "ocupada"):
+            pool.converter(self.origem, Path(self._tmp_dir.name) / "outra.pdf", 5)
+        thread.join()
+
+    def test_timeout_derruba_e_reinicia_instancia(self):
+        atrasos = iter([1.0, 0.0])
+        pool = PoolConversaoOffice(1, criar_instancia=lambda nome: InstanciaFalsa(nome, next(atrasos)))
+
+        with self.assertRaisesRegex(RuntimeError, "Timeout"):
+            pool.converter(self.origem, self.destino, timeout=0.1)
+        self.assertTrue(InstanciaFalsa.criadas[0].encerrada)
+
+        pool.converter(self.origem, self.destino, timeout=5)
+        self.assertEqual(len(InstanciaFalsa.criadas), 2)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_instancia_sem_resposta_e_reiniciada_antes_do_uso(self):
+        pool = PoolConversaoOffice(1, criar_instancia=InstanciaFalsa)
+        pool.converter(self.origem, self.destino, timeout=5)
+        InstanciaFalsa.criadas[0].ativa = False
+
+        pool.converter(self.origem, self.destino, timeout=5)
+        self.assertEqual(len(InstanciaFalsa.criadas), 2)
+        self.assertTrue(InstanciaFalsa.criadas[0].encerrada)
+
+    def test_recicla_instancia_apos_limite_de_conversoes(self):
+        pool = PoolConversaoOffice(1, criar_instancia=InstanciaFalsa, max_conversoes=2)
+        for _ in range(3):
+            pool.converter(self.origem, self.destino, timeout=5)
+        self.assertEqual(len(InstanciaFalsa.criadas), 2)
+
+    def test_falha_ao_iniciar_adia_novas_tentativas_com_espera_crescente(self):
+        falhas = iter([True, True, False])
+
+        class InstanciaQueNaoSobe(InstanciaFalsa):
+            def iniciar(self):
+                if next(falhas):
+                    raise ConversaoOfficeIndisponivel("LibreOffice encerrou durante a inicializacao.")
+                return super().iniciar()
+
+        pool = PoolConversaoOffice(1, criar_instancia=InstanciaQueNaoSobe, espera_reinicio=0.1)
+
+        with self.assertLogs("services.office_converter", level="WARNING"):
+            with self.assertRaisesRegex(ConversaoOfficeIndisponivel, "inicializacao"):
+                pool.converter(self.origem, self.destino, timeout=5)
+        with self.assertRaisesRegex(ConversaoOfficeIndisponivel, "suspenso"):
+            pool.converter(self.origem, self.destino, timeout=5)
+        self.assertEqual(len(InstanciaFalsa.criadas), 1)
+
+        time.sleep(0.12)
+        with self.assertLogs("services.office_converter", level="WARNING"):
+            with self.assertRaises(ConversaoOfficeIndisponivel):
+                pool.converter(self.origem, self.destino, timeout=5)
+        self.assertEqual(pool.stats()["falhas_inicio_seguidas"], 2)
+        time.sleep(0.12)
+        # A segunda falha dobrou a espera.
+        with self.assertRaisesRegex(ConversaoOfficeIndisponivel, "suspenso"):
+            pool.converter(self.origem, self.destino, timeout=5)
+
+        time.sleep(0.2)
+        pool.converter(self.origem, self.destino, timeout=5)
+        self.assertEqual(self.destino.read_bytes(), b"%PDF-docx")
+        self.assertEqual(pool.stats()["falhas_inicio_seguidas"], 0)
+
+
+class ConverterOfficeFallbackTest(unittest.TestCase):
+    def _converter_com_pool_falhando(self, erro: Exception):
+        class PoolComFalha:
+            def converter(self, *_args, **_kwargs):
+                raise erro
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            origem = Path(tmp_dir) / "atividade.docx"
+            origem.write_bytes(b"docx")
+
+            def soffice_a_frio(comando, caminho_origem, caminho_destino):
+                caminho_destino.write_bytes(b"%PDF-frio")
+                return caminho_destino
+
+            with (
+                patch.object(file_service, "_descobrir_comando_soffice", return_value="soffice"),
+                patch.object(
+                    file_service, "obter_pool_conversao_office", return_value=PoolComFalha()
+                ),
+                patch.object(file_service, "desativar_pool_conversao_office") as desativar,
+                patch.object(
+                    file_service,
+                    "_converter_office_para_pdf_subprocesso",
+                    side_effect=soffice_a_frio,
+                ),
+            ):
+                caminho_pdf = file_service.converter_office_para_pdf(origem)
+                self.assertEqual(caminho_pdf.read_bytes(), b"%PDF-frio")
+        return desativar
+
+    def test_sem_uno_usa_soffice_a_frio_e_desativa_o_pool(self):
+        desativar = self._converter_com_pool_falhando(ModuloUnoIndisponivel("sem uno"))
+        desativar.assert_called_once_with("sem uno")
+
+    def test_falha_passageira_usa_soffice_a_frio_sem_desativar_o_pool(self):
+        desativar = self._converter_com_pool_falhando(
+            ConversaoOfficeIndisponivel("LibreOffice nao respondeu dentro do tempo de inicializacao.")
+        )
+        desativar.assert_not_called()
+
+    def test_sem_modulo_uno_nao_cria_pool(self):
+        with (
+            patch.object(office_converter, "_POOL", None),
+            patch.object(office_converter, "_POOL_DESATIVADO", False),
+            patch.object(office_converter.importlib.util, "find_spec", return_value=None),
+        ):
+            self.assertIsNone(office_converter.obter_pool_conversao_office("soffice"))
+            self.assertTrue(office_converter._POOL_DESATIVADO)
+
+
+if __name__ == "__main__":
+    unittest.main()
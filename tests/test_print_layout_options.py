@@ -1,6 +1,7 @@
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from pypdf import PdfReader, PdfWriter
 
@@ -9,6 +10,8 @@ from services.pdf_service import (
     A4_PAISAGEM_LARGURA_PT,
     A4_RETRATO_ALTURA_PT,
     A4_RETRATO_LARGURA_PT,
+    _contar_paginas_pdf_sem_cache,
+    _matriz_rotacao,
     _obter_layout_nup,
     gerar_pdf_n_por_folha,
 )
@@ -55,6 +58,46 @@ class PrintLayoutOptionsTest(unittest.TestCase):
             self.assertAlmostEqual(float(pagina.mediabox.width), A4_PAISAGEM_LARGURA_PT, places=1)
             self.assertAlmostEqual(float(pagina.mediabox.height), A4_PAISAGEM_ALTURA_PT, places=1)
 
+    def test_pagina_unica_replicada_reaproveita_o_mesmo_xobject(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            origem = self._criar_pdf_origem(Path(tmp_dir), paginas=1)
+            saida = gerar_pdf_n_por_folha(origem, paginas_por_folha=4, orientacao="retrato")
+
+            folha = PdfReader(str(saida)).pages[0]
+            xobjects = folha["/Resources"]["/XObject"]
+            self.assertEqual(list(xobjects.keys()), ["/P1"])
+            conteudo = folha.get_contents().get_data().decode()
+            self.assertEqual(conteudo.count("/P1 Do"), 4)
+
+    def test_pagina_girada_ocupa_a_celula_com_as_medidas_exibidas(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pasta = Path(tmp_dir)
+            origem = self._criar_pdf_origem(pasta, paginas=2)
+            reader = PdfReader(str(origem))
+            writer = PdfWriter()
+            for pagina in reader.pages:
+                writer.add_page(pagina.rotate(90))
+            with origem.open("wb") as arquivo:
+                writer.write(arquivo)
+
+            pagina = PdfReader(str(origem)).pages[0]
+            a, b, c, d, e, f = _matriz_rotacao(pagina)
+            largura, altura = A4_RETRATO_LARGURA_PT, A4_RETRATO_ALTURA_PT
+            # Canto superior esquerdo vai para o superior direito ao girar 90 graus.
+            self.assertAlmostEqual(a * 0 + c * altura + e, altura, places=2)
+            self.assertAlmostEqual(b * 0 + d * altura + f, largura, places=2)
+
+            saida = gerar_pdf_n_por_folha(origem, paginas_por_folha=2, orientacao="paisagem")
+            xobject = PdfReader(str(saida)).pages[0]["/Resources"]["/XObject"]["/P1"]
+            self.assertEqual([float(v) for v in xobject["/Matrix"]], [0, -1, 1, 0, 0, largura])
+
+    def test_contagem_de_paginas_pelo_catalogo_e_fallback(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            origem = self._criar_pdf_origem(Path(tmp_dir), paginas=5)
+            self.assertEqual(_contar_paginas_pdf_sem_cache(str(origem)), 5)
+            with patch("services.pdf_service._contar_paginas_pelo_catalogo", return_value=None):
+                self.assertEqual(_contar_paginas_pdf_sem_cache(str(origem)), 5)
+
     def test_opcoes_cups_duas_por_folha_seguem_orientacao(self):
         opcoes_retrato = _montar_opcoes_cups_legado(
             {"paginas_por_folha": 2, "orientacao": "retrato", "duplex": False}
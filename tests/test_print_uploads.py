@@ -0,0 +1,143 @@
+import hashlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from modules.printing import uploads
+from modules.printing.service import prepare_uploaded_file_for_preview
+from modules.printing.uploads import store_upload_in_spool
+
+
+class LeitorRegistrado(io.BytesIO):
+    def __init__(self, conteudo: bytes):
+        super().__init__(conteudo)
+        self.tamanhos_lidos = []
+
+    def read(self, tamanho=-1):
+        self.tamanhos_lidos.append(tamanho)
+        return super().read(tamanho)
+
+
+class StoreUploadInSpoolTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.spool = Path(self._tmp_dir.name)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _gravar(self, conteudo: bytes, nome: str = "prova.pdf", **kwargs):
+        return store_upload_in_spool(
+            arquivo_upload=LeitorRegistrado(conteudo),
+            nome_arquivo=nome,
+            extensao_arquivo=Path(nome).suffix,
+            spool_dir=self.spool,
+            **kwargs,
+        )
+
+    def test_grava_em_blocos_e_calcula_hash(self):
+        conteudo = b"%PDF-1.7\n" + b"x" * (3 * uploads.TAMANHO_BLOCO_UPLOAD)
+        leitor = LeitorRegistrado(conteudo)
+
+        resultado = store_upload_in_spool(
+            arquivo_upload=leitor,
+            nome_arquivo="prova.pdf",
+            extensao_arquivo=".pdf",
+            spool_dir=self.spool,
+        )
+
+        self.assertEqual(resultado["caminho_arquivo"].read_bytes(), conteudo)
+        self.assertEqual(resultado["tamanho_bytes"], len(conteudo))
+        self.assertEqual(resultado["sha256"], hashlib.sha256(conteudo).hexdigest())
+        self.assertTrue(all(t == uploads.TAMANHO_BLOCO_UPLOAD for t in leitor.tamanhos_lidos))
+
+    def test_recusa_conteudo_fora_dos_formatos_aceitos(self):
+        for conteudo, nome in (
+            (b"MZ\x90\x00executavel", "atividade.docx"),
+            (b"MZ\x90\x00executavel", "prova.pdf"),
+            (b"{\\rtf1\\ansi texto}", "prova.pdf"),
+        ):
+            with self.subTest(nome=nome, inicio=conteudo[:5]):
+                with self.assertRaises(HTTPException) as contexto:
+                    self._gravar(conteudo, nome=nome)
+
+                self.assertEqual(contexto.exception.status_code, 400)
+                self.assertEqual(list(self.spool.iterdir()), [])
+
+    def test_formato_detectado_pelo_conteudo_manda_sobre_a_extensao(self):
+        casos = (
+            (b"PK\x03\x04docx", "atividade.doc", ".docx"),
+            (b"\x89PNG\r\n\x1a\nimagem", "foto.jpg", ".png"),
+            (b"\xff\xd8\xffimagem", "foto.jpeg", ".jpeg"),
+            (b"{\\rtf1\\ansi texto}", "atividade.doc", ".doc"),
+            (b"\xef\xbb\xbf  <html><body>texto</body></html>", "atividade.doc", ".doc"),
+            (b"%PDF-1.4 escaneado", "prova.docx", ".pdf"),
+        )
+        for conteudo, nome, esperada in casos:
+            with self.subTest(nome=nome, esperada=esperada):
+                resultado = self._gravar(conteudo, nome=nome)
+                self.assertEqual(resultado["extensao_arquivo"], esperada)
+                self.assertEqual(resultado["caminho_arquivo"].read_bytes(), conteudo)
+
+    def test_limite_do_formato_pelo_tamanho_declarado(self):
+        leitor = LeitorRegistrado(b"%PDF-")
+        with patch.dict(uploads.LIMITES_UPLOAD_MB, {".pdf": 1}):
+            with self.assertRaises(HTTPException) as contexto:
+                store_upload_in_spool(
+                    arquivo_upload=leitor,
+                    nome_arquivo="scan.pdf",
+                    extensao_arquivo=".pdf",
+                    spool_dir=self.spool,
+                    tamanho_declarado=2 * 1024 * 1024,
+                )
+
+        self.assertEqual(contexto.exception.status_code, 413)
+        self.assertEqual(leitor.tamanhos_lidos, [])
+
+    def test_limite_do_formato_durante_a_copia(self):
+        conteudo = b"\x89PNG\r\n\x1a\n" + b"0" * (2 * 1024 * 1024)
+        with patch.dict(uploads.LIMITES_UPLOAD_MB, {".png": 1}):
+            with self.assertRaises(HTTPException) as contexto:
+                self._gravar(conteudo, nome="foto.png")
+
+        self.assertEqual(contexto.exception.status_code, 413)
+        self.assertEqual(list(self.spool.iterdir()), [])
+
+    def test_arquivo_vazio(self):
+        with self.assertRaises(HTTPException) as contexto:
+            self._gravar(b"")
+
+        self.assertEqual(contexto.exception.status_code, 400)
+        self.assertEqual(list(self.spool.iterdir()), [])
+
+    def test_preview_devolve_caminho_sem_ler_pdf_para_memoria(self):
+        extensoes_convertidas = []
+
+        def converter(caminho_origem: Path, extensao: str) -> Path:
+            extensoes_convertidas.append(extensao)
+            destino = caminho_origem.with_suffix(".pdf")
+            destino.write_bytes(b"%PDF-preview")
+            return destino
+
+        resultado = prepare_uploaded_file_for_preview(
+            nome_arquivo="atividade.doc",
+            arquivo_upload=io.BytesIO(b"PK\x03\x04docx"),
+            spool_dir=self.spool,
+            obter_extensao_arquivo=lambda nome: Path(nome).suffix,
+            converter_para_pdf=converter,
+            remover_arquivo_se_existir=lambda caminho: caminho.unlink(missing_ok=True),
+        )
+
+        self.assertEqual(resultado["caminho_pdf"].read_bytes(), b"%PDF-preview")
+        self.assertEqual(extensoes_convertidas, [".docx"])
+        self.assertEqual(resultado["extensao_arquivo"], ".docx")
+        self.assertIn(resultado["caminho_pdf"], resultado["arquivos_temporarios"])
+        self.assertEqual(len(resultado["arquivos_temporarios"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import socket
+import unittest
+from unittest.mock import patch
+
+from services import realtime_events
+from services.realtime_events import CanalEventos, publicar_evento, publicar_job_impressao
+
+
+def _porta_livre() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _drenar(conexao) -> list[dict]:
+    mensagens = []
+    while not conexao.fila.empty():
+        mensagens.append(conexao.fila.get_nowait())
+    return mensagens
+
+
+class _RequestConectado:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+class CanalEventosTest(unittest.TestCase):
+    def test_job_chega_ao_dono_e_aos_gestores(self):
+        async def cenario():
+            canal = CanalEventos(porta=0)
+            await canal.iniciar()
+            dono = canal.conectar(7)
+            gestor = canal.conectar(1, gestor=True)
+            outro = canal.conectar(8)
+            with patch.object(realtime_events, "canal_eventos", canal):
+                publicar_job_impressao({"id": 42, "usuario_id": 7}, "CONCLUIDO")
+                publicar_evento("impressao.status", {"sem_papel": True})
+            await asyncio.sleep(0)
+            return _drenar(dono), _drenar(gestor), _drenar(outro), canal.stats()
+
+        dono, gestor, outro, stats = asyncio.run(cenario())
+
+        job = {"tipo": "impressao.job", "dados": {"job_id": 42, "status": "CONCLUIDO", "usuario_id": 7}}
+        status = {"tipo": "impressao.status", "dados": {"sem_papel": True}}
+        self.assertEqual(dono, [job, status])
+        self.assertEqual(gestor, [job, status])
+        self.assertEqual(outro, [status])
+        self.assertEqual(stats["conexoes_ativas"], 3)
+        self.assertEqual(stats["eventos_publicados"], 2)
+
+    def test_cliente_lento_recebe_resync_em_vez_de_fila_infinita(self):
+        async def cenario():
+            canal = CanalEventos(porta=0, tamanho_fila=3)
+            await canal.iniciar()
+            conexao = canal.conectar(7)
+            for indice in range(5):
+                canal._distribuir({"tipo": "impressao.job", "dados": {"job_id": indice}, "usuarios": [7]})
+            return _drenar(conexao), conexao.stats()
+
+        mensagens, stats = asyncio.run(cenario())
+
+        self.assertEqual(
+            mensagens,
+            [{"tipo": "resync", "dados": {}}, {"tipo": "impressao.job", "dados": {"job_id": 4}}],
+        )
+        self.assertEqual(stats["descartados"], 4)
+        self.assertEqual(stats["resyncs"], 1)
+
+    def test_evento_de_outro_processo_chega_por_udp(self):
+        porta = _porta_livre()
+
+        async def cenario():
+            canal = CanalEventos(porta=porta)
+            self.assertTrue(await canal.iniciar())
+            try:
+                conexao = canal.conectar(7)
+                produtor = CanalEventos(porta=porta)
+                with patch.object(realtime_events, "canal_eventos", produtor):
+                    publicar_evento("notificacoes.nao_lidas", {"unread_count": 3}, usuarios=[7])
+                    publicar_evento("notificacoes.nao_lidas", {"unread_count": 9}, usuarios=[8])
+                mensagem = await asyncio.wait_for(conexao.fila.get(), timeout=2)
+                await asyncio.sleep(0.05)
+                return mensagem, conexao.fila.qsize(), canal.stats()
+            finally:
+                canal.parar()
+
+        mensagem, pendentes, stats = asyncio.run(cenario())
+
+        self.assertEqual(mensagem, {"tipo": "notificacoes.nao_lidas", "dados": {"unread_count": 3}})
+        self.assertEqual(pendentes, 0)
+        self.assertEqual(stats["eventos_recebidos_udp"], 2)
+
+    def test_stream_sse_formata_eventos_e_libera_conexao(self):
+        from routers.eventos_router import _stream_eventos
+
+        async def cenario():
+            canal = CanalEventos(porta=0)
+            await canal.iniciar()
+            conexao = canal.conectar(7)
+            with patch("routers.eventos_router.canal_eventos", canal):
+                stream = _stream_eventos(_RequestConectado(), conexao)
+                partes = [await stream.__anext__(), await stream.__anext__()]
+                canal._distribuir({"tipo": "impressao.job", "dados": {"job_id": 5}, "usuarios": [7]})
+                partes.append(await stream.__anext__())
+                await stream.aclose()
+            return partes, canal.stats(), conexao.stats()
+
+        partes, stats, conexao = asyncio.run(cenario())
+
+        self.assertEqual(partes[0], "retry: 5000\n\n")
+        self.assertTrue(partes[1].startswith("event: conectado\n"))
+        self.assertEqual(partes[2], 'event: impressao.job\ndata: {"job_id": 5}\n\n')
+        self.assertEqual(conexao["entregues"], 1)
+        self.assertEqual(stats["conexoes_ativas"], 0)
+
+    def test_sem_api_no_processo_envia_datagrama_json(self):
+        porta = _porta_livre()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receptor:
+            receptor.bind(("127.0.0.1", porta))
+            receptor.settimeout(2)
+            with patch.object(realtime_events, "canal_eventos", CanalEventos(porta=porta)):
+                publicar_job_impressao({"id": 9, "usuario_id": None}, "ERRO")
+            evento = json.loads(receptor.recv(65535))
+
+        self.assertEqual(evento["tipo"], "impressao.job")
+        self.assertEqual(evento["usuarios"], [])
+        self.assertTrue(evento["gestores"])
+
+
+if __name__ == "__main__":
+    unittest.main()
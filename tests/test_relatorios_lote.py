@@ -0,0 +1,194 @@
+import importlib
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+
+class _SmtpStub(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SmtpStubHandler)
+        self.conexoes = 0
+        self.mensagens: list[tuple[list[str], str]] = []
+        self.recusados: set[str] = set()
+        self.lock = threading.Lock()
+
+
+class _SmtpStubHandler(socketserver.StreamRequestHandler):
+    def _responder(self, linha: str):
+        self.wfile.write(f"{linha}\r\n".encode())
+
+    def handle(self):
+        servidor = self.server
+        with servidor.lock:
+            servidor.conexoes += 1
+        destinatarios: list[str] = []
+        self._responder("220 stub")
+        for bruto in self.rfile:
+            comando = bruto.decode().strip()
+            verbo = comando.split(" ", 1)[0].upper()
+            if verbo in {"EHLO", "HELO"}:
+                self._responder("250 stub")
+            elif verbo == "MAIL":
+                destinatarios = []
+                self._responder("250 OK")
+            elif verbo == "RCPT":
+                endereco = comando.split(":", 1)[1].strip().strip("<>")
+                if endereco in servidor.recusados:
+                    self._responder("550 recusado")
+                else:
+                    destinatarios.append(endereco)
+                    self._responder("250 OK")
+            elif verbo == "DATA":
+                self._responder("354 fim com .")
+                linhas = []
+                for linha in self.rfile:
+                    if linha in {b".\r\n", b".\n"}:
+                        break
+                    linhas.append(linha.decode())
+                with servidor.lock:
+                    servidor.mensagens.append((destinatarios, "".join(linhas)))
+                self._responder("250 OK")
+            elif verbo == "QUIT":
+                self._responder("221 bye")
+                return
+            else:
+                self._responder("250 OK")
+
+
+class RelatoriosLoteTest(unittest.TestCase):
+    def setUp(self):
+        self._old_env = {
+            nome: os.environ.get(nome)
+            for nome in ("DB_PATH", "SMTP_HOST", "SMTP_PORT", "SMTP_FROM", "SMTP_TLS")
+        }
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        os.environ["DB_PATH"] = os.path.join(self._tmp_dir.name, "impressao.db")
+        for nome_modulo in (
+            "database",
+            "modules.reports.batch",
+            "modules.reports.repository",
+            "modules.reports.service",
+            "modules.reports",
+        ):
+            sys.modules.pop(nome_modulo, None)
+        self.database = importlib.import_module("database")
+        self.batch = importlib.import_module("modules.reports.batch")
+        self.repository = importlib.import_module("modules.reports.repository")
+        self.database.criar_tabelas()
+
+        self.smtp = _SmtpStub()
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        os.environ.update(
+            {
+                "SMTP_HOST": "127.0.0.1",
+                "SMTP_PORT": str(self.smtp.server_address[1]),
+                "SMTP_FROM": "secretaria@escola",
+                "SMTP_TLS": "0",
+            }
+        )
+
+        self.professores = {}
+        for nome in ("Ana", "Bruno", "Carla"):
+            email = f"{nome.lower()}@escola"
+            self.database.criar_usuario(nome, email, "senha123", "professor")
+            self.professores[email] = int(self.database.buscar_usuario_por_email(email)["id"])
+
+    def tearDown(self):
+        self.smtp.shutdown()
+        self.smtp.server_close()
+        for nome_modulo in ("database", "modules.reports.batch", "modules.reports.repository"):
+            sys.modules.pop(nome_modulo, None)
+        for nome, valor in self._old_env.items():
+            if valor is None:
+                os.environ.pop(nome, None)
+            else:
+                os.environ[nome] = valor
+        self._tmp_dir.cleanup()
+
+    def _criar_lote(self, **kwargs) -> int:
+        with patch.object(self.batch, "_agendar"):
+            return self.batch.iniciar_lote("2026-05-01", "2026-05-31", **kwargs)["id"]
+
+    def _status_itens(self, lote_id: int) -> dict:
+        conn = self.database.get_connection()
+        try:
+            return {
+                row["email"]: row["status"]
+                for row in conn.execute(
+                    "SELECT email, status FROM relatorios_lote_itens WHERE lote_id = ?",
+                    (lote_id,),
+                )
+            }
+        finally:
+            conn.close()
+
+    def test_lote_envia_todos_numa_unica_sessao_smtp(self):
+        lote_id = self._criar_lote(assunto="Relatorio de maio")
+
+        with patch.object(
+            self.repository,
+            "get_attachments_report",
+            wraps=self.repository.get_attachments_report,
+        ) as anexos:
+            lote = self.batch.processar_lote(lote_id, pdf_workers=2)
+
+        anexos.assert_called_once_with("2026-05-01", "2026-05-31")
+        self.assertEqual(self.smtp.conexoes, 1)
+        self.assertEqual(
+            sorted(destinos[0] for destinos, _ in self.smtp.mensagens),
+            sorted(self.professores),
+        )
+        self.assertTrue(all("Subject: Relatorio de maio" in corpo for _, corpo in self.smtp.mensagens))
+        self.assertTrue(all("application/pdf" in corpo for _, corpo in self.smtp.mensagens))
+        self.assertEqual(lote["status"], self.batch.STATUS_LOTE_CONCLUIDO)
+        self.assertEqual((lote["total"], lote["enviados"], lote["pendentes"]), (3, 3, 0))
+
+    def test_dry_run_gera_relatorios_sem_abrir_conexao(self):
+        lote_id = self._criar_lote(dry_run=True, professor_ids=[self.professores["ana@escola"]])
+
+        lote = self.batch.processar_lote(lote_id, pdf_workers=0)
+
+        self.assertEqual(self.smtp.conexoes, 0)
+        self.assertEqual(self._status_itens(lote_id), {"ana@escola": self.batch.STATUS_ITEM_SIMULADO})
+        self.assertEqual((lote["total"], lote["simulados"], lote["pendentes"]), (1, 1, 0))
+
+    def test_retomada_reenvia_apenas_itens_nao_concluidos(self):
+        self.smtp.recusados.add("bruno@escola")
+        lote_id = self._criar_lote()
+
+        lote = self.batch.processar_lote(lote_id, pdf_workers=0)
+
+        self.assertEqual((lote["enviados"], lote["erros"]), (2, 1))
+        self.assertEqual(lote["falhas"][0]["email"], "bruno@escola")
+
+        self.smtp.recusados.clear()
+        lote = self.batch.processar_lote(lote_id, pdf_workers=0)
+
+        self.assertEqual(self.smtp.conexoes, 2)
+        self.assertEqual(
+            [destinos for destinos, _ in self.smtp.mensagens][-1],
+            ["bruno@escola"],
+        )
+        self.assertEqual(len(self.smtp.mensagens), 3)
+        self.assertEqual((lote["enviados"], lote["erros"], lote["pendentes"]), (3, 0, 0))
+
+    def test_smtp_indisponivel_deixa_lote_pendente_para_retomar(self):
+        os.environ["SMTP_PORT"] = "1"
+        lote_id = self._criar_lote()
+
+        lote = self.batch.processar_lote(lote_id, pdf_workers=0)
+
+        self.assertEqual(lote["status"], self.batch.STATUS_LOTE_ERRO)
+        self.assertEqual(lote["pendentes"], 3)
+        self.assertEqual(set(self._status_itens(lote_id).values()), {self.batch.STATUS_ITEM_PENDENTE})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import importlib
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+
+class RelatoriosRollupsTest(unittest.TestCase):
+    def setUp(self):
+        self._old_db_path = os.environ.get("DB_PATH")
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, "impressao.db")
+        os.environ["DB_PATH"] = self.db_path
+        sys.modules.pop("database", None)
+        self.database = importlib.import_module("database")
+        self.database.criar_tabelas()
+        self.database.seed_recursos_padrao()
+        self.database.criar_usuario("Ana", "ana@escola", "senha123", "professor")
+        self.database.criar_usuario("Bruno", "bruno@escola", "senha123", "professor")
+        self.ana = int(self.database.buscar_usuario_por_email("ana@escola")["id"])
+        self.bruno = int(self.database.buscar_usuario_por_email("bruno@escola")["id"])
+
+    def tearDown(self):
+        sys.modules.pop("database", None)
+        if self._old_db_path is None:
+            os.environ.pop("DB_PATH", None)
+        else:
+            os.environ["DB_PATH"] = self._old_db_path
+        self._tmp_dir.cleanup()
+
+    def _executar(self, sql: str, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(sql, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _consultar(self, sql: str, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _criar_job(self, usuario_id: int, paginas: int, tags: str, criado_em: str) -> int:
+        job_id = self.database.criar_job(
+            usuario_id=usuario_id,
+            arquivo="a.pdf",
+            arquivo_path="/tmp/a.pdf",
+            copias=1,
+            paginas_totais=paginas,
+            printer_name="sala-1",
+            tags_json=tags,
+        )
+        self._executar("UPDATE jobs SET criado_em = ? WHERE id = ?", (criado_em, job_id))
+        return job_id
+
+    def _agregados_brutos(self):
+        impressao = self._consultar(
+            """
+            SELECT date(criado_em), usuario_id, COALESCE(printer_name, ''), COUNT(*), SUM(paginas_totais)
+            FROM jobs
+            WHERE status IN ('CONCLUIDO', 'FINALIZADO')
+            GROUP BY 1, 2, 3
+            ORDER BY 1, 2, 3
+            """
+        )
+        reservas = self._consultar(
+            """
+            SELECT data, recurso_id, usuario_id, COUNT(*)
+            FROM agendamentos
+            WHERE status = 'ATIVO'
+            GROUP BY 1, 2, 3
+            ORDER BY 1, 2, 3
+            """
+        )
+        return impressao, reservas
+
+    def _agregados_rollup(self):
+        impressao = self._consultar(
+            """
+            SELECT data, usuario_id, impressora, total_jobs, total_paginas
+            FROM relatorio_impressao_diario
+            WHERE total_jobs > 0
+            ORDER BY 1, 2, 3
+            """
+        )
+        reservas = self._consultar(
+            """
+            SELECT data, recurso_id, usuario_id, total_reservas
+            FROM relatorio_reservas_diario
+            WHERE total_reservas > 0
+            ORDER BY 1, 2, 3
+            """
+        )
+        return impressao, reservas
+
+    def test_agregados_acompanham_conclusao_edicao_e_cancelamento(self):
+        job_ana = self._criar_job(self.ana, 20, '["Atividade", "Prova"]', "2026-05-04 10:00:00")
+        job_bruno = self._criar_job(self.bruno, 12, '["Atividade"]', "2026-05-05 09:00:00")
+        job_pendente = self._criar_job(self.bruno, 7, '["Prova"]', "2026-05-05 11:00:00")
+        self.database.atualizar_status(job_ana, self.database.STATUS_CONCLUIDO)
+        self.database.atualizar_status(job_bruno, self.database.STATUS_CONCLUIDO)
+
+        recurso_id = int(self.database.listar_recursos_ativos()[0]["id"])
+        for dia, usuario_id in (("2026-05-05", self.ana), ("2026-05-06", self.ana), ("2026-05-06", self.bruno)):
+            self.database.criar_agendamento(
+                recurso_id=recurso_id,
+                usuario_id=usuario_id,
+                data=dia,
+                turno="MATUTINO",
+                aula="1",
+                faixa_global=1,
+                turma="7 Ano A",
+                tema_aula="Aula",
+            )
+
+        self.assertEqual(self._agregados_rollup(), self._agregados_brutos())
+        self.assertEqual(
+            self.database.gerar_relatorio_tags_impressao("2026-05-01", "2026-05-31"),
+            [
+                {"tag": "Atividade", "total_jobs": 2, "total_paginas": 32},
+                {"tag": "Prova", "total_jobs": 1, "total_paginas": 20},
+            ],
+        )
+
+        self._executar("UPDATE jobs SET tags_json = ? WHERE id = ?", ('["Projeto"]', job_ana))
+        self._executar("UPDATE jobs SET paginas_totais = 30 WHERE id = ?", (job_bruno,))
+        self.database.cancelar_job(job_pendente)
+        agendamento_id = self._consultar("SELECT MIN(id) FROM agendamentos")[0][0]
+        self.database.cancelar_agendamento(agendamento_id)
+
+        self.assertEqual(self._agregados_rollup(), self._agregados_brutos())
+        self.assertEqual(
+            [
+                (item["tag"], item["total_jobs"], item["total_paginas"])
+                for item in self.database.gerar_relatorio_tags_impressao("2026-05-01", "2026-05-31")
+            ],
+            [("Atividade", 1, 30), ("Projeto", 1, 20)],
+        )
+        self.assertEqual(
+            self.database.gerar_relatorio_impressoras("2026-05-01", "2026-05-31"),
+            [{"impressora": "sala-1", "total_jobs": 2, "total_paginas": 50}],
+        )
+        recursos = {
+            item["recurso_id"]: item
+            for item in self.database.gerar_relatorio_uso_recursos("2026-05-06", "2026-05-06")
+        }
+        self.assertEqual(recursos[recurso_id]["total_reservas"], 2)
+        self.assertEqual(recursos[recurso_id]["professores_distintos"], 2)
+
+    def test_migracao_reconstroi_agregados_de_dados_existentes(self):
+        job_id = self._criar_job(self.ana, 9, '["Atividade", "atividade", 3, ""]', "2026-03-02 08:00:00")
+        self.database.atualizar_status(job_id, self.database.STATUS_CONCLUIDO)
+        self._executar("DELETE FROM relatorio_impressao_diario")
+        self._executar("DELETE FROM relatorio_tags_diario")
+        self._executar("DELETE FROM jobs_tags")
+
+        migracao = importlib.import_module("migrations.20261018_create_report_rollups")
+        conn = sqlite3.connect(self.db_path)
+        try:
+            migracao.upgrade(conn)
+        finally:
+            conn.close()
+
+        self.assertEqual(self._agregados_rollup(), self._agregados_brutos())
+        self.assertEqual(self._consultar("SELECT tag_chave, tag FROM jobs_tags"), [("atividade", "Atividade")])
+
+        self._executar("UPDATE jobs SET status = 'CANCELADO' WHERE id = ?", (job_id,))
+        self.assertEqual(self._agregados_rollup(), self._agregados_brutos())
+
+    def test_tags_acentuadas_com_caixa_diferente_tem_a_mesma_chave(self):
+        for usuario_id, tags in ((self.ana, '["AVALIAÇÃO"]'), (self.bruno, '["Avaliação"]')):
+            job_id = self._criar_job(usuario_id, 4, tags, "2026-04-06 08:00:00")
+            self.database.atualizar_status(job_id, self.database.STATUS_CONCLUIDO)
+
+        esperado = [("avaliação", 2, 8)]
+        consulta = "SELECT tag_chave, total_jobs, total_paginas FROM relatorio_tags_diario"
+        self.assertEqual(self._consultar(consulta), esperado)
+
+        self._executar("DELETE FROM relatorio_tags_diario")
+        migracao = importlib.import_module("migrations.20261018_create_report_rollups")
+        conn = sqlite3.connect(self.db_path)
+        try:
+            migracao.upgrade(conn)
+        finally:
+            conn.close()
+        self.assertEqual(self._consultar(consulta), esperado)
+
+    def test_tags_invalidas_nao_bloqueiam_criacao_de_job(self):
+        job_id = self._criar_job(self.ana, 3, "nao-e-json", "2026-03-02 08:00:00")
+        self.database.atualizar_status(job_id, self.database.STATUS_CONCLUIDO)
+
+        self.assertEqual(self._consultar("SELECT COUNT(*) FROM jobs_tags")[0][0], 0)
+        self.assertEqual(self.database.gerar_relatorio_impressao("2026-03-01", "2026-03-31")[0]["total_paginas"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ def _reload_modulos(db_path: str):
         "database",
         "db._proxy",
         "db.relatorios",
+        "modules.reports.batch",
         "modules.reports.pdf_service",
         "modules.reports.repository",
         "modules.reports.service",
@@ -65,6 +65,54 @@ class SchemaMigrationsTest(unittest.TestCase):
             self.assertEqual(status["pending"], [])
             self.assertEqual(status["applied"], schema_migrations.list_migration_names())
 
+    def test_criar_tabelas_com_carimbo_atual_nao_pega_lock_de_escrita(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "impressao.db")
+            database, _schema_migrations = _reload_modulos(db_path)
+
+            primeira = database.criar_tabelas()
+            self.assertEqual(primeira["caminho"], "completo")
+            self.assertIn("compatibilidade_legada", primeira["tempos_ms"])
+
+            escritor = sqlite3.connect(db_path, timeout=0)
+            try:
+                escritor.execute("BEGIN IMMEDIATE")
+                segunda = database.criar_tabelas()
+                escritor.rollback()
+            finally:
+                escritor.close()
+
+            self.assertEqual(segunda["caminho"], "rapido")
+            self.assertEqual(set(segunda["tempos_ms"]), {"fingerprint", "verificacao_carimbo", "total"})
+
+    def test_carimbo_invalida_com_ddl_externo_codigo_novo_ou_forcar(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "impressao.db")
+            database, _schema_migrations = _reload_modulos(db_path)
+            database.criar_tabelas()
+
+            conn = sqlite3.connect(db_path)
+            try:
+                conn.execute("DROP INDEX idx_jobs_status_prioridade_criado_em")
+                conn.commit()
+            finally:
+                conn.close()
+            self.assertEqual(database.criar_tabelas()["caminho"], "completo")
+            conn = sqlite3.connect(db_path)
+            try:
+                indice = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'idx_jobs_status_prioridade_criado_em'"
+                ).fetchone()
+            finally:
+                conn.close()
+            self.assertIsNotNone(indice)
+            self.assertEqual(database.criar_tabelas()["caminho"], "rapido")
+
+            database._FINGERPRINT_SCHEMA = "codigo-de-schema-novo"
+            self.assertEqual(database.criar_tabelas()["caminho"], "completo")
+            self.assertEqual(database.criar_tabelas()["caminho"], "rapido")
+            self.assertEqual(database.criar_tabelas(forcar=True)["caminho"], "completo")
+
     def test_migration_adiciona_sexo_opcional_a_estudantes(self):
         migration = _load_migration_module("20260714_add_sexo_to_estudantes.py")
         conn = sqlite3.connect(":memory:")
@@ -0,0 +1,117 @@
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+from security.token_cache import TokenCache, token_cache
+
+
+class TokenCacheTest(unittest.TestCase):
+    def test_expira_apos_ttl(self):
+        now = [100.0]
+        cache = TokenCache(ttl_seconds=30, max_entries=10, clock=lambda: now[0])
+        cache.put("token", {"id": 1, "nome": "Ana"})
+
+        self.assertEqual(cache.get("token")["nome"], "Ana")
+        now[0] += 31
+        self.assertIsNone(cache.get("token"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_descarta_entrada_menos_recente(self):
+        cache = TokenCache(ttl_seconds=30, max_entries=2)
+        cache.put("a", {"id": 1})
+        cache.put("b", {"id": 2})
+        cache.get("a")
+        cache.put("c", {"id": 3})
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_invalida_todos_os_tokens_do_usuario(self):
+        cache = TokenCache(ttl_seconds=30, max_entries=10)
+        cache.put("a", {"id": 1})
+        cache.put("b", {"id": 1})
+        cache.put("c", {"id": 2})
+
+        self.assertEqual(cache.invalidate_user(1), 2)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_retorna_copia_do_usuario(self):
+        cache = TokenCache(ttl_seconds=30, max_entries=10)
+        cache.put("a", {"id": 1, "nome": "Ana"})
+        cache.get("a")["nome"] = "Outro"
+
+        self.assertEqual(cache.get("a")["nome"], "Ana")
+
+
+class TokenCacheDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self._old_db_path = os.environ.get("DB_PATH")
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        os.environ["DB_PATH"] = os.path.join(self._tmp_dir.name, "impressao.db")
+        sys.modules.pop("database", None)
+        self.database = importlib.import_module("database")
+        self.database.criar_tabelas()
+        token_cache.clear()
+
+    def tearDown(self):
+        token_cache.clear()
+        sys.modules.pop("database", None)
+        if self._old_db_path is None:
+            os.environ.pop("DB_PATH", None)
+        else:
+            os.environ["DB_PATH"] = self._old_db_path
+        self._tmp_dir.cleanup()
+
+    def _criar_professor_com_token(self, token: str) -> int:
+        professor_id = self.database.criar_professor(
+            nome="Professor Cache",
+            email="cache@escola.test",
+            senha_hash=self.database.hash_senha("senha123"),
+        )
+        self.database.salvar_token(token, professor_id, "2999-01-01 00:00:00")
+        return professor_id
+
+    def test_consultas_repetidas_usam_cache(self):
+        self._criar_professor_com_token("token-cache")
+        hits_antes = token_cache.stats()["hits"]
+
+        primeiro = self.database.buscar_usuario_por_token("token-cache")
+        segundo = self.database.buscar_usuario_por_token("token-cache")
+
+        self.assertEqual(primeiro, segundo)
+        self.assertEqual(token_cache.stats()["hits"], hits_antes + 1)
+
+    def test_revogacao_e_desativacao_invalidam_cache(self):
+        professor_id = self._criar_professor_com_token("token-revogado")
+        self.assertIsNotNone(self.database.buscar_usuario_por_token("token-revogado"))
+
+        self.database.revogar_tokens_usuario(professor_id)
+        self.assertIsNone(self.database.buscar_usuario_por_token("token-revogado"))
+
+        self.database.salvar_token("token-novo", professor_id, "2999-01-01 00:00:00")
+        self.assertIsNotNone(self.database.buscar_usuario_por_token("token-novo"))
+        self.database.desativar_professor(professor_id)
+        self.assertIsNone(self.database.buscar_usuario_por_token("token-novo"))
+
+    def test_promocao_atualiza_cargo_em_cache(self):
+        professor_id = self._criar_professor_com_token("token-promocao")
+        self.assertEqual(
+            self.database.buscar_usuario_por_token("token-promocao")["perfil"],
+            "professor",
+        )
+
+        self.database.promover_professor_para_coordenador(professor_id)
+
+        self.assertEqual(
+            self.database.buscar_usuario_por_token("token-promocao")["perfil"],
+            "coordenador",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import importlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import types
+import unittest
+
+
+def _importar_worker():
+    modulo_original = sys.modules.get("services.printer")
+    stub_printer = types.ModuleType("services.printer")
+    stub_printer.imprimir_job = lambda job: {}
+    sys.modules["services.printer"] = stub_printer
+    sys.modules.pop("services.worker", None)
+    try:
+        return importlib.import_module("services.worker")
+    finally:
+        if modulo_original is None:
+            del sys.modules["services.printer"]
+        else:
+            sys.modules["services.printer"] = modulo_original
+
+
+class ReivindicacaoJobTest(unittest.TestCase):
+    def setUp(self):
+        self._old_db_path = os.environ.get("DB_PATH")
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, "impressao.db")
+        os.environ["DB_PATH"] = self.db_path
+        sys.modules.pop("database", None)
+        self.database = importlib.import_module("database")
+        self.database.criar_tabelas()
+        self.database.criar_usuario("Admin", "admin@example.com", "senha123", "admin")
+        self.usuario_id = int(self.database.buscar_usuario_por_email("admin@example.com")["id"])
+
+    def tearDown(self):
+        sys.modules.pop("database", None)
+        sys.modules.pop("services.worker", None)
+        if self._old_db_path is None:
+            os.environ.pop("DB_PATH", None)
+        else:
+            os.environ["DB_PATH"] = self._old_db_path
+        self._tmp_dir.cleanup()
+
+    def _criar_job(self, nome: str, printer_name: str = "", prioridade: int = 0) -> int:
+        job_id = self.database.criar_job(
+            usuario_id=self.usuario_id,
+            arquivo=nome,
+            arquivo_path=f"spool/{nome}",
+            copias=1,
+            paginas_totais=1,
+            printer_name=printer_name,
+        )
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE jobs SET prioridade = ?, criado_em = datetime('now', '-1 minute') WHERE id = ?",
+            (prioridade, job_id),
+        )
+        conn.commit()
+        conn.close()
+        return job_id
+
+    def test_reivindicacoes_concorrentes_nunca_repetem_job(self):
+        criados = {self._criar_job(f"job-{indice}.pdf") for indice in range(30)}
+        reivindicados = []
+        lock = threading.Lock()
+
+        def consumir():
+            while True:
+                job = self.database.reivindicar_proximo_job()
+                if not job:
+                    return
+                with lock:
+                    reivindicados.append(int(job["id"]))
+
+        threads = [threading.Thread(target=consumir) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(reivindicados), sorted(criados))
+        self.assertIsNone(self.database.reivindicar_proximo_job())
+
+    def test_ignora_raias_ocupadas_respeitando_prioridade(self):
+        self._criar_job("normal-a.pdf", printer_name="SalaA")
+        urgente_a = self._criar_job("urgente-a.pdf", printer_name="SalaA", prioridade=1)
+        normal_b = self._criar_job("normal-b.pdf", printer_name="SalaB")
+        padrao = self._criar_job("padrao.pdf")
+
+        self.assertEqual(self.database.reivindicar_proximo_job()["id"], urgente_a)
+        job = self.database.reivindicar_proximo_job(
+            impressoras_ocupadas=["SALAA"],
+        )
+        self.assertEqual(job["id"], normal_b)
+        job = self.database.reivindicar_proximo_job(
+            impressoras_ocupadas=["salaa", "salab"],
+            impressora_padrao="Central",
+        )
+        self.assertEqual(job["id"], padrao)
+        self.assertEqual(job["status"], "IMPRIMINDO")
+        self.assertIsNone(
+            self.database.reivindicar_proximo_job(impressoras_ocupadas=["salaa"]),
+        )
+
+    def test_despachante_paraleliza_impressoras_e_serializa_cada_raia(self):
+        for indice in range(2):
+            self._criar_job(f"a-{indice}.pdf", printer_name="SalaA")
+            self._criar_job(f"b-{indice}.pdf", printer_name="SalaB")
+        worker = _importar_worker()
+        liberar = threading.Event()
+
+        def processar(job):
+            liberar.wait(5)
+            self.database.atualizar_status(job["id"], "CONCLUIDO")
+
+        despachante = worker.DespachanteImpressao(max_raias=4, processar=processar)
+        old_janela = worker.JANELA_CANCELAMENTO_SEGUNDOS
+        worker.JANELA_CANCELAMENTO_SEGUNDOS = 0
+        try:
+            self.assertEqual(despachante.despachar(), 2)
+            self.assertEqual(sorted(despachante.raias_ocupadas()), ["salaa", "salab"])
+            self.assertEqual(despachante.despachar(), 0)
+
+            liberar.set()
+            for thread in threading.enumerate():
+                if thread.name.startswith("impressao-"):
+                    thread.join(5)
+            self.assertEqual(despachante.despachar(), 2)
+        finally:
+            liberar.set()
+            worker.JANELA_CANCELAMENTO_SEGUNDOS = old_janela
+
+    def test_limite_de_raias_paralelas(self):
+        for nome in ("SalaA", "SalaB", "SalaC"):
+            self._criar_job(f"{nome}.pdf", printer_name=nome)
+        worker = _importar_worker()
+        liberar = threading.Event()
+
+        despachante = worker.DespachanteImpressao(max_raias=2, processar=lambda _job: liberar.wait(5))
+        old_janela = worker.JANELA_CANCELAMENTO_SEGUNDOS
+        worker.JANELA_CANCELAMENTO_SEGUNDOS = 0
+        try:
+            self.assertEqual(despachante.despachar(), 2)
+            self.assertTrue(despachante.lotado())
+        finally:
+            liberar.set()
+            worker.JANELA_CANCELAMENTO_SEGUNDOS = old_janela
+
+
+if __name__ == "__main__":
+    unittest.main()
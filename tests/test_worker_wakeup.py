@@ -0,0 +1,103 @@
+import importlib
+import socket
+import sys
+import threading
+import time
+import types
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from services.worker_wakeup import SinalizadorWorker
+
+
+def _porta_livre() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _importar_worker():
+    modulo_original = sys.modules.get("services.printer")
+    stub_printer = types.ModuleType("services.printer")
+    stub_printer.imprimir_job = lambda job: {}
+    sys.modules["services.printer"] = stub_printer
+    sys.modules.pop("services.worker", None)
+    try:
+        return importlib.import_module("services.worker")
+    finally:
+        if modulo_original is None:
+            del sys.modules["services.printer"]
+        else:
+            sys.modules["services.printer"] = modulo_original
+
+
+class SinalizadorWorkerTest(unittest.TestCase):
+    def test_sinal_de_outro_produtor_acorda_worker(self):
+        porta = _porta_livre()
+        worker = SinalizadorWorker(porta)
+        produtor = SinalizadorWorker(porta)
+        self.assertTrue(worker.escutar())
+        try:
+            threading.Timer(0.05, produtor.notificar).start()
+            inicio = time.monotonic()
+            self.assertTrue(worker.aguardar(5))
+            self.assertLess(time.monotonic() - inicio, 2)
+        finally:
+            worker.fechar()
+
+    def test_timeout_sem_sinal(self):
+        worker = SinalizadorWorker(_porta_livre())
+        self.assertTrue(worker.escutar())
+        try:
+            self.assertFalse(worker.aguardar(0.05))
+        finally:
+            worker.fechar()
+
+    def test_sem_porta_usa_evento_local(self):
+        worker = SinalizadorWorker(0)
+        self.assertFalse(worker.escutar())
+        worker.notificar()
+        self.assertTrue(worker.aguardar(1))
+        self.assertFalse(worker.aguardar(0.01))
+
+
+class WorkerEsperaOciosaTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.worker = _importar_worker()
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.modules.pop("services.worker", None)
+
+    def setUp(self):
+        self._old_segundos = self.worker.segundos_ate_proximo_job
+
+    def tearDown(self):
+        self.worker.segundos_ate_proximo_job = self._old_segundos
+
+    def test_fila_vazia_usa_polling_de_seguranca(self):
+        self.worker.segundos_ate_proximo_job = lambda **_kwargs: None
+        self.assertEqual(self.worker.calcular_espera_ociosa(), self.worker.INTERVALO)
+
+    def test_dorme_ate_fim_da_janela_de_cancelamento(self):
+        self.worker.segundos_ate_proximo_job = lambda **_kwargs: 3.0
+        espera = self.worker.calcular_espera_ociosa()
+        self.assertGreaterEqual(espera, 3.0)
+        self.assertLess(espera, 4.0)
+
+    def test_metricas_de_espera_na_fila(self):
+        metricas = self.worker.MetricasFilaImpressao()
+        agora = datetime(2026, 10, 1, 12, 0, 20, tzinfo=timezone.utc)
+        for atraso in (16, 18):
+            criado_em = (agora - timedelta(seconds=atraso)).strftime("%Y-%m-%d %H:%M:%S")
+            metricas.registrar_despacho({"criado_em": criado_em}, agora=agora)
+
+        resumo = metricas.resumo()
+        self.assertEqual(resumo["jobs_despachados"], 2)
+        self.assertEqual(resumo["espera_media_segundos"], 17.0)
+        self.assertEqual(resumo["espera_maxima_segundos"], 18.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
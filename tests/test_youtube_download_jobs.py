@@ -1,132 +1,229 @@
+import importlib
+import os
+import sqlite3
+import sys
 import tempfile
 import threading
 import time
+import types
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 import services.youtube_download_jobs as youtube_download_jobs
+import services.youtube_download_service as youtube_download_service
+
+
+class FakeYtDlp:
+    """Extrator falso: responde metadados com MP4 720p progressivo e grava o arquivo pedido."""
+
+    def __init__(self, tamanho_bytes: int = 10):
+        self.tamanho_bytes = tamanho_bytes
+        self.liberar = threading.Event()
+        self.liberar.set()
+        self.downloads: list[str] = []
+        self.falhar_com: str | None = None
+        self._lock = threading.Lock()
+
+    def modulo(self):
+        extrator = self
+
+        class YoutubeDL:
+            def __init__(self, opcoes):
+                self.opcoes = opcoes
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *_exc):
+                return False
+
+            def sanitize_info(self, info):
+                return info
+
+            def extract_info(self, url, download=False):
+                info = {
+                    "title": "Aula de Fisica",
+                    "duration": 90,
+                    "formats": [
+                        {"format_id": "22", "ext": "mp4", "vcodec": "avc1", "acodec": "mp4a", "height": 720},
+                    ],
+                }
+                if download:
+                    extrator.liberar.wait(timeout=5)
+                    with extrator._lock:
+                        extrator.downloads.append(url)
+                    if extrator.falhar_com:
+                        raise RuntimeError(extrator.falhar_com)
+                    Path(self.opcoes["outtmpl"] % {"ext": "mp4"}).write_bytes(b"v" * extrator.tamanho_bytes)
+                return info
+
+        return types.SimpleNamespace(YoutubeDL=YoutubeDL)
 
 
 class YoutubeDownloadJobsTest(unittest.TestCase):
+    def setUp(self):
+        self._old_db_path = os.environ.get("DB_PATH")
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp_dir.name, "impressao.db")
+        os.environ["DB_PATH"] = self.db_path
+        sys.modules.pop("database", None)
+        self.database = importlib.import_module("database")
+        self.database.criar_tabelas()
+
+        self.extrator = FakeYtDlp()
+        youtube_download_service._INFO_VIDEO_CACHE.clear()
+        for patcher in (
+            patch.dict(sys.modules, {"yt_dlp": self.extrator.modulo()}),
+            patch.object(youtube_download_service, "DOWNLOAD_DIR", Path(self._tmp_dir.name) / "youtube"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def tearDown(self):
-        with youtube_download_jobs._LOCK:
-            for job in youtube_download_jobs._JOBS.values():
-                arquivo_path = job.get("arquivo_path")
-                if arquivo_path:
-                    youtube_download_jobs.remover_arquivo_se_existir(Path(arquivo_path))
-            youtube_download_jobs._JOBS.clear()
-            youtube_download_jobs._TICKETS.clear()
-
-    def _aguardar_status(self, job_id: str, usuario_id: int, status_esperado: str, timeout: float = 3.0):
+        youtube_download_service._INFO_VIDEO_CACHE.clear()
+        sys.modules.pop("database", None)
+        if self._old_db_path is None:
+            os.environ.pop("DB_PATH", None)
+        else:
+            os.environ["DB_PATH"] = self._old_db_path
+        self._tmp_dir.cleanup()
+
+    def _aguardar_status(self, job_id: str, usuario_id: int, status_esperado: str, timeout: float = 5.0):
         limite = time.time() + timeout
         while time.time() < limite:
             job = youtube_download_jobs.obter_job_download(job_id, usuario_id)
             if job["status"] == status_esperado:
                 return job
-            time.sleep(0.05)
+            time.sleep(0.02)
         self.fail(f"Job {job_id} nao chegou ao status {status_esperado}.")
 
-    def test_criar_job_reutiliza_download_em_andamento_do_mesmo_usuario(self):
-        liberar_download = threading.Event()
-
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            caminho_arquivo = Path(tmp_dir) / "video.mp4"
-
-            def fake_baixar_arquivo(url: str, formato: str, qualidade: str | None):
-                self.assertEqual(url, "https://www.youtube.com/watch?v=abc")
-                self.assertEqual(formato, "mp4")
-                self.assertEqual(qualidade, "720p")
-                liberar_download.wait(timeout=2)
-                caminho_arquivo.write_text("video", encoding="utf-8")
-                return caminho_arquivo, "video.mp4", "video/mp4"
-
-            with (
-                patch(
-                    "services.youtube_download_jobs.preparar_solicitacao_download",
-                    return_value=("https://www.youtube.com/watch?v=abc", "mp4", "720p"),
-                ),
-                patch("services.youtube_download_jobs.baixar_arquivo", side_effect=fake_baixar_arquivo),
-            ):
-                job1 = youtube_download_jobs.criar_job_download(
-                    7,
-                    "https://www.youtube.com/watch?v=abc",
-                    "mp4",
-                    "720p",
-                )
-                job2 = youtube_download_jobs.criar_job_download(
-                    7,
-                    "https://www.youtube.com/watch?v=abc",
-                    "mp4",
-                    "720p",
-                )
-
-                self.assertEqual(job1["id"], job2["id"])
-                liberar_download.set()
-                concluido = self._aguardar_status(
-                    job1["id"],
-                    7,
-                    youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO,
-                )
-
-        self.assertTrue(concluido["pronto"])
-
-    def test_obter_arquivo_job_download_retorna_arquivo_pronto(self):
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            caminho_arquivo = Path(tmp_dir) / "aula.mp3"
-            caminho_arquivo.write_text("audio", encoding="utf-8")
-
-            with (
-                patch(
-                    "services.youtube_download_jobs.preparar_solicitacao_download",
-                    return_value=("https://www.youtube.com/watch?v=abc", "mp3", None),
-                ),
-                patch(
-                    "services.youtube_download_jobs.baixar_arquivo",
-                    return_value=(caminho_arquivo, "aula.mp3", "audio/mpeg"),
-                ),
-            ):
-                job = youtube_download_jobs.criar_job_download(3, "https://www.youtube.com/watch?v=abc", "mp3")
-                concluido = self._aguardar_status(
-                    job["id"],
-                    3,
-                    youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO,
-                )
-                caminho, nome_arquivo, media_type = youtube_download_jobs.obter_arquivo_job_download(
-                    concluido["id"],
-                    3,
-                )
-
-        self.assertEqual(caminho, caminho_arquivo)
-        self.assertEqual(nome_arquivo, "aula.mp3")
-        self.assertEqual(media_type, "audio/mpeg")
+    def _consultar(self, sql: str, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def test_pedidos_iguais_de_varios_professores_baixam_uma_vez(self):
+        self.extrator.liberar.clear()
+        urls = (
+            "https://www.youtube.com/watch?v=abcdefghijk",
+            "https://youtu.be/abcdefghijk",
+            "https://m.youtube.com/watch?v=abcdefghijk&t=30",
+        )
+        jobs: dict[int, dict] = {}
+
+        def pedir(usuario_id: int):
+            jobs[usuario_id] = youtube_download_jobs.criar_job_download(
+                usuario_id, urls[usuario_id % len(urls)], "mp4", "720p"
+            )
+
+        threads = [threading.Thread(target=pedir, args=(usuario_id,)) for usuario_id in range(1, 31)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        repetido = youtube_download_jobs.criar_job_download(7, urls[0], "mp4", "720p")
+        self.assertEqual(repetido["id"], jobs[7]["id"])
+        self.assertEqual(len({job["id"] for job in jobs.values()}), 30)
+
+        self.extrator.liberar.set()
+        caminhos = set()
+        for usuario_id, job in jobs.items():
+            concluido = self._aguardar_status(job["id"], usuario_id, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+            self.assertTrue(concluido["pronto"])
+            caminho, nome_arquivo, media_type = youtube_download_jobs.obter_arquivo_job_download(job["id"], usuario_id)
+            caminhos.add(caminho)
+            self.assertEqual((nome_arquivo, media_type), ("Aula_de_Fisica_720p.mp4", "video/mp4"))
+
+        self.assertEqual(len(self.extrator.downloads), 1)
+        self.assertEqual(len(caminhos), 1)
+        self.assertEqual(self._consultar("SELECT COUNT(*) FROM youtube_download_artefatos")[0][0], 1)
+
+    def test_cache_atende_novo_pedido_sem_baixar_de_novo(self):
+        primeiro = youtube_download_jobs.criar_job_download(1, "https://youtu.be/abcdefghijk", "mp4", "720p")
+        self._aguardar_status(primeiro["id"], 1, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+
+        # Simula outro processo da API: o estado esta todo no banco.
+        sys.modules.pop("database", None)
+        importlib.import_module("database")
+        segundo = youtube_download_jobs.criar_job_download(
+            2, "https://www.youtube.com/watch?v=abcdefghijk", "mp4", "720p"
+        )
+
+        self.assertEqual(segundo["status"], youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+        self.assertTrue(segundo["pronto"])
+        self.assertEqual(len(self.extrator.downloads), 1)
+        self.assertEqual(
+            self._consultar("SELECT usuario_id, status FROM youtube_download_jobs ORDER BY usuario_id"),
+            [(1, "CONCLUIDO"), (2, "CONCLUIDO")],
+        )
+
+        outro_formato = youtube_download_jobs.criar_job_download(2, "https://youtu.be/abcdefghijk", "mp4", "1080p")
+        self.assertEqual(outro_formato["status"], youtube_download_jobs.STATUS_DOWNLOAD_PENDENTE)
+
+    def test_cache_remove_artefatos_menos_acessados_acima_do_limite(self):
+        with patch.object(youtube_download_jobs, "CACHE_MAX_BYTES_DOWNLOAD", 25):
+            antigo = youtube_download_jobs.criar_job_download(1, "https://youtu.be/aaaaaaaaaaa", "mp4", "720p")
+            self._aguardar_status(antigo["id"], 1, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+            caminho_antigo, _, _ = youtube_download_jobs.obter_arquivo_job_download(antigo["id"], 1)
+            usado = youtube_download_jobs.criar_job_download(1, "https://youtu.be/bbbbbbbbbbb", "mp4", "720p")
+            self._aguardar_status(usado["id"], 1, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+            youtube_download_jobs.obter_arquivo_job_download(usado["id"], 1)
+
+            novo = youtube_download_jobs.criar_job_download(1, "https://youtu.be/ccccccccccc", "mp4", "720p")
+            self._aguardar_status(novo["id"], 1, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+
+            expirado = youtube_download_jobs.obter_job_download(antigo["id"], 1)
+            self.assertEqual(expirado["status"], youtube_download_jobs.STATUS_DOWNLOAD_ERRO)
+            self.assertEqual(expirado["erro_mensagem"], "O arquivo expirou ou nao esta mais disponivel.")
+            self.assertFalse(caminho_antigo.exists())
+            self.assertEqual(
+                [row[0] for row in self._consultar("SELECT video_id FROM youtube_download_artefatos ORDER BY 1")],
+                ["bbbbbbbbbbb", "ccccccccccc"],
+            )
+
+            refeito = youtube_download_jobs.criar_job_download(1, "https://youtu.be/aaaaaaaaaaa", "mp4", "720p")
+            self.assertNotEqual(refeito["id"], antigo["id"])
+            self._aguardar_status(refeito["id"], 1, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+
+        self.assertEqual(len(self.extrator.downloads), 4)
+
+    def test_falha_do_extrator_chega_a_todos_e_permite_nova_tentativa(self):
+        self.extrator.liberar.clear()
+        self.extrator.falhar_com = "ERROR: Private video"
+        job1 = youtube_download_jobs.criar_job_download(1, "https://youtu.be/abcdefghijk", "mp4", "720p")
+        job2 = youtube_download_jobs.criar_job_download(2, "https://youtu.be/abcdefghijk", "mp4", "720p")
+        self.extrator.liberar.set()
+
+        for job, usuario_id in ((job1, 1), (job2, 2)):
+            falho = self._aguardar_status(job["id"], usuario_id, youtube_download_jobs.STATUS_DOWNLOAD_ERRO)
+            self.assertEqual(
+                falho["mensagem_status"],
+                "Este video nao permite download com a configuracao atual do servidor.",
+            )
+
+        self.extrator.falhar_com = None
+        nova = youtube_download_jobs.criar_job_download(1, "https://youtu.be/abcdefghijk", "mp4", "720p")
+        self._aguardar_status(nova["id"], 1, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+        self.assertEqual(len(self.extrator.downloads), 2)
 
     def test_criar_ticket_download_retorna_url_temporaria(self):
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            caminho_arquivo = Path(tmp_dir) / "aula.mp4"
-            caminho_arquivo.write_text("video", encoding="utf-8")
-
-            with (
-                patch(
-                    "services.youtube_download_jobs.preparar_solicitacao_download",
-                    return_value=("https://www.youtube.com/watch?v=abc", "mp4", "720p"),
-                ),
-                patch(
-                    "services.youtube_download_jobs.baixar_arquivo",
-                    return_value=(caminho_arquivo, "aula.mp4", "video/mp4"),
-                ),
-            ):
-                job = youtube_download_jobs.criar_job_download(9, "https://www.youtube.com/watch?v=abc", "mp4", "720p")
-                concluido = self._aguardar_status(
-                    job["id"],
-                    9,
-                    youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO,
-                )
-                ticket = youtube_download_jobs.criar_ticket_download(concluido["id"], 9)
-                usuario_ticket = youtube_download_jobs.validar_ticket_download(concluido["id"], ticket["ticket"])
+        job = youtube_download_jobs.criar_job_download(9, "https://youtu.be/abcdefghijk", "mp4", "720p")
+        concluido = self._aguardar_status(job["id"], 9, youtube_download_jobs.STATUS_DOWNLOAD_CONCLUIDO)
+
+        ticket = youtube_download_jobs.criar_ticket_download(concluido["id"], 9)
+        usuario_ticket = youtube_download_jobs.validar_ticket_download(concluido["id"], ticket["ticket"])
 
         self.assertEqual(usuario_ticket, 9)
         self.assertIn(f"/download/jobs/{job['id']}/arquivo?ticket=", ticket["download_url"])
+        self.assertTrue(ticket["expira_em"].endswith("Z"))
+        with self.assertRaises(youtube_download_jobs.YoutubeDownloadTicketInvalidError):
+            youtube_download_jobs.validar_ticket_download("outro-job", ticket["ticket"])
+        with self.assertRaises(youtube_download_jobs.YoutubeDownloadJobNotFoundError):
+            youtube_download_jobs.obter_job_download(job["id"], 10)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@ from services.youtube_download_service import (
     _traduzir_erro_rede,
     _opcoes_ytdlp_base,
     baixar_arquivo,
+    extrair_id_video,
     formatar_duracao,
     montar_opcoes_qualidade_mp4,
     normalizar_qualidade_mp4,
@@ -41,6 +42,19 @@ class YoutubeDownloadServiceTest(unittest.TestCase):
         with self.assertRaises(YoutubeDownloadError):
             validar_url_youtube("youtube.com/watch?v=abc")
 
+    def test_extrair_id_video_reconhece_formas_do_link(self):
+        for url in (
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42",
+            "https://youtu.be/dQw4w9WgXcQ?si=abc",
+            "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+            "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+        ):
+            self.assertEqual(extrair_id_video(url), "dQw4w9WgXcQ")
+
+        outro = extrair_id_video("https://videos.escola.local/aula.mp4")
+        self.assertTrue(outro.startswith("url-"))
+        self.assertEqual(outro, extrair_id_video("https://videos.escola.local/aula.mp4"))
+
     def test_normalizar_qualidade_mp4_rejeita_valor_invalido(self):
         with self.assertRaises(YoutubeDownloadError):
             normalizar_qualidade_mp4("480p")